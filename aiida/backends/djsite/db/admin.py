@@ -9,12 +9,11 @@
 ###########################################################################
 from django.contrib import admin
 
-from .models import DbNode, DbLink, DbAttribute, DbGroup, DbComputer, DbAuthInfo, DbComment
+from .models import DbNode, DbLink, DbGroup, DbComputer, DbAuthInfo, DbComment
 
 
 admin.site.register(DbNode)
 admin.site.register(DbLink)
-admin.site.register(DbAttribute)
 admin.site.register(DbGroup)
 admin.site.register(DbComputer)
 admin.site.register(DbAuthInfo)
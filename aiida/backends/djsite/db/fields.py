@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Custom Django model fields used by the AiiDA models.
+"""
+import datetime
+import json
+import re
+
+from dateutil import parser
+from django.db import models as m
+from django.db.models.lookups import Lookup
+from psycopg2.extras import Json
+
+# The datetimes are stored as ISO 8601 strings in the JSON, as in the SQLAlchemy
+# backend, and the strings with this format are converted back when loading
+date_reg = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d+(\+\d{2}:\d{2})?$')
+
+
+def serialize_dates(value):
+    """
+    Recursively replace the datetime objects with their isoformat string
+
+    :param value: a JSON-serializable value, possibly containing datetimes
+    :return: a copy of value with the datetimes replaced
+    """
+    if isinstance(value, list):
+        return [serialize_dates(_) for _ in value]
+    elif isinstance(value, dict):
+        return dict((key, serialize_dates(val)) for key, val in value.iteritems())
+    elif isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def deserialize_dates(value):
+    """
+    Recursively replace the strings in isoformat with the datetime objects they represent
+
+    :param value: a value loaded from JSON
+    :return: a copy of value with the datetime strings replaced
+    """
+    if isinstance(value, list):
+        return [deserialize_dates(_) for _ in value]
+    elif isinstance(value, dict):
+        return dict((key, deserialize_dates(val)) for key, val in value.iteritems())
+    elif isinstance(value, basestring) and date_reg.match(value):
+        try:
+            return parser.parse(value)
+        except (ValueError, TypeError):
+            return value
+    return value
+
+
+def dumps_json(value):
+    """
+    Serialize to JSON, transforming the datetime objects into their isoformat
+    """
+    return json.dumps(serialize_dates(value))
+
+
+def to_jsonb(value):
+    """
+    :param value: a JSON-serializable value, possibly containing datetimes
+    :return: the value adapted to be passed as a jsonb parameter of a raw SQL query
+    """
+    return Json(value, dumps=dumps_json)
+
+
+class JSONBField(m.Field):
+    """
+    A field stored in a PostgreSQL JSONB column, holding any JSON-serializable
+    python value (typically a dictionary). Datetimes are stored as strings in
+    isoformat and converted back when loading.
+    """
+    __metaclass__ = m.SubfieldBase
+
+    description = "JSON object stored as PostgreSQL jsonb"
+
+    def db_type(self, connection):
+        return 'jsonb'
+
+    def to_python(self, value):
+        # psycopg2 already loads jsonb columns, but the value could also come
+        # as a string, e.g. from a serialized fixture
+        if isinstance(value, basestring):
+            value = json.loads(value)
+        return deserialize_dates(value)
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        return to_jsonb(value)
+
+    def get_prep_lookup(self, lookup_type, value):
+        if lookup_type in JSONB_LOOKUPS:
+            return value
+        return super(JSONBField, self).get_prep_lookup(lookup_type, value)
+
+    def get_db_prep_lookup(self, lookup_type, value, connection, prepared=False):
+        if lookup_type == 'contains':
+            return [to_jsonb(value)]
+        elif lookup_type == 'has_key':
+            return [value]
+        return super(JSONBField, self).get_db_prep_lookup(lookup_type, value, connection, prepared=prepared)
+
+    def value_to_string(self, obj):
+        return dumps_json(self._get_val_from_obj(obj))
+
+
+class JSONBContains(Lookup):
+    """
+    The ``contains`` lookup, e.g. ``DbNode.objects.filter(attributes__contains={'state': 'FINISHED'})``,
+    translated to the JSONB containment operator, that can use a GIN index
+    """
+    lookup_name = 'contains'
+
+    def as_sql(self, qn, connection):
+        lhs, lhs_params = self.process_lhs(qn, connection)
+        rhs, rhs_params = self.process_rhs(qn, connection)
+        return '{} @> {}'.format(lhs, rhs), lhs_params + rhs_params
+
+
+class JSONBHasKey(Lookup):
+    """
+    The ``has_key`` lookup, e.g. ``DbNode.objects.filter(extras__has_key='_aiida_hash')``,
+    translated to the JSONB key existence operator, that can use a GIN index
+    """
+    lookup_name = 'has_key'
+
+    def as_sql(self, qn, connection):
+        lhs, lhs_params = self.process_lhs(qn, connection)
+        rhs, rhs_params = self.process_rhs(qn, connection)
+        return '{} ? {}'.format(lhs, rhs), lhs_params + rhs_params
+
+
+JSONB_LOOKUPS = ('contains', 'has_key')
+
+JSONBField.register_lookup(JSONBContains)
+JSONBField.register_lookup(JSONBHasKey)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+from aiida.backends.djsite.db.migrations import update_schema_version
+
+
+SCHEMA_VERSION = "1.0.13"
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0012_drop_dblock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DbCheckpoint',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('pid', models.IntegerField(unique=True)),
+                ('mtime', models.DateTimeField(auto_now=True)),
+                ('encoding', models.CharField(max_length=64)),
+                ('checksum', models.CharField(max_length=64)),
+                ('data', models.BinaryField()),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        update_schema_version(SCHEMA_VERSION)
+    ]
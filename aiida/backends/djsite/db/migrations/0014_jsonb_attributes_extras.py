@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+import aiida.backends.djsite.db.fields
+from aiida.backends.djsite.db.migrations import update_schema_version
+
+
+SCHEMA_VERSION = "1.0.14"
+
+# Number of nodes whose attributes and extras are converted at a time
+MIGRATION_BATCH_SIZE = 1000
+
+
+def attributes_to_jsonb(apps, schema_editor):
+    """
+    Copy the attributes and extras stored as one row per value in the
+    DbAttribute and DbExtra tables into the JSONB columns of the nodes
+    """
+    from itertools import groupby
+    from django.db import connection
+    from aiida.backends.djsite.db.fields import to_jsonb
+    from aiida.backends.djsite.db.models import DbNode, DbAttribute, DbExtra, deserialize_attributes
+
+    columns = ('dbnode_id', 'key', 'datatype', 'tval', 'fval', 'ival', 'bval', 'dval')
+    pks = list(DbNode.objects.order_by('pk').values_list('pk', flat=True))
+
+    for start in range(0, len(pks), MIGRATION_BATCH_SIZE):
+        batch = pks[start:start + MIGRATION_BATCH_SIZE]
+        for model, column in ((DbAttribute, 'attributes'), (DbExtra, 'extras')):
+            rows = model.objects.filter(dbnode_id__in=batch).order_by('dbnode_id').values_list(*columns)
+            updates = []
+            for pk, node_rows in groupby(rows.iterator(), key=lambda row: row[0]):
+                data = {row[1]: dict(zip(columns[2:], row[2:])) for row in node_rows}
+                values = deserialize_attributes(data, sep=model._sep, original_class=model, original_pk=pk)
+                updates.append((to_jsonb(values), pk))
+
+            with connection.cursor() as cursor:
+                cursor.executemany('UPDATE db_dbnode SET {} = %s WHERE id = %s'.format(column), updates)
+
+
+def jsonb_to_attributes(apps, schema_editor):
+    """
+    Write the attributes and extras of the JSONB columns of the nodes back
+    as one row per value in the DbAttribute and DbExtra tables, replacing the
+    rows left from before the migration, that can be outdated
+    """
+    from aiida.backends.djsite.db.fields import deserialize_dates
+    from aiida.backends.djsite.db.models import DbNode, DbAttribute, DbExtra
+
+    pks = list(DbNode.objects.order_by('pk').values_list('pk', flat=True))
+
+    for start in range(0, len(pks), MIGRATION_BATCH_SIZE):
+        batch = pks[start:start + MIGRATION_BATCH_SIZE]
+        for model, column in ((DbAttribute, 'attributes'), (DbExtra, 'extras')):
+            rows = []
+            for pk, values in DbNode.objects.filter(pk__in=batch).values_list('pk', column).iterator():
+                # values_list returns the JSON as loaded by psycopg2, with the datetimes as strings
+                values = deserialize_dates(values or {})
+                rows.extend(model.reset_values_for_node(pk, values, with_transaction=False, return_not_store=True))
+
+            model.objects.filter(dbnode_id__in=batch).delete()
+            model.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0013_add_dbcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dbnode',
+            name='attributes',
+            field=aiida.backends.djsite.db.fields.JSONBField(default=dict),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='dbnode',
+            name='extras',
+            field=aiida.backends.djsite.db.fields.JSONBField(default=dict),
+            preserve_default=True,
+        ),
+        migrations.RunPython(attributes_to_jsonb, jsonb_to_attributes),
+        # GIN indexes speed up the key existence (?) and containment (@>)
+        # operators, used by the QueryBuilder for has_key and equality filters.
+        # We use the RunSQL command because Django 1.7 cannot define them
+        migrations.RunSQL("""
+        CREATE INDEX db_dbnode_attributes_gin ON db_dbnode USING gin (attributes);
+        CREATE INDEX db_dbnode_extras_gin ON db_dbnode USING gin (extras);
+        """, """
+        DROP INDEX db_dbnode_attributes_gin;
+        DROP INDEX db_dbnode_extras_gin;
+        """),
+        update_schema_version(SCHEMA_VERSION)
+    ]
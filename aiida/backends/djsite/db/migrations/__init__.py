@@ -9,7 +9,7 @@
 ###########################################################################
 
 
-LATEST_MIGRATION = '0012_drop_dblock'
+LATEST_MIGRATION = '0014_jsonb_attributes_extras'
 
 
 def _update_schema_version(version, apps, schema_editor):
@@ -26,6 +26,7 @@ from aiida.backends.settings import AIIDANODES_UUID_VERSION
 from aiida.backends.djsite.settings.settings import AUTH_USER_MODEL
 import aiida.backends.djsite.db.migrations as migrations
 from aiida.backends.utils import AIIDA_ATTRIBUTE_SEP
+from aiida.backends.djsite.db.fields import JSONBField, to_jsonb
 
 # This variable identifies the schema version of this file.
 # Every time you change the schema below in *ANY* way, REMEMBER TO CHANGE
@@ -116,16 +117,15 @@ class DbNode(m.Model):
     * A is 'input' of C.
     * C is 'output' of A.
 
-    Internal attributes, that define the node itself,
-    are stored in the DbAttribute table; further user-defined attributes,
-    called 'extra', are stored in the DbExtra table (same schema and methods
-    of the DbAttribute table, but the code does not rely on the content of the
-    table, therefore the user can use it at his will to tag or annotate nodes.
+    Internal attributes, that define the node itself, are stored as a
+    dictionary in the JSONB column 'attributes'; further user-defined
+    attributes, called 'extras', are stored in the JSONB column 'extras'
+    (the code does not rely on their content, therefore the user can use them
+    at his will to tag or annotate nodes).
 
-    :note: Attributes in the DbAttribute table have to be thought as belonging
-       to the DbNode, (this is the reason for which there is no 'user' field
-       in the DbAttribute field). Moreover, Attributes define uniquely the
-       Node so should be immutable
+    :note: Attributes define uniquely the Node so should be immutable.
+       The DbAttribute and DbExtra tables, where they were stored as one row
+       per value, are only kept to migrate existing databases.
     """
     uuid = UUIDField(auto=True, version=AIIDANODES_UUID_VERSION, db_index=True)
     # in the form data.upffile., data.structure., calculation., ...
@@ -161,6 +161,9 @@ class DbNode(m.Model):
     # For the API: whether this node
     public = m.BooleanField(default=False)
 
+    attributes = JSONBField(default=dict)
+    extras = JSONBField(default=dict)
+
     objects = m.Manager()
     # Return aiida Node instances or their subclasses instead of DbNode instances
     aiidaobjects = AiidaObjectManager()
@@ -205,19 +208,104 @@ class DbNode(m.Model):
             thistype = thistype[:-1]  # Strip final dot
             return thistype.rpartition('.')[2]
 
-    @property
-    def attributes(self):
+    def set_attr(self, key, value):
         """
-        Return all attributes of the given node as a single dictionary.
+        Set the value of an attribute, updating only that key in the database
+
+        :param key: the key of the attribute
+        :param value: its value
         """
-        return DbAttribute.get_all_values_for_node(self)
+        self._set_json_key('attributes', key, value)
 
-    @property
-    def extras(self):
+    def del_attr(self, key):
+        """
+        Delete an attribute, updating only that key in the database
+
+        :param key: the key of the attribute
+        :raise AttributeError: if the attribute does not exist
+        """
+        self._del_json_key('attributes', key)
+
+    def set_extra(self, key, value, exclusive=False):
+        """
+        Set the value of an extra, updating only that key in the database
+
+        :param key: the key of the extra
+        :param value: its value
+        :param exclusive: if True, raise a UniquenessError if the extra
+            already exists
+        """
+        self._set_json_key('extras', key, value, exclusive=exclusive)
+
+    def reset_extras(self, new_extras):
+        """
+        Replace all the extras with the given dictionary
+
+        :param new_extras: the dictionary of the new extras
+        """
+        mtime = timezone.now()
+        DbNode.objects.filter(pk=self.pk).update(extras=new_extras, mtime=mtime)
+        self.extras = new_extras
+        self.mtime = mtime
+
+    def del_extra(self, key):
+        """
+        Delete an extra, updating only that key in the database
+
+        :param key: the key of the extra
+        :raise AttributeError: if the extra does not exist
+        """
+        self._del_json_key('extras', key)
+
+    def _set_json_key(self, column, key, value, exclusive=False):
+        """
+        Set a single key of a JSONB column with an atomic update, so that
+        the other keys possibly set meanwhile by other processes are not lost.
+        The mtime is updated too (auto_now only applies to save()).
         """
-        Return all extras of the given node as a single dictionary.
+        from django.db import connection
+        from aiida.common.exceptions import UniquenessError
+
+        if AIIDA_ATTRIBUTE_SEP in key:
+            raise ValueError("We don't know how to treat key with dot in it yet")
+
+        query = 'UPDATE db_dbnode SET {0} = {0} || %s, mtime = now() WHERE id = %s'.format(column)
+        params = [to_jsonb({key: value}), self.pk]
+        if exclusive:
+            query += ' AND NOT {} ? %s'.format(column)
+            params.append(key)
+        query += ' RETURNING {}, mtime'.format(column)
+
+        with connection.cursor() as cursor:
+            cursor.execute(query, params)
+            row = cursor.fetchone()
+        if row is None:
+            if exclusive:
+                raise UniquenessError("An extra with key '{}' already exists for node {}".format(key, self.pk))
+            raise ObjectDoesNotExist("No node with pk {} found".format(self.pk))
+        setattr(self, column, row[0])
+        self.mtime = row[1]
+
+    def _del_json_key(self, column, key):
         """
-        return DbExtra.get_all_values_for_node(self)
+        Delete a single key of a JSONB column with an atomic update, updating
+        also the mtime
+        """
+        from django.db import connection
+
+        if AIIDA_ATTRIBUTE_SEP in key:
+            raise ValueError("We don't know how to treat key with dot in it yet")
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE db_dbnode SET {0} = {0} - %s, mtime = now() '
+                'WHERE id = %s AND {0} ? %s RETURNING {0}, mtime'.format(column),
+                [key, self.pk, key])
+            row = cursor.fetchone()
+        if row is None:
+            raise AttributeError("Key {} does not exist".format(key))
+        setattr(self, column, row[0])
+        self.mtime = row[1]
 
     def __str__(self):
         simplename = self.get_simple_name(invalid_result="Unknown")
@@ -1504,6 +1592,26 @@ class DbLog(m.Model):
                                                self.objname, self.objpk, self.message)
 
 
+@python_2_unicode_compatible
+class DbCheckpoint(m.Model):
+    """
+    The last checkpoint of a process, as saved by the AiiDAPersister
+    """
+    # The pk of the calculation node of the process. It is not a ForeignKey,
+    # as for DbLog, such that the checkpoints do not get in the way of the
+    # deletion of the nodes
+    pid = m.IntegerField(unique=True)
+    mtime = m.DateTimeField(auto_now=True, editable=False)
+    # How the data was serialized and compressed, e.g. 'pickle+zlib'
+    encoding = m.CharField(max_length=64)
+    # The checksum of the serialized checkpoint
+    checksum = m.CharField(max_length=64)
+    data = m.BinaryField()
+
+    def __str__(self):
+        return "[Checkpoint of process {}, {}]".format(self.pid, self.encoding)
+
+
 @python_2_unicode_compatible
 class DbWorkflow(m.Model):
     from aiida.common.datastructures import wf_states
@@ -1761,7 +1869,7 @@ class DbWorkflowStep(m.Model):
             return JobCalculation.query(workflow_step=self)
         else:
             return JobCalculation.query(workflow_step=self).filter(
-                dbattributes__key="state", dbattributes__tval=state)
+                attributes__contains={'state': state})
 
     def remove_calculations(self):
         self.calculations.all().delete()
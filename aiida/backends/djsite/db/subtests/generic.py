@@ -146,18 +146,16 @@ class TestGroupsDjango(AiidaTestCase):
 
 class TestDbExtrasDjango(AiidaTestCase):
     """
-    Test DbAttributes.
+    Test the extras in the JSONB column of DbNode.
     """
 
     def test_replacement_1(self):
-        from aiida.backends.djsite.db.models import DbExtra
-
         n1 = Node().store()
         n2 = Node().store()
 
-        DbExtra.set_value_for_node(n1._dbnode, "pippo", [1, 2, 'a'])
-        DbExtra.set_value_for_node(n1._dbnode, "pippobis", [5, 6, 'c'])
-        DbExtra.set_value_for_node(n2._dbnode, "pippo2", [3, 4, 'b'])
+        n1._dbnode.set_extra("pippo", [1, 2, 'a'])
+        n1._dbnode.set_extra("pippobis", [5, 6, 'c'])
+        n2._dbnode.set_extra("pippo2", [3, 4, 'b'])
 
         self.assertEquals(n1.get_extras(), {'pippo': [1, 2, 'a'],
                                             'pippobis': [5, 6, 'c'],
@@ -169,11 +167,11 @@ class TestDbExtrasDjango(AiidaTestCase):
 
         new_attrs = {"newval1": "v", "newval2": [1, {"c": "d", "e": 2}]}
 
-        DbExtra.reset_values_for_node(n1._dbnode, attributes=new_attrs)
+        n1._dbnode.reset_extras(new_attrs)
         self.assertEquals(n1.get_extras(), new_attrs)
         self.assertEquals(n2.get_extras(), {'pippo2': [3, 4, 'b'], '_aiida_hash': n2.get_hash()})
 
-        DbExtra.del_value_for_node(n1._dbnode, key='newval2')
+        n1._dbnode.del_extra('newval2')
         del new_attrs['newval2']
         self.assertEquals(n1.get_extras(), new_attrs)
         # Also check that other nodes were not damaged
@@ -82,11 +82,9 @@ class TestDataNodeDjango(AiidaTestCase):
                                 output_links_b[1].output.uuid])
         self.assertEquals(uuid_set, uuid_set_db_link)
 
-        # Query for related fields using django syntax
-        # Note that being myvalue an attribute, it is internally stored starting
-        # with an underscore
-        nodes_with_given_attribute = Node.query(dbattributes__key='myvalue',
-                                                dbattributes__ival=145)
+        # Query for the attributes with the containment lookup of the
+        # JSONB column
+        nodes_with_given_attribute = Node.query(attributes__contains={'myvalue': 145})
         # should be entry a3
         self.assertEquals(len(nodes_with_given_attribute), 1)
         self.assertTrue(isinstance(nodes_with_given_attribute[0], Node))
@@ -126,7 +124,7 @@ class TestTransitiveClosureDeletionDjango(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                     Node, filters={'id':n1.pk}, tag='anc'
-                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}
+                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}, edge_project='path'
                 ).count(), 0
             )
 
@@ -136,7 +134,7 @@ class TestTransitiveClosureDeletionDjango(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                     Node, filters={'id':n1.pk}, tag='anc'
-                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}
+                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}, edge_project='path'
                 ).count(), 2
             )
 
@@ -146,7 +144,7 @@ class TestTransitiveClosureDeletionDjango(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                     Node, filters={'id':n1.pk}, tag='anc'
-                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}
+                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}, edge_project='path'
                 ).count(), 2
             )
 
@@ -156,9 +154,16 @@ class TestTransitiveClosureDeletionDjango(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                     Node, filters={'id':n1.pk}, tag='anc'
-                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}
+                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}, edge_project='path'
                 ).count(), 4
             )
+        # ... but n8 is a descendant of n1 only once
+        self.assertEquals(
+            QueryBuilder().append(
+                    Node, filters={'id':n1.pk}, tag='anc'
+                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}
+                ).count(), 1
+            )
 
         ### I start deleting now
 
@@ -168,7 +173,7 @@ class TestTransitiveClosureDeletionDjango(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                     Node, filters={'id':n1.pk}, tag='anc'
-                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}
+                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}, edge_project='path'
                 ).count(), 2
             )
 
@@ -177,7 +182,7 @@ class TestTransitiveClosureDeletionDjango(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                     Node, filters={'id':n1.pk}, tag='anc'
-                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}
+                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}, edge_project='path'
                 ).count(), 1
             )
         #~ self.assertEquals(
@@ -188,7 +193,7 @@ class TestTransitiveClosureDeletionDjango(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                     Node, filters={'id':n1.pk}, tag='anc'
-                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}
+                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}, edge_project='path'
                 ).count(), 0
             )
         #~ self.assertEquals(
@@ -199,13 +204,13 @@ class TestTransitiveClosureDeletionDjango(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                     Node, filters={'id':n4.pk}, tag='anc'
-                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}
+                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}, edge_project='path'
                 ).count(), 1
             )
         self.assertEquals(
             QueryBuilder().append(
                     Node, filters={'id':n5.pk}, tag='anc'
-                ).append(Node, descendant_of='anc',  filters={'id':n7.pk}
+                ).append(Node, descendant_of='anc',  filters={'id':n7.pk}, edge_project='path'
                 ).count(), 1
             )
         #~ self.assertEquals(
@@ -220,7 +225,7 @@ class TestTransitiveClosureDeletionDjango(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                     Node, filters={'id':n1.pk}, tag='anc'
-                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}
+                ).append(Node, descendant_of='anc',  filters={'id':n8.pk}, edge_project='path'
                 ).count(), 1
             )
         #~ self.assertEquals(
@@ -233,7 +238,7 @@ class TestNodeBasicDjango(AiidaTestCase):
         when replacing list and dict with objects that have no deepness,
         no junk is left in the DB (i.e., no 'dict.a', 'list.3.h', ...
         """
-        from aiida.backends.djsite.db.models import DbExtra
+        from aiida.backends.djsite.db.models import DbNode
 
         a = Node().store()
         extras_to_set = {
@@ -272,12 +277,51 @@ class TestNodeBasicDjango(AiidaTestCase):
         extras_to_set.update(new_extras)
 
         # Check (manually) that, when replacing list and dict with objects
-        # that have no deepness, no junk is left in the DB (i.e., no
-        # 'dict.a', 'list.3.h', ...
-        self.assertEquals(len(DbExtra.objects.filter(
-            dbnode=a, key__startswith=('list' + DbExtra._sep))), 0)
-        self.assertEquals(len(DbExtra.objects.filter(
-            dbnode=a, key__startswith=('dict' + DbExtra._sep))), 0)
+        # that have no deepness, the JSONB column in the DB only contains
+        # the new values
+        extras_to_set['_aiida_hash'] = a.get_hash()
+        self.assertEquals(DbNode.objects.get(pk=a.pk).extras, extras_to_set)
+
+    def test_jsonb_lookups(self):
+        """
+        Check the containment and key existence lookups on the JSONB columns
+        of the attributes and extras
+        """
+        from aiida.backends.djsite.db.models import DbNode
+
+        a = Node()
+        a._set_attr('state', 'FINISHED')
+        a._set_attr('nested', {'value': 1.5, 'list': [1, 2]})
+        a.store()
+        a.set_extra('tag', 'first')
+        b = Node()
+        b._set_attr('state', 'FAILED')
+        b.store()
+
+        self.assertEquals(
+            list(DbNode.objects.filter(attributes__contains={'state': 'FINISHED'}).values_list('pk', flat=True)),
+            [a.pk])
+        self.assertEquals(
+            list(DbNode.objects.filter(attributes__contains={'nested': {'value': 1.5}}).values_list('pk', flat=True)),
+            [a.pk])
+        self.assertEquals(
+            list(DbNode.objects.filter(extras__has_key='tag').values_list('pk', flat=True)),
+            [a.pk])
+        self.assertEquals(
+            sorted(DbNode.objects.filter(pk__in=[a.pk, b.pk], extras__has_key='_aiida_hash').values_list(
+                'pk', flat=True)), sorted([a.pk, b.pk]))
+
+    def test_set_extra_exclusive(self):
+        """
+        An exclusive extra can only be set if it does not exist yet
+        """
+        from aiida.common.exceptions import UniquenessError
+
+        a = Node().store()
+        a.set_extra_exclusive('tag', 'first')
+        with self.assertRaises(UniquenessError):
+            a.set_extra_exclusive('tag', 'second')
+        self.assertEquals(a.get_extra('tag'), 'first')
 
     def test_attrs_and_extras_wrong_keyname(self):
         """
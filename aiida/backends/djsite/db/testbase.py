@@ -111,6 +111,10 @@ class DjangoTests(AiidaTestImplementation):
 
         DbLog.objects.all().delete()
 
+        from aiida.backends.djsite.db.models import DbCheckpoint
+
+        DbCheckpoint.objects.all().delete()
+
     # Note this is has to be a normal method, not a class method
     def tearDownClass_method(self):
         from aiida.settings import REPOSITORY_PATH
@@ -42,8 +42,6 @@ class QueryManagerDjango(AbstractQueryManager):
 
         :return: a list of calculation objects matching the filters.
         """
-        # I assume that calc_states are strings. If this changes in the future,
-        # update the filter below from dbattributes__tval to the correct field.
         from aiida.orm import Computer
         from aiida.common.exceptions import InputValidationError
         from aiida.orm.implementation.django.calculation.job import JobCalculation
@@ -66,8 +64,7 @@ class QueryManagerDjango(AbstractQueryManager):
             kwargs['dbcomputer__enabled'] = True
 
         queryresults = JobCalculation.query(
-            dbattributes__key='state',
-            dbattributes__tval=state,
+            attributes__contains={'state': state},
             **kwargs)
 
         if only_computer_user_pairs:
@@ -167,7 +164,6 @@ class QueryManagerDjango(AbstractQueryManager):
         """
         Returns bands and closest parent structure     
         """
-        from collections import defaultdict
         from django.db.models import Q
         from aiida.common.utils import grouper
         from aiida.backends.djsite.db import models
@@ -208,25 +204,8 @@ class QueryManagerDjango(AbstractQueryManager):
             struc_pks = [structure_dict[pk] for pk in pks]
 
             # query for the attributes needed for the structure formula
-            attr_query = Q(key__startswith='kinds') | Q(key__startswith='sites')
-            attrs = models.DbAttribute.objects.filter(attr_query,
-                                                      dbnode__in=struc_pks).values_list(
-                'dbnode__pk', 'key', 'datatype', 'tval', 'fval',
-                'ival', 'bval', 'dval')
-
-            results = defaultdict(dict)
-            for attr in attrs:
-                results[attr[0]][attr[1]] = {"datatype": attr[2],
-                                             "tval": attr[3],
-                                             "fval": attr[4],
-                                             "ival": attr[5],
-                                             "bval": attr[6],
-                                             "dval": attr[7]}
-            # organize all of it in a dictionary
-            deser_data = {}
-            for k in results:
-                deser_data[k] = models.deserialize_attributes(results[k],
-                                                              sep=models.DbAttribute._sep)
+            deser_data = dict(models.DbNode.objects.filter(
+                pk__in=struc_pks).values_list('pk', 'attributes'))
 
             # prepare the printout
             for ((bid, blabel, bdate), struc_pk) in zip(this_chunk, struc_pks):
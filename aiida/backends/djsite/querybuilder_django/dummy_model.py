@@ -275,8 +275,8 @@ class DbNode(Base):
 
     nodeversion = Column(Integer, default=1)
 
-    attributes = relationship('DbAttribute', uselist=True, backref='dbnode')
-    extras = relationship('DbExtra', uselist=True, backref='dbnode')
+    attributes = Column(JSONB, default={})
+    extras = Column(JSONB, default={})
 
 
 
@@ -312,7 +312,8 @@ class DbNode(Base):
         dbnode = DjangoSchemaDbNode(
             id=self.id, type=self.type, process_type=self.process_type, uuid=self.uuid, ctime=self.ctime,
             mtime=self.mtime, label=self.label, description=self.description, dbcomputer_id=self.dbcomputer_id,
-            user_id=self.user_id, public=self.public, nodeversion=self.nodeversion
+            user_id=self.user_id, public=self.public, nodeversion=self.nodeversion,
+            attributes=self.attributes, extras=self.extras
         )
         return dbnode.get_aiida_class()
 
@@ -15,11 +15,11 @@ from json import loads as json_loads
 
 # ~ import aiida.backends.djsite.querybuilder_django.dummy_model as dummy_model
 import dummy_model
-from aiida.backends.djsite.db.models import DbAttribute, DbExtra, ObjectDoesNotExist
+from aiida.backends.djsite.db.fields import deserialize_dates
 
-from sqlalchemy import and_, or_, not_, exists, select, exists, case
-from sqlalchemy.types import Float, String
-from sqlalchemy.orm import aliased
+from sqlalchemy import and_, or_, not_
+from sqlalchemy.types import Integer, Float, Boolean, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm.attributes import InstrumentedAttribute
 
 from sqlalchemy.sql.expression import cast, ColumnClause
@@ -27,6 +27,7 @@ from sqlalchemy.sql.elements import Cast, Label
 from aiida.common.exceptions import InputValidationError
 from aiida.backends.general.querybuilder_interface import QueryBuilderInterface
 from aiida.backends.utils import _get_column
+from aiida.utils.queries import jsonb_array_length, jsonb_typeof
 from aiida.common.exceptions import (
     InputValidationError, DbContentError,
     MissingPluginError, ConfigurationError
@@ -175,8 +176,7 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
                 and acts as a wildcard. If you specifically
                 want to capture a ``%`` in the string, use: ``_%``
 
-        *   for arrays and dictionaries (only for the
-            SQLAlchemy implementation):
+        *   for arrays and dictionaries:
 
             *   contains: pass a list with all the items that
                 the array should contain, or that should be among
@@ -184,7 +184,7 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
             *   has_key: pass an element that the list has to contain
                 or that has to be a key, eg: 'has_key':'N')
 
-        *  for arrays only (SQLAlchemy version):
+        *  for arrays only:
             *   of_length
             *   longer
             *   shorter
@@ -264,6 +264,15 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
                     operator, value, attr_key,
                     column=column, column_name=column_name, alias=alias
                 )
+                if operator == '==' and not negation:
+                    # The equivalent containment, that can use the GIN index
+                    # of the JSONB column, narrows down the rows to check
+                    containment = self.get_containment_expr(
+                        value, attr_key,
+                        column=column, column_name=column_name, alias=alias
+                    )
+                    if containment is not None:
+                        expr = and_(containment, expr)
             else:
                 if column is None:
                     if (alias is None) and (column_name is None):
@@ -283,14 +292,11 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
 
     def modify_expansions(self, alias, expansions):
         """
-        For the Django schema, we have as additioanl expansions 'attributes'
-        and 'extras'
+        For the Django schema, the metadata of the computer is stored
+        in the '_metadata' column
         """
 
-        if issubclass(alias._sa_class_manager.class_, self.Node):
-            expansions.append("attributes")
-            expansions.append("extras")
-        elif issubclass(alias._sa_class_manager.class_, self.Computer):
+        if issubclass(alias._sa_class_manager.class_, self.Computer):
             try:
                 expansions.remove('metadata')
                 expansions.append('_metadata')
@@ -304,165 +310,144 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
             column=None, column_name=None,
             alias=None):
 
-        def get_attribute_db_column(mapped_class, dtype, castas=None):
-            if dtype == 't':
-                mapped_entity = mapped_class.tval
-            elif dtype == 'b':
-                mapped_entity = mapped_class.bval
-                # ~ mapped_entity = cast(mapped_class.value_str, Boolean)
-            elif dtype == 'f':
-                mapped_entity = mapped_class.fval
-                # ~ mapped_entity = cast(mapped_class.value_str, Float)
-            elif dtype == 'i':
-                mapped_entity = mapped_class.ival
-                # ~ mapped_entity = cast(mapped_class.value_str, Integer)
-            elif dtype == 'd':
-                mapped_entity = mapped_class.dval
+        def cast_according_to_type(path_in_json, value):
+            if isinstance(value, bool):
+                type_filter = jsonb_typeof(path_in_json) == 'boolean'
+                casted_entity = path_in_json.cast(Boolean)
+            elif isinstance(value, (int, float)):
+                type_filter = jsonb_typeof(path_in_json) == 'number'
+                casted_entity = path_in_json.cast(Float)
+            elif isinstance(value, dict) or value is None:
+                type_filter = jsonb_typeof(path_in_json) == 'object'
+                casted_entity = path_in_json.cast(JSONB)
+            elif isinstance(value, basestring):
+                type_filter = jsonb_typeof(path_in_json) == 'string'
+                casted_entity = path_in_json.astext
+            elif isinstance(value, datetime):
+                # Datetimes are stored as strings in isoformat, so I also
+                # check that the string is compatible with a datetime
+                type_filter = jsonb_typeof(path_in_json) == 'string'
+                regex_filter = path_in_json.astext.op(
+                    "SIMILAR TO"
+                )("\d\d\d\d-[0-1]\d-[0-3]\dT[0-2]\d:[0-5]\d:\d\d\.\d+((\+|\-)\d\d:\d\d)?")
+                type_filter = and_(type_filter, regex_filter)
+                casted_entity = path_in_json.cast(DateTime)
             else:
-                raise InputValidationError(
-                    "I don't know what to do with dtype {}".format(dtype)
-                )
-            if castas == 't':
-                mapped_entity = cast(mapped_entity, String)
-            elif castas == 'f':
-                mapped_entity = cast(mapped_entity, Float)
+                raise InputValidationError('Unknown type {}'.format(type(value)))
+            return type_filter, casted_entity
 
-            return mapped_entity
+        if column is None:
+            column = _get_column(column_name, alias)
 
-        if column:
-            mapped_class = column.prop.mapper.class_
-        else:
-            column = getattr(alias, column_name)
-            mapped_class = column.prop.mapper.class_
-        # Ok, so we have an attribute key here.
-        # Unless cast is specified, will try to infer my self where the value
-        # is stored
-        # Datetime -> dval
-        # bool -> bval
-        # string -> tval
-        # integer -> ival, fval (cast ival to float)
-        # float -> ival, fval (cast ival to float)
-        # If the user specified of_type ??
-        # That is basically a query for where the value is sitting
-        #   (which db_column in the dbattribtues)
-        # If the user specified in what to cast, he wants an operation to
-        #   be performed to cast the value to a different type
-        if isinstance(value, (list, tuple)):
-            value_type_set = set([type(i) for i in value])
-            if len(value_type_set) > 1:
-                raise InputValidationError('{}  contains more than one type'.format(value))
-            elif len(value_type_set) == 0:
-                raise InputValidationError('Given list is empty, cannot determine type')
-            else:
-                value_to_consider = value[0]
-        else:
-            value_to_consider = value
-
-        # First cases, I maybe need not do anything but just count the
-        # number of entries
-        if operator in ('of_length', 'shorter', 'longer'):
-            raise NotImplementedError(
-                "Filtering by lengths of arrays or lists is not implemented\n"
-                "in the Django-Backend"
-            )
+        database_entity = column[tuple(attr_key)]
+        if operator == '==':
+            type_filter, casted_entity = cast_according_to_type(database_entity, value)
+            expr = and_(type_filter, casted_entity == value)
+        elif operator == '>':
+            type_filter, casted_entity = cast_according_to_type(database_entity, value)
+            expr = and_(type_filter, casted_entity > value)
+        elif operator == '<':
+            type_filter, casted_entity = cast_according_to_type(database_entity, value)
+            expr = and_(type_filter, casted_entity < value)
+        elif operator in ('>=', '=>'):
+            type_filter, casted_entity = cast_according_to_type(database_entity, value)
+            expr = and_(type_filter, casted_entity >= value)
+        elif operator in ('<=', '=<'):
+            type_filter, casted_entity = cast_according_to_type(database_entity, value)
+            expr = and_(type_filter, casted_entity <= value)
         elif operator == 'of_type':
-            raise NotImplementedError(
-                "Filtering by type is not implemented\n"
-                "in the Django-Backend"
-            )
+            # http://www.postgresql.org/docs/9.5/static/functions-json.html
+            #  Possible types are object, array, string, number, boolean, and null.
+            valid_types = ('object', 'array', 'string', 'number', 'boolean', 'null')
+            if value not in valid_types:
+                raise InputValidationError(
+                    "value {} for of_type is not among valid types\n"
+                    "{}".format(value, valid_types)
+                )
+            expr = jsonb_typeof(database_entity) == value
+        elif operator == 'like':
+            type_filter, casted_entity = cast_according_to_type(database_entity, value)
+            expr = and_(type_filter, casted_entity.like(value))
+        elif operator == 'ilike':
+            type_filter, casted_entity = cast_according_to_type(database_entity, value)
+            expr = and_(type_filter, casted_entity.ilike(value))
+        elif operator == 'in':
+            type_filter, casted_entity = cast_according_to_type(database_entity, value[0])
+            expr = and_(type_filter, casted_entity.in_(value))
         elif operator == 'contains':
-            raise NotImplementedError(
-                "Contains is not implemented in the Django-backend"
+            expr = database_entity.cast(JSONB).contains(value)
+        elif operator == 'has_key':
+            expr = database_entity.cast(JSONB).has_key(value)
+        elif operator == 'of_length':
+            expr = and_(
+                jsonb_typeof(database_entity) == 'array',
+                jsonb_array_length(database_entity.cast(JSONB)) == value
+            )
+        elif operator == 'longer':
+            expr = and_(
+                jsonb_typeof(database_entity) == 'array',
+                jsonb_array_length(database_entity.cast(JSONB)) > value
             )
+        elif operator == 'shorter':
+            expr = and_(
+                jsonb_typeof(database_entity) == 'array',
+                jsonb_array_length(database_entity.cast(JSONB)) < value
+            )
+        else:
+            raise InputValidationError(
+                "Unknown operator {} for filters in JSON field".format(operator)
+            )
+        return expr
 
+    def get_containment_expr(self, value, attr_key, column=None, column_name=None, alias=None):
+        """
+        Return the containment of the value at the given path (e.g.
+        ``attributes @> '{"kinds": {"name": "Si"}}'``), that is a necessary
+        condition for the attribute to be equal to the value and can use the
+        GIN index on the JSONB column.
 
-        elif operator == 'has_key':
-            if issubclass(mapped_class, dummy_model.DbAttribute):
-                expr = alias.attributes.any(mapped_class.key == '.'.join(attr_key + [value]))
-            elif issubclass(mapped_class, dummy_model.DbExtra):
-                expr = alias.extras.any(mapped_class.key == '.'.join(attr_key + [value]))
-            else:
-                raise Exception("I was given {} as an attribute base class".format(mapped_class))
+        :returns: the containment expression, or None if the value is not a
+            string, a boolean or a number, or the path has list indices
+        """
+        if (not attr_key or isinstance(value, datetime) or
+                not isinstance(value, (basestring, bool, int, float)) or
+                any(key.isdigit() for key in attr_key)):
+            return None
 
-        else:
-            types_n_casts = []
-            if isinstance(value_to_consider, basestring):
-                types_n_casts.append(('t', None))
-            elif isinstance(value_to_consider, bool):
-                types_n_casts.append(('b', None))
-            elif isinstance(value_to_consider, (int, float)):
-                types_n_casts.append(('f', None))
-                types_n_casts.append(('i', 'f'))
-            elif isinstance(value_to_consider, datetime):
-                types_n_casts.append(('d', None))
-
-            expressions = []
-            for dtype, castas in types_n_casts:
-                try:
-                    expressions.append(
-                        self.get_filter_expr(
-                            operator, value, attr_key=[],
-                            column=get_attribute_db_column(mapped_class, dtype, castas=castas),
-                            is_attribute=False
-                        )
-                    )
-                except InputValidationError as e:
-                    raise e
+        if column is None:
+            column = _get_column(column_name, alias)
 
-            actual_attr_key = '.'.join(attr_key)
-            expr = column.any(and_(
-                mapped_class.key == actual_attr_key,
-                or_(*expressions)
-            )
-            )
-        return expr
+        contained = value
+        for key in reversed(attr_key):
+            contained = {key: contained}
+        return column.contains(contained)
 
     def get_projectable_attribute(
             self, alias, column_name, attrpath,
             cast=None, **kwargs
     ):
-        if cast is not None:
-            raise NotImplementedError(
-                "Casting is not implemented in the Django backend"
-            )
-        if not attrpath:
-            # If the user with Django backend wants all the attributes or all
-            # the extras, I will select as entity the ID of the node.
-            # in get_aiida_res, this is transformed to the dictionary of attributes.
-            if column_name in ('attributes', 'extras'):
-                entity = alias.id
-            else:
-                raise NotImplementedError(
-                    "Whatever you asked for "
-                    "({}) is not implemented"
-                    "".format(column_name)
-                )
+        """
+        :returns: An attribute store in a JSON field of the give column
+        """
+        entity = _get_column(column_name, alias)[(attrpath)]
+        if cast is None:
+            entity = entity
+        elif cast == 'f':
+            entity = entity.cast(Float)
+        elif cast == 'i':
+            entity = entity.cast(Integer)
+        elif cast == 'b':
+            entity = entity.cast(Boolean)
+        elif cast == 't':
+            entity = entity.astext
+        elif cast == 'j':
+            entity = entity.cast(JSONB)
+        elif cast == 'd':
+            entity = entity.cast(DateTime)
         else:
-            aliased_attributes = aliased(getattr(alias, column_name).prop.mapper.class_)
-
-            if not issubclass(alias._aliased_insp.class_, self.Node):
-                NotImplementedError(
-                    "Other classes than Nodes are not implemented yet"
-                )
-
-            attrkey = '.'.join(attrpath)
-
-            exists_stmt = exists(select([1], correlate=True).select_from(
-                aliased_attributes
-            ).where(and_(
-                aliased_attributes.key == attrkey,
-                aliased_attributes.dbnode_id == alias.id
-            )))
-
-            select_stmt = select(
-                [aliased_attributes.id], correlate=True
-            ).select_from(aliased_attributes).where(and_(
-                aliased_attributes.key == attrkey,
-                aliased_attributes.dbnode_id == alias.id
-            )).label('miao')
-
-            entity = case([(exists_stmt, select_stmt), ], else_=None)
-
+            raise InputValidationError(
+                "Unkown casting key {}".format(cast)
+            )
         return entity
 
     def get_aiida_res(self, key, res):
@@ -475,29 +460,9 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
 
         :returns: an aiida-compatible instance
         """
-        if key.startswith('attributes.'):
-            # If you want a specific attributes, that key was stored in res.
-            # So I call the getvalue method to expand into a dictionary
-            try:
-                returnval = DbAttribute.objects.get(id=res).getvalue()
-            except ObjectDoesNotExist:
-                # If the object does not exist, return None. This is consistent
-                # with SQLAlchemy inside the JSON
-                returnval = None
-        elif key.startswith('extras.'):
-            # Same as attributes
-            try:
-                returnval = DbExtra.objects.get(id=res).getvalue()
-            except ObjectDoesNotExist:
-                returnval = None
-        elif key == 'attributes':
-            # If you asked for all attributes, the QB return the ID of the node
-            # I use DbAttribute.get_all_values_for_nodepk
-            # to get the dictionary
-            return DbAttribute.get_all_values_for_nodepk(res)
-        elif key == 'extras':
-            # same as attributes
-            return DbExtra.get_all_values_for_nodepk(res)
+        if key.split('.')[0] in ('attributes', 'extras'):
+            # The datetimes are stored as strings in the JSONB columns
+            returnval = deserialize_dates(res)
         elif key in ('_metadata', 'transport_params') and res is not None:
             # Metadata and transport_params are stored as json strings in the DB:
             return json_loads(res)
@@ -632,11 +597,12 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
         with transaction.atomic():
             return query.first()
 
-    def iterall(self, query, batch_size, tag_to_index_dict):
+    def iterall(self, query, batch_size, tag_to_index_dict, raw=False):
         from django.db import transaction
 
         with transaction.atomic():
-            results = query.yield_per(batch_size)
+            results = self.get_results(query, batch_size, raw)
+            get_res = self.get_raw_res if raw else self.get_aiida_res
 
             if len(tag_to_index_dict) == 1:
                 # Sqlalchemy, for some strange reason, does not return a list of lsits
@@ -644,32 +610,33 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
 
                 if tag_to_index_dict.values() == ['*']:
                     for rowitem in results:
-                        yield [self.get_aiida_res(tag_to_index_dict[0], rowitem)]
+                        yield [get_res(tag_to_index_dict[0], rowitem)]
                 else:
                     for rowitem, in results:
-                        yield [self.get_aiida_res(tag_to_index_dict[0], rowitem)]
+                        yield [get_res(tag_to_index_dict[0], rowitem)]
             elif len(tag_to_index_dict) > 1:
                 for resultrow in results:
                     yield [
-                        self.get_aiida_res(tag_to_index_dict[colindex], rowitem)
+                        get_res(tag_to_index_dict[colindex], rowitem)
                         for colindex, rowitem
                         in enumerate(resultrow)
                     ]
             else:
                 raise Exception("Got an empty dictionary: {}".format(tag_to_index_dict))
 
-    def iterdict(self, query, batch_size, tag_to_projected_entity_dict):
+    def iterdict(self, query, batch_size, tag_to_projected_entity_dict, raw=False):
         from django.db import transaction
         # Wrapping everything in an atomic transaction:
         with transaction.atomic():
-            results = query.yield_per(batch_size)
+            results = self.get_results(query, batch_size, raw)
+            get_res = self.get_raw_res if raw else self.get_aiida_res
             # Two cases: If one column was asked, the database returns a matrix of rows * columns:
             nr_items = sum([len(v) for v in tag_to_projected_entity_dict.values()])
             if nr_items > 1:
                 for this_result in results:
                     yield {
                         tag: {
-                            attrkey: self.get_aiida_res(
+                            attrkey: get_res(
                                 attrkey, this_result[index_in_sql_result]
                             )
                             for attrkey, index_in_sql_result
@@ -685,7 +652,7 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
                     for this_result in results:
                         yield {
                             tag: {
-                                attrkey: self.get_aiida_res(attrkey, this_result)
+                                attrkey: get_res(attrkey, this_result)
                                 for attrkey, position in projected_entities_dict.items()
                             }
                             for tag, projected_entities_dict in tag_to_projected_entity_dict.items()
@@ -694,7 +661,7 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
                     for this_result, in results:
                         yield {
                             tag: {
-                                attrkey: self.get_aiida_res(attrkey, this_result)
+                                attrkey: get_res(attrkey, this_result)
                                 for attrkey, position in projected_entities_dict.items()
                             }
                             for tag, projected_entities_dict in tag_to_projected_entity_dict.items()
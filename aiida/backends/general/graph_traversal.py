@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Breadth-first traversal of the graph of nodes and links, run in the database.
+
+The visited nodes are kept in a temporary table together with the depth at which
+they were reached: every step joins the nodes of the last depth (the frontier) with
+the links table, instead of sending the ids of the frontier back and forth in
+``IN (...)`` lists, and the traversal is over once a step reaches no new node.
+"""
+from array import array
+
+from aiida.backends.utils import get_raw_cursor
+
+_NODES_TABLE = 'traversal_nodes'
+_LINKS_TABLE = 'traversal_links'
+
+# Number of rows fetched at once from the temporary tables
+_FETCH_SIZE = 10000
+
+_FORWARD_EDGES = """
+    SELECT l.id AS link_id, l.output_id AS node_id FROM {nodes} n JOIN db_dblink l ON l.input_id = n.id
+    WHERE n.depth = %(depth)s AND l.type IN %(forward)s"""
+
+_BACKWARD_EDGES = """
+    SELECT l.id AS link_id, l.input_id AS node_id FROM {nodes} n JOIN db_dblink l ON l.output_id = n.id
+    WHERE n.depth = %(depth)s AND l.type IN %(backward)s"""
+
+_STORE_LINKS = """, new_links AS (
+    INSERT INTO {links} (id) SELECT link_id FROM edges
+)"""
+
+_STORE_NODES = """
+INSERT INTO {nodes} (id, depth)
+SELECT DISTINCT e.node_id, %(depth)s + 1 FROM edges e
+WHERE NOT EXISTS (SELECT 1 FROM {nodes} v WHERE v.id = e.node_id)"""
+
+
+def _link_type_values(link_types):
+    return tuple(getattr(link_type, 'value', link_type) for link_type in link_types)
+
+
+def _fetch_ids(cursor, query):
+    """
+    :return: an array with the integers in the first column of the results of the query
+    """
+    ids = array('l')
+    cursor.execute(query)
+    rows = cursor.fetchmany(_FETCH_SIZE)
+    while rows:
+        ids.extend(row[0] for row in rows)
+        rows = cursor.fetchmany(_FETCH_SIZE)
+    return ids
+
+
+def traverse_graph(pks, forward=(), backward=(), max_depth=None, get_links=False):
+    """
+    Find all the nodes that can be reached from the given nodes following the links
+    of the given types, breadth first.
+
+    :param pks: an iterable with the pks of the starting nodes
+    :param forward: the types of the links to follow from their input to their output
+        (i.e. towards the descendants), as LinkType or as their values
+    :param backward: the types of the links to follow from their output to their input
+        (i.e. towards the ancestors), as LinkType or as their values
+    :param max_depth: the maximum number of links between a starting node and a visited
+        node, or None to traverse the graph until no new node is found
+    :param get_links: if True, also return the ids of the links that were followed,
+        i.e. of all the links of the given types from the nodes visited at a depth lower
+        than max_depth (these can lead to nodes that were already visited)
+    :return: a sorted array of the pks of the visited nodes, including the starting nodes,
+        or a tuple with this array and a sorted array of the ids of the followed links
+        if get_links is True
+    """
+    pks = list(set(pks))
+    forward = _link_type_values(forward)
+    backward = _link_type_values(backward)
+
+    edges = []
+    if forward:
+        edges.append(_FORWARD_EDGES)
+    if backward:
+        edges.append(_BACKWARD_EDGES)
+    step = 'WITH edges AS ({})'.format(' UNION ALL '.join(edges))
+    if get_links:
+        step += _STORE_LINKS
+    step = (step + _STORE_NODES).format(nodes=_NODES_TABLE, links=_LINKS_TABLE)
+
+    with get_raw_cursor(commit=False) as cursor:
+        # Tables left behind by an interrupted traversal on the same connection
+        cursor.execute('DROP TABLE IF EXISTS {}, {}'.format(_NODES_TABLE, _LINKS_TABLE))
+        cursor.execute('CREATE TEMPORARY TABLE {} (id integer PRIMARY KEY, depth integer NOT NULL)'.format(
+            _NODES_TABLE))
+        cursor.execute('CREATE INDEX ON {} (depth)'.format(_NODES_TABLE))
+        if get_links:
+            cursor.execute('CREATE TEMPORARY TABLE {} (id integer NOT NULL)'.format(_LINKS_TABLE))
+
+        if pks:
+            cursor.execute('INSERT INTO {} (id, depth) SELECT unnest(%s), 0'.format(_NODES_TABLE), [pks])
+
+        depth = 0
+        while pks and edges and (max_depth is None or depth < max_depth):
+            cursor.execute(step, {'depth': depth, 'forward': forward, 'backward': backward})
+            if not cursor.rowcount:
+                break
+            depth += 1
+
+        nodes = _fetch_ids(cursor, 'SELECT id FROM {} ORDER BY id'.format(_NODES_TABLE))
+        if get_links:
+            links = _fetch_ids(cursor, 'SELECT DISTINCT id FROM {} ORDER BY id'.format(_LINKS_TABLE))
+        cursor.execute('DROP TABLE IF EXISTS {}, {}'.format(_NODES_TABLE, _LINKS_TABLE))
+
+    if get_links:
+        return nodes, links
+    return nodes
@@ -176,17 +176,56 @@ class QueryBuilderInterface():
 
         pass
     @abstractmethod
-    def iterall(self, batch_size=100):
+    def iterall(self, batch_size=100, raw=False):
         """
         :returns: An iterator over all the results of a list of lists.
         """
         pass
 
     @abstractmethod
-    def iterdict(self, batch_size=100):
+    def iterdict(self, batch_size=100, raw=False):
         """
         :returns: An iterator over all the results of a list of dictionaries.
         """
         pass
 
+    @staticmethod
+    def get_results(query, batch_size, raw=False):
+        """
+        Execute the query. If a batch size is given, the rows are streamed in
+        batches through a server-side cursor (with psycopg2) rather than being
+        all loaded in memory by the client before the first one is returned.
+
+        :param query: an instance of sqlalchemy.orm.Query
+        :param int batch_size: the number of rows to fetch at a time, or None
+            to fetch them all at once
+        :param bool raw: if True, the SQL statement of the query is executed
+            directly and plain rows are returned, without building ORM instances
+
+        :returns: an iterable over the rows
+        """
+        if raw:
+            statement = query.statement
+            if batch_size is not None:
+                statement = statement.execution_options(stream_results=True, max_row_buffer=batch_size)
+            return query.session.execute(statement)
+
+        if batch_size is not None:
+            # This also sets the stream_results execution option
+            return query.yield_per(batch_size)
+
+        return query
+
+    def get_raw_res(self, key, res):
+        """
+        Convert a value of a row returned with raw=True. By default it is
+        returned as it is.
+
+        :param key: the key that this entry would be returned with
+        :param res: the value in the row
+
+        :returns: the value
+        """
+        return res
+
 
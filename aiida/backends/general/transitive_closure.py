@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Optional transitive closure of the provenance graph, used to speed up the
+ancestor and descendant queries of the QueryBuilder.
+
+The closure table stores one row per (ancestor, descendant) pair connected through
+a path of CREATE and INPUT links, with the depth of the shortest such path (0 for a
+direct link, as in the recursive queries of the QueryBuilder). It does not exist by
+default: it is created and filled with ``verdi closure build`` and afterwards kept up
+to date by a trigger every time a link is inserted, including the bulk inserts of
+``Node.store_many`` and of the import. Deleting or modifying links does not update the
+closure, but marks it as stale: the QueryBuilder then falls back to the recursive
+queries until the closure is rebuilt.
+"""
+from string import Template
+
+from sqlalchemy import Table, Column, Integer, MetaData
+
+from aiida.backends.utils import get_raw_cursor
+from aiida.common.links import LinkType
+
+CLOSURE_TABLE_NAME = 'db_dblinkclosure'
+CLOSURE_STATE_TABLE_NAME = 'db_dblinkclosure_state'
+
+#: The link types that are followed by the ancestor_of and descendant_of joins of the QueryBuilder
+CLOSURE_LINK_TYPES = (LinkType.CREATE.value, LinkType.INPUT.value)
+
+closure_table = Table(
+    CLOSURE_TABLE_NAME, MetaData(),
+    Column('ancestor_id', Integer, primary_key=True),
+    Column('descendant_id', Integer, primary_key=True),
+    Column('depth', Integer, nullable=False),
+)
+
+_TEMPLATE_VARIABLES = dict(
+    closure_table=CLOSURE_TABLE_NAME,
+    state_table=CLOSURE_STATE_TABLE_NAME,
+    link_types=', '.join("'{}'".format(link_type) for link_type in CLOSURE_LINK_TYPES),
+)
+
+_CREATE_TABLES = Template("""
+CREATE TABLE IF NOT EXISTS $closure_table (
+    ancestor_id integer NOT NULL,
+    descendant_id integer NOT NULL,
+    depth integer NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id)
+);
+CREATE INDEX ${closure_table}_descendant_id ON $closure_table (descendant_id, ancestor_id);
+CREATE TABLE IF NOT EXISTS $state_table (
+    id integer PRIMARY KEY,
+    stale boolean NOT NULL
+);
+INSERT INTO $state_table (id, stale) SELECT 1, true WHERE NOT EXISTS (SELECT 1 FROM $state_table);
+""")
+
+# The pairs added by a new link input -> output are all the ancestors of the input (and the input itself)
+# times all the descendants of the output (and the output itself). The input and output are given a depth
+# of -1, so that the depth of the pair (input, output) is 0.
+_NEW_PAIRS = """
+    WITH ancestors AS (
+        SELECT new.input_id AS id, -1 AS depth
+        UNION ALL
+        SELECT ancestor_id, depth FROM $closure_table WHERE descendant_id = new.input_id
+    ), descendants AS (
+        SELECT new.output_id AS id, -1 AS depth
+        UNION ALL
+        SELECT descendant_id, depth FROM $closure_table WHERE ancestor_id = new.output_id
+    ), pairs AS (
+        SELECT a.id AS ancestor_id, d.id AS descendant_id, min(a.depth + d.depth + 2) AS depth
+        FROM ancestors a CROSS JOIN descendants d
+        GROUP BY a.id, d.id
+    )"""
+
+# PostgreSQL 9.5 and later can resolve concurrent insertions of the same pair with an upsert
+_INSERT_PAIRS_UPSERT = _NEW_PAIRS + """
+    INSERT INTO $closure_table (ancestor_id, descendant_id, depth)
+    SELECT ancestor_id, descendant_id, depth FROM pairs
+    ON CONFLICT (ancestor_id, descendant_id)
+    DO UPDATE SET depth = excluded.depth WHERE $closure_table.depth > excluded.depth;"""
+
+_INSERT_PAIRS_LEGACY = _NEW_PAIRS + """, updated AS (
+        UPDATE $closure_table c SET depth = p.depth FROM pairs p
+        WHERE c.ancestor_id = p.ancestor_id AND c.descendant_id = p.descendant_id AND c.depth > p.depth
+    )
+    INSERT INTO $closure_table (ancestor_id, descendant_id, depth)
+    SELECT p.ancestor_id, p.descendant_id, p.depth FROM pairs p
+    WHERE NOT EXISTS (
+        SELECT 1 FROM $closure_table c WHERE c.ancestor_id = p.ancestor_id AND c.descendant_id = p.descendant_id
+    );"""
+
+_CREATE_TRIGGERS = Template("""
+CREATE OR REPLACE FUNCTION ${closure_table}_insert()
+  RETURNS trigger AS
+$$BODY$$
+BEGIN
+    IF new.type NOT IN ($link_types) OR new.input_id = new.output_id THEN
+        RETURN NULL;
+    END IF;
+$insert_pairs
+    RETURN NULL;
+END
+$$BODY$$
+  LANGUAGE plpgsql VOLATILE;
+
+CREATE OR REPLACE FUNCTION ${closure_table}_invalidate()
+  RETURNS trigger AS
+$$BODY$$
+BEGIN
+    UPDATE $state_table SET stale = true WHERE NOT stale;
+    RETURN NULL;
+END
+$$BODY$$
+  LANGUAGE plpgsql VOLATILE;
+
+DROP TRIGGER IF EXISTS ${closure_table}_insert ON db_dblink;
+CREATE TRIGGER ${closure_table}_insert
+  AFTER INSERT ON db_dblink FOR EACH ROW
+  EXECUTE PROCEDURE ${closure_table}_insert();
+
+DROP TRIGGER IF EXISTS ${closure_table}_invalidate ON db_dblink;
+CREATE TRIGGER ${closure_table}_invalidate
+  AFTER UPDATE OR DELETE OR TRUNCATE ON db_dblink FOR EACH STATEMENT
+  EXECUTE PROCEDURE ${closure_table}_invalidate();
+""")
+
+_DROP = Template("""
+DROP TRIGGER IF EXISTS ${closure_table}_insert ON db_dblink;
+DROP TRIGGER IF EXISTS ${closure_table}_invalidate ON db_dblink;
+DROP FUNCTION IF EXISTS ${closure_table}_insert();
+DROP FUNCTION IF EXISTS ${closure_table}_invalidate();
+DROP TABLE IF EXISTS $closure_table;
+DROP TABLE IF EXISTS $state_table;
+""")
+
+# The closure is computed breadth first: the pairs at depth n + 1 are the pairs at depth n extended by one
+# link, that were not reached before. Each pair is therefore inserted once, with the depth of its shortest
+# path, and the number of rows produced at each step does not grow with the number of paths.
+_FILL_DIRECT_LINKS = Template("""
+INSERT INTO $target (ancestor_id, descendant_id, depth)
+SELECT input_id, output_id, 0 FROM db_dblink
+WHERE type IN ($link_types) AND input_id <> output_id
+GROUP BY input_id, output_id;
+""")
+
+_FILL_NEXT_DEPTH = Template("""
+INSERT INTO $target (ancestor_id, descendant_id, depth)
+SELECT c.ancestor_id, l.output_id, %s FROM $target c
+JOIN db_dblink l ON l.input_id = c.descendant_id
+WHERE c.depth = %s AND l.type IN ($link_types) AND c.ancestor_id <> l.output_id
+AND NOT EXISTS (
+    SELECT 1 FROM $target e WHERE e.ancestor_id = c.ancestor_id AND e.descendant_id = l.output_id
+)
+GROUP BY c.ancestor_id, l.output_id;
+""")
+
+_TABLE_EXISTS = "SELECT EXISTS (SELECT 1 FROM pg_tables WHERE schemaname = current_schema() AND tablename = %s)"
+
+
+def _table_exists(cursor, table_name):
+    cursor.execute(_TABLE_EXISTS, [table_name])
+    return cursor.fetchone()[0]
+
+
+def _fill(cursor, target):
+    """
+    Fill the empty table ``target`` with the transitive closure of the CREATE and INPUT links
+
+    :return: the number of inserted rows
+    """
+    variables = dict(_TEMPLATE_VARIABLES, target=target)
+    cursor.execute(_FILL_DIRECT_LINKS.substitute(variables))
+    num_rows = cursor.rowcount
+    depth = 0
+    fill_next_depth = _FILL_NEXT_DEPTH.substitute(variables)
+    while True:
+        cursor.execute(fill_next_depth, [depth + 1, depth])
+        if not cursor.rowcount:
+            return num_rows
+        num_rows += cursor.rowcount
+        depth += 1
+
+
+def build_closure():
+    """
+    Create the closure table and its triggers, if needed, and (re)compute its content
+    from the links in the database.
+
+    The links table is locked for writing while the closure is computed.
+
+    :return: the number of rows of the closure table
+    """
+    with get_raw_cursor() as cursor:
+        if not _table_exists(cursor, CLOSURE_TABLE_NAME):
+            cursor.execute(_CREATE_TABLES.substitute(_TEMPLATE_VARIABLES))
+
+        cursor.execute('SHOW server_version_num')
+        if int(cursor.fetchone()[0]) >= 90500:
+            insert_pairs = _INSERT_PAIRS_UPSERT
+        else:
+            insert_pairs = _INSERT_PAIRS_LEGACY
+        variables = dict(_TEMPLATE_VARIABLES, insert_pairs=Template(insert_pairs).substitute(_TEMPLATE_VARIABLES))
+        cursor.execute(_CREATE_TRIGGERS.substitute(variables))
+
+        cursor.execute('LOCK TABLE db_dblink IN SHARE MODE')
+        cursor.execute('TRUNCATE {}'.format(CLOSURE_TABLE_NAME))
+        num_rows = _fill(cursor, CLOSURE_TABLE_NAME)
+        cursor.execute('UPDATE {} SET stale = false'.format(CLOSURE_STATE_TABLE_NAME))
+        cursor.execute('ANALYZE {}'.format(CLOSURE_TABLE_NAME))
+
+    return num_rows
+
+
+def check_closure():
+    """
+    Compare the content of the closure table with the closure computed from the links in the database
+
+    :return: a tuple with the number of missing pairs, of pairs that should not be there and of pairs with
+        a wrong depth
+    :raise ValueError: if the closure table does not exist
+    """
+    with get_raw_cursor() as cursor:
+        if not _table_exists(cursor, CLOSURE_TABLE_NAME):
+            raise ValueError('the transitive closure table does not exist')
+
+        cursor.execute(
+            'CREATE TEMPORARY TABLE expected_closure '
+            '(ancestor_id integer, descendant_id integer, depth integer, PRIMARY KEY (ancestor_id, descendant_id)) '
+            'ON COMMIT DROP'
+        )
+        _fill(cursor, 'expected_closure')
+        cursor.execute("""
+            SELECT
+                count(*) FILTER (WHERE c.ancestor_id IS NULL),
+                count(*) FILTER (WHERE e.ancestor_id IS NULL),
+                count(*) FILTER (WHERE c.depth <> e.depth)
+            FROM expected_closure e
+            FULL OUTER JOIN {} c ON c.ancestor_id = e.ancestor_id AND c.descendant_id = e.descendant_id
+        """.format(CLOSURE_TABLE_NAME))
+        return tuple(cursor.fetchone())
+
+
+def get_closure_status():
+    """
+    :return: None if the closure table does not exist, otherwise a dictionary with the number of rows
+        of the table ('num_rows') and whether it is stale ('stale')
+    """
+    with get_raw_cursor(commit=False) as cursor:
+        if not _table_exists(cursor, CLOSURE_TABLE_NAME):
+            return None
+        cursor.execute('SELECT stale FROM {}'.format(CLOSURE_STATE_TABLE_NAME))
+        stale = cursor.fetchone()[0]
+        cursor.execute('SELECT count(*) FROM {}'.format(CLOSURE_TABLE_NAME))
+        return {'stale': stale, 'num_rows': cursor.fetchone()[0]}
+
+
+def drop_closure():
+    """
+    Remove the closure table and its triggers
+    """
+    with get_raw_cursor() as cursor:
+        cursor.execute(_DROP.substitute(_TEMPLATE_VARIABLES))
+
+
+def is_closure_usable():
+    """
+    :return: True if the closure table exists and is up to date, i.e. it can replace the recursive queries
+    """
+    with get_raw_cursor(commit=False) as cursor:
+        if not _table_exists(cursor, CLOSURE_STATE_TABLE_NAME):
+            return False
+        cursor.execute('SELECT stale FROM {}'.format(CLOSURE_STATE_TABLE_NAME))
+        return not cursor.fetchone()[0]
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Add the DbCheckpoint table for the checkpoints of the processes
+
+Revision ID: 3e0b5f2a8c1d
+Revises: a514d673c163
+Create Date: 2018-06-04 10:21:37.512842
+
+"""
+from alembic import op
+from sqlalchemy.dialects import postgresql
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e0b5f2a8c1d'
+down_revision = 'a514d673c163'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('db_dbcheckpoint',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('pid', sa.Integer(), nullable=False),
+    sa.Column('mtime', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('encoding', sa.String(length=64), nullable=False),
+    sa.Column('checksum', sa.String(length=64), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=u'db_dbcheckpoint_pkey'),
+    sa.UniqueConstraint('pid', name=u'db_dbcheckpoint_pid_key')
+    )
+
+
+def downgrade():
+    op.drop_table('db_dbcheckpoint')
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from sqlalchemy.schema import Column
+from sqlalchemy.types import Integer, DateTime, String, LargeBinary
+
+from aiida.utils import timezone
+from aiida.backends.sqlalchemy.models.base import Base
+
+
+class DbCheckpoint(Base):
+    """
+    The last checkpoint of a process, as saved by the AiiDAPersister
+    """
+    __tablename__ = "db_dbcheckpoint"
+
+    id = Column(Integer, primary_key=True)
+
+    # The pk of the calculation node of the process. It is not a foreign key,
+    # as for DbLog, such that the checkpoints do not get in the way of the
+    # deletion of the nodes
+    pid = Column(Integer, unique=True, nullable=False)
+    mtime = Column(DateTime(timezone=True), default=timezone.now, onupdate=timezone.now)
+    # How the data was serialized and compressed, e.g. 'pickle+zlib'
+    encoding = Column(String(64), nullable=False)
+    # The checksum of the serialized checkpoint
+    checksum = Column(String(64), nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+    def __str__(self):
+        return "[Checkpoint of process {}, {}]".format(self.pid, self.encoding)
@@ -624,9 +624,10 @@ class QueryBuilderImplSQLA(QueryBuilderInterface):
             self.get_session().rollback()
             raise e
 
-    def iterall(self, query, batch_size, tag_to_index_dict):
+    def iterall(self, query, batch_size, tag_to_index_dict, raw=False):
         try:
-            results = query.yield_per(batch_size)
+            results = self.get_results(query, batch_size, raw)
+            get_res = self.get_raw_res if raw else self.get_aiida_res
 
             if len(tag_to_index_dict) == 1:
                 # Sqlalchemy, for some strange reason, does not return a list of lsits
@@ -634,14 +635,14 @@ class QueryBuilderImplSQLA(QueryBuilderInterface):
 
                 if tag_to_index_dict.values() == ['*']:
                     for rowitem in results:
-                        yield [self.get_aiida_res(tag_to_index_dict[0], rowitem)]
+                        yield [get_res(tag_to_index_dict[0], rowitem)]
                 else:
                     for rowitem, in results:
-                        yield [self.get_aiida_res(tag_to_index_dict[0], rowitem)]
+                        yield [get_res(tag_to_index_dict[0], rowitem)]
             elif len(tag_to_index_dict) > 1:
                 for resultrow in results:
                     yield [
-                        self.get_aiida_res(tag_to_index_dict[colindex], rowitem)
+                        get_res(tag_to_index_dict[colindex], rowitem)
                         for colindex, rowitem
                         in enumerate(resultrow)
                     ]
@@ -651,17 +652,18 @@ class QueryBuilderImplSQLA(QueryBuilderInterface):
             self.get_session().rollback()
             raise
 
-    def iterdict(self, query, batch_size, tag_to_projected_entity_dict):
+    def iterdict(self, query, batch_size, tag_to_projected_entity_dict, raw=False):
 
         # Wrapping everything in an atomic transaction:
         try:
-            results = query.yield_per(batch_size)
+            results = self.get_results(query, batch_size, raw)
+            get_res = self.get_raw_res if raw else self.get_aiida_res
             nr_items = sum([len(v) for v in tag_to_projected_entity_dict.values()])
             if nr_items > 1:
                 for this_result in results:
                     yield {
                         tag: {
-                            attrkey: self.get_aiida_res(
+                            attrkey: get_res(
                                 attrkey, this_result[index_in_sql_result]
                             )
                             for attrkey, index_in_sql_result
@@ -677,7 +679,7 @@ class QueryBuilderImplSQLA(QueryBuilderInterface):
                     for this_result in results:
                         yield {
                             tag: {
-                                attrkey: self.get_aiida_res(attrkey, this_result)
+                                attrkey: get_res(attrkey, this_result)
                                 for attrkey, position in projected_entities_dict.items()
                             }
                             for tag, projected_entities_dict in tag_to_projected_entity_dict.items()
@@ -686,7 +688,7 @@ class QueryBuilderImplSQLA(QueryBuilderInterface):
                     for this_result, in results:
                         yield {
                             tag: {
-                                attrkey: self.get_aiida_res(attrkey, this_result)
+                                attrkey: get_res(attrkey, this_result)
                                 for attrkey, position in projected_entities_dict.items()
                             }
                             for tag, projected_entities_dict in tag_to_projected_entity_dict.items()
@@ -52,7 +52,7 @@ class TestTransitiveClosureDeletionSQLA(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n1.pk}, tag='anc'
-            ).append(Node, descendant_of='anc', filters={'id': n8.pk}
+            ).append(Node, descendant_of='anc', filters={'id': n8.pk}, edge_project='path'
                      ).count(), 0
         )
 
@@ -62,7 +62,7 @@ class TestTransitiveClosureDeletionSQLA(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n1.pk}, tag='anc'
-            ).append(Node, descendant_of='anc', filters={'id': n8.pk}
+            ).append(Node, descendant_of='anc', filters={'id': n8.pk}, edge_project='path'
                      ).count(), 2
         )
 
@@ -77,7 +77,7 @@ class TestTransitiveClosureDeletionSQLA(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n1.pk}, tag='anc'
-            ).append(Node, descendant_of='anc', filters={'id': n8.pk}
+            ).append(Node, descendant_of='anc', filters={'id': n8.pk}, edge_project='path'
                      ).count(), 2
         )
         # ~ self.assertEquals(
@@ -90,9 +90,16 @@ class TestTransitiveClosureDeletionSQLA(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n1.pk}, tag='anc'
-            ).append(Node, descendant_of='anc', filters={'id': n8.pk}
+            ).append(Node, descendant_of='anc', filters={'id': n8.pk}, edge_project='path'
                      ).count(), 4
         )
+        # ... but n8 is a descendant of n1 only once
+        self.assertEquals(
+            QueryBuilder().append(
+                Node, filters={'id': n1.pk}, tag='anc'
+            ).append(Node, descendant_of='anc', filters={'id': n8.pk}
+                     ).count(), 1
+        )
 
         # ~ self.assertEquals(
         # ~ DbPath.query.filter(DbPath.parent == n1.dbnode,
@@ -107,7 +114,7 @@ class TestTransitiveClosureDeletionSQLA(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n1.pk}, tag='anc'
-            ).append(Node, descendant_of='anc', filters={'id': n8.pk}
+            ).append(Node, descendant_of='anc', filters={'id': n8.pk}, edge_project='path'
                      ).count(), 2
         )
 
@@ -123,7 +130,7 @@ class TestTransitiveClosureDeletionSQLA(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n1.pk}, tag='anc'
-            ).append(Node, descendant_of='anc', filters={'id': n8.pk}
+            ).append(Node, descendant_of='anc', filters={'id': n8.pk}, edge_project='path'
                      ).count(), 1
         )
 
@@ -139,7 +146,7 @@ class TestTransitiveClosureDeletionSQLA(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n1.pk}, tag='anc'
-            ).append(Node, descendant_of='anc', filters={'id': n8.pk}
+            ).append(Node, descendant_of='anc', filters={'id': n8.pk}, edge_project='path'
                      ).count(), 0
         )
 
@@ -154,7 +161,7 @@ class TestTransitiveClosureDeletionSQLA(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n4.pk}, tag='anc'
-            ).append(Node, descendant_of='anc', filters={'id': n8.pk}
+            ).append(Node, descendant_of='anc', filters={'id': n8.pk}, edge_project='path'
                      ).count(), 1
         )
         # ~ self.assertEquals(
@@ -165,7 +172,7 @@ class TestTransitiveClosureDeletionSQLA(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n5.pk}, tag='anc'
-            ).append(Node, descendant_of='anc', filters={'id': n7.pk}
+            ).append(Node, descendant_of='anc', filters={'id': n7.pk}, edge_project='path'
                      ).count(), 1
         )
         # ~ self.assertEquals(
@@ -180,7 +187,7 @@ class TestTransitiveClosureDeletionSQLA(AiidaTestCase):
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n1.pk}, tag='anc'
-            ).append(Node, descendant_of='anc', filters={'id': n8.pk}
+            ).append(Node, descendant_of='anc', filters={'id': n8.pk}, edge_project='path'
                      ).count(), 1
         )
         # ~ self.assertEquals(
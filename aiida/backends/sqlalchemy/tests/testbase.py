@@ -131,6 +131,7 @@ class SqlAlchemyTests(AiidaTestImplementation):
         from aiida.backends.sqlalchemy.models.node import DbLink
         from aiida.backends.sqlalchemy.models.node import DbNode
         from aiida.backends.sqlalchemy.models.log import DbLog
+        from aiida.backends.sqlalchemy.models.checkpoint import DbCheckpoint
         from aiida.backends.sqlalchemy.models.user import DbUser
 
         # Delete the workflows
@@ -168,6 +169,9 @@ class SqlAlchemyTests(AiidaTestImplementation):
         # Delete the logs
         self.test_session.query(DbLog).delete()
 
+        # Delete the checkpoints of the processes
+        self.test_session.query(DbCheckpoint).delete()
+
         self.test_session.commit()
 
     def tearDownClass_method(self):
@@ -51,6 +51,7 @@ db_test_list = {
         'computer': ['aiida.backends.tests.computer'],
         'examplehelpers': ['aiida.backends.tests.example_helpers'],
         'daemon.client': ['aiida.backends.tests.daemon.test_client'],
+        'daemon.execmanager': ['aiida.backends.tests.daemon.test_execmanager'],
         'orm.data.frozendict': ['aiida.backends.tests.orm.data.frozendict'],
         'orm.log': ['aiida.backends.tests.orm.log'],
         'orm.utils': ['aiida.backends.tests.orm.utils'],
@@ -69,6 +70,8 @@ db_test_list = {
         'work.work_chain': ['aiida.backends.tests.work.work_chain'],
         'work.workfunctions': ['aiida.backends.tests.work.test_workfunctions'],
         'work.job_processes': ['aiida.backends.tests.work.job_processes'],
+        'work.job_manager': ['aiida.backends.tests.work.test_job_manager'],
+        'work.transports': ['aiida.backends.tests.work.test_transports'],
         'plugin_loader': ['aiida.backends.tests.test_plugin_loader'],
         'daemon': ['aiida.backends.tests.daemon'],
         'verdi_commands': ['aiida.backends.tests.verdi_commands'],
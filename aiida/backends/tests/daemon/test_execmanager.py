@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+import io
+import os
+import tempfile
+
+import mock
+
+from aiida.backends.testbase import AiidaTestCase
+from aiida.daemon.execmanager import retrieve_files_from_list, upload_files_from_list
+from aiida.transport.plugins.local import LocalTransport
+
+
+class FakeCalculation(object):
+    """
+    The calculation, only used by the execmanager functions for its pk in the log messages
+    """
+    pk = 0
+
+
+def write_file(path, content):
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with io.open(path, 'w', encoding='utf8') as handle:
+        handle.write(content)
+
+
+def read_file(path):
+    with io.open(path, encoding='utf8') as handle:
+        return handle.read()
+
+
+class TestUploadFiles(AiidaTestCase):
+    """
+    Test the upload of the input files of a calculation, with and without a tarball
+    """
+
+    def setUp(self):
+        super(TestUploadFiles, self).setUp()
+        self.local_dir = tempfile.mkdtemp()
+        self.remote_dir = tempfile.mkdtemp()
+        write_file(os.path.join(self.local_dir, 'aiida.in'), u'input')
+        write_file(os.path.join(self.local_dir, 'pseudo', 'Si.upf'), u'pseudo')
+        write_file(os.path.join(self.local_dir, 'override.in'), u'override')
+        self.upload_list = [
+            (os.path.join(self.local_dir, 'aiida.in'), 'aiida.in'),
+            (os.path.join(self.local_dir, 'pseudo'), 'pseudo'),
+            (os.path.join(self.local_dir, 'override.in'), 'aiida.in'),
+        ]
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.local_dir)
+        shutil.rmtree(self.remote_dir)
+        super(TestUploadFiles, self).tearDown()
+
+    def assert_uploaded(self):
+        self.assertEquals(sorted(os.listdir(self.remote_dir)), ['aiida.in', 'pseudo'])
+        # Later entries overwrite earlier ones
+        self.assertEquals(read_file(os.path.join(self.remote_dir, 'aiida.in')), u'override')
+        self.assertEquals(read_file(os.path.join(self.remote_dir, 'pseudo', 'Si.upf')), u'pseudo')
+
+    def test_upload_with_tarball(self):
+        with LocalTransport() as transport:
+            transport.chdir(self.remote_dir)
+            with mock.patch.object(transport, 'put', wraps=transport.put) as put:
+                upload_files_from_list(FakeCalculation(), transport, self.upload_list, use_tarball=True)
+                self.assertFalse(put.called)
+
+        # The tarball is removed after being unpacked
+        self.assert_uploaded()
+
+    def test_upload_without_tarball(self):
+        with LocalTransport() as transport:
+            transport.chdir(self.remote_dir)
+            with mock.patch.object(transport, 'exec_command_wait') as exec_command_wait:
+                upload_files_from_list(FakeCalculation(), transport, self.upload_list)
+                self.assertFalse(exec_command_wait.called)
+
+        self.assert_uploaded()
+
+    def test_upload_tarball_fallback(self):
+        """
+        If the tarball cannot be unpacked on the remote, the files are uploaded one by one
+        """
+        with LocalTransport() as transport:
+            transport.chdir(self.remote_dir)
+            with mock.patch.object(transport, 'exec_command_wait', return_value=(127, '', 'tar: command not found')):
+                with mock.patch.object(transport, 'put', wraps=transport.put) as put:
+                    upload_files_from_list(FakeCalculation(), transport, self.upload_list, use_tarball=True)
+                    self.assertEquals(put.call_count, len(self.upload_list))
+
+        # Only remove the tarball, that the mocked command left behind
+        os.remove(os.path.join(self.remote_dir, '.aiida_upload.tar'))
+        self.assert_uploaded()
+
+
+class TestRetrieveFiles(AiidaTestCase):
+    """
+    Test the retrieval of the files of a calculation, with and without a tarball
+    """
+    remote_files = [
+        'aiida.out',
+        'out_1.txt',
+        'out_2.txt',
+        os.path.join('path', 'to', 'nested', 'data.txt'),
+        os.path.join('sub', 'a.dat'),
+        os.path.join('sub', 'b.dat'),
+        os.path.join('sub', 'c.txt'),
+    ]
+
+    # Plain and wildcard entries, nested entries keeping part of their path, and a missing file
+    retrieve_list = [
+        'aiida.out',
+        'out_*.txt',
+        'missing.txt',
+        [os.path.join('path', 'to', 'nested', 'data.txt'), 'dest', 2],
+        [os.path.join('sub', '*.dat'), '.', 2],
+    ]
+
+    retrieved_files = [
+        'aiida.out',
+        os.path.join('dest', 'nested', 'data.txt'),
+        'out_1.txt',
+        'out_2.txt',
+        os.path.join('sub', 'a.dat'),
+        os.path.join('sub', 'b.dat'),
+    ]
+
+    def setUp(self):
+        super(TestRetrieveFiles, self).setUp()
+        self.local_dir = tempfile.mkdtemp()
+        self.remote_dir = tempfile.mkdtemp()
+        for filename in self.remote_files:
+            write_file(os.path.join(self.remote_dir, filename), unicode(filename))
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.local_dir)
+        shutil.rmtree(self.remote_dir)
+        super(TestRetrieveFiles, self).tearDown()
+
+    def get_file_list(self, path):
+        file_list = []
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                file_list.append(os.path.relpath(os.path.join(dirpath, filename), path))
+        return sorted(file_list)
+
+    def assert_retrieved(self):
+        self.assertEquals(self.get_file_list(self.local_dir), self.retrieved_files)
+        self.assertEquals(read_file(os.path.join(self.local_dir, 'dest', 'nested', 'data.txt')),
+                          os.path.join('path', 'to', 'nested', 'data.txt'))
+        self.assertEquals(read_file(os.path.join(self.local_dir, 'sub', 'b.dat')), os.path.join('sub', 'b.dat'))
+        # The remote folder is left untouched, without the tarball
+        self.assertEquals(self.get_file_list(self.remote_dir), sorted(self.remote_files))
+
+    def test_retrieve_with_tarball(self):
+        with LocalTransport() as transport:
+            transport.chdir(self.remote_dir)
+            with mock.patch.object(transport, 'get_many', wraps=transport.get_many) as get_many:
+                retrieve_files_from_list(
+                    FakeCalculation(), transport, self.local_dir, self.retrieve_list, use_tarball=True)
+                self.assertFalse(get_many.called)
+
+        self.assert_retrieved()
+
+    def test_retrieve_without_tarball(self):
+        with LocalTransport() as transport:
+            transport.chdir(self.remote_dir)
+            with mock.patch.object(transport, 'exec_command_wait') as exec_command_wait:
+                retrieve_files_from_list(FakeCalculation(), transport, self.local_dir, self.retrieve_list)
+                self.assertFalse(exec_command_wait.called)
+
+        self.assert_retrieved()
+
+    def test_retrieve_tarball_fallback(self):
+        """
+        If the tarball cannot be created on the remote, the files are retrieved one by one
+        """
+        with LocalTransport() as transport:
+            transport.chdir(self.remote_dir)
+            with mock.patch.object(transport, 'exec_command_wait', return_value=(127, '', 'tar: command not found')):
+                with mock.patch.object(transport, 'get_many', wraps=transport.get_many) as get_many:
+                    retrieve_files_from_list(
+                        FakeCalculation(), transport, self.local_dir, self.retrieve_list, use_tarball=True)
+                    self.assertEquals(get_many.call_count, 1)
+
+        self.assert_retrieved()
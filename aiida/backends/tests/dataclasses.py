@@ -2723,6 +2723,153 @@ class TestArrayData(AiidaTestCase):
             if name == 'third':
                 self.assertAlmostEquals(abs(third - array).max(), 0.)
 
+    def test_lazy_and_sliced_access(self):
+        """
+        Check the sliced reads and the read-only memory-mapped arrays of
+        stored nodes
+        """
+        from aiida.orm.data.array import ArrayData
+        import numpy
+
+        n = ArrayData()
+        first = numpy.random.rand(5, 3, 2)
+        n.set_array('first', first)
+        objects = numpy.array([{'a': 1}, None], dtype=object)
+        n.set_array('objects', objects)
+
+        # Before storing, the index is applied to the array read from disk
+        self.assertAlmostEquals(abs(first[1:3] - n.get_array('first', slice(1, 3))).max(), 0.)
+        self.assertAlmostEquals(abs(first[2] - n.get_array('first', 2, lazy=True)).max(), 0.)
+
+        n.store()
+
+        lazy = n.get_array('first', lazy=True)
+        self.assertIsInstance(lazy, numpy.memmap)
+        self.assertAlmostEquals(abs(first - lazy).max(), 0.)
+        with self.assertRaises(ValueError):
+            lazy[0, 0, 0] = 1.
+
+        # A part read lazily is a copy that can be modified
+        part = n.get_array('first', (slice(None, None, 2), 0), lazy=True)
+        self.assertAlmostEquals(abs(first[::2, 0] - part).max(), 0.)
+        part[0, 0] = 1.
+        self.assertAlmostEquals(abs(first - n.get_array('first', lazy=True)).max(), 0.)
+
+        # The lazy reads do not fill the cache
+        self.assertEquals(len(n._cached_arrays), 0)
+
+        # Arrays of python objects cannot be memory-mapped, but are read-only too
+        lazy_objects = n.get_array('objects', lazy=True)
+        self.assertEquals(lazy_objects.tolist(), objects.tolist())
+        with self.assertRaises(ValueError):
+            lazy_objects[1] = 1
+
+    def test_cache_eviction(self):
+        """
+        Check that the least recently used arrays are dropped from the cache
+        when it grows beyond its maximum size
+        """
+        from aiida.orm.data.array import ArrayData
+        import numpy
+
+        n = ArrayData()
+        arrays = {name: numpy.random.rand(100) for name in ('first', 'second', 'third')}
+        for name, array in arrays.iteritems():
+            n.set_array(name, array)
+        n.store()
+
+        array_size = arrays['first'].nbytes
+        original_max_size = ArrayData._cache_max_size
+        n.set_cache_max_size(2 * array_size)
+        try:
+            n.get_array('first')
+            n.get_array('second')
+            n.get_array('first')
+            n.get_array('third')
+            # 'second' was the least recently used
+            self.assertEquals(list(n._cached_arrays.keys()), ['first', 'third'])
+            self.assertEquals(n._cached_size, 2 * array_size)
+            self.assertAlmostEquals(abs(arrays['second'] - n.get_array('second')).max(), 0.)
+
+            n.clear_internal_cache()
+            self.assertEquals(len(n._cached_arrays), 0)
+            self.assertEquals(n._cached_size, 0)
+        finally:
+            ArrayData._cache_max_size = original_max_size
+
+    def test_chunked_container(self):
+        """
+        Check the arrays stored in the chunked container format, read whole
+        and by part, and their hash
+        """
+        from aiida.orm.data.array import ArrayData
+        import numpy
+
+        first = numpy.random.rand(1000, 3)
+        second = numpy.arange(10)
+
+        n = ArrayData()
+        n.set_array('first', first, chunked=True)
+        n.set_array('second', second, chunked=True)
+        n.set_array('second', second)
+        self.assertEquals(sorted(n.get_folder_list()), ['first.npc', 'second.npy'])
+        hash_before = n.get_hash()
+        n.store()
+        self.assertEquals(n.get_hash(), hash_before)
+
+        self.assertAlmostEquals(abs(first - n.get_array('first')).max(), 0.)
+        self.assertAlmostEquals(abs(first - n.get_array('first', lazy=True)).max(), 0.)
+        for index in (7, -1, slice(10, 500, 3), slice(None, None, -7), (slice(2, 5), 1), (3, 2)):
+            self.assertAlmostEquals(abs(first[index] - n.get_array('first', index, lazy=True)).max(), 0.)
+        self.assertEquals(n.get_array('first', slice(5, 5), lazy=True).shape, (0, 3))
+        self.assertEquals(n.get_array('second').tolist(), second.tolist())
+
+        # Nodes with the same arrays, stored in the same formats, have the same hash
+        m = ArrayData()
+        m.set_array('first', first)
+        m.set_array('second', second)
+        self.assertNotEquals(m.get_hash(), n.get_hash())
+        m.set_array('first', n.get_array('first'), chunked=True)
+        self.assertEquals(m.get_hash(), n.get_hash())
+
+    def test_chunked_reader(self):
+        """
+        Check the random access to the chunks of a container
+        """
+        import StringIO
+        from aiida.orm.data.array.chunked import save_chunked, ChunkedArrayReader
+        import numpy
+
+        array = numpy.arange(1000 * 4, dtype=numpy.int32).reshape(1000, 4)
+        handle = StringIO.StringIO()
+        # 16 bytes per row, 10 rows per chunk
+        save_chunked(handle, array, chunk_size=160)
+        handle.seek(0)
+
+        reader = ChunkedArrayReader(handle)
+        self.assertEquals(reader.shape, (1000, 4))
+        self.assertEquals(reader.dtype, numpy.int32)
+        self.assertEquals(reader.num_chunks, 100)
+        self.assertEquals(reader.read_chunk(99).tolist(), array[990:].tolist())
+        self.assertEquals(reader.read().tolist(), array.tolist())
+        for index in (0, 999, -10, slice(5, 35), slice(995, 2000), slice(None, None, 97), (slice(3, 25), 2), (Ellipsis, 1)):
+            self.assertEquals(reader.read(index).tolist(), array[index].tolist())
+        # Steps shorter and longer than a chunk, in both directions, and empty slices
+        for index in (slice(None, None, -3), slice(500, 5, -10), slice(-1, None, -25), slice(7, 93, 10),
+                      (slice(None, None, 11), 1), slice(20, 10), slice(2000, None)):
+            self.assertEquals(reader.read(index).tolist(), array[index].tolist())
+
+        for other in (numpy.array(3.5), numpy.zeros((0, 3)), numpy.zeros((4, 0))):
+            handle = StringIO.StringIO()
+            save_chunked(handle, other)
+            handle.seek(0)
+            read = ChunkedArrayReader(handle).read()
+            self.assertEquals(read.shape, other.shape)
+            self.assertEquals(read.tolist(), other.tolist())
+
+        with self.assertRaises(ValueError):
+            save_chunked(StringIO.StringIO(), numpy.array([None], dtype=object))
+
 
 class TestTrajectoryData(AiidaTestCase):
     """
@@ -3052,6 +3199,70 @@ class TestTrajectoryData(AiidaTestCase):
         with self.assertRaises(ValueError):
             td = TrajectoryData(structurelist=structurelist)
 
+    def test_writer_and_step_iteration(self):
+        """
+        Check the trajectories written by blocks of steps, and the iteration
+        over the steps
+        """
+        from aiida.orm.data.array.trajectory import TrajectoryData
+        import numpy
+
+        numsteps = 25
+        stepids = numpy.arange(numsteps) * 10
+        times = stepids * 0.01
+        cells = numpy.array([numpy.eye(3) * (2. + i) for i in range(numsteps)])
+        symbols = numpy.array(['H', 'O', 'C'])
+        positions = numpy.random.rand(numsteps, 3, 3)
+        velocities = numpy.random.rand(numsteps, 3, 3)
+
+        reference = TrajectoryData()
+        reference.set_trajectory(stepids=stepids, cells=cells, symbols=symbols,
+                                 positions=positions, times=times,
+                                 velocities=velocities)
+
+        n = TrajectoryData()
+        with n.open_writer(symbols) as writer:
+            for start in range(0, numsteps, 10):
+                block = slice(start, start + 10)
+                writer.append(stepids[block], cells[block], positions[block],
+                              times=times[block], velocities=velocities[block])
+                with self.assertRaises(ValueError):
+                    writer.append(stepids[block], cells[block], positions[block])
+                with self.assertRaises(ValueError):
+                    writer.append(stepids[block], cells[block], positions[block][:, :2],
+                                  times=times[block], velocities=velocities[block])
+        self.assertEquals(n.numsteps, numsteps)
+        self.assertEquals(n.get_shape('positions'), (numsteps, 3, 3))
+        n.store()
+
+        self.assertEquals(n.get_stepids().tolist(), stepids.tolist())
+        self.assertAlmostEquals(abs(n.get_positions() - positions).max(), 0.)
+        self.assertAlmostEquals(abs(n.get_velocities() - velocities).max(), 0.)
+        self.assertEquals(n._prepare_xsf(), reference._prepare_xsf())
+
+        # Iterate with blocks smaller than the trajectory, in both directions
+        n._step_block_size = 4
+        for step in (1, 3, -2):
+            indices = range(numsteps)[::step]
+            steps = list(n.iter_step_data(step=step))
+            self.assertEquals(len(steps), len(indices))
+            for index, data in zip(indices, steps):
+                expected = reference.get_step_data(index)
+                self.assertEquals(data[0], expected[0])
+                self.assertAlmostEquals(data[1], expected[1])
+                self.assertEquals(data[3].tolist(), expected[3].tolist())
+                for array, expected_array in zip(data[2:6:2] + data[5:], expected[2:6:2] + expected[5:]):
+                    self.assertAlmostEquals(abs(array - expected_array).max(), 0.)
+        self.assertEquals(len(list(n.iter_step_data(start=20, stop=100))), 5)
+
+        # Without times nor velocities
+        m = TrajectoryData()
+        with m.open_writer(symbols) as writer:
+            writer.append(stepids, cells, positions)
+        self.assertIsNone(m.get_times())
+        self.assertIsNone(m.get_step_data(3)[5])
+        self.assertAlmostEquals(abs(m.get_step_data(3)[4] - positions[3]).max(), 0.)
+
     def test_export_to_file(self):
         """
         Export the band structure on a file, check if it is working
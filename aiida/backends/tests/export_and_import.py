@@ -234,6 +234,204 @@ class TestSimple(AiidaTestCase):
             # Deleting the created temporary folder
             shutil.rmtree(temp_folder, ignore_errors=True)
 
+    def test_chunked_export(self):
+        """
+        Export to tar and zip files with chunks smaller than the number of
+        exported entries, and check that links, groups and files are preserved.
+        """
+        import os
+        import shutil
+        import tempfile
+
+        from aiida.orm import load_node
+        from aiida.orm.group import Group
+        from aiida.orm.data.int import Int
+        from aiida.orm.calculation import Calculation
+        from aiida.common.links import LinkType
+        from aiida.orm import importexport
+        from aiida.orm.importexport import export, export_zip
+
+        temp_folder = tempfile.mkdtemp()
+        chunk_size = importexport.EXPORT_CHUNK_SIZE
+        batch_size = importexport.EXPORT_BATCH_SIZE
+        try:
+            calc = Calculation().store()
+            inputs = [Int(i).store() for i in range(5)]
+            for index, node in enumerate(inputs):
+                calc.add_link_from(node, 'input_{}'.format(index), link_type=LinkType.INPUT)
+            outputs = []
+            for index in range(5):
+                node = Int(index)
+                node.add_link_from(calc, 'output_{}'.format(index), link_type=LinkType.CREATE)
+                node.add_path(os.path.abspath(__file__), 'file.txt')
+                outputs.append(node.store())
+            group, _ = Group.get_or_create(name='chunked_export')
+            group.add_nodes(outputs[:3])
+
+            uuids = {node.uuid: node.value for node in inputs + outputs}
+            group_uuids = set(node.uuid for node in outputs[:3])
+
+            importexport.EXPORT_CHUNK_SIZE = 2
+            importexport.EXPORT_BATCH_SIZE = 3
+            # Write all the archives before the nodes are deleted from the database
+            filenames = []
+            for filename, function in (('export.tar.gz', export), ('export.zip', export_zip)):
+                filename = os.path.join(temp_folder, filename)
+                function([calc.dbnode, group.dbgroup], outfile=filename, silent=True)
+                filenames.append(filename)
+
+            for filename in filenames:
+                self.clean_db()
+                self.insert_data()
+                import_data(filename, silent=True)
+
+                for uuid, value in uuids.iteritems():
+                    self.assertEquals(load_node(uuid).value, value)
+                self.assertEquals(len(load_node(calc.uuid).get_inputs()), 5)
+                self.assertEquals(len(load_node(calc.uuid).get_outputs()), 5)
+                for node in outputs:
+                    self.assertEquals(load_node(node.uuid).get_folder_list(), ['file.txt'])
+                imported_group = Group.get(name='chunked_export')
+                self.assertEquals(set(node.uuid for node in imported_group.nodes), group_uuids)
+
+                self.clean_db()
+                self.insert_data()
+        finally:
+            importexport.EXPORT_CHUNK_SIZE = chunk_size
+            importexport.EXPORT_BATCH_SIZE = batch_size
+            shutil.rmtree(temp_folder, ignore_errors=True)
+
+    def test_failed_export(self):
+        """
+        A failed export leaves neither a partial archive nor a temporary file,
+        and does not overwrite an existing archive
+        """
+        import os
+        import shutil
+        import tempfile
+
+        from aiida.orm.importexport import export, export_zip
+
+        class NotAnEntity(object):
+            pass
+
+        temp_folder = tempfile.mkdtemp()
+        try:
+            for filename, function in (('export.tar.gz', export), ('export.zip', export_zip)):
+                filename = os.path.join(temp_folder, filename)
+                with self.assertRaises(ValueError):
+                    function([NotAnEntity()], outfile=filename, silent=True)
+                self.assertEquals(os.listdir(temp_folder), [])
+
+                with open(filename, 'w') as handle:
+                    handle.write('existing archive')
+                with self.assertRaises(ValueError):
+                    function([NotAnEntity()], outfile=filename, overwrite=True, silent=True)
+                self.assertEquals(os.listdir(temp_folder), [os.path.basename(filename)])
+                with open(filename) as handle:
+                    self.assertEquals(handle.read(), 'existing archive')
+                os.remove(filename)
+        finally:
+            shutil.rmtree(temp_folder, ignore_errors=True)
+
+    def test_streaming_import(self):
+        """
+        Import tar and zip files with the streaming importer, with batches
+        smaller than the number of entries, and import them again to check
+        that the existing nodes and links are recognized.
+        """
+        import os
+        import shutil
+        import tempfile
+
+        from aiida.orm import load_node
+        from aiida.orm.group import Group
+        from aiida.orm.data.int import Int
+        from aiida.orm.calculation import Calculation
+        from aiida.common.links import LinkType
+        from aiida.orm import importexport
+        from aiida.orm.importexport import export, export_zip
+
+        temp_folder = tempfile.mkdtemp()
+        batch_size = importexport.IMPORT_BATCH_SIZE
+        try:
+            calc = Calculation().store()
+            inputs = [Int(i).store() for i in range(3)]
+            for index, node in enumerate(inputs):
+                calc.add_link_from(node, 'input_{}'.format(index), link_type=LinkType.INPUT)
+            outputs = []
+            for index in range(3):
+                node = Int(index)
+                node.add_link_from(calc, 'output_{}'.format(index), link_type=LinkType.CREATE)
+                node.add_path(os.path.abspath(__file__), 'file.txt')
+                outputs.append(node.store())
+            group, _ = Group.get_or_create(name='streaming_import')
+            group.add_nodes(outputs[:2])
+
+            uuids = {node.uuid: node.value for node in inputs + outputs}
+            group_uuids = set(node.uuid for node in outputs[:2])
+
+            importexport.IMPORT_BATCH_SIZE = 2
+            # Write all the archives before the nodes are deleted from the database
+            filenames = []
+            for filename, function in (('export.tar.gz', export), ('export.zip', export_zip)):
+                filename = os.path.join(temp_folder, filename)
+                function([calc.dbnode, group.dbgroup], outfile=filename, silent=True)
+                filenames.append(filename)
+
+            for filename in filenames:
+                self.clean_db()
+                self.insert_data()
+                result = import_data(filename, silent=True, streaming=True)
+                self.assertEquals(result['Node'], {'new': 7, 'existing': 0})
+                self.assertEquals(result['Link'], {'new': 6})
+
+                for uuid, value in uuids.iteritems():
+                    self.assertEquals(load_node(uuid).value, value)
+                self.assertEquals(len(load_node(calc.uuid).get_inputs()), 3)
+                self.assertEquals(len(load_node(calc.uuid).get_outputs()), 3)
+                for node in outputs:
+                    self.assertEquals(load_node(node.uuid).get_folder_list(), ['file.txt'])
+                imported_group = Group.get(name='streaming_import')
+                self.assertEquals(set(node.uuid for node in imported_group.nodes), group_uuids)
+
+                result = import_data(filename, silent=True, streaming=True)
+                self.assertEquals(result['Node'], {'new': 0, 'existing': 7})
+                self.assertEquals(result['Link'], {'new': 0})
+                self.assertEquals(len(load_node(calc.uuid).get_outputs()), 3)
+
+                self.clean_db()
+                self.insert_data()
+        finally:
+            importexport.IMPORT_BATCH_SIZE = batch_size
+            shutil.rmtree(temp_folder, ignore_errors=True)
+
+    def test_json_members_reader(self):
+        """
+        Read the members of a JSON file with blocks smaller than the values.
+        """
+        import json
+        from StringIO import StringIO
+
+        from aiida.orm.importexport import JsonMembersReader
+
+        data = {
+            'export_data': {'Node': {str(i): {'uuid': 'uuid_{}'.format(i), 'ctime': None}
+                                     for i in range(10)}},
+            'links_uuid': [{'input': 'a', 'output': 'b', 'label': 'x]}"\\{'}],
+            'groups_uuid': {'group': ['a', 'b'], 'empty': []},
+        }
+        reader = JsonMembersReader(StringIO(json.dumps(data)))
+        reader._chunk_size = 3
+
+        self.assertEquals({keys[0]: value for keys, value in reader.iter_members(('export_data', 'Node'))},
+                          data['export_data']['Node'])
+        self.assertEquals([value for _, value in reader.iter_members(('links_uuid',))],
+                          data['links_uuid'])
+        self.assertEquals(list(reader.iter_members(('groups_uuid',), depth=2)),
+                          [(('group', 0), 'a'), (('group', 1), 'b')])
+        self.assertEquals(list(reader.iter_members(('export_data', 'Computer'))), [])
+
     def test_1(self):
         import os
         import shutil
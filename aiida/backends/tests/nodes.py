@@ -135,6 +135,101 @@ class TestNodeHashing(AiidaTestCase):
         self.assertEquals(hash1, hash2)
 
 
+class TestObjectStore(AiidaTestCase):
+    """
+    Tests the deduplication of the files of the nodes in the object store
+    """
+
+    def setUp(self):
+        from aiida.common import objectstore
+        objectstore.set_enabled(True)
+
+    def tearDown(self):
+        from aiida.common import objectstore
+        objectstore.set_enabled(None)
+
+    @staticmethod
+    def create_folderdata(content):
+        from aiida.orm.data.folder import FolderData
+        res = FolderData()
+        with res.folder.get_subfolder('path').open('file.txt', 'w') as f:
+            f.write(content)
+        res.folder.get_subfolder('path/sub').create()
+        with res.folder.get_subfolder('path/sub').open('other.txt', 'w') as f:
+            f.write(content * 2)
+        return res
+
+    def test_identical_files_are_shared(self):
+        import os
+        from aiida.common import objectstore
+        from aiida.common.hashing import clear_hash_caches
+
+        f1 = self.create_folderdata('identical content').store()
+        f2 = self.create_folderdata('identical content').store()
+        f3 = self.create_folderdata('other content').store()
+
+        path1 = f1.get_abs_path('file.txt')
+        self.assertEquals(os.stat(path1).st_ino, os.stat(f2.get_abs_path('file.txt')).st_ino)
+        self.assertNotEquals(os.stat(path1).st_ino, os.stat(f3.get_abs_path('file.txt')).st_ino)
+        self.assertIsNotNone(objectstore.get_file_digests(path1))
+
+        # The hash computed from the manifest is the same as from the content
+        hash_from_manifest = f1.get_hash()
+        objectstore.set_enabled(False)
+        clear_hash_caches()
+        self.assertEquals(f1.get_hash(), hash_from_manifest)
+        objectstore.set_enabled(True)
+
+        # The files of the copy are private copies until the copy is stored,
+        # as they can be written by their path
+        copy = f1.copy()
+        self.assertNotEquals(os.stat(copy.get_abs_path('sub/other.txt')).st_ino,
+                             os.stat(f1.get_abs_path('sub/other.txt')).st_ino)
+        copy.store()
+        self.assertEquals(os.stat(copy.get_abs_path('sub/other.txt')).st_ino,
+                          os.stat(f1.get_abs_path('sub/other.txt')).st_ino)
+
+    def test_write_does_not_modify_other_nodes(self):
+        f1 = self.create_folderdata('shared content').store()
+        f2 = self.create_folderdata('shared content').store()
+
+        with f2.folder.get_subfolder('path').open('file.txt', 'w') as f:
+            f.write('modified')
+        with f1.folder.get_subfolder('path').open('file.txt') as f:
+            self.assertEquals(f.read(), 'shared content')
+
+    def test_write_disabled_store(self):
+        """
+        The files are not checked for being shared when the object store is disabled
+        """
+        import mock
+        from aiida.common import objectstore
+
+        objectstore.set_enabled(False)
+        with mock.patch.object(objectstore, 'unshare_file') as unshare_file:
+            self.create_folderdata('content')
+            self.assertFalse(unshare_file.called)
+
+    def test_collect_garbage(self):
+        import os
+        from aiida.common import objectstore
+
+        node = self.create_folderdata('garbage content {}'.format(self.id())).store()
+        object_path = objectstore.get_object_path(
+            objectstore.get_file_digests(node.get_abs_path('file.txt'))[0])
+
+        # Other tests may have left unused objects as well
+        unused = objectstore.collect_garbage(dry_run=True)['objects']
+        node.folder.erase()
+        self.assertEquals(objectstore.collect_garbage(dry_run=True)['objects'], unused + 2)
+        self.assertTrue(os.path.exists(object_path))
+
+        removed = objectstore.collect_garbage()
+        self.assertEquals(removed['objects'], unused + 2)
+        self.assertGreaterEqual(removed['manifests'], 1)
+        self.assertFalse(os.path.exists(object_path))
+
+
 class TestTransitiveNoLoops(AiidaTestCase):
     """
     Test the transitive closure functionality
@@ -1049,6 +1144,31 @@ class TestNodeBasic(AiidaTestCase):
         a.description = 'test description'
         self.assertEquals(a.dbnode.nodeversion, 4)
 
+    def test_mtime_update(self):
+        """
+        Check that the modification time of a stored node is updated, also in
+        the database, when an attribute or an extra is changed
+        """
+        import time
+        from aiida.orm import load_node
+
+        a = Node()
+        a._set_attr('integer', self.intval)
+        a.store()
+
+        mtime = load_node(a.pk).mtime
+        # The mutability check of stored nodes is disabled, as for the attributes that
+        # can be updated, e.g. the state of a calculation
+        for change in (lambda: a._set_attr('integer', self.intval + 1, stored_check=False),
+                       lambda: a._del_attr('integer', stored_check=False),
+                       lambda: a.set_extra('extra', 'value'),
+                       lambda: a.del_extra('extra')):
+            time.sleep(0.01)
+            change()
+            self.assertGreater(a.mtime, mtime)
+            self.assertEquals(load_node(a.pk).mtime, a.mtime)
+            mtime = a.mtime
+
     def test_delete_extras(self):
         """
         Checks the ability of deleting extras, also when they are dictionaries
@@ -2336,3 +2456,107 @@ class TestNodeDeletion(AiidaTestCase):
 
         delete_nodes([wf.pk], verbosity=0, force=True, follow_returns=True)
         self._check_existence(uuids_check_existence, uuids_check_deleted)
+
+
+class TestStoreMany(AiidaTestCase):
+
+    def test_store_many(self):
+        """
+        The nodes are stored with their attributes, files, hash and the cached
+        links between them, parents before children
+        """
+        import tempfile
+        from aiida.orm.data.parameter import ParameterData
+
+        inputs = [ParameterData(dict={'index': i}) for i in range(3)]
+        calc = Calculation()
+        for i, node in enumerate(inputs):
+            calc.add_link_from(node, label='input_{}'.format(i), link_type=LinkType.INPUT)
+        output = Data()
+        output.add_link_from(calc, label='output', link_type=LinkType.CREATE)
+
+        with tempfile.NamedTemporaryFile() as handle:
+            handle.write('content')
+            handle.flush()
+            output.add_path(handle.name, 'file.txt')
+
+        stored = Node.store_many([output, calc] + inputs)
+        self.assertEquals(len(stored), 5)
+        self.assertLess(stored.index(calc), stored.index(output))
+
+        for node in stored:
+            self.assertTrue(node.is_stored)
+            loaded = load_node(node.pk)
+            self.assertEquals(loaded.uuid, node.uuid)
+            self.assertEquals(loaded.get_extra('_aiida_hash'), loaded.get_hash())
+
+        self.assertEquals(load_node(inputs[1].pk).get_dict(), {'index': 1})
+        self.assertEquals(
+            sorted(load_node(calc.pk).get_inputs_dict().keys()), ['input_0', 'input_1', 'input_2'])
+        self.assertEquals(load_node(output.pk).get_inputs()[0].uuid, calc.uuid)
+        with load_node(output.pk)._get_folder_pathsubfolder.open('file.txt') as handle:
+            self.assertEquals(handle.read(), 'content')
+
+        # Already stored nodes are skipped
+        self.assertEquals(Node.store_many(stored), [])
+
+    def test_store_many_unstored_parent(self):
+        """
+        A cached link from an unstored node that is not among the nodes to store is refused
+        """
+        parent = Data()
+        calc = Calculation()
+        calc.add_link_from(parent, label='input', link_type=LinkType.INPUT)
+
+        with self.assertRaises(ModificationNotAllowed):
+            Node.store_many([calc])
+        self.assertFalse(calc.is_stored)
+
+    def test_store_many_failure(self):
+        """
+        If storing fails, the nodes that are not in the DB are unstored again,
+        with their attributes, cached links and files, and can be stored later
+        """
+        import mock
+        import tempfile
+        from aiida.common.exceptions import ValidationError
+        from aiida.orm.calculation.job import JobCalculation
+        from aiida.orm.data.parameter import ParameterData
+        from aiida.orm.querybuilder import QueryBuilder
+
+        calc_params = {
+            'computer': self.computer,
+            'resources': {'num_machines': 1, 'num_mpiprocs_per_machine': 1}
+        }
+
+        inputs = [ParameterData(dict={'index': i}) for i in range(2)]
+        with tempfile.NamedTemporaryFile() as handle:
+            handle.write('content')
+            handle.flush()
+            inputs[0].add_path(handle.name, 'file.txt')
+
+        # The job calculations override store(): they are stored one by one after the bulk inserts
+        calcs = [JobCalculation(**calc_params) for _ in range(2)]
+        for calc in calcs:
+            for i, node in enumerate(inputs):
+                calc.add_link_from(node, label='input_{}'.format(i), link_type=LinkType.INPUT)
+        nodes = inputs + calcs
+
+        with mock.patch.object(calcs[1], '_validate', side_effect=ValidationError('failure')):
+            with self.assertRaises(ValidationError):
+                Node.store_many(nodes)
+
+        # The nodes are stored only if they are in the DB
+        self.assertFalse(calcs[1].is_stored)
+        for node in nodes:
+            in_db = QueryBuilder().append(Node, filters={'uuid': node.uuid}).count()
+            self.assertEquals(node.is_stored, bool(in_db))
+
+        Node.store_many(nodes)
+        for node in nodes:
+            self.assertTrue(node.is_stored)
+        for calc in calcs:
+            self.assertEquals(sorted(load_node(calc.pk).get_inputs_dict().keys()), ['input_0', 'input_1'])
+        self.assertEquals(load_node(inputs[1].pk).get_dict(), {'index': 1})
+        with load_node(inputs[0].pk)._get_folder_pathsubfolder.open('file.txt') as handle:
+            self.assertEquals(handle.read(), 'content')
@@ -147,4 +147,101 @@ class TestBackendLog(AiidaTestCase):
         logs = self._backend.log.find()
 
         self.assertEquals(len(logs), 1)
-        self.assertEquals(logs[0].message, message)
\ No newline at end of file
+        self.assertEquals(logs[0].message, message)
+    def test_create_entries(self):
+        """
+        Test the creation of many log entries at once, skipping those
+        without objpk
+        """
+        records = []
+        for pk in range(10):
+            record = dict(self._record)
+            record['objpk'] = pk
+            records.append(record)
+        record = dict(self._record)
+        record['objpk'] = None
+        records.append(record)
+
+        self.assertEquals(self._backend.log.create_entries(records), 10)
+
+        entries = self._backend.log.find(order_by=[OrderSpecifier('objpk', ASCENDING)])
+        self.assertEquals([entry.objpk for entry in entries], range(10))
+        self.assertEquals(entries[0].message, self._record['message'])
+        self.assertEquals(entries[0].metadata, self._record['metadata'])
+
+    def test_buffered_db_log_handler(self):
+        """
+        Verify that the buffered db log handler writes the queued records
+        when flushed and when closed, and counts them
+        """
+        from aiida.common.log import BufferedDBLogHandler
+
+        calc = Calculation().store()
+        logger = logging.getLogger('aiida.test_buffered_db_log_handler')
+        logger.propagate = False
+        handler = BufferedDBLogHandler(flush_size=3, flush_interval=60)
+        logger.addHandler(handler)
+        try:
+            extra = {'objpk': calc.pk, 'objname': 'calculation'}
+            for index in range(5):
+                logger.critical('message %s', index, extra=extra)
+            # Records not referring to an object are not stored
+            logger.critical('no object')
+
+            handler.flush()
+            entries = self._backend.log.find(order_by=[OrderSpecifier('id', ASCENDING)])
+            self.assertEquals([entry.message for entry in entries],
+                              ['message {}'.format(index) for index in range(5)])
+
+            logger.critical('last message', extra=extra)
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+        self.assertEquals(len(self._backend.log.find()), 6)
+        metrics = handler.get_metrics()
+        self.assertEquals(metrics['queued'], 7)
+        self.assertEquals(metrics['flushed'], 7)
+        self.assertEquals(metrics['dropped'], 0)
+        self.assertEquals(metrics['failed'], 0)
+        self.assertEquals(metrics['pending'], 0)
+
+    def test_buffered_db_log_handler_record(self):
+        """
+        Verify that the buffered db log handler does not modify the records,
+        that are also passed to the other handlers
+        """
+        from aiida.common.log import BufferedDBLogHandler
+
+        class RecordListHandler(logging.Handler):
+
+            def __init__(self):
+                super(RecordListHandler, self).__init__()
+                self.records = []
+
+            def emit(self, record):
+                self.records.append(record)
+
+        calc = Calculation().store()
+        logger = logging.getLogger('aiida.test_buffered_db_log_handler_record')
+        logger.propagate = False
+        handler = BufferedDBLogHandler()
+        other_handler = RecordListHandler()
+        logger.addHandler(handler)
+        logger.addHandler(other_handler)
+        try:
+            try:
+                raise ValueError('the exception')
+            except ValueError:
+                logger.exception('message %s', 0, extra={'objpk': calc.pk, 'objname': 'calculation'})
+            handler.flush()
+        finally:
+            logger.removeHandler(handler)
+            logger.removeHandler(other_handler)
+            handler.close()
+
+        record = other_handler.records[0]
+        self.assertEquals(record.msg, 'message %s')
+        self.assertEquals(record.args, (0,))
+        self.assertIsNotNone(record.exc_info)
+        self.assertEquals([entry.message for entry in self._backend.log.find()], ['message 0'])
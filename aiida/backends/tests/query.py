@@ -564,6 +564,34 @@ class QueryBuilderLimitOffsetsTest(AiidaTestCase):
         res = list(zip(*qb.all())[0])
         self.assertEqual(res, range(4, 1, -1))
 
+    def test_keyset_filters(self):
+        from aiida.orm import Node
+        from aiida.orm.querybuilder import QueryBuilder, get_keyset_filters
+        from aiida.common.exceptions import InputValidationError
+        nodes = []
+        for i in range(10):
+            n = Node()
+            n._set_attr('foo', i)
+            n.store()
+            nodes.append(n)
+
+        # The nodes after the fifth one, in both orders
+        columns = ['ctime', 'id']
+        values = [nodes[4].ctime, nodes[4].pk]
+        for descending, expected in [(False, range(5, 10)), (True, range(3, -1, -1))]:
+            qb = QueryBuilder().append(
+                Node, filters={'and': [
+                    {'id': {'in': [n.pk for n in nodes]}},
+                    get_keyset_filters(columns, values, descending=descending)]},
+                project='attributes.foo'
+            ).order_by({Node: [{column: 'desc' if descending else 'asc'} for column in columns]})
+            res = list(zip(*qb.all())[0])
+            self.assertEqual(res, expected)
+
+        self.assertEqual(get_keyset_filters(['id'], [nodes[0].pk]), {'id': {'>': nodes[0].pk}})
+        with self.assertRaises(InputValidationError):
+            get_keyset_filters(columns, [nodes[0].pk])
+
 
 class QueryBuilderJoinsTests(AiidaTestCase):
     def test_joins1(self):
@@ -748,30 +776,30 @@ class QueryBuilderPath(AiidaTestCase):
                      ).count(), 0)
 
         n6.add_link_from(n5, link_type=LinkType.INPUT)
-        # Yet, now 2 links from 1 to 8
+        # Yet, now 2 paths from 1 to 8, but n8 is a descendant of n1 only once
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n1.pk}, tag='anc'
             ).append(Node, descendant_of='anc', filters={'id': n8.pk}
-                     ).count(), 2
+                     ).count(), 1
         )
 
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n8.pk}, tag='desc'
             ).append(Node, ancestor_of='desc', filters={'id': n1.pk}
-                     ).count(), 2)
+                     ).count(), 1)
 
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n8.pk}, tag='desc'
             ).append(Node, ancestor_of='desc', filters={'id': n1.pk}, edge_filters={'depth': {'<': 6}},
-                     ).count(), 2)
+                     ).count(), 1)
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n8.pk}, tag='desc'
             ).append(Node, ancestor_of='desc', filters={'id': n1.pk}, edge_filters={'depth': 5},
-                     ).count(), 2)
+                     ).count(), 1)
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n8.pk}, tag='desc'
@@ -805,34 +833,29 @@ class QueryBuilderPath(AiidaTestCase):
         ))
 
         n7.add_link_from(n9, link_type=LinkType.INPUT)
-        # Still two links...
-
+        # Still two paths...
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n1.pk}, tag='anc'
-            ).append(Node, descendant_of='anc', filters={'id': n8.pk}
+            ).append(Node, descendant_of='anc', filters={'id': n8.pk}, edge_project='path'
                      ).count(), 2
         )
 
-        self.assertEquals(
-            QueryBuilder().append(
-                Node, filters={'id': n8.pk}, tag='desc'
-            ).append(Node, ancestor_of='desc', filters={'id': n1.pk}
-                     ).count(), 2)
         n9.add_link_from(n6, link_type=LinkType.INPUT)
-        # And now there should be 4 nodes
-
-        self.assertEquals(
-            QueryBuilder().append(
-                Node, filters={'id': n1.pk}, tag='anc'
-            ).append(Node, descendant_of='anc', filters={'id': n8.pk}
-                     ).count(), 4)
+        # And now there should be 4 paths, of depth 5 and 6
+        qb = QueryBuilder().append(
+            Node, filters={'id': n1.pk}, tag='anc'
+        ).append(
+            Node, descendant_of='anc', filters={'id': n8.pk}, edge_project=['path', 'depth']
+        )
+        self.assertEquals(sorted(depth for _, depth in qb.all()), [5, 5, 6, 6])
 
+        # But still a single pair, with the depth of the shortest path
         self.assertEquals(
             QueryBuilder().append(
                 Node, filters={'id': n8.pk}, tag='desc'
             ).append(Node, ancestor_of='desc', filters={'id': n1.pk}
-                     ).count(), 4)
+                     ).count(), 1)
 
         qb = QueryBuilder().append(
             Node, filters={'id': n1.pk}, tag='anc'
@@ -840,9 +863,9 @@ class QueryBuilderPath(AiidaTestCase):
             Node, descendant_of='anc', filters={'id': n8.pk}, edge_tag='edge'
         )
         qb.add_projection('edge', 'depth')
-        self.assertTrue(set(zip(*qb.all())[0]), set([5, 6]))
+        self.assertEquals(qb.all(), [[5]])
         qb.add_filter('edge', {'depth': 6})
-        self.assertTrue(set(zip(*qb.all())[0]), set([6]))
+        self.assertEquals(qb.all(), [])
 
 
 class TestConsistency(AiidaTestCase):
@@ -865,6 +888,127 @@ class TestConsistency(AiidaTestCase):
         self.assertTrue(len(QueryBuilder().append(Node, project=['id', 'label']).all(batch_size=10)) > 99)
 
 
+class TestRawIteration(AiidaTestCase):
+    def test_iterall_raw(self):
+        """
+        The raw rows have the same values as the rows converted by the backend,
+        and the ORM instances cannot be projected
+        """
+        from aiida.common.exceptions import InputValidationError
+        from aiida.orm.data.parameter import ParameterData
+        from aiida.orm.querybuilder import QueryBuilder
+
+        pks = [ParameterData(dict={'value': i}).store().pk for i in range(5)]
+
+        def get_query():
+            return QueryBuilder().append(
+                ParameterData, filters={'id': {'in': pks}}, project=['id', 'attributes.value'],
+                tag='parameters').order_by({'parameters': 'id'})
+
+        self.assertEqual([row[1] for row in get_query().iterall(batch_size=2, raw=True)], range(5))
+        self.assertEqual(list(get_query().iterall(batch_size=2, raw=True)), get_query().all())
+        self.assertEqual(list(get_query().iterdict(batch_size=2, raw=True)), get_query().dict())
+
+        with self.assertRaises(InputValidationError):
+            list(QueryBuilder().append(ParameterData, project='*').iterall(raw=True))
+
+
+class TestTransitiveClosure(AiidaTestCase):
+    def tearDown(self):
+        from aiida.backends.general.transitive_closure import drop_closure
+        drop_closure()
+
+    def test_transitive_closure(self):
+        """
+        The closure table is updated when links are stored, used by the ancestor and
+        descendant joins and marked as stale when links are deleted
+        """
+        from aiida.backends.general.transitive_closure import (
+            build_closure, check_closure, get_closure_status)
+        from aiida.backends.utils import delete_nodes_and_connections
+        from aiida.common.links import LinkType
+        from aiida.orm import Node
+        from aiida.orm.querybuilder import QueryBuilder
+
+        nodes = [Node().store() for _ in range(6)]
+        n1, n2, n3, n4, n5, n6 = nodes
+
+        def get_descendants(node, **kwargs):
+            qb = QueryBuilder().append(Node, filters={'id': node.pk}, tag='anc')
+            qb.append(Node, descendant_of='anc', project='id', **kwargs)
+            return sorted(pk for pk, in qb.all())
+
+        def get_ancestors_with_depth(node):
+            qb = QueryBuilder().append(Node, filters={'id': node.pk}, tag='desc')
+            qb.append(Node, ancestor_of='desc', project='id', edge_project='depth')
+            return sorted(qb.all())
+
+        self.assertIsNone(get_closure_status())
+
+        n2.add_link_from(n1, link_type=LinkType.INPUT)
+        n3.add_link_from(n2, link_type=LinkType.CREATE)
+        n4.add_link_from(n2, link_type=LinkType.INPUT)
+        n4.add_link_from(n3, link_type=LinkType.INPUT)
+        # Links of other types are not followed
+        n6.add_link_from(n5, link_type=LinkType.RETURN)
+        recursive_descendants = get_descendants(n1)
+        recursive_ancestors = get_ancestors_with_depth(n4)
+        # Every pair is returned once, with the depth of the shortest path, also without the closure table
+        self.assertEqual(recursive_descendants, [n2.pk, n3.pk, n4.pk])
+        self.assertEqual(recursive_ancestors, [[n1.pk, 1], [n2.pk, 0], [n3.pk, 0]])
+
+        self.assertEqual(build_closure(), 6)
+        self.assertEqual(get_closure_status(), {'stale': False, 'num_rows': 6})
+        self.assertEqual(get_descendants(n1), recursive_descendants)
+        self.assertEqual(get_ancestors_with_depth(n4), recursive_ancestors)
+
+        # The closure is updated by the new links
+        n5.add_link_from(n4, link_type=LinkType.INPUT)
+        self.assertEqual(get_descendants(n1), [n2.pk, n3.pk, n4.pk, n5.pk])
+        self.assertEqual(get_descendants(n1, edge_filters={'depth': 2}), [n5.pk])
+        self.assertEqual(check_closure(), (0, 0, 0))
+
+        # Deleting links makes the QueryBuilder fall back to the recursive queries
+        delete_nodes_and_connections([n5.pk])
+        self.assertTrue(get_closure_status()['stale'])
+        self.assertEqual(get_descendants(n1), recursive_descendants)
+        self.assertNotEqual(check_closure(), (0, 0, 0))
+
+        build_closure()
+        self.assertEqual(check_closure(), (0, 0, 0))
+        self.assertEqual(get_descendants(n1), [n2.pk, n3.pk, n4.pk])
+
+
+class TestGraphTraversal(AiidaTestCase):
+    def test_traverse_graph(self):
+        """
+        The traversal follows the links of the given types in the given directions, up to the maximum depth
+        """
+        from aiida.backends.general.graph_traversal import traverse_graph
+        from aiida.common.links import LinkType
+        from aiida.orm import Node
+
+        n1, n2, n3, n4, n5 = [Node().store() for _ in range(5)]
+        n2.add_link_from(n1, link_type=LinkType.INPUT)
+        n3.add_link_from(n2, link_type=LinkType.CREATE)
+        n4.add_link_from(n3, link_type=LinkType.INPUT)
+        n5.add_link_from(n2, link_type=LinkType.CALL)
+
+        provenance = (LinkType.CREATE, LinkType.INPUT)
+        self.assertEqual(list(traverse_graph([n1.pk], forward=provenance)), [n1.pk, n2.pk, n3.pk, n4.pk])
+        self.assertEqual(list(traverse_graph([n1.pk], forward=provenance, max_depth=1)), [n1.pk, n2.pk])
+        self.assertEqual(list(traverse_graph([n4.pk], backward=provenance)), [n1.pk, n2.pk, n3.pk, n4.pk])
+        self.assertEqual(list(traverse_graph([n1.pk], forward=[LinkType.CREATE])), [n1.pk])
+        self.assertEqual(list(traverse_graph([n3.pk], forward=[LinkType.CALL], backward=provenance)),
+                         [n1.pk, n2.pk, n3.pk, n5.pk])
+        self.assertEqual(list(traverse_graph([n2.pk], forward=[LinkType.CALL, LinkType.INPUT])), [n2.pk, n5.pk])
+        self.assertEqual(list(traverse_graph([])), [])
+
+        nodes, links = traverse_graph([n3.pk], backward=provenance, max_depth=1, get_links=True)
+        self.assertEqual(list(nodes), [n2.pk, n3.pk])
+        self.assertEqual(len(links), 1)
+
+
 class TestManager(AiidaTestCase):
     def test_statistics(self):
         """
@@ -8,6 +8,7 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 import json
+import os
 
 from aiida.backends.testbase import AiidaTestCase
 from aiida.common.links import LinkType
@@ -696,6 +697,40 @@ class RESTApiTestSuite(RESTApiTestCase):
                                      "/calculations?limit=1&offset=1&orderby=+id",
                                      expected_list_ids=[0])
 
+    def test_calculations_list_after(self):
+        """
+        Get the calculations that come after a given one (keyset pagination),
+        ordering them by id or by ctime
+        """
+        calculations = self.get_dummy_data()["calculations"]
+        after = str(calculations[0]["id"])
+        RESTApiTestCase.process_test(self, "calculations",
+                                     "/calculations?orderby=-id&after=" + after,
+                                     expected_range=[1, len(calculations)])
+        RESTApiTestCase.process_test(self, "calculations",
+                                     "/calculations?orderby=-ctime&after=" + after,
+                                     expected_range=[1, len(calculations)])
+
+    def test_computers_list_after(self):
+        """
+        Get the computers that come after a given one, ordering them by id
+        """
+        computers = sorted(self.get_dummy_data()["computers"], key=lambda computer: computer["id"])
+        url = "/computers?orderby=id&limit=2&after=" + str(computers[1]["id"])
+        with self.app.test_client() as client:
+            response = json.loads(client.get(self.get_url_prefix() + url).data)
+        self.assertEqual([computer["id"] for computer in response["data"]["computers"]],
+                         [computer["id"] for computer in computers[2:4]])
+
+    def test_computers_list_after_offset(self):
+        """
+        after cannot be used together with offset
+        """
+        RESTApiTestCase.process_test(self, "computers",
+                                     "/computers?offset=1&after=1",
+                                     expected_errormsg="after key is incompatible with offset "
+                                                       "and with requesting a specific page")
+
     ############### calculation inputs  #############
     def test_calculation_inputs(self):
         """
@@ -805,3 +840,140 @@ class RESTApiTestSuite(RESTApiTestCase):
         self.assertEquals(rv.data, cif )
 
 
+
+    ############### validators of the responses #############
+    def test_etag_not_modified(self):
+        """
+        A request with the ETag of the previous response gets a 304 with no
+        content
+        """
+        url = self.get_url_prefix() + '/computers/'
+        with self.app.test_client() as client:
+            rv = client.get(url)
+            etag = rv.headers['ETag']
+            self.assertIn('ETag', rv.headers['Access-Control-Expose-Headers'])
+
+            rv = client.get(url, headers={'If-None-Match': etag})
+            self.assertEquals(rv.status_code, 304)
+            self.assertEquals(rv.data, '')
+
+            rv = client.get(url + '?limit=1', headers={'If-None-Match': etag})
+            self.assertEquals(rv.status_code, 200)
+
+    def test_node_last_modified(self):
+        """
+        The response for a single node has the mtime of the node as
+        Last-Modified
+        """
+        import pytz
+        from aiida.orm import load_node
+
+        node_uuid = self.get_dummy_data()["structuredata"][0]["uuid"]
+        mtime = load_node(node_uuid).mtime.astimezone(pytz.utc)
+        url = self.get_url_prefix() + '/structures/' + node_uuid
+        with self.app.test_client() as client:
+            rv = client.get(url)
+            self.assertEquals(rv.status_code, 200)
+            self.assertEquals(rv.last_modified,
+                              mtime.replace(microsecond=0, tzinfo=None))
+
+            rv = client.get(url, headers={'If-Modified-Since': rv.headers['Last-Modified']})
+            self.assertEquals(rv.status_code, 304)
+
+    def test_node_last_modified_update(self):
+        """
+        The Last-Modified header of the response for a single node changes
+        when an attribute of the node is updated
+        """
+        import time
+        from aiida.orm import load_node
+
+        node_uuid = self.get_dummy_data()["structuredata"][0]["uuid"]
+        node = load_node(node_uuid)
+        url = self.get_url_prefix() + '/structures/' + node_uuid
+        with self.app.test_client() as client:
+            rv = client.get(url)
+            last_modified = rv.last_modified
+
+            # Last-Modified has a precision of a second
+            time.sleep(1.1)
+            node._set_attr('last_modified_test', True, stored_check=False)
+            try:
+                rv = client.get(url, headers={'If-Modified-Since': rv.headers['Last-Modified']})
+                self.assertEquals(rv.status_code, 200)
+                self.assertGreater(rv.last_modified, last_modified)
+            finally:
+                node._del_attr('last_modified_test', stored_check=False)
+
+
+class RESTApiCacheTest(AiidaTestCase):
+    """
+    Tests of the cache of the counts and results of the translators
+    """
+
+    def test_simple_cache(self):
+        from aiida.restapi.common.cache import SimpleCache, make_cache_key
+
+        self.assertEquals(make_cache_key('nodes', {'a': 1, 'b': [1, 2]}),
+                          make_cache_key('nodes', {'b': [1, 2], 'a': 1}))
+        self.assertNotEquals(make_cache_key('nodes', {'a': 1}),
+                             make_cache_key('nodes', {'a': 2}))
+
+        cache = SimpleCache(threshold=2)
+        cache.set('a', 1, timeout=10)
+        cache.set('b', 2, timeout=10)
+        self.assertEquals(cache.get('a'), 1)
+        # 'b' is the least recently used
+        cache.set('c', 3, timeout=10)
+        self.assertIsNone(cache.get('b'))
+        self.assertEquals(cache.get('a'), 1)
+        self.assertEquals(cache.get('c'), 3)
+
+        cache.set('a', 1, timeout=-1)
+        self.assertIsNone(cache.get('a'))
+
+    def test_filesystem_cache(self):
+        import shutil
+        import tempfile
+        from aiida.restapi.common.cache import FileSystemCache
+
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cache = FileSystemCache(cache_dir, threshold=2)
+            cache.set('a', {'nodes': [1, 2]}, timeout=10)
+            self.assertEquals(cache.get('a'), {'nodes': [1, 2]})
+            self.assertEquals(FileSystemCache(cache_dir).get('a'), {'nodes': [1, 2]})
+
+            cache.set('b', 2, timeout=-1)
+            self.assertIsNone(cache.get('b'))
+            # The expired value is removed first when the cache is full
+            cache.set('c', 3, timeout=10)
+            self.assertEquals(cache.get('a'), {'nodes': [1, 2]})
+            self.assertEquals(len(os.listdir(cache_dir)), 2)
+
+            cache.clear()
+            self.assertIsNone(cache.get('a'))
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_cached_count(self):
+        """
+        The counts are reused by the following requests until they expire
+        """
+        from aiida.restapi.common.cache import SimpleCache
+
+        cache = SimpleCache()
+        app = App(__name__)
+        app.config['TESTING'] = True
+        AiidaApi(app, PREFIX='/api/v2', PERPAGE_DEFAULT=20, LIMIT_DEFAULT=400,
+                 cache=cache, CACHING_TIMEOUTS={'computers': 600})
+        url = '/api/v2/computers/'
+
+        with app.test_client() as client:
+            count = int(client.get(url).headers['X-Total-Count'])
+            Computer(name='test_cached_count', hostname='localhost',
+                     transport_type='local', scheduler_type='direct').store()
+            self.assertEquals(int(client.get(url).headers['X-Total-Count']), count)
+
+            cache.clear()
+            self.assertEquals(int(client.get(url).headers['X-Total-Count']), count + 1)
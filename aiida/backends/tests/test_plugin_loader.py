@@ -126,3 +126,80 @@ class TestExistingPlugins(AiidaTestCase):
             cls = DbImporterFactory(entry_point.name)
             self.assertTrue(issubclass(cls, DbImporter),
                 'DbImporter plugin class {} is not subclass of {}'.format(cls, BaseTcodtranslator))
+
+
+class TestPluginCache(AiidaTestCase):
+    """
+    Test the entry point index and the cache of the plugin classes
+    """
+
+    def tearDown(self):
+        from aiida.plugins.entry_point import reset_entry_point_index
+        reset_entry_point_index()
+
+    def test_load_plugin_cache(self):
+        """
+        The classes are cached until the entry points are scanned again
+        """
+        from aiida.plugins import loader
+        from aiida.plugins.entry_point import reset_entry_point_index
+
+        plugin_type = 'data.parameter.ParameterData'
+        cls = loader.load_plugin(plugin_type)
+        self.assertIs(cls, DataFactory('parameter'))
+        self.assertIs(loader._plugin_classes[plugin_type, False], cls)
+
+        # Scanning the entry points again invalidates the cache
+        reset_entry_point_index()
+        self.assertIs(loader.load_plugin(plugin_type), cls)
+        self.assertIs(loader.load_plugin(plugin_type), cls)
+        self.assertEqual(loader._plugin_classes.keys(), [(plugin_type, False)])
+
+        # Unknown plugins are cached as their base class only if safe
+        self.assertIs(loader.load_plugin('data.unknownplugin.UnknownData', safe=True), Data)
+        self.assertIs(loader._plugin_classes['data.unknownplugin.UnknownData', True], Data)
+
+    def test_entry_point_index(self):
+        """
+        The saved index gives the same entry points as a scan
+        """
+        from aiida.plugins import entry_point
+
+        entry_point.reset_entry_point_index()
+        names = entry_point.get_entry_point_names('aiida.data')
+        self.assertIn('parameter', names)
+        self.assertIn('aiida.data', entry_point._scanned_groups)
+
+        # As in a new process, reading the saved index
+        entry_point._index = None
+        entry_point._scanned_groups.clear()
+        self.assertEqual(entry_point.get_entry_point_names('aiida.data'), names)
+        self.assertNotIn('aiida.data', entry_point._scanned_groups)
+        self.assertIs(entry_point.load_entry_point('aiida.data', 'parameter'), DataFactory('parameter'))
+
+    def test_entry_point_index_path(self):
+        """
+        The index does not depend on the folder of the script, nor on the files written to it
+        """
+        import os
+        import shutil
+        import sys
+        import tempfile
+        import mock
+        from aiida.plugins import entry_point
+
+        index_path = entry_point._get_index_path()
+        signature = entry_point._get_index_signature()
+        script_folder = tempfile.mkdtemp()
+        try:
+            for first_path in ['', script_folder]:
+                with mock.patch.object(sys, 'path', [first_path] + sys.path[1:]):
+                    self.assertEqual(entry_point._get_index_path(), index_path)
+                    self.assertEqual(entry_point._get_index_signature(), signature)
+
+            with mock.patch.object(sys, 'path', [script_folder] + sys.path[1:]):
+                with open(os.path.join(script_folder, 'script.py'), 'w') as handle:
+                    handle.write('')
+                self.assertEqual(entry_point._get_index_signature(), signature)
+        finally:
+            shutil.rmtree(script_folder)
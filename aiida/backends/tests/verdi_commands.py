@@ -131,6 +131,42 @@ class TestVerdiCalculationCommands(AiidaTestCase):
         out_str = ''.join(output)
         self.assertTrue(calc_states.FINISHED in out_str, 'FINISHED state not found in: {}'.format(out_str))
 
+    def test_calculation_list_pages(self):
+        """
+        Follow the --after hint printed by verdi calculation list with --limit,
+        and check that the pages show all the calculations exactly once
+        """
+        import re
+        from aiida.cmdline.commands.calculation import Calculation
+        calc_cmd = Calculation()
+
+        def list_pks(*args):
+            """
+            :return: the PKs listed, and the arguments to show the next page, if printed
+            """
+            with Capturing() as output:
+                calc_cmd.calculation_list(*(['-a', '--project', 'pk'] + list(args)))
+            pks = [int(line) for line in output if line.strip().isdigit()]
+            hints = [re.search(r'--limit (\d+) --after (\d+)', line) for line in output]
+            hints = [hint for hint in hints if hint is not None]
+            if not hints:
+                return pks, None
+            return pks, ['--limit', hints[0].group(1), '--after', hints[0].group(2)]
+
+        for order_by in ('ctime', 'id'):
+            all_pks, _ = list_pks('-o', order_by)
+            self.assertEquals(len(all_pks), 3)
+
+            paged_pks = []
+            next_args = ['--limit', '2']
+            while next_args is not None:
+                pks, next_args = list_pks(*(['-o', order_by] + next_args))
+                self.assertLessEqual(len(pks), 2)
+                paged_pks.extend(pks)
+                self.assertLessEqual(len(paged_pks), len(all_pks), 'The pages do not end: {}'.format(paged_pks))
+
+            self.assertEquals(paged_pks, all_pks)
+
 
 class TestVerdiCodeCommands(AiidaTestCase):
 
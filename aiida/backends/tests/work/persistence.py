@@ -8,10 +8,14 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 
+import shutil
 import tempfile
 
+import plumpy
+import yaml
+
 from aiida.backends.testbase import AiidaTestCase
-from aiida.work.persistence import AiiDAPersister
+from aiida.work.persistence import AiiDAPersister, FileCheckpointStore, SERIALIZERS, COMPRESSIONS
 import aiida.work.utils as util
 from aiida.work.test_utils import DummyProcess
 from aiida import work
@@ -58,7 +62,54 @@ class TestAiiDAPersister(AiidaTestCase):
         process = DummyProcess()
 
         self.persister.save_checkpoint(process)
-        self.assertTrue(isinstance(process.calc.checkpoint, basestring))
+        self.assertEquals(self.persister.get_process_checkpoints(process.pid),
+                          [plumpy.PersistedCheckpoint(process.pid, None)])
+        # The checkpoints are not stored in the attributes anymore
+        self.assertEquals(process.calc.checkpoint, None)
+
+        self.persister.delete_checkpoint(process.pid)
+        self.assertEquals(self.persister.get_process_checkpoints(process.pid), [])
+
+    def test_encodings(self):
+        process = DummyProcess()
+        for serializer in SERIALIZERS:
+            for compression in COMPRESSIONS:
+                persister = AiiDAPersister(serializer=serializer, compression=compression)
+                bundle_saved = persister.save_checkpoint(process)
+                # Any persister loads the checkpoints in any encoding
+                self.assertEquals(self.persister.load_checkpoint(process.pid), bundle_saved)
+
+        with self.assertRaises(ValueError):
+            AiiDAPersister(serializer='unknown')
+
+    def test_unchanged_checkpoint(self):
+        process = DummyProcess()
+        self.persister.save_checkpoint(process)
+        self.persister.store.delete(process.pid)
+
+        # The checkpoint did not change, so it is not saved again
+        self.persister.save_checkpoint(process)
+        self.assertEquals(self.persister.get_process_checkpoints(process.pid), [])
+
+    def test_load_attribute_checkpoint(self):
+        process = DummyProcess()
+        bundle = work.Bundle(process)
+        process.calc._set_checkpoint(yaml.dump(bundle))
 
+        self.assertEquals(self.persister.load_checkpoint(process.pid), bundle)
         self.persister.delete_checkpoint(process.pid)
-        self.assertEquals(process.calc.checkpoint, None)
\ No newline at end of file
+        self.assertEquals(process.calc.checkpoint, None)
+
+    def test_file_checkpoint_store(self):
+        folder = tempfile.mkdtemp()
+        try:
+            persister = AiiDAPersister(store=FileCheckpointStore(folder))
+            process = DummyProcess()
+            bundle_saved = persister.save_checkpoint(process)
+            self.assertEquals(persister.load_checkpoint(process.pid), bundle_saved)
+            self.assertEquals(persister.get_checkpoints(), [plumpy.PersistedCheckpoint(process.pid, None)])
+
+            persister.delete_checkpoint(process.pid)
+            self.assertEquals(persister.get_checkpoints(), [])
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
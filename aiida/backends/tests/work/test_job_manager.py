@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+import tornado.ioloop
+
+from aiida.backends.testbase import AiidaTestCase
+from aiida.scheduler.datastructures import JobInfo
+from aiida.work.job_manager import JobManager
+
+
+class MockScheduler(object):
+
+    def __init__(self, can_query_by_user=False, known_jobs=()):
+        self.calls = []
+        self._can_query_by_user = can_query_by_user
+        self._known_jobs = known_jobs
+
+    def set_transport(self, transport):
+        pass
+
+    def get_feature(self, feature_name):
+        return {'can_query_by_user': self._can_query_by_user}[feature_name]
+
+    def getJobs(self, jobs=None, user=None, as_dict=False, filter_jobs=None):
+        self.calls.append({'jobs': jobs, 'user': user, 'filter_jobs': filter_jobs})
+        job_ids = self._known_jobs if user is not None else [j for j in jobs if j in self._known_jobs]
+        if filter_jobs is not None:
+            job_ids = [j for j in job_ids if j in filter_jobs]
+        result = {}
+        for job_id in job_ids:
+            info = JobInfo()
+            info.job_id = job_id
+            result[job_id] = info
+        return result
+
+
+class MockComputer(object):
+
+    def __init__(self, scheduler, batch_size):
+        self._scheduler = scheduler
+        self._batch_size = batch_size
+
+    def get_scheduler(self):
+        return self._scheduler
+
+    def get_minimum_job_poll_interval(self):
+        return 0.
+
+    def get_job_poll_batch_size(self):
+        return self._batch_size
+
+
+class MockAuthInfo(object):
+    id = 1
+
+    def __init__(self, computer):
+        self.computer = computer
+
+
+class MockTransportQueue(object):
+    """ Hand out a dummy transport on the next loop iteration, counting the requests """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.requests = 0
+
+    def call_me_with_transport(self, authinfo, callback):
+        self.requests += 1
+        self.loop.add_callback(callback, authinfo, None)
+
+
+class TestJobManager(AiidaTestCase):
+
+    def setUp(self):
+        super(TestJobManager, self).setUp()
+        self.loop = tornado.ioloop.IOLoop()
+
+    def tearDown(self):
+        self.loop.close()
+        super(TestJobManager, self).tearDown()
+
+    def _request_all(self, scheduler, job_ids, batch_size=200):
+        authinfo = MockAuthInfo(MockComputer(scheduler, batch_size))
+        transport_queue = MockTransportQueue(self.loop)
+        manager = JobManager(transport_queue)
+
+        futures = [manager.request_job_info_update(authinfo, job_id) for job_id in job_ids]
+        for future in futures:
+            self.loop.run_sync(lambda: future)
+
+        return transport_queue, [future.result() for future in futures]
+
+    def test_single_poll_per_tick(self):
+        """ All the job ids requested before a poll are passed to one scheduler query """
+        scheduler = MockScheduler(known_jobs=['1', '2'])
+        transport_queue, results = self._request_all(scheduler, ['1', '2', '3'])
+
+        self.assertEqual(transport_queue.requests, 1)
+        self.assertEqual(len(scheduler.calls), 1)
+        self.assertEqual(sorted(scheduler.calls[0]['jobs']), ['1', '2', '3'])
+        self.assertEqual([r.job_id if r is not None else None for r in results], ['1', '2', None])
+
+    def test_batch_size(self):
+        """ The job ids are split in batches of the maximum batch size """
+        scheduler = MockScheduler()
+        job_ids = [str(i) for i in range(5)]
+        self._request_all(scheduler, job_ids, batch_size=2)
+
+        self.assertEqual([len(call['jobs']) for call in scheduler.calls], [2, 2, 1])
+
+    def test_query_by_user(self):
+        """ A scheduler that can query by user is queried once without the job ids """
+        scheduler = MockScheduler(can_query_by_user=True, known_jobs=['1', '3'])
+        _, results = self._request_all(scheduler, ['1', '2'], batch_size=1)
+
+        # Only the requested jobs are parsed from the jobs of the user
+        self.assertEqual(len(scheduler.calls), 1)
+        self.assertEqual(scheduler.calls[0]['jobs'], None)
+        self.assertEqual(scheduler.calls[0]['user'], '$USER')
+        self.assertEqual(sorted(scheduler.calls[0]['filter_jobs']), ['1', '2'])
+        self.assertEqual(results[0].job_id, '1')
+        self.assertIsNone(results[1])
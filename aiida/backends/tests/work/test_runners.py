@@ -53,6 +53,34 @@ class TestWorkchain(AiidaTestCase):
 
         self.assertTrue(future.result())
 
+    def test_call_on_calculation_finish_many(self):
+        """
+        Wait for several calculations at once, some of which are already terminated
+        """
+        from aiida.orm.calculation import Calculation
+
+        loop = self.runner.loop
+        terminated = Calculation()
+        terminated._set_process_state(plumpy.ProcessState.FINISHED)
+        terminated.store()
+        procs = [Proc(runner=self.runner) for _ in range(3)]
+        pks = [terminated.pk] + [proc.calc.pk for proc in procs]
+        finished = []
+
+        def calc_done(pk):
+            finished.append(pk)
+            if len(finished) == len(pks):
+                loop.stop()
+
+        for pk in pks:
+            self.runner.call_on_calculation_finish(pk, calc_done)
+
+        for proc in procs:
+            self.runner.loop.add_callback(proc.step_until_terminated)
+        self._run_loop_for(5.)
+
+        self.assertEqual(sorted(finished), sorted(pks))
+
     def test_call_on_wf_finish(self):
         loop = self.runner.loop
         future = plumpy.Future()
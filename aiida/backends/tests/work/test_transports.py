@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+import tornado.gen
+import tornado.ioloop
+
+from aiida.backends.testbase import AiidaTestCase
+from aiida.transport.plugins.local import LocalTransport
+from aiida.work.transports import TransportPool, TransportQueue
+
+
+class MockAuthInfo(object):
+    id = 1
+
+    def __init__(self, safe_open_interval=0.):
+        self.safe_open_interval = safe_open_interval
+        self.transports = []
+
+    def get_transport(self):
+        transport = LocalTransport()
+        transport._DEFAULT_SAFE_OPEN_INTERVAL = self.safe_open_interval
+        self.transports.append(transport)
+        return transport
+
+
+class TestTransportPool(AiidaTestCase):
+
+    def setUp(self):
+        super(TestTransportPool, self).setUp()
+        self.loop = tornado.ioloop.IOLoop()
+        self.authinfo = MockAuthInfo()
+
+    def tearDown(self):
+        self.loop.close()
+        super(TestTransportPool, self).tearDown()
+
+    def test_reuse_across_batches(self):
+        """ The transport is kept open and reused by consecutive batches of callbacks """
+        pool = TransportPool(self.loop, idle_timeout=60)
+        queue = TransportQueue(self.loop, pool=pool)
+        used = []
+
+        def callback(authinfo, transport):
+            # Users of the transport should be able to use it in a 'with' without closing it
+            with transport:
+                used.append(transport)
+
+        for _ in range(2):
+            queue.call_me_with_transport(self.authinfo, callback)
+            self.loop.run_sync(lambda: tornado.gen.sleep(0.1))
+
+        self.assertEqual(len(used), 2)
+        self.assertIs(used[0], used[1])
+        self.assertEqual(len(self.authinfo.transports), 1)
+        self.assertTrue(used[0].is_open)
+
+        queue.close()
+        self.assertFalse(used[0].is_open)
+
+    def test_dead_transport_replaced(self):
+        """ An idle transport that is no longer alive is replaced by a new one """
+        pool = TransportPool(self.loop, idle_timeout=60)
+
+        transport = pool.acquire(self.authinfo)
+        pool.release(self.authinfo, transport)
+        transport.is_alive = lambda: False
+
+        new_transport = pool.acquire(self.authinfo)
+        self.assertIsNot(new_transport, transport)
+        self.assertTrue(new_transport.is_open)
+        self.assertFalse(transport.is_open)
+
+    def test_dead_transport_safe_open_interval(self):
+        """ A dead idle transport is replaced by a new one only after the safe open interval """
+        authinfo = MockAuthInfo(safe_open_interval=0.5)
+        pool = TransportPool(self.loop, idle_timeout=60)
+        queue = TransportQueue(self.loop, pool=pool)
+        used = []
+
+        def callback(authinfo, transport):
+            used.append(transport)
+
+        queue.call_me_with_transport(authinfo, callback)
+        self.loop.run_sync(lambda: tornado.gen.sleep(0.7))
+        self.assertEqual(len(used), 1)
+
+        used[0].is_alive = lambda: False
+        queue.call_me_with_transport(authinfo, callback)
+        self.loop.run_sync(lambda: tornado.gen.sleep(0.2))
+        self.assertEqual(len(used), 1)
+        self.loop.run_sync(lambda: tornado.gen.sleep(0.5))
+        self.assertEqual(len(used), 2)
+        self.assertIsNot(used[1], used[0])
+        self.assertFalse(used[0].is_open)
+
+        queue.close()
+
+    def test_idle_expiry(self):
+        """ An idle transport is closed after the idle timeout """
+        pool = TransportPool(self.loop, idle_timeout=0)
+
+        transport = pool.acquire(self.authinfo)
+        pool.release(self.authinfo, transport)
+        self.loop.run_sync(lambda: tornado.gen.sleep(0.1))
+
+        self.assertFalse(transport.is_open)
+        self.assertFalse(pool.has_idle(self.authinfo))
@@ -231,6 +231,74 @@ class TestWorkflowBasic(AiidaTestCase):
         finally:
             pass
 
+    def test_running_steps_states(self):
+        """
+        Check the states of the calculations and sub-workflows of the running
+        steps, as fetched in a single query by the workflow stepper
+        """
+        from aiida.daemon.workflowmanager import get_running_steps_states
+
+        wf = WFTestSimpleWithSubWF()
+        wf.store()
+        wf.start()
+
+        states = get_running_steps_states()
+        step_states = states[wf.get_step('start').id]
+        self.assertEqual(step_states.calcs_num, 1)
+        self.assertEqual(step_states.calcs_terminated, 1)
+        self.assertEqual(step_states.calcs_new, [])
+        self.assertEqual(step_states.sub_wf_num, 2)
+        self.assertEqual(step_states.sub_wf_terminated, 0)
+        self.assertFalse(step_states.is_ready)
+
+        # The steps of the sub-workflows only have a finished calculation
+        for sub_wf in wf.get_step('start').get_sub_workflows():
+            sub_step_states = states[sub_wf.get_step('start').id]
+            self.assertEqual(sub_step_states.sub_wf_num, 0)
+            self.assertTrue(sub_step_states.is_ready)
+
+    def test_running_steps_states_no_state(self):
+        """
+        A calculation with no state at all is new, as for JobCalculation._is_new()
+        """
+        from aiida.backends.utils import get_raw_cursor
+        from aiida.daemon.workflowmanager import get_running_steps_states
+
+        wf = WFTestSimpleWithSubWF()
+        wf.store()
+        wf.start()
+
+        step = wf.get_step('start')
+        calc = wf.get_step_calculations(wf.start)[0]
+        with get_raw_cursor() as cursor:
+            cursor.execute('DELETE FROM db_dbcalcstate WHERE dbnode_id = %s', [calc.pk])
+        self.assertIsNone(calc.get_state())
+        self.assertTrue(calc._is_new())
+
+        step_states = get_running_steps_states()[step.id]
+        self.assertEqual(step_states.calcs_new, [calc.pk])
+
+    def test_step_calculations_state(self):
+        """
+        Check the filter on the state of the calculations of the steps
+        """
+        from aiida.common.datastructures import calc_states
+
+        wf = WFTestSimpleWithSubWF()
+        wf.store()
+        wf.start()
+
+        calc_pks = [calc.pk for calc in wf.get_step_calculations(wf.start)]
+        self.assertEqual(len(calc_pks), 1)
+        self.assertEqual(
+            [calc.pk for calc in wf.get_step_calculations(wf.start, calc_state=calc_states.FINISHED)], calc_pks)
+        self.assertEqual(list(wf.get_step_calculations(wf.start, calc_state=calc_states.NEW)), [])
+
+        # The calculations of the two sub-workflows are also finished
+        self.assertEqual(len(wf.get_all_calcs(calc_state=calc_states.FINISHED, depth=1)), 3)
+        self.assertEqual(wf.get_all_calcs(calc_state=calc_states.FINISHED, depth=0)[0].pk, calc_pks[0])
+        self.assertEqual(wf.get_all_calcs(calc_state=calc_states.NEW, depth=1), [])
+
     def test_result_parameter_name_colision(self):
         """
         This test checks that the the workflow parameters and results do not
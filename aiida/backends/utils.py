@@ -10,6 +10,8 @@
 
 from __future__ import absolute_import
 
+from contextlib import contextmanager
+
 from aiida.backends import settings
 from aiida.backends.profile import load_profile, BACKEND_SQLA, BACKEND_DJANGO
 from aiida.common.exceptions import ConfigurationError, NotExistent, InvalidOperation
@@ -236,6 +238,42 @@ def get_current_profile():
         return None
 
 
+@contextmanager
+def get_raw_cursor(commit=True):
+    """
+    Return a DB-API cursor on the database connection of the current backend,
+    to run raw SQL (e.g. PostgreSQL specific statements) that cannot be expressed
+    with the ORM of either backend
+
+    :param commit: if True, run the block in a transaction that is committed at the end
+    """
+    if settings.BACKEND == BACKEND_DJANGO:
+        from django.db import connection, transaction
+        if commit:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    yield cursor
+        else:
+            with connection.cursor() as cursor:
+                yield cursor
+    elif settings.BACKEND == BACKEND_SQLA:
+        from aiida.backends.sqlalchemy import get_scoped_session
+        session = get_scoped_session()
+        cursor = session.connection().connection.cursor()
+        try:
+            yield cursor
+            if commit:
+                session.commit()
+        except Exception:
+            if commit:
+                session.rollback()
+            raise
+        finally:
+            cursor.close()
+    else:
+        raise Exception("unknown backend {}".format(settings.BACKEND))
+
+
 def delete_nodes_and_connections(pks):
     if settings.BACKEND == BACKEND_DJANGO:
         from aiida.backends.djsite.utils import delete_nodes_and_connections_django as delete_nodes_backend
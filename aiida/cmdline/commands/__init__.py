@@ -79,3 +79,8 @@ def daemon_cmd():
 @verdi.group('code')
 def code_cmd():
     pass
+
+
+@verdi.group('closure')
+def closure_cmd():
+    pass
@@ -193,6 +193,11 @@ class Calculation(VerdiCommandWithSubcommands):
                             choices=['id', 'ctime'],
                             default='ctime',
                             help='order the results')
+        parser.add_argument('--after', metavar='PK',
+                            type=int, default=None,
+                            help='show only the calculations that come after the one with the given PK, '
+                                 'in the order given by --order-by: with --limit, pass the PK of the '
+                                 'last calculation of a page to show the next one')
         parser.add_argument('--project',
                             choices=(
                                     'pk', 'state', 'ctime', 'job_state', 'calculation_state', 'scheduler_state',
@@ -247,6 +252,7 @@ class Calculation(VerdiCommandWithSubcommands):
             filters=filters,
             projections=parsed_args.project,
             raw=parsed_args.raw,
+            after=parsed_args.after,
         )
 
         if not parsed_args.raw:
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Manage the optional transitive closure table of the provenance graph.
+"""
+import sys
+import time
+
+import click
+
+from aiida.cmdline.baseclass import VerdiCommandWithSubcommands
+from aiida.cmdline.commands import closure_cmd, verdi
+
+CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
+
+
+class Closure(VerdiCommandWithSubcommands):
+    """
+    Manage the transitive closure table of the provenance graph
+
+    The closure table speeds up the ancestor and descendant queries of the
+    QueryBuilder. It is optional: use 'build' to create it.
+    """
+
+    def __init__(self):
+        self.valid_subcommands = {
+            'build': (self.cli, self.complete_none),
+            'check': (self.cli, self.complete_none),
+            'status': (self.cli, self.complete_none),
+            'drop': (self.cli, self.complete_none),
+        }
+
+    def cli(self, *args):
+        verdi()
+
+
+@closure_cmd.command('build', context_settings=CONTEXT_SETTINGS)
+def build():
+    """
+    Create the closure table, or rebuild it if it is stale
+    """
+    from aiida import try_load_dbenv
+    try_load_dbenv()
+    from aiida.backends.general.transitive_closure import build_closure
+
+    start = time.time()
+    num_rows = build_closure()
+    click.echo('Transitive closure built: {} pairs of nodes in {:.1f} s.'.format(num_rows, time.time() - start))
+
+
+@closure_cmd.command('check', context_settings=CONTEXT_SETTINGS)
+def check():
+    """
+    Compare the closure table with the links in the database
+    """
+    from aiida import try_load_dbenv
+    try_load_dbenv()
+    from aiida.backends.general.transitive_closure import check_closure, get_closure_status
+
+    status = get_closure_status()
+    if status is None:
+        click.echo('The transitive closure table does not exist.', err=True)
+        sys.exit(1)
+
+    missing, spurious, wrong_depth = check_closure()
+    if missing or spurious or wrong_depth:
+        click.echo('The transitive closure table is not consistent with the links: {} missing pairs, '
+                   '{} spurious pairs, {} pairs with a wrong depth.'.format(missing, spurious, wrong_depth), err=True)
+        click.echo("Rebuild it with 'verdi closure build'.", err=True)
+        sys.exit(1)
+
+    if status['stale']:
+        click.echo("The transitive closure table is consistent, but marked as stale: "
+                   "rebuild it with 'verdi closure build' to use it again.")
+    else:
+        click.echo('The transitive closure table is consistent with the links.')
+
+
+@closure_cmd.command('status', context_settings=CONTEXT_SETTINGS)
+def status():
+    """
+    Show whether the closure table exists and is used by the QueryBuilder
+    """
+    from aiida import try_load_dbenv
+    try_load_dbenv()
+    from aiida.backends.general.transitive_closure import get_closure_status
+
+    status = get_closure_status()
+    if status is None:
+        click.echo('The transitive closure table does not exist.')
+    elif status['stale']:
+        click.echo('The transitive closure table ({} pairs) is stale and not used: links were deleted or '
+                   "modified since it was built. Rebuild it with 'verdi closure build'.".format(status['num_rows']))
+    else:
+        click.echo('The transitive closure table ({} pairs) is up to date.'.format(status['num_rows']))
+
+
+@closure_cmd.command('drop', context_settings=CONTEXT_SETTINGS)
+@click.option('-f', '--force', is_flag=True, help='Do not ask for confirmation')
+def drop(force):
+    """
+    Remove the closure table and its triggers
+    """
+    from aiida import try_load_dbenv
+    try_load_dbenv()
+    from aiida.backends.general.transitive_closure import drop_closure
+
+    if not force:
+        click.confirm('Are you sure you want to remove the transitive closure table?', abort=True)
+    drop_closure()
+    click.echo('Transitive closure table removed.')
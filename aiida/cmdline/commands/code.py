@@ -1006,9 +1006,7 @@ class Code(VerdiCommandWithSubcommands):
                 print "[Enter] to continue, [Ctrl + C] to exit"
                 raw_input()
 
-                from aiida.backends.djsite.db.models import DbAttribute
-
-                DbAttribute.set_value_for_node(code.dbnode, 'remote_exec_path', set_params.remote_abs_path)
+                code.dbnode.set_attr('remote_exec_path', set_params.remote_abs_path)
 
         # store comment, to track history
         code.add_comment(comment, user=backend.users.get_automatic_user())
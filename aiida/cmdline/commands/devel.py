@@ -95,12 +95,6 @@ class Devel(VerdiCommandWithSubcommands):
     _dbprefix = _dbrawprefix + "."
 
     def __init__(self, *args, **kwargs):
-        from aiida.backends.tests import get_db_test_names
-        from aiida.backends import settings
-
-        load_dbenv()
-        db_test_list = get_db_test_names()
-
         super(Devel, self).__init__(*args, **kwargs)
 
         self.valid_subcommands = {
@@ -113,19 +107,33 @@ class Devel(VerdiCommandWithSubcommands):
             'listproperties': (self.run_listproperties, self.complete_none),
             'play': (self.run_play, self.complete_none),
             'getresults': (self.calculation_getresults, self.complete_none),
-            'run_daemon': (self.run_daemon, self.complete_none)
+            'run_daemon': (self.run_daemon, self.complete_none),
+            'repository': (self.run_repository, self.complete_none),
+            'startuptime': (self.run_startuptime, self.complete_none),
         }
 
-        # The content of the dict is:
-        # None for a simple folder test
-        #   a list of strings for db tests, one for each test to run
-        self.allowed_test_folders = {}
-        for k in self.base_allowed_test_folders:
-            self.allowed_test_folders[k] = None
+        self._allowed_test_folders = None
+
+    @property
+    def allowed_test_folders(self):
+        """
+        The tests that can be run: the content of the dict is
+        None for a simple folder test, or
+        a list of strings for db tests, one for each test to run
+        """
+        from aiida.backends.tests import get_db_test_names
 
-        for dbtest in db_test_list:
-            self.allowed_test_folders["{}{}".format(self._dbprefix, dbtest)] = [dbtest]
-        self.allowed_test_folders[self._dbrawprefix] = db_test_list
+        if self._allowed_test_folders is None:
+            db_test_list = get_db_test_names()
+
+            self._allowed_test_folders = {}
+            for k in self.base_allowed_test_folders:
+                self._allowed_test_folders[k] = None
+
+            for dbtest in db_test_list:
+                self._allowed_test_folders["{}{}".format(self._dbprefix, dbtest)] = [dbtest]
+            self._allowed_test_folders[self._dbrawprefix] = db_test_list
+        return self._allowed_test_folders
 
     def complete_properties(self, subargs_idx, subargs):
         """
@@ -372,8 +380,47 @@ class Devel(VerdiCommandWithSubcommands):
         Run a daemon instance in this in the current interpreter
         """
         from aiida.daemon.runner import start_daemon
+
+        if not is_dbenv_loaded():
+            load_dbenv()
         start_daemon()
 
+    def run_repository(self, *args):
+        """
+        Manage the object store of the repository: add the files of the
+        existing nodes to it, or remove the objects not used anymore.
+        """
+        import argparse
+
+        from aiida.common import objectstore
+
+        parser = argparse.ArgumentParser(
+            prog=self.get_full_command_name(),
+            description='Manage the content-addressed object store of the file '
+                        'repository (see the repository.deduplicate property).')
+        parser.add_argument('action', choices=['deduplicate', 'gc'],
+                            help="'deduplicate' adds the files of the existing "
+                                 "nodes to the object store, 'gc' removes the "
+                                 "objects that are not used by any node")
+        parser.add_argument('-n', '--dry-run', dest='dry_run', action='store_true',
+                            help="With 'gc', only print what would be removed")
+        parsed_args = parser.parse_args(args)
+
+        if not is_dbenv_loaded():
+            load_dbenv()
+
+        if parsed_args.action == 'deduplicate':
+            if not objectstore.is_enabled():
+                print >> sys.stderr, ("The object store is not enabled, set the "
+                                      "repository.deduplicate property first")
+                sys.exit(1)
+            objectstore.deduplicate_repository()
+        else:
+            removed = objectstore.collect_garbage(dry_run=parsed_args.dry_run)
+            print "{} {} objects ({} bytes) and {} manifests".format(
+                'Would remove' if parsed_args.dry_run else 'Removed',
+                removed['objects'], removed['bytes'], removed['manifests'])
+
     def run_listproperties(self, *args):
         """
         List all found global AiiDA properties.
@@ -471,6 +518,9 @@ class Devel(VerdiCommandWithSubcommands):
             sys.exit(1)
 
     def run_tests(self, *args):
+        if not is_dbenv_loaded():
+            load_dbenv()
+
         import unittest
         from aiida.backends import settings
         from aiida.backends.testbase import run_aiida_db_tests
@@ -641,54 +691,18 @@ class Devel(VerdiCommandWithSubcommands):
         elif item == 'c':  # input
             keystring = "children"
             do_recursive = True
-        elif item == 'a':  # input
-            keystring = "dbattributes"
-            if '*' in subproperty:
-                if sep_filter_string:
-                    raise ValueError("Only = allowed if * patterns in the attributes are used")
-                regex_key = re.escape(subproperty)
-                # I look for non-separators, i.e. the * only covers
-                # at a single level, and does not go deeper in levels
-                regex_key = regex_key.replace(r'\*', r'[^\.]+')
-                # Match the full string
-                return ({keystring + "__key__regex": r'^{}$'.format(regex_key),
-                         keystring + "__{}".format(attr_field): cast_value},
-                        [keystring + "__key", keystring +
-                         "__{}".format(attr_field)]
-                )
-            else:
-                # Standard query
-                return ({keystring + "__key": subproperty,
-                         keystring + "__{}".format(attr_field)
-                         + sep_filter_string: cast_value},
-                        [keystring + "__key", keystring
-                         + "__{}".format(attr_field)]
-                )
-
-        elif item == 'e':  # input
-            keystring = "dbextras"
-
-            if '*' in subproperty:
-                import re
-
-                if sep_filter_string:
-                    raise ValueError("Only = allowed if * patterns in the extras are used")
-                regex_key = re.escape(subproperty)
-                # I look for non-separators, i.e. the * only covers
-                # at a single level, and does not go deeper in levels
-                regex_key = regex_key.replace(r'\*', r'[^\.]+')
-                return ({keystring + "__key__regex": r'^{}$'.format(regex_key),
-                         keystring + "__ival": value},
-                        [keystring + "__key", keystring + "__ival"],
-                )
-
-            else:
-                # Standard query
-                return ({keystring + "__key": subproperty,
-                         keystring + "__ival" + sep_filter_string: value},
-                        [keystring + "__key", keystring + "__ival"]
-                )
-
+        elif item == 'a' or item == 'e':  # attributes or extras
+            keystring = "attributes" if item == 'a' else "extras"
+            if '*' in subproperty or sep_filter_string:
+                raise ValueError("Only = allowed on attributes and extras, "
+                                 "without * patterns")
+            # Nest the value in the dictionaries of the subproperty, to
+            # query by containment in the JSONB column
+            contained = cast_value
+            for subkey in reversed(subproperty.split('.')):
+                contained = {subkey: contained}
+            return ({keystring + "__contains": contained},
+                    [keystring])
 
         elif item == 't' or item == 'type':
             if sep_filter_string:
@@ -863,6 +877,46 @@ class Devel(VerdiCommandWithSubcommands):
                 print "  `-> {} = {}".format(p, v)
 
 
+    def run_startuptime(self, *args):
+        """
+        Run a verdi command in a new interpreter, and report the time spent
+        importing each module.
+        """
+        import argparse
+
+        from aiida.backends import settings
+        from aiida.cmdline.utils.importtime import format_timings, get_import_timings
+
+        parser = argparse.ArgumentParser(
+            prog=self.get_full_command_name(),
+            description='Report the time spent importing each module when '
+                        'running a verdi command (by default, help).')
+        parser.add_argument('-s', '--sort', choices=['self', 'cumulative', 'order'],
+                            default='cumulative',
+                            help="Sort the modules by the time spent importing them "
+                                 "('self' excludes the modules they import), or list "
+                                 "them in the order of the imports")
+        parser.add_argument('-n', '--limit', type=int, default=30,
+                            help='The number of modules to list, 0 for all of them')
+        parser.add_argument('command', nargs=argparse.REMAINDER,
+                            help='The verdi command to run, with its arguments')
+        parsed_args = parser.parse_args(args)
+
+        command = parsed_args.command or ['help']
+        if settings.AIIDADB_PROFILE is not None:
+            command = ['-p', settings.AIIDADB_PROFILE] + command
+        result = get_import_timings(command)
+        timings = result['imports']
+
+        print "'{} {}' took {:.3f} s, {:.3f} s in {} imports of modules".format(
+            execname, ' '.join(command), result['wall_time'],
+            sum(timing.self_time for timing in timings), len(timings))
+        if result['error'] is not None:
+            print "The command failed with {}".format(result['error'])
+        print ""
+        sort_by = None if parsed_args.sort == 'order' else parsed_args.sort
+        print "\n".join(format_timings(timings, sort_by=sort_by, limit=parsed_args.limit or None))
+
     def run_play(self, *args):
         """
         Open a browser and play the Aida triumphal march by Giuseppe Verdi
@@ -39,6 +39,11 @@ class Import(VerdiCommand):
                             dest='webpages', metavar='URL',
                             help="Download all URLs in the given HTTP web "
                                  "page with extension .aiida")
+        parser.add_argument('-s', '--streaming', action='store_true',
+                            help="Use the streaming importer, that does not "
+                                 "load the whole file in memory and loads "
+                                 "the data with bulk COPY commands; meant "
+                                 "for big export files")
         parser.add_argument(nargs='*', type=str,
                             dest='files', metavar='URL_OR_PATH',
                             help="Import the given files or URLs")
@@ -82,7 +87,7 @@ class Import(VerdiCommand):
         for filename in files:
             try:
                 print "**** Importing file {}".format(filename)
-                import_data(filename)
+                import_data(filename, streaming=parsed_args.streaming)
             except Exception:
                 traceback.print_exc()
 
@@ -107,7 +112,7 @@ class Import(VerdiCommand):
 
                     print " `-> File downloaded. Importing it..."
                     import_data(temp_download_folder.get_abs_path(
-                        download_file_name))
+                        download_file_name), streaming=parsed_args.streaming)
             except Exception:
                 traceback.print_exc()
 
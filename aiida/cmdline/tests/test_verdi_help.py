@@ -10,7 +10,8 @@
 """Bug regression tests for ``verdi help``"""
 import unittest
 
-from aiida.cmdline.verdilib import Help, Import
+from aiida.cmdline.commands.importfile import Import
+from aiida.cmdline.verdilib import Help
 from aiida.utils.capturing import Capturing
 
 
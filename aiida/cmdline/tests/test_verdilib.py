@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Tests for the lazy loading of the verdi commands"""
+import subprocess
+import sys
+import unittest
+
+from aiida.cmdline import verdilib
+from aiida.cmdline.utils.importtime import ImportTimer, format_timings, get_import_timings
+
+
+class VerdiLazyCommandsTest(unittest.TestCase):
+    """The modules of the commands are imported only when needed"""
+
+    def test_command_classes(self):
+        """Every command of the registry is implemented by its class"""
+        for command in verdilib.get_command_names(hidden=True):
+            self.assertEqual(verdilib.get_command_class(command).get_command_name(), command)
+
+        with self.assertRaises(KeyError):
+            verdilib.get_command_class('notacommand')
+
+    def test_docstrings_from_source(self):
+        """The docstrings read from the sources are those of the classes"""
+        for command, (module_name, class_name) in verdilib._lazy_commands.iteritems():
+            docstrings = verdilib._get_class_docstrings(module_name)
+            self.assertEqual(docstrings[class_name] or "",
+                             verdilib.get_command_class(command).__doc__ or "")
+
+    def test_completion_imports(self):
+        """Listing the commands does not import any of their modules"""
+        code = (
+            "import sys\n"
+            "from aiida.cmdline.verdilib import exec_from_cmdline, get_listparams\n"
+            "exec_from_cmdline(['verdi', 'completion', '1', 'verdi'])\n"
+            "get_listparams()\n"
+            "print sorted(name for name in sys.modules if name.startswith('aiida.cmdline.commands.')"
+            " or name.startswith('aiida.orm') or name in ('django', 'sqlalchemy', 'numpy'))\n"
+        )
+        output = subprocess.check_output([sys.executable, '-c', code])
+        names = output.splitlines()[0].split()
+        self.assertIn('calculation', names)
+        self.assertIn('help', names)
+        self.assertEqual(output.splitlines()[-1], '[]')
+
+
+class ImportTimerTest(unittest.TestCase):
+    """Tests for the timing of the imports"""
+
+    def test_import_timer(self):
+        """The nested imports are timed"""
+        # Import the modules again, and restore the original ones afterwards
+        names = ['xml.dom.minidom', 'xml.dom', 'xml']
+        modules = {name: sys.modules.pop(name) for name in names if name in sys.modules}
+
+        timer = ImportTimer()
+        timer.install()
+        try:
+            import xml.dom.minidom
+        finally:
+            timer.uninstall()
+            sys.modules.update(modules)
+
+        timings = {timing.name: timing for timing in timer.timings}
+        self.assertEqual(timings['xml'].depth, 0)
+        self.assertEqual(timings['xml.dom'].depth, 0)
+        self.assertEqual(timings['xml.dom.minidom'].depth, 0)
+        self.assertLessEqual(timings['xml.dom.minidom'].self_time,
+                             timings['xml.dom.minidom'].cumulative_time)
+        self.assertTrue(any(timing.depth > 0 for timing in timer.timings))
+        self.assertEqual(len(format_timings(timer.timings, sort_by='self', limit=2)), 3)
+
+    def test_get_import_timings(self):
+        """The imports of a verdi command are timed in a new interpreter"""
+        result = get_import_timings(['help'])
+        names = [timing.name for timing in result['imports']]
+        self.assertIn('aiida.cmdline.verdilib', names)
+        self.assertNotIn('aiida.cmdline.commands.calculation', names)
+        self.assertGreaterEqual(result['wall_time'], result['running'])
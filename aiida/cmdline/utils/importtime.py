@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Measure the time spent importing each module when running a verdi command,
+as 'python -X importtime' does in python 3.
+
+The command is run in a new interpreter, by running this file as a script
+(not as a module of the aiida package, so that the imports of aiida itself
+are timed as well)::
+
+    python aiida/cmdline/utils/importtime.py [verdi arguments]
+
+prints the timings as JSON on the standard output, while the output of the
+command is discarded. Use get_import_timings to run it and read the timings.
+
+Only the stdlib is imported here, before the import hook is installed.
+"""
+import imp
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+# The time spent importing a module: self_time excludes the time spent
+# importing the modules imported by it, depth is the number of modules being
+# imported when it was imported
+ImportTiming = namedtuple('ImportTiming', ['name', 'self_time', 'cumulative_time', 'depth'])
+
+
+class _TimedLoader(object):
+    """
+    Loader of a module found by ImportTimer
+    """
+
+    def __init__(self, timer, found):
+        self._timer = timer
+        self._found = found
+
+    def load_module(self, fullname):
+        return self._timer.load_module(fullname, *self._found)
+
+
+class ImportTimer(object):
+    """
+    An import hook (see PEP 302) recording the time spent loading each module,
+    in the order in which the modules finish loading.
+
+    The modules that cannot be found with imp.find_module (e.g. the modules of
+    zipped eggs) are imported by the default machinery, and are not timed.
+    """
+
+    def __init__(self):
+        self.timings = []
+        # The time spent importing the modules imported by each of the modules
+        # being loaded
+        self._children_times = []
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_module(self, fullname, path=None):
+        try:
+            found = imp.find_module(fullname.rpartition('.')[2], path)
+        except ImportError:
+            return None
+        return _TimedLoader(self, found)
+
+    def load_module(self, fullname, handle, pathname, description):
+        self._children_times.append(0.)
+        start = time.time()
+        try:
+            return imp.load_module(fullname, handle, pathname, description)
+        finally:
+            if handle is not None:
+                handle.close()
+            cumulative_time = time.time() - start
+            children_time = self._children_times.pop()
+            if self._children_times:
+                self._children_times[-1] += cumulative_time
+            self.timings.append(ImportTiming(
+                fullname, cumulative_time - children_time, cumulative_time,
+                len(self._children_times)))
+
+
+def get_import_timings(args):
+    """
+    Run 'verdi' with the given arguments in a new interpreter, timing the
+    imports
+
+    :param args: the list of the arguments of verdi, e.g. ['calculation', 'list']
+    :return: a dictionary with the total 'wall_time' of the process (including
+        the startup of the interpreter), the time spent 'running' the command,
+        the 'error' raised by the command, if any, and the list of the
+        ImportTiming of the 'imports'
+    """
+    script = os.path.splitext(os.path.abspath(__file__))[0] + '.py'
+    start = time.time()
+    process = subprocess.Popen([sys.executable, script] + list(args),
+                               stdout=subprocess.PIPE, stdin=open(os.devnull))
+    output = process.communicate()[0]
+    wall_time = time.time() - start
+
+    result = json.loads(output)
+    result['wall_time'] = wall_time
+    result['imports'] = [ImportTiming(**timing) for timing in result['imports']]
+    return result
+
+
+def format_timings(timings, sort_by=None, limit=None):
+    """
+    Format the timings of the imports as a table
+
+    :param timings: a list of ImportTiming
+    :param sort_by: 'self' or 'cumulative' to sort the modules by decreasing
+        time, None to keep the order of the imports (the modules are then
+        indented by their depth)
+    :param limit: the maximum number of modules to list
+    :return: a list of lines
+    """
+    if sort_by == 'self':
+        timings = sorted(timings, key=lambda timing: -timing.self_time)
+    elif sort_by == 'cumulative':
+        timings = sorted(timings, key=lambda timing: -timing.cumulative_time)
+    elif sort_by is not None:
+        raise ValueError("sort_by must be 'self', 'cumulative' or None")
+
+    lines = ['{:>10} | {:>10} | {}'.format('self [ms]', 'cumul [ms]', 'module')]
+    for timing in timings[:limit]:
+        indent = '  ' * timing.depth if sort_by is None else ''
+        lines.append('{:10.1f} | {:10.1f} | {}{}'.format(
+            timing.self_time * 1000., timing.cumulative_time * 1000., indent, timing.name))
+    return lines
+
+
+def main(argv):
+    """
+    Run 'verdi' with the arguments argv, and print the timings of the imports
+    as JSON
+    """
+    timer = ImportTimer()
+    timer.install()
+
+    # Discard the output of the command, also the one written directly to the
+    # file descriptors
+    saved_fds = [os.dup(1), os.dup(2)]
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+
+    error = None
+    start = time.time()
+    try:
+        from aiida.cmdline.verdilib import exec_from_cmdline
+        exec_from_cmdline(['verdi'] + argv)
+    except SystemExit:
+        pass
+    except Exception as exc:
+        error = '{}: {}'.format(type(exc).__name__, exc)
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved_fds[0], 1)
+        os.dup2(saved_fds[1], 2)
+        os.close(devnull)
+    running_time = time.time() - start
+    timer.uninstall()
+
+    json.dump({
+        'running': running_time,
+        'error': error,
+        'imports': [timing._asdict() for timing in timer.timings],
+    }, sys.stdout)
+
+
+if __name__ == '__main__':
+    # Do not import the modules of this folder instead of the top-level ones
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+        sys.path.pop(0)
+    main(sys.argv[1:])
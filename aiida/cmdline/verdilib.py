@@ -19,6 +19,12 @@ verdi NAME
 
 Don't forget to add the docstring to the class: the first line will be the
 short description, the following ones the long description.
+
+The commands implemented in a module of aiida.cmdline.commands are listed in
+the _lazy_commands dictionary instead: their module is imported only when the
+command is run or completed, so that e.g. 'verdi help' or the completion of
+the command names do not import the ORM, the backends and all the libraries
+used by the commands.
 """
 import sys
 import os
@@ -26,7 +32,6 @@ import contextlib
 import click
 
 import aiida
-import aiida.cmdline.commands.user
 from aiida.common.exceptions import (
     AiidaException, ConfigurationError, ProfileConfigurationError)
 from aiida.cmdline.baseclass import VerdiCommand, VerdiCommandRouter
@@ -35,31 +40,40 @@ from aiida.backends import settings as settings_profile
 from aiida.control.postgres import Postgres, manual_setup_instructions, prompt_db_info
 from aiida.cmdline.commands import verdi
 from aiida.backends.profile import (BACKEND_DJANGO, BACKEND_SQLA)
-
-# Import here from other files; once imported, it will be found and
-# used as a command-line parameter
-from aiida.cmdline.commands.user import User
-import aiida.cmdline.commands.user as user
-from aiida.cmdline.commands.calculation import Calculation
-from aiida.cmdline.commands.code import Code
-from aiida.cmdline.commands.computer import Computer
-from aiida.cmdline.commands.daemon import Daemon
-from aiida.cmdline.commands.data import Data
-from aiida.cmdline.commands.devel import Devel
-from aiida.cmdline.commands.exportfile import Export
-from aiida.cmdline.commands.group import Group
-from aiida.cmdline.commands.graph import Graph
-from aiida.cmdline.commands.importfile import Import
-from aiida.cmdline.commands.node import Node
-from aiida.cmdline.commands.profile import Profile
-from aiida.cmdline.commands.workflow import Workflow
-from aiida.cmdline.commands.work import Work
-from aiida.cmdline.commands.comment import Comment
-from aiida.cmdline.commands.shell import Shell
-from aiida.cmdline.commands.restapi import Restapi
-from aiida.cmdline.commands.rehash import Rehash
 from aiida.cmdline import execname
 
+# The commands implemented in the modules of aiida.cmdline.commands, as
+# {command name: (module name, class name)}. Add a new command here
+_lazy_commands = {
+    'calculation': ('calculation', 'Calculation'),
+    'closure': ('closure', 'Closure'),
+    'code': ('code', 'Code'),
+    'comment': ('comment', 'Comment'),
+    'computer': ('computer', 'Computer'),
+    'daemon': ('daemon', 'Daemon'),
+    'data': ('data', 'Data'),
+    'devel': ('devel', 'Devel'),
+    'export': ('exportfile', 'Export'),
+    'graph': ('graph', 'Graph'),
+    'group': ('group', 'Group'),
+    'import': ('importfile', 'Import'),
+    'node': ('node', 'Node'),
+    'profile': ('profile', 'Profile'),
+    'rehash': ('rehash', 'Rehash'),
+    'restapi': ('restapi', 'Restapi'),
+    'shell': ('shell', 'Shell'),
+    'user': ('user', 'User'),
+    'work': ('work', 'Work'),
+    'workflow': ('workflow', 'Workflow'),
+}
+
+# Commands that are not listed in the help nor completed
+_hidden_commands = ['completion', 'completioncommand', 'listparams']
+
+# The docstrings of the classes of the commands, read from the sources of the
+# modules, by module name
+_module_docstrings = {}
+
 
 class ProfileParsingException(AiidaException):
     """
@@ -244,7 +258,7 @@ class Completion(VerdiCommand):
             cword_offset = command_position - 1
 
         if cword == 1 + cword_offset:
-            print(" ".join(sorted(short_doc.keys())))
+            print(" ".join(get_command_names()))
             return
         else:
             try:
@@ -256,7 +270,7 @@ class Completion(VerdiCommand):
             except IndexError:
                 return
             try:
-                CommandClass = list_commands[command]
+                CommandClass = get_command_class(command)
             except KeyError:
                 return
             CommandClass().complete(subargs_idx=cword - 2 - cword_offset,
@@ -297,12 +311,12 @@ class Help(VerdiCommand):
                   "on a specific command.".format(execname))
             sys.exit(1)
 
-        if command in short_doc:
+        if command in get_command_names():
+            short_doc, long_doc = _split_docstring(get_command_help(command))
             print("Description for '{} {}'".format(execname, command))
             print("")
-            print("**{}".format(short_doc[command]))
-            if command in long_doc:
-                print(long_doc[command])
+            print("**{}".format(short_doc))
+            print(long_doc)
         else:
             print >> sys.stderr, (
                 "{}: '{}' is not a valid command. "
@@ -314,7 +328,7 @@ class Help(VerdiCommand):
     def complete(self, subargs_idx, subargs):
         if subargs_idx == 0:
             print
-            " ".join(sorted(short_doc.keys()))
+            " ".join(get_command_names())
         else:
             print("")
 
@@ -587,6 +601,7 @@ def setup(profile, only_config, non_interactive=False, **kwargs):
         nuser.store()
 
     from aiida.common.utils import get_configured_user_email
+    import aiida.cmdline.commands.user as user
     email = get_configured_user_email()
     print
     "Starting user configuration for {}...".format(email)
@@ -602,7 +617,7 @@ def setup(profile, only_config, non_interactive=False, **kwargs):
             user.configure.main(args=[email])
         else:
             # or don't ask
-            aiida.cmdline.commands.user.do_configure(
+            user.do_configure(
                 backend,
                 email=kwargs['email'],
                 first_name=kwargs.get('first_name'),
@@ -909,6 +924,7 @@ def get_listparams():
     The advantage of this function is that the calling routine can
     choose to print it on stdout or stderr, depending on the needs.
     """
+    short_doc = get_short_doc()
     max_length = max(len(i) for i in short_doc.keys())
 
     name_desc = [(cmd.ljust(max_length + 2), desc.strip())
@@ -927,7 +943,7 @@ def get_command_suggestion(command):
     """
     import difflib
 
-    similar_cmds = difflib.get_close_matches(command, short_doc.keys())
+    similar_cmds = difflib.get_close_matches(command, get_command_names())
     if similar_cmds:
         print >> sys.stderr, ""
         print >> sys.stderr, "Did you mean this?"
@@ -935,6 +951,146 @@ def get_command_suggestion(command):
                                         for i in similar_cmds])
 
 
+def get_local_commands():
+    """
+    Return the commands defined in this module
+
+    :return: a dictionary {command name: class}
+    """
+    import inspect
+
+    return {
+        verdi_subcmd.get_command_name(): verdi_subcmd
+        for verdi_subcmd in globals().itervalues()
+        if inspect.isclass(verdi_subcmd) and not verdi_subcmd == VerdiCommand
+           and issubclass(verdi_subcmd, VerdiCommand)
+           and not verdi_subcmd.__name__.startswith('_')
+           and not verdi_subcmd._abstract
+    }
+
+
+def get_command_names(hidden=False):
+    """
+    Return the sorted list of the names of the commands, without importing
+    their modules
+
+    :param hidden: if True, include also the commands hidden from the help
+    """
+    names = set(get_local_commands()) | set(_lazy_commands)
+    if not hidden:
+        names -= set(_hidden_commands)
+    return sorted(names)
+
+
+def get_command_class(command):
+    """
+    Return the class of a command, importing its module if needed
+
+    :raise KeyError: if there is no such command
+    """
+    import importlib
+
+    try:
+        return get_local_commands()[command]
+    except KeyError:
+        module_name, class_name = _lazy_commands[command]
+    module = importlib.import_module(
+        'aiida.cmdline.commands.{}'.format(module_name))
+    return getattr(module, class_name)
+
+
+def _get_class_docstrings(module_name):
+    """
+    Read the docstrings of the classes of a module of aiida.cmdline.commands
+    from its source, without importing it
+
+    :return: a dictionary {class name: docstring}, or None if the source of
+        the module cannot be read
+    """
+    import ast
+    import aiida.cmdline.commands
+
+    try:
+        return _module_docstrings[module_name]
+    except KeyError:
+        pass
+
+    path = os.path.join(os.path.dirname(aiida.cmdline.commands.__file__),
+                        '{}.py'.format(module_name))
+    try:
+        with open(path) as handle:
+            tree = ast.parse(handle.read(), path)
+    except (IOError, SyntaxError):
+        docstrings = None
+    else:
+        docstrings = {node.name: ast.get_docstring(node, clean=False)
+                      for node in tree.body if isinstance(node, ast.ClassDef)}
+    _module_docstrings[module_name] = docstrings
+    return docstrings
+
+
+def get_command_docstring(command):
+    """
+    Return the docstring of the class of a command, reading it from the source
+    if the module of the command was not imported yet
+
+    :raise KeyError: if there is no such command
+    """
+    if command in _lazy_commands:
+        module_name, class_name = _lazy_commands[command]
+        if 'aiida.cmdline.commands.{}'.format(module_name) not in sys.modules:
+            docstrings = _get_class_docstrings(module_name)
+            if docstrings is not None and class_name in docstrings:
+                return docstrings[class_name] or ""
+
+    return get_command_class(command).__doc__ or ""
+
+
+def get_command_help(command):
+    """
+    Return the full help of a command: the docstring of its class and, for
+    the commands with a parser written with the 'click' module, the help of
+    the options.
+
+    :raise KeyError: if there is no such command
+    """
+    cmd = get_command_class(command)
+    help_msg = cmd.__doc__ or ""
+
+    # Note: to enable this for a command, simply add a static
+    # _ctx method (see e.g. Quicksetup)
+    if hasattr(cmd, '_ctx'):
+        help_msg += "\n"
+        # resilient_parsing suppresses interactive prompts
+        help_msg += cmd._ctx(args=[], resilient_parsing=True).get_help()
+    return help_msg
+
+
+def _split_docstring(help_msg):
+    """
+    Split a help message in the short description (the first non-empty line)
+    and the long description (the following lines)
+    """
+    lines = [l.strip() for l in help_msg.split('\n')]
+    empty_lines = [bool(l) for l in lines]
+    try:
+        first_idx = empty_lines.index(True)  # The first non-empty line
+    except ValueError:
+        # All False
+        return "No description available", ""
+    return lines[first_idx], os.linesep.join(lines[first_idx + 1:])
+
+
+def get_short_doc():
+    """
+    Return the short description of the commands listed in the help
+
+    :return: a dictionary {command name: short description}
+    """
+    return {command: _split_docstring(get_command_docstring(command))[0]
+            for command in get_command_names()}
+
+
 def print_usage(execname):
     print >> sys.stderr, ("Usage: {} [--profile=PROFILENAME|-p PROFILENAME] "
                           "COMMAND [<args>]".format(execname))
@@ -947,74 +1103,7 @@ def exec_from_cmdline(argv):
     """
     The main function to be called. Pass as parameter the sys.argv.
     """
-    ### This piece of code takes care of creating a list of valid
-    ### commands and of their docstrings for dynamic management of
-    ### the code.
-    ### It defines a few global variables
-
     global execname
-    global list_commands
-    global short_doc
-    global long_doc
-
-    # import itself
-    from aiida.cmdline import verdilib
-    import inspect
-
-    # List of command names that should be hidden or not completed.
-    hidden_commands = ['completion', 'completioncommand', 'listparams']
-
-    # Retrieve the list of commands
-    verdilib_namespace = verdilib.__dict__
-
-    list_commands = {
-        verdi_subcmd.get_command_name(): verdi_subcmd
-        for verdi_subcmd in verdilib_namespace.itervalues()
-        if inspect.isclass(verdi_subcmd) and not verdi_subcmd == VerdiCommand
-           and issubclass(verdi_subcmd, VerdiCommand)
-           and not verdi_subcmd.__name__.startswith('_')
-           and not verdi_subcmd._abstract
-    }
-
-    # Retrieve the list of docstrings, managing correctly the
-    # case of empty docstrings. Each value is a list of lines
-    raw_docstrings = {k: (v.__doc__ if v.__doc__ else "").splitlines()
-                      for k, v in list_commands.iteritems()}
-
-    short_doc = {}
-    long_doc = {}
-    for k, cmd in list_commands.iteritems():
-        if k in hidden_commands:
-            continue
-
-        # assemble help string
-        # first from python docstring
-        if cmd.__doc__:
-            help_msg = cmd.__doc__
-        else:
-            help_msg = ""
-
-        # if command has parser written with the 'click' module
-        # we also add a dynamic help string documenting the options
-        # Note: to enable this for a command, simply add a static
-        # _ctx method (see e.g. Quicksetup)
-        if hasattr(cmd, '_ctx'):
-            help_msg += "\n"
-            # resilient_parsing suppresses interactive prompts
-            help_msg += cmd._ctx(args=[], resilient_parsing=True).get_help()
-        help_msg = help_msg.split('\n')  # need list of lines
-
-        lines = [l.strip() for l in help_msg]
-        empty_lines = [bool(l) for l in lines]
-        try:
-            first_idx = empty_lines.index(True)  # The first non-empty line
-        except ValueError:
-            # All False
-            short_doc[k] = "No description available"
-            long_doc[k] = ""
-            continue
-        short_doc[k] = lines[first_idx]
-        long_doc[k] = os.linesep.join(lines[first_idx + 1:])
 
     execname = os.path.basename(argv[0])
 
@@ -1036,15 +1125,15 @@ def exec_from_cmdline(argv):
         sys.exit(1)
 
     try:
-        if command in list_commands:
-            CommandClass = list_commands[command]()
-            CommandClass.run(*argv[command_position + 1:])
-        else:
+        try:
+            CommandClass = get_command_class(command)
+        except KeyError:
             print >> sys.stderr, ("{}: '{}' is not a valid command. "
                                   "See '{} help' for more help.".format(
                 execname, command, execname))
             get_command_suggestion(command)
             sys.exit(1)
+        CommandClass().run(*argv[command_position + 1:])
     except ProfileConfigurationError as err:
         print >> sys.stderr, "The profile specified is not valid!"
         print >> sys.stderr, err.message
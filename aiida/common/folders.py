@@ -12,6 +12,7 @@ import shutil
 import fnmatch
 import tempfile
 
+from aiida.common import objectstore
 from aiida.common.utils import get_repository_folder
 
 # If True, tries to make everything (dirs, files) group-writable.
@@ -206,17 +207,25 @@ class Folder(object):
                     else:
                         os.remove(dest_abs_path)
                     # This automatically overwrites files
-                    shutil.copytree(src, dest_abs_path)
+                    self._copy_tree(src, dest_abs_path)
                 else:
                     raise IOError("destination already exists: {}".format(
                         os.path.join(dest_abs_path)))
             else:
-                shutil.copytree(src, dest_abs_path)
+                self._copy_tree(src, dest_abs_path)
         else:
             raise ValueError("insert_path can only insert files or paths, not symlinks or the like")
 
         return dest_abs_path
 
+    @staticmethod
+    def _copy_tree(src, dest):
+        # The files of the nodes in the object store are read-only
+        if objectstore.is_enabled():
+            objectstore.copy_tree(src, dest)
+        else:
+            shutil.copytree(src, dest)
+
     def create_file_from_filelike(self, src_filelike, dest_name):
         """
         Create a file from a file-like object.
@@ -234,6 +243,8 @@ class Folder(object):
         # I get the full path of the filename, checking also that I don't
         # go beyond the folder limits
         dest_abs_path = self.get_abs_path(filename)
+        if objectstore.is_enabled():
+            objectstore.unshare_file(dest_abs_path, keep_content=False)
 
         with open(dest_abs_path, 'w') as f:
             shutil.copyfileobj(src_filelike, f)
@@ -291,8 +302,14 @@ class Folder(object):
         """
         Open a file in the current folder and return the corresponding
         file object.
+
+        A file shared with other nodes through the object store is replaced
+        with a private copy first, if it is opened for writing.
         """
-        return open(self.get_abs_path(name), mode)
+        abs_path = self.get_abs_path(name)
+        if objectstore.is_enabled() and (mode[0] in 'wa' or '+' in mode):
+            objectstore.unshare_file(abs_path, keep_content=mode[0] != 'w')
+        return open(abs_path, mode)
 
     @property
     def abspath(self):
@@ -528,6 +545,16 @@ class RepositoryFolder(Folder):
         """
         return RepositoryFolder(self.section, self.uuid)
 
+    def replace_with_folder(self, srcdir, move=False, overwrite=False):
+        """
+        As Folder.replace_with_folder; moreover, the files of the folder of a
+        node are added to the object store, if enabled.
+        """
+        super(RepositoryFolder, self).replace_with_folder(srcdir, move=move, overwrite=overwrite)
+        if (self.section == objectstore.DEDUPLICATED_SECTION and
+                self.subfolder == os.curdir and objectstore.is_enabled()):
+            objectstore.deduplicate_folder(self)
+
 
         # NOTE! The get_subfolder method will return a Folder object, and not a RepositoryFolder object
 
@@ -9,6 +9,29 @@
 ###########################################################################
 import os, tempfile
 
+# Number of ids in the filters of the queries of draw_graph
+_CHUNK_SIZE = 1000
+
+
+def _iter_chunks(pks):
+    for start in range(0, len(pks), _CHUNK_SIZE):
+        yield pks[start:start + _CHUNK_SIZE]
+
+
+def _get_calculation_pks(pks):
+    """
+    :return: the pks of the calculations among the given nodes
+    """
+    from aiida.orm.calculation import Calculation
+    from aiida.orm.querybuilder import QueryBuilder
+
+    calculation_pks = []
+    for chunk in _iter_chunks(pks):
+        qb = QueryBuilder().append(Calculation, filters={'id': {'in': list(chunk)}}, project='id')
+        calculation_pks.extend(pk for pk, in qb.iterall())
+    return calculation_pks
+
+
 def draw_graph(origin_node, ancestor_depth=None, descendant_depth=None, format='dot',
         include_calculation_inputs=False, include_calculation_outputs=False):
     """
@@ -35,6 +58,7 @@ def draw_graph(origin_node, ancestor_depth=None, descendant_depth=None, format='
     from aiida.orm.node import Node
     from aiida.common.links import LinkType
     from aiida.orm.querybuilder import QueryBuilder
+    from aiida.backends.general.graph_traversal import traverse_graph
 
     def draw_node_settings(node, **kwargs):
         """
@@ -81,95 +105,56 @@ def draw_graph(origin_node, ancestor_depth=None, descendant_depth=None, format='
             color="0.0 0.0 0.5" #grey lines for unspecified links!
         return '    {} -> {} [label="{}", color="{}", style="{}"];'.format("N{}".format(inp_id),  "N{}".format(out_id), link_label, color, style)
 
-    # Breadth-first search of all ancestors and descendant nodes of a given node
-    links = {}  # Accumulate links here
-    nodes = {origin_node.pk: draw_node_settings(origin_node, style='filled', color='lightblue')} #Accumulate nodes specs here
+    # Breadth-first search of all ancestors and descendant nodes of a given node, following all the links.
+    # The traversal returns the links that were followed from the nodes at a depth lower than the maximum.
+    all_link_types = [link_type for link_type in LinkType]
+    ancestor_pks, ancestor_link_ids = traverse_graph(
+        [origin_node.pk], backward=all_link_types, max_depth=ancestor_depth, get_links=True)
+    descendant_pks, descendant_link_ids = traverse_graph(
+        [origin_node.pk], forward=all_link_types, max_depth=descendant_depth, get_links=True)
+    link_ids = set(ancestor_link_ids).union(descendant_link_ids)
+    # The nodes used for the recursion
+    recursion_pks = set(ancestor_pks).union(descendant_pks)
+
     # Additional nodes (the ones added with either one of  include_calculation_inputs or include_calculation_outputs
-    # is set to true. I have to put them in a different dictionary because nodes is the one used for the recursion,
-    # whereas these should not be used for the recursion:
-    additional_nodes = {}
+    # is set to true) are the outputs (inputs) of the calculations whose inputs (outputs) were followed,
+    # i.e. that are at a depth lower than the maximum depth, but they are not used for the recursion.
+    if include_calculation_outputs and ancestor_depth != 0:
+        scanned_pks = traverse_graph(
+            [origin_node.pk], backward=all_link_types,
+            max_depth=None if ancestor_depth is None else ancestor_depth - 1)
+        calculation_pks = _get_calculation_pks(scanned_pks)
+        if calculation_pks:
+            link_ids.update(traverse_graph(calculation_pks, forward=all_link_types, max_depth=1, get_links=True)[1])
+    if include_calculation_inputs and descendant_depth != 0:
+        scanned_pks = traverse_graph(
+            [origin_node.pk], forward=all_link_types,
+            max_depth=None if descendant_depth is None else descendant_depth - 1)
+        calculation_pks = _get_calculation_pks(scanned_pks)
+        if calculation_pks:
+            link_ids.update(traverse_graph(calculation_pks, backward=all_link_types, max_depth=1, get_links=True)[1])
 
-    last_nodes = [origin_node] # Put the nodes whose links have not been scanned yet
-
-    # Go through the graph on-ward (i.e. look at inputs)
-    depth = 0
-    while last_nodes:
-        # I augment depth every time I get through a new iteration
-        depth += 1
-        # I check whether I should stop here:
-        if ancestor_depth is not None and depth > ancestor_depth:
-            break
-        # I continue by adding new nodes here!
-        new_nodes = []
-        for node in last_nodes:
-            # This query gives me all the inputs of this node, and link labels and types!
-            input_query = QueryBuilder()
-            input_query.append(Node, filters={'id':node.pk}, tag='n')
-            input_query.append(Node, input_of='n', edge_project=('id', 'label', 'type'), project='*', tag='inp')
-            for inp, link_id, link_label, link_type in input_query.iterall():
-                # I removed this check, to me there is no way that this link was already referred to!
-                # if link_id not in links:
-                links[link_id] = draw_link_settings(inp.pk, node.pk, link_label, link_type)
-                # For the nodes I need to check, maybe this same node is referred to multiple times.
-                if inp.pk not in nodes:
-                    nodes[inp.pk] = draw_node_settings(inp)
-                    new_nodes.append(inp)
-
-            # Checking whether I also should include all the outputs of a calculation into the drawing:
-            if include_calculation_outputs and isinstance(node, Calculation):
-                # Query for the outputs, giving me also link labels and types:
-                output_query = QueryBuilder()
-                output_query.append(Node, filters={'id':node.pk}, tag='n')
-                output_query.append(Node, output_of='n', edge_project=('id', 'label', 'type'), project='*', tag='out')
-                # Iterate through results
-                for out, link_id, link_label, link_type in output_query.iterall():
-                    # This link might have been drawn already, because the output is maybe
-                    # already drawn.
-                    # To check: Maybe it's more efficient not to check this, since
-                    # the dictionaries are large and contain many keys...
-                    # I.e. just always draw, also when overwriting an existing (identical) entry.
-                    if link_id not in links:
-                        links[link_id] = draw_link_settings(node.pk, out.pk, link_label, link_type)
-                    if out.pk not in nodes and out.pk not in additional_nodes:
-                        additional_nodes[out.pk] = draw_node_settings(out)
-
-        last_nodes = new_nodes
-
-
-    # Go through the graph down-ward (i.e. look at outputs)
-    last_nodes = [origin_node]
-    depth = 0
-    while last_nodes:
-        depth += 1
-        # Also here, checking of maximum descendant depth is set and applies.
-        if descendant_depth is not None and depth > descendant_depth:
-            break
-        new_nodes = []
-
-        for node in last_nodes:
-            # Query for the outputs:
-            output_query = QueryBuilder()
-            output_query.append(Node, filters={'id':node.pk}, tag='n')
-            output_query.append(Node, output_of='n', edge_project=('id', 'label', 'type'), project='*', tag='out')
-
-            for out, link_id, link_label, link_type in output_query.iterall():
-                # Draw the link
-                links[link_id] = draw_link_settings(node.pk, out.pk, link_label, link_type)
-                if out.pk not in nodes:
-                    nodes[out.pk] = draw_node_settings(out)
-                    new_nodes.append(out)
-
-            if include_calculation_inputs and isinstance(node, Calculation):
-                input_query = QueryBuilder()
-                input_query.append(Node, filters={'id':node.pk}, tag='n')
-                input_query.append(Node, input_of='n', edge_project=('id', 'label', 'type'), project='*', tag='inp')
-                for inp, link_id, link_label, link_type in input_query.iterall():
-                    # Also here, maybe it's just better not to check?
-                    if link_id not in links:
-                        links[link_id] = draw_link_settings(inp.pk, node.pk, link_label, link_type)
-                    if inp.pk not in nodes and inp.pk not in additional_nodes:
-                        additional_nodes[inp.pk] = draw_node_settings(inp)
-        last_nodes = new_nodes
+    links = {}  # Accumulate links here
+    additional_pks = set()
+    for chunk in _iter_chunks(sorted(link_ids)):
+        link_query = QueryBuilder()
+        link_query.append(Node, project='id', tag='inp')
+        link_query.append(Node, output_of='inp', project='id', edge_filters={'id': {'in': chunk}},
+                          edge_project=('id', 'label', 'type'))
+        for inp_pk, out_pk, link_id, link_label, link_type in link_query.iterall():
+            links[link_id] = draw_link_settings(inp_pk, out_pk, link_label, link_type)
+            additional_pks.update(pk for pk in (inp_pk, out_pk) if pk not in recursion_pks)
+
+    nodes = {}  # Accumulate nodes specs here
+    additional_nodes = {}
+    for chunk in _iter_chunks(sorted(recursion_pks.union(additional_pks))):
+        for node, in QueryBuilder().append(Node, filters={'id': {'in': chunk}}).iterall():
+            if node.pk == origin_node.pk:
+                nodes[node.pk] = draw_node_settings(node, style='filled', color='lightblue')
+            elif node.pk in recursion_pks:
+                nodes[node.pk] = draw_node_settings(node)
+            else:
+                additional_nodes[node.pk] = draw_node_settings(node)
 
     # Writing the graph to a temporary file
     fd, fname = tempfile.mkstemp(suffix='.dot')
@@ -7,10 +7,12 @@
 # For further information on the license, see the LICENSE.txt file        #
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
+from collections import OrderedDict
 from passlib.context import CryptContext
 import random
 import hashlib
 import time
+import weakref
 from datetime import datetime
 import numbers
 try: # Python3
@@ -22,7 +24,8 @@ except ImportError: # Python2
 
 import numpy as np
 
-from .folders import Folder
+from . import objectstore
+from .folders import Folder, RepositoryFolder
 
 """
 Here we define a single password hashing instance for the full AiiDA.
@@ -115,6 +118,51 @@ def get_random_string(length=12,
 
 
 
+# Size of the chunks in which the files of a folder are read to be hashed
+FILE_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class _LRUCache(object):
+    """
+    A minimal least-recently-used cache of hashes
+    """
+
+    def __init__(self, maxsize):
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            value = self._entries.pop(key)
+        except KeyError:
+            return default
+        self._entries[key] = value
+        return value
+
+    def set(self, key, value):
+        self._entries.pop(key, None)
+        self._entries[key] = value
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+# Memoized hashes of objects whose content cannot change: the repository folders of stored
+# nodes (keyed on their path) and read-only numpy arrays (keyed on their id)
+_folder_hash_cache = _LRUCache(maxsize=1024)
+_array_hash_cache = _LRUCache(maxsize=1024)
+
+
+def clear_hash_caches():
+    """
+    Clear the memoized hashes of repository folders and read-only arrays
+    """
+    _folder_hash_cache.clear()
+    _array_hash_cache.clear()
+
+
 def make_hash_with_type(type_chr, string_to_hash):
     """
     Convention: type_chr should be a single char, lower case
@@ -123,6 +171,51 @@ def make_hash_with_type(type_chr, string_to_hash):
     """
     return hashlib.sha224("{}{}".format(type_chr, string_to_hash)).hexdigest()
 
+
+def _make_hash_of_hashes(type_chr, hashes):
+    """
+    Equivalent to ``make_hash_with_type(type_chr, ",".join(hashes))``, but feeding the
+    hashes one by one to the hasher rather than building the joined string first.
+    """
+    hasher = hashlib.sha224(type_chr)
+    for index, hash_ in enumerate(hashes):
+        if index:
+            hasher.update(',')
+        hasher.update(hash_)
+    return hasher.hexdigest()
+
+
+def _make_hash_of_file(folder, name):
+    """
+    Equivalent to ``make_hash_with_type('pf', content)`` where content is the content of
+    the file, but reading the file in chunks rather than all at once. The files in the
+    object store are not read, their hash is recorded in the manifest of the node.
+    """
+    if objectstore.is_enabled():
+        digests = objectstore.get_file_digests(folder.get_abs_path(name))
+        if digests is not None:
+            return digests[1]
+
+    hasher = hashlib.sha224('pf')
+    with folder.open(name) as handle:
+        while True:
+            chunk = handle.read(FILE_HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _is_immutable_array(array):
+    """
+    :return: True if neither the array nor any of the arrays it is a view of can be written to
+    """
+    while isinstance(array, np.ndarray):
+        if array.flags.writeable:
+            return False
+        array = array.base
+    return True
+
 @singledispatch
 def make_hash(object_to_hash, **kwargs):
     """
@@ -198,19 +291,11 @@ def make_hash(object_to_hash, **kwargs):
 
 @make_hash.register(abc.Sequence)
 def _(sequence, **kwargs):
-    hashes = tuple([
-        make_hash(x, **kwargs) for x in sequence
-    ])
-    return make_hash_with_type('L', ",".join(hashes))
+    return _make_hash_of_hashes('L', (make_hash(x, **kwargs) for x in sequence))
 
 @make_hash.register(abc.Set)
 def _(object_to_hash, **kwargs):
-    hashes = tuple([
-            make_hash(x, **kwargs)
-            for x
-            in sorted(object_to_hash)
-        ])
-    return make_hash_with_type('S', ",".join(hashes))
+    return _make_hash_of_hashes('S', (make_hash(x, **kwargs) for x in sorted(object_to_hash)))
 
 @make_hash.register(abc.Mapping)
 def _(mapping, **kwargs):
@@ -263,28 +348,49 @@ def _(object_to_hash, **kwargs):
 
 @make_hash.register(Folder)
 def _(folder, **kwargs):
-    # make sure file is closed after being read
-    def _read_file(folder, name):
-        with folder.open(name) as f:
-            return f.read()
-
     ignored_folder_content = kwargs.get('ignored_folder_content', [])
 
-    return make_hash_with_type(
+    # The repository folder of a stored node is never modified, so its hash can be reused
+    cache_key = None
+    if isinstance(folder, RepositoryFolder) and folder.section == 'node' and folder.exists():
+        cache_key = (folder.abspath, tuple(sorted(ignored_folder_content)))
+        cached_hash = _folder_hash_cache.get(cache_key)
+        if cached_hash is not None:
+            return cached_hash
+
+    folder_hash = make_hash_with_type(
         'pd',
         make_hash([
             (
                 name,
                 folder.get_subfolder(name) if folder.isdir(name) else
-                make_hash_with_type('pf', _read_file(folder, name))
+                _make_hash_of_file(folder, name)
             )
             for name in sorted(folder.get_content_list())
             if name not in ignored_folder_content
         ], **kwargs)
     )
 
+    if cache_key is not None:
+        _folder_hash_cache.set(cache_key, folder_hash)
+
+    return folder_hash
+
 @make_hash.register(np.ndarray)
 def _(object_to_hash, **kwargs):
+    # A read-only array cannot change, so its hash can be reused as long as the array is alive
+    if _is_immutable_array(object_to_hash):
+        cached = _array_hash_cache.get(id(object_to_hash))
+        if cached is not None and cached[0]() is object_to_hash:
+            return cached[1]
+
+        array_hash = _make_hash_of_array(object_to_hash, **kwargs)
+        _array_hash_cache.set(id(object_to_hash), (weakref.ref(object_to_hash), array_hash))
+        return array_hash
+
+    return _make_hash_of_array(object_to_hash, **kwargs)
+
+def _make_hash_of_array(object_to_hash, **kwargs):
     if object_to_hash.dtype == np.float64:
         return make_hash_with_type(
             'af',
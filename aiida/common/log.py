@@ -8,7 +8,11 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 import logging
-from copy import deepcopy
+import os
+import Queue
+import threading
+import time
+from copy import copy, deepcopy
 from logging import config
 from aiida.common import setup
 from aiida.backends.utils import is_dbenv_loaded
@@ -73,6 +77,172 @@ class DBLogHandler(logging.Handler):
             traceback.print_exc()
 
 
+# A logging handler that stores the log records in the database DbLog table
+# asynchronously: the records are put in a bounded queue and written in bulk by
+# a background thread, when flush_size records are queued or after flush_interval
+# seconds. It is used by the daemon, where many records (e.g. the reports of the
+# WorkChains) would otherwise each cost an INSERT and a commit on the event loop.
+class BufferedDBLogHandler(DBLogHandler):
+    """
+    A DBLogHandler that writes the records in batches from a background thread.
+
+    When the queue is full, the records are dropped (and counted) or, if block
+    is True, emit waits for the background thread to make room. All the queued
+    records are written by flush and close, the latter also being called at exit
+    by the logging module.
+    """
+
+    def __init__(self, level=logging.NOTSET, capacity=10000, flush_size=500,
+                 flush_interval=1., block=False, timeout=None):
+        """
+        :param capacity: the maximum number of records in the queue
+        :param flush_size: the maximum number of records written at once
+        :param flush_interval: the maximum number of seconds a record waits in the
+            queue before being written
+        :param block: if True, wait for a free slot when the queue is full rather
+            than dropping the record
+        :param timeout: if block is True, the maximum number of seconds to wait for
+            a free slot before dropping the record (None to wait indefinitely)
+        """
+        super(BufferedDBLogHandler, self).__init__(level)
+        self.capacity = capacity
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.block = block
+        self.timeout = timeout
+
+        self._metrics_lock = threading.Lock()
+        self._metrics = {'queued': 0, 'flushed': 0, 'dropped': 0, 'failed': 0}
+        self._queue = None
+        self._thread = None
+        self._pid = None
+
+    def get_metrics(self):
+        """
+        :return: a dictionary with the number of records queued, flushed (i.e. written
+            to the database, or skipped since they do not refer to any object), dropped
+            because the queue was full, failed to be written, and still pending in the queue
+        """
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        metrics['pending'] = self._queue.qsize() if self._queue is not None else 0
+        return metrics
+
+    def _count(self, name, number=1):
+        with self._metrics_lock:
+            self._metrics[name] += number
+
+    def _start(self):
+        """
+        Start the background thread, also after a fork since the threads are not
+        copied to the child process
+        """
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        self._queue = Queue.Queue(maxsize=self.capacity)
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='BufferedDBLogHandler')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _prepare(self, record):
+        """
+        Format the message and the exception of the record now, since its arguments
+        may change (or be deleted) before the record is written
+
+        :return: a copy of the record, as the record is also passed to the other handlers
+        """
+        record = copy(record)
+        if record.exc_info:
+            self.format(record)
+            record.exc_info = None
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def emit(self, record):
+        # If this is reached before a backend is defined, simply pass
+        if not is_dbenv_loaded():
+            return
+
+        self._start()
+        try:
+            self._queue.put(self._prepare(record), block=self.block, timeout=self.timeout)
+        except Queue.Full:
+            self._count('dropped')
+        except Exception:
+            self.handleError(record)
+        else:
+            self._count('queued')
+
+    def _write(self, records):
+        from aiida.orm.backend import construct_backend
+
+        if not records:
+            return
+
+        try:
+            construct_backend().log.create_entries_from_records(records)
+        except Exception:
+            # To avoid loops with the error handler, I just print.
+            import traceback
+
+            traceback.print_exc()
+            self._count('failed', len(records))
+        else:
+            self._count('flushed', len(records))
+
+    def _run(self):
+        queue = self._queue
+        while True:
+            records = []
+            events = []
+            stop = False
+            deadline = time.time() + self.flush_interval
+            while len(records) < self.flush_size:
+                try:
+                    item = queue.get(timeout=max(deadline - time.time(), 0.001))
+                except Queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                elif isinstance(item, logging.LogRecord):
+                    records.append(item)
+                else:
+                    # A flush was requested: write what was queued before it
+                    events.append(item)
+                    break
+
+            self._write(records)
+            for event in events:
+                event.set()
+            if stop:
+                return
+
+    def flush(self):
+        """
+        Write all the records queued so far, waiting for the background thread
+        """
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return
+
+        event = threading.Event()
+        self._queue.put(event)
+        event.wait()
+
+    def close(self):
+        """
+        Write all the queued records and stop the background thread
+        """
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
+        super(BufferedDBLogHandler, self).close()
+
+
 # The default logging dictionary for AiiDA that can be used in conjunction
 # with the config.dictConfig method of python's logging module
 LOGGING = {
@@ -156,7 +326,8 @@ def configure_logging(daemon=False, daemon_log_file=None):
     the python module logging.config.dictConfig. If the logging needs to be setup for the
     daemon, set the argument 'daemon' to True and specify the path to the log file. This
     will cause a 'daemon_handler' to be added to all the configured loggers, that is a
-    RotatingFileHandler that writes to the log file.
+    RotatingFileHandler that writes to the log file. The records are also written to the
+    database asynchronously by a BufferedDBLogHandler.
 
     :param daemon: configure the logging for a daemon task by adding a file handler instead
         of the default 'console' StreamHandler
@@ -184,6 +355,9 @@ def configure_logging(daemon=False, daemon_log_file=None):
         for name, logger in config.get('loggers', {}).iteritems():
             logger.setdefault('handlers', []).append(daemon_handler_name)
 
+        # The daemon writes the log records to the database in batches, from a background thread
+        config['handlers']['dblogger']['class'] = 'aiida.common.log.BufferedDBLogHandler'
+
     logging.config.dictConfig(config)
 
 
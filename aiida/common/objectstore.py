@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+An optional content-addressed store for the files of the repository folders
+of the nodes.
+
+When the ``repository.deduplicate`` property is set, the files of the folder
+of a node are added to the store when the node is stored: the content of each
+file is stored once, as an object named after its SHA-256, and the file in the
+node folder becomes a hard link to the object. The node folders keep their
+layout, so that everything accessing the files by their path keeps working,
+while identical files (the same pseudopotential, the same submission script,
+the outputs of the calculations stored from the cache) take the space of a
+single copy.
+
+Only the folders of stored nodes, that are never modified, contain links to
+the objects: the files copied from them (e.g. by Node.copy() or by the caching)
+are private copies until the new node is stored, because the files of unstored
+nodes are often written directly by their path. Copying a node therefore still
+copies its files, and storing the copy reads them again to hash them: only the
+disk space is saved, not the time to copy. A file of a stored node is also
+replaced with a private copy before being opened for writing through
+Folder.open or Folder.create_file_from_filelike, as long as the store is
+enabled (the check is skipped otherwise, to avoid a stat). The objects are read-only,
+but this does not stop the root user: writing directly to the path of a file
+of a stored node modifies the content of all the nodes sharing it.
+
+A manifest for each node folder records the digests of its files, so that
+make_hash of a folder uses the recorded digests rather than reading the files.
+
+The number of hard links of an object is its reference count: the objects not
+linked from any node folder anymore are removed by collect_garbage.
+deduplicate_repository adds the folders of an existing repository to the store.
+"""
+import errno
+import hashlib
+import json
+import os
+import shutil
+
+from aiida.common.utils import get_repository_folder
+
+# The folders of the objects and of the manifests, in the repository
+OBJECTS_FOLDER = 'objects'
+MANIFESTS_FOLDER = 'manifests'
+
+# Only the folders of this section of the repository are deduplicated
+DEDUPLICATED_SECTION = 'node'
+
+# Size of the chunks in which the files are read to be hashed
+FILE_HASH_CHUNK_SIZE = 1024 * 1024
+
+# The objects can be shared by many nodes, so they are read-only
+OBJECT_MODE = 0444
+
+# Maximum number of entries of the in-memory caches below
+_CACHE_SIZE = 100000
+
+# The digests of the objects, by (device, inode), learned when adding files to
+# the store or reading the manifests: new links to an object do not need to be
+# read again to be added to the store
+_object_digests = {}
+
+# The manifests read, by uuid of the node
+_manifests = {}
+
+_enabled = None
+
+
+def is_enabled():
+    """
+    :return: True if the files of the nodes are added to the object store, as
+        set by the repository.deduplicate property
+    """
+    global _enabled
+    if _enabled is None:
+        from aiida.common.setup import get_property
+        _enabled = get_property('repository.deduplicate')
+    return _enabled
+
+
+def set_enabled(enabled):
+    """
+    Enable or disable the object store in this process, overriding the
+    repository.deduplicate property
+
+    :param enabled: a boolean, or None to use the property again
+    """
+    global _enabled
+    _enabled = enabled
+
+
+def get_object_path(digest):
+    """
+    :param digest: the SHA-256 of the content of an object, in hexadecimal
+    :return: the absolute path of the object
+    """
+    return os.path.join(get_repository_folder('repository'), OBJECTS_FOLDER,
+                        digest[:2], digest[2:4], digest[4:])
+
+
+def _get_manifest_path(uuid):
+    uuid = unicode(uuid)
+    return os.path.join(get_repository_folder('repository'), MANIFESTS_FOLDER,
+                        DEDUPLICATED_SECTION, uuid[:2], uuid[2:4], uuid[4:] + '.json')
+
+
+def hash_file(path):
+    """
+    Read a file once to compute the digests recorded in the manifests
+
+    :return: the SHA-256 of the content of the file, and the hash of the file
+        computed by make_hash for a file in a Folder
+    """
+    sha256 = hashlib.sha256()
+    file_hash = hashlib.sha224('pf')
+    with open(path, 'rb') as handle:
+        while True:
+            chunk = handle.read(FILE_HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            sha256.update(chunk)
+            file_hash.update(chunk)
+    return sha256.hexdigest(), file_hash.hexdigest()
+
+
+def _remember(stat, digests):
+    if len(_object_digests) >= _CACHE_SIZE:
+        _object_digests.clear()
+    _object_digests[stat.st_dev, stat.st_ino] = tuple(digests)
+
+
+def _is_link_to_object(stat, digest):
+    try:
+        object_stat = os.stat(get_object_path(digest))
+    except OSError:
+        return False
+    return (object_stat.st_dev, object_stat.st_ino) == (stat.st_dev, stat.st_ino)
+
+
+def _makedirs(path):
+    try:
+        os.makedirs(path)
+    except OSError as exc:
+        if exc.errno != errno.EEXIST:
+            raise
+
+
+def _replace_with_link(src, path):
+    """
+    Atomically replace the file at path with a new hard link to src
+    """
+    tmp_path = '{}.{}.link'.format(path, os.getpid())
+    os.link(src, tmp_path)
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        os.remove(tmp_path)
+        raise
+
+
+def add_file(path):
+    """
+    Add a file to the store: if its content is already in the store, the file
+    is replaced with a link to the object, otherwise the file becomes the object.
+
+    :param path: the absolute path of the file
+    :return: the digests of the file (see hash_file), or None if the file
+        could not be added, e.g. if the file system does not support hard links
+    """
+    stat = os.stat(path)
+    digests = _object_digests.get((stat.st_dev, stat.st_ino))
+    if digests is None or not _is_link_to_object(stat, digests[0]):
+        digests = hash_file(path)
+        object_path = get_object_path(digests[0])
+        try:
+            _makedirs(os.path.dirname(object_path))
+            try:
+                os.link(path, object_path)
+            except OSError as exc:
+                if exc.errno != errno.EEXIST:
+                    raise
+                if not _is_link_to_object(stat, digests[0]):
+                    _replace_with_link(object_path, path)
+        except OSError:
+            return None
+        stat = os.stat(path)
+
+    if stat.st_mode & 0222:
+        try:
+            os.chmod(path, OBJECT_MODE)
+        except OSError:
+            pass
+    _remember(stat, digests)
+    return digests
+
+
+def deduplicate_folder(folder):
+    """
+    Add the files of the repository folder of a node to the store, and write
+    the manifest of the folder
+
+    :param folder: the RepositoryFolder of the node
+    :return: the number of files in the store
+    """
+    manifest = {}
+    for dirpath, _, filenames in os.walk(folder.abspath):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if os.path.islink(path) or not os.path.isfile(path):
+                continue
+            digests = get_file_digests(path) or add_file(path)
+            if digests is not None:
+                manifest[os.path.relpath(path, folder.abspath)] = list(digests)
+
+    manifest_path = _get_manifest_path(folder.uuid)
+    _makedirs(os.path.dirname(manifest_path))
+    tmp_path = '{}.{}.tmp'.format(manifest_path, os.getpid())
+    with open(tmp_path, 'w') as handle:
+        json.dump(manifest, handle)
+    os.rename(tmp_path, manifest_path)
+    _manifests.pop(unicode(folder.uuid), None)
+
+    return len(manifest)
+
+
+def _read_manifest(uuid):
+    try:
+        return _manifests[uuid]
+    except KeyError:
+        pass
+    try:
+        with open(_get_manifest_path(uuid)) as handle:
+            manifest = json.load(handle)
+    except (IOError, ValueError):
+        manifest = {}
+    if len(_manifests) >= _CACHE_SIZE:
+        _manifests.clear()
+    _manifests[uuid] = manifest
+    return manifest
+
+
+def get_file_digests(path):
+    """
+    :param path: the absolute path of a file in the repository folder of a node
+    :return: the digests of the file recorded in the manifest of the node (see
+        hash_file), or None if there are none or if the file is not a link to
+        the object anymore
+    """
+    root = os.path.join(get_repository_folder('repository'), DEDUPLICATED_SECTION)
+    parts = os.path.relpath(path, root).split(os.sep)
+    if len(parts) < 4 or parts[0] == os.pardir:
+        return None
+
+    digests = _read_manifest(u''.join(parts[:3])).get(os.path.join(*parts[3:]))
+    if digests is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if not _is_link_to_object(stat, digests[0]):
+        return None
+    _remember(stat, digests)
+    return tuple(digests)
+
+
+def copy_tree(src, dest):
+    """
+    As shutil.copytree, but only copying the content of the files, so that the
+    copies of the read-only files of the store are writable, as the other files
+    of the folders of the unstored nodes
+
+    :param src: the absolute path of the folder to copy
+    :param dest: the absolute path of the new folder, that must not exist
+    """
+    os.makedirs(dest)
+    for name in os.listdir(src):
+        src_path = os.path.join(src, name)
+        dest_path = os.path.join(dest, name)
+        if os.path.isdir(src_path):
+            copy_tree(src_path, dest_path)
+        else:
+            shutil.copyfile(src_path, dest_path)
+    shutil.copystat(src, dest)
+
+
+def unshare_file(path, keep_content=True):
+    """
+    Replace a file that is a link to an object with a private copy, before it
+    is opened for writing, so that the other nodes are not modified
+
+    :param path: the absolute path of the file, that may not exist
+    :param keep_content: if False, the file is removed instead, as when it is
+        opened to be overwritten
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return
+    if stat.st_nlink < 2 or not os.path.isfile(path):
+        return
+
+    if not keep_content:
+        os.remove(path)
+        return
+    tmp_path = '{}.{}.copy'.format(path, os.getpid())
+    shutil.copyfile(path, tmp_path)
+    os.chmod(tmp_path, (stat.st_mode | 0200) & 0777)
+    os.rename(tmp_path, path)
+
+
+def collect_garbage(dry_run=False):
+    """
+    Remove the objects that are not linked from any node folder anymore, and
+    the manifests of the node folders that do not exist anymore
+
+    :param dry_run: if True, only count what would be removed
+    :return: a dictionary with the number of 'objects' and of 'manifests'
+        removed, and the 'bytes' freed
+    """
+    removed = {'objects': 0, 'manifests': 0, 'bytes': 0}
+
+    objects_root = os.path.join(get_repository_folder('repository'), OBJECTS_FOLDER)
+    for dirpath, _, filenames in os.walk(objects_root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            stat = os.lstat(path)
+            # The only remaining link is the object itself
+            if stat.st_nlink == 1:
+                if not dry_run:
+                    os.remove(path)
+                removed['objects'] += 1
+                removed['bytes'] += stat.st_size
+
+    folders_root = os.path.join(get_repository_folder('repository'), DEDUPLICATED_SECTION)
+    manifests_root = os.path.join(get_repository_folder('repository'), MANIFESTS_FOLDER,
+                                  DEDUPLICATED_SECTION)
+    for dirpath, _, filenames in os.walk(manifests_root):
+        for filename in filenames:
+            if not filename.endswith('.json'):
+                continue
+            relpath = os.path.relpath(os.path.join(dirpath, filename), manifests_root)
+            if not os.path.isdir(os.path.join(folders_root, relpath[:-len('.json')])):
+                uuid = u''.join(relpath.split(os.sep))[:-len('.json')]
+                if not dry_run:
+                    os.remove(os.path.join(dirpath, filename))
+                    _manifests.pop(uuid, None)
+                removed['manifests'] += 1
+
+    return removed
+
+
+def deduplicate_repository(silent=False):
+    """
+    Add the folders of the nodes of an existing repository to the store.
+    The files already in the store are not read again, so that the migration
+    can be interrupted and run again.
+
+    :param silent: if False, print the progress
+    :return: the number of node folders and of files in the store
+    """
+    from aiida.common.folders import RepositoryFolder
+
+    root = os.path.join(get_repository_folder('repository'), DEDUPLICATED_SECTION)
+    num_folders = num_files = 0
+    for first in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+        for second in sorted(os.listdir(os.path.join(root, first))):
+            for rest in sorted(os.listdir(os.path.join(root, first, second))):
+                if not os.path.isdir(os.path.join(root, first, second, rest)):
+                    continue
+                folder = RepositoryFolder(section=DEDUPLICATED_SECTION, uuid=first + second + rest)
+                num_files += deduplicate_folder(folder)
+                num_folders += 1
+                if not silent and num_folders % 1000 == 0:
+                    print "{} node folders, {} files in the object store".format(num_folders, num_files)
+
+    if not silent:
+        print "{} node folders, {} files in the object store".format(num_folders, num_files)
+    return num_folders, num_files
@@ -850,6 +850,40 @@ _property_table = {
         "Minimum level to log to the DbLog table",
         "REPORT",
         ["CRITICAL", "ERROR", "WARNING", "REPORT", "INFO", "DEBUG"]),
+    "transport.pool_connections": (
+        "transport_pool_connections",
+        "bool",
+        "Boolean whether the runners should keep transports open across "
+        "batches of transport tasks, rather than opening and closing a "
+        "connection every time (at most one per authinfo)",
+        False,
+        None),
+    "transport.pool_idle_timeout": (
+        "transport_pool_idle_timeout",
+        "int",
+        "Number of seconds after which an unused open transport is closed, "
+        "when transport pooling is enabled",
+        300,
+        None),
+    "arraydata.cache_size": (
+        "arraydata_cache_size",
+        "int",
+        "Maximum total size in MB of the arrays that each stored ArrayData "
+        "node keeps cached in memory after reading them; the least recently "
+        "used arrays are dropped first",
+        256,
+        None),
+    "repository.deduplicate": (
+        "repository_deduplicate",
+        "bool",
+        "Boolean whether the files of the stored nodes are kept in a "
+        "content-addressed object store, where identical files are stored "
+        "only once and shared through hard links. Writing directly to a file "
+        "in the repository folder of a stored node (which AiiDA never does) "
+        "then modifies all the nodes sharing it, also when running as root, "
+        "that ignores the read-only mode of the shared files",
+        False,
+        None),
     "tcod.depositor_username": (
         "tcod_depositor_username",
         "string",
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+import unittest
+
+
+class MakeHashTest(unittest.TestCase):
+    """
+    Tests for the make_hash function. The expected values were produced with the
+    original recursive implementation, and must not change to keep the caching valid.
+    """
+
+    def test_nested_objects(self):
+        from aiida.common.hashing import make_hash
+
+        self.assertEquals(
+            make_hash({'a': 1, 'b': [1, 2, 'c'], 'd': None, 'e': True, 'f': {3, 4}, 'g': ('x', {'y': 'z'})}),
+            '698bed453eccf5aeedb38b396767e1a524c6f0348b5b0f96e2868140')
+        self.assertEquals(
+            make_hash(['first', ['second', 3]]),
+            '026377f44ee23c90d81ca3d0f345a9772067ebcf0322a71d5b0c9f29')
+
+    def test_folder(self):
+        import os
+        import shutil
+        import tempfile
+        from aiida.common.folders import Folder
+        from aiida.common import hashing
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            os.mkdir(os.path.join(tmpdir, 'sub'))
+            with open(os.path.join(tmpdir, 'name'), 'w') as handle:
+                handle.write('content\n')
+
+            expected = 'b98863d18b8ba5fd1b1d3f039fac3d49d70a527b7d6309c8912d75f6'
+            self.assertEquals(hashing.make_hash(Folder(tmpdir)), expected)
+
+            # Reading the files in chunks smaller than their size should not change the hash
+            chunk_size = hashing.FILE_HASH_CHUNK_SIZE
+            hashing.FILE_HASH_CHUNK_SIZE = 3
+            try:
+                self.assertEquals(hashing.make_hash(Folder(tmpdir)), expected)
+            finally:
+                hashing.FILE_HASH_CHUNK_SIZE = chunk_size
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_read_only_array(self):
+        import numpy as np
+        from aiida.common.hashing import make_hash
+
+        array = np.arange(10.)
+        expected = make_hash(array)
+
+        array.flags.writeable = False
+        self.assertEquals(make_hash(array), expected)
+        # The second call is served from the cache of read-only arrays
+        self.assertEquals(make_hash(array), expected)
+
+        # A read-only view of a writeable array can change, and should not be cached
+        writeable = np.arange(10.)
+        view = writeable[:]
+        view.flags.writeable = False
+        make_hash(view)
+        writeable[0] = 1.
+        self.assertNotEquals(make_hash(view), expected)
@@ -14,6 +14,7 @@ the routines make reference to the suitable plugins for all
 plugin-specific operations.
 """
 import os
+import time
 from backports import tempfile
 
 from aiida.common.datastructures import calc_states
@@ -34,6 +35,12 @@ from aiida.common.log import get_dblogger_extra
 
 execlogger = aiidalogger.getChild('execmanager')
 
+# Name of the tarball created in the remote working directory to retrieve the files in one go
+_RETRIEVE_TARBALL_NAME = '.aiida_retrieve.tar.gz'
+
+# Name of the tarball that is unpacked in the remote working directory to upload the files in one go
+_UPLOAD_TARBALL_NAME = '.aiida_upload.tar'
+
 
 def update_job_calc_from_job_info(calc, job_info):
     """
@@ -207,6 +214,14 @@ def submit_calc(calc, authinfo, transport=None):
             # retrieval
             calc._set_remote_workdir(workdir)
 
+            # local_copy_list is a list of tuples,
+            # each with (src_abs_path, dest_rel_path)
+            # NOTE: validation of these lists are done
+            # inside calc._presubmit()
+            local_copy_list = calcinfo.local_copy_list
+            remote_copy_list = calcinfo.remote_copy_list
+            remote_symlink_list = calcinfo.remote_symlink_list
+
             # I first create the code files, so that the code can put
             # default files to be overwritten by the plugin itself.
             # Still, beware! The code file itself could be overwritten...
@@ -218,28 +233,14 @@ def submit_calc(calc, authinfo, transport=None):
                         t.put(code.get_abs_path(f), f)
                     t.chmod(code.get_local_executable(), 0o755)  # rwxr-xr-x
 
-            # copy all files, recursively with folders
-            for f in folder.get_content_list():
-                execlogger.debug("[submission of calc {}] "
-                                 "copying file/folder {}...".format(calc.pk, f),
-                                 extra=logger_extra)
-                t.put(folder.get_abs_path(f), f)
-
-            # local_copy_list is a list of tuples,
-            # each with (src_abs_path, dest_rel_path)
-            # NOTE: validation of these lists are done
-            # inside calc._presubmit()
-            local_copy_list = calcinfo.local_copy_list
-            remote_copy_list = calcinfo.remote_copy_list
-            remote_symlink_list = calcinfo.remote_symlink_list
+            # copy all files, recursively with folders, as tuples (src_abs_path, dest_rel_path)
+            upload_list = [(folder.get_abs_path(f), f) for f in folder.get_content_list()]
 
             if local_copy_list is not None:
-                for src_abs_path, dest_rel_path in local_copy_list:
-                    execlogger.debug("[submission of calc {}] "
-                                     "copying local file/folder to {}".format(
-                        calc.pk, dest_rel_path),
-                        extra=logger_extra)
-                    t.put(src_abs_path, dest_rel_path)
+                upload_list.extend(local_copy_list)
+
+            upload_files_from_list(calc, t, upload_list, use_tarball=computer.get_upload_with_tarball(),
+                                   logger_extra=logger_extra)
 
             if remote_copy_list is not None:
                 for (remote_computer_uuid, remote_abs_path,
@@ -322,6 +323,61 @@ def submit_calc(calc, authinfo, transport=None):
             t.close()
 
 
+def upload_files_from_list(calculation, transport, upload_list, use_tarball=False, logger_extra=None):
+    """
+    Upload the files and folders in the upload_list through the transport to its
+    current remote directory.
+
+    :param transport: the Transport instance
+    :param upload_list: a list of tuples (src_abs_path, dest_rel_path); later entries overwrite
+        earlier ones with the same destination
+    :param use_tarball: if True, pack the files in a tarball that is transferred and unpacked on
+        the remote; the files are uploaded one by one if this fails
+    """
+    if use_tarball and upload_list:
+        try:
+            _upload_with_tarball(transport, upload_list)
+            return
+        except (IOError, OSError) as exception:
+            execlogger.warning("[submission of calc {}] Upload through a tarball failed, uploading the "
+                               "files one by one: {}".format(calculation.pk, exception), extra=logger_extra)
+
+    for src_abs_path, dest_rel_path in upload_list:
+        execlogger.debug("[submission of calc {}] "
+                         "copying file/folder to {}...".format(calculation.pk, dest_rel_path),
+                         extra=logger_extra)
+        transport.put(src_abs_path, dest_rel_path)
+
+
+def _upload_with_tarball(transport, upload_list):
+    """
+    Upload files and folders by packing them locally in a single tarball, transferring it
+    in one go and unpacking it with a single command in the current remote directory.
+
+    :param transport: an open transport, whose current directory is the remote working directory
+    :param upload_list: a list of tuples (src_abs_path, dest_rel_path); later entries overwrite
+        earlier ones with the same destination
+    :raise IOError: if the tarball could not be transferred or unpacked
+    """
+    import tarfile
+    from aiida.common.utils import escape_for_bash
+
+    with tempfile.TemporaryDirectory() as sandbox:
+        local_tarball = os.path.join(sandbox, _UPLOAD_TARBALL_NAME)
+
+        # Links are followed, as put would do when copying their content
+        with tarfile.open(local_tarball, 'w', dereference=True) as archive:
+            for src_abs_path, dest_rel_path in upload_list:
+                archive.add(src_abs_path, arcname=dest_rel_path)
+
+        transport.putfile(local_tarball, _UPLOAD_TARBALL_NAME)
+
+    command = 'tar -xf {0} ; retval=$? ; rm -f {0} ; exit $retval'.format(escape_for_bash(_UPLOAD_TARBALL_NAME))
+    retval, stdout, stderr = transport.exec_command_wait(command)
+    if retval != 0:
+        raise IOError("unpacking the tarball failed with exit code {}: {}".format(retval, stderr.strip()))
+
+
 def retrieve_all(job, transport, retrieved_temporary_folder, logger_extra=None):
     try:
         job._set_state(calc_states.RETRIEVING)
@@ -337,6 +393,8 @@ def retrieve_all(job, transport, retrieved_temporary_folder, logger_extra=None):
 
     execlogger.debug("Retrieving calc {}".format(job.pk), extra=logger_extra)
     workdir = job._get_remote_workdir()
+    use_tarball = job.get_computer().get_retrieve_with_tarball()
+    start_time = time.time()
 
     execlogger.debug(
         "[retrieval of calc {}] chdir {}".format(job.pk, workdir),
@@ -356,10 +414,11 @@ def retrieve_all(job, transport, retrieved_temporary_folder, logger_extra=None):
         retrieve_temporary_list = job._get_retrieve_temporary_list()
         retrieve_singlefile_list = job._get_retrieve_singlefile_list()
 
-        with SandboxFolder() as folder:
-            retrieve_files_from_list(job, transport, folder.abspath, retrieve_list)
-            # Here I retrieved everything; now I store them inside the calculation
-            retrieved_files.replace_with_folder(folder.abspath, overwrite=True)
+        # Retrieve the files directly inside the repository folder of the node, which is
+        # moved to the permanent repository when the node is stored
+        retrieved_folder = retrieved_files._get_folder_pathsubfolder
+        retrieved_folder.create()
+        retrieve_files_from_list(job, transport, retrieved_folder.abspath, retrieve_list, use_tarball)
 
         # Second, retrieve the singlefiles
         with SandboxFolder() as folder:
@@ -368,13 +427,18 @@ def retrieve_all(job, transport, retrieved_temporary_folder, logger_extra=None):
         # Retrieve the temporary files in the retrieved_temporary_folder if any files were
         # specified in the 'retrieve_temporary_list' key
         if retrieve_temporary_list:
-            retrieve_files_from_list(job, transport, retrieved_temporary_folder, retrieve_temporary_list)
+            retrieve_files_from_list(
+                job, transport, retrieved_temporary_folder, retrieve_temporary_list, use_tarball)
 
             # Log the files that were retrieved in the temporary folder
             for filename in os.listdir(retrieved_temporary_folder):
                 execlogger.debug("[retrieval of calc {}] Retrieved temporary file or folder '{}'".format(
                 job.pk, filename), extra=logger_extra)
 
+        retrieved_bytes = _get_folder_size(retrieved_folder.abspath)
+        if retrieve_temporary_list:
+            retrieved_bytes += _get_folder_size(retrieved_temporary_folder)
+
         # Store everything
         execlogger.debug(
             "[retrieval of calc {}] "
@@ -382,6 +446,11 @@ def retrieve_all(job, transport, retrieved_temporary_folder, logger_extra=None):
             extra=logger_extra)
         retrieved_files.store()
 
+    execlogger.info(
+        "[retrieval of calc {}] Retrieved {} bytes in {:.3f} seconds".format(
+            job.pk, retrieved_bytes, time.time() - start_time),
+        extra=logger_extra)
+
 
 def parse_results(job, retrieved_temporary_folder=None, logger_extra=None):
     """
@@ -463,7 +532,7 @@ def _retrieve_singlefiles(job, transport, folder, retrieve_file_list, logger_ext
         fil.store()
 
 
-def retrieve_files_from_list(calculation, transport, folder, retrieve_list):
+def retrieve_files_from_list(calculation, transport, folder, retrieve_list, use_tarball=False):
     """
     Retrieve all the files in the retrieve_list from the remote into the
     local folder instance through the transport. The entries in the retrieve_list
@@ -486,7 +555,11 @@ def retrieve_files_from_list(calculation, transport, folder, retrieve_list):
     :param transport: the Transport instance
     :param folder: an absolute path to a folder to copy files in
     :param retrieve_list: the list of files to retrieve
+    :param use_tarball: if True, pack the files in a tarball on the remote, and transfer and
+        unpack it; the files are retrieved one by one if this fails
     """
+    remote_local_pairs = []
+
     for item in retrieve_list:
         if isinstance(item, list):
             tmp_rname, tmp_lname, depth = item
@@ -499,7 +572,7 @@ def retrieve_files_from_list(calculation, transport, folder, retrieve_list):
                     local_names.append(os.path.sep.join([tmp_lname] + to_append))
             else:
                 remote_names = [tmp_rname]
-                to_append = remote_names.split(os.path.sep)[-depth:] if depth > 0 else []
+                to_append = tmp_rname.split(os.path.sep)[-depth:] if depth > 0 else []
                 local_names = [os.path.sep.join([tmp_lname] + to_append)]
             if depth > 1:  # create directories in the folder, if needed
                 for this_local_file in local_names:
@@ -518,4 +591,71 @@ def retrieve_files_from_list(calculation, transport, folder, retrieve_list):
 
         for rem, loc in zip(remote_names, local_names):
             transport.logger.debug("[retrieval of calc {}] Trying to retrieve remote item '{}'".format(calculation.pk, rem))
-            transport.get(rem, os.path.join(folder, loc), ignore_nonexisting=True)
+            remote_local_pairs.append((rem, os.path.join(folder, loc)))
+
+    if use_tarball and remote_local_pairs:
+        try:
+            _retrieve_with_tarball(transport, remote_local_pairs)
+            return
+        except (IOError, OSError) as exception:
+            transport.logger.warning("[retrieval of calc {}] Retrieval through a tarball failed, retrieving the "
+                                     "files one by one: {}".format(calculation.pk, exception))
+
+    transport.get_many(remote_local_pairs, ignore_nonexisting=True)
+
+
+def _retrieve_with_tarball(transport, remote_local_pairs):
+    """
+    Retrieve the remote paths by packing them in a compressed tarball in the current remote
+    directory, transferring it in one go and unpacking it locally. Remote paths that do not
+    exist are ignored.
+
+    :param transport: an open transport, whose current directory is the remote working directory
+    :param remote_local_pairs: a list of tuples (remotepath, absolute localpath)
+    :raise IOError: if the tarball could not be created or transferred
+    """
+    import shutil
+    import tarfile
+    from aiida.common.utils import escape_for_bash
+
+    remote_names = sorted(set(rem for rem, _ in remote_local_pairs))
+    command = 'tar -czf {} --ignore-failed-read -- {}'.format(
+        _RETRIEVE_TARBALL_NAME, ' '.join(escape_for_bash(name) for name in remote_names))
+
+    retval, stdout, stderr = transport.exec_command_wait(command)
+    if retval != 0 or not transport.isfile(_RETRIEVE_TARBALL_NAME):
+        raise IOError("creating the tarball failed with exit code {}: {}".format(retval, stderr.strip()))
+
+    with tempfile.TemporaryDirectory() as sandbox:
+        local_tarball = os.path.join(sandbox, _RETRIEVE_TARBALL_NAME)
+        try:
+            transport.getfile(_RETRIEVE_TARBALL_NAME, local_tarball)
+        finally:
+            transport.remove(_RETRIEVE_TARBALL_NAME)
+
+        unpacked = os.path.join(sandbox, 'unpacked')
+        with tarfile.open(local_tarball, 'r:gz') as archive:
+            for member in archive.getmembers():
+                if os.path.normpath(member.name).startswith(os.pardir) or os.path.isabs(member.name):
+                    raise IOError("the tarball contains an invalid path '{}'".format(member.name))
+            archive.extractall(unpacked)
+
+        for remotepath, localpath in remote_local_pairs:
+            # Leading slashes of absolute paths are stripped by tar
+            source = os.path.join(unpacked, os.path.normpath(remotepath).lstrip(os.sep))
+            if not os.path.exists(source):
+                continue
+            if os.path.isdir(localpath):
+                localpath = os.path.join(localpath, os.path.split(remotepath)[1])
+            shutil.move(source, localpath)
+
+
+def _get_folder_size(path):
+    """
+    :return: the total size in bytes of the files in the folder at the given path
+    """
+    size = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            size += os.lstat(os.path.join(dirpath, filename)).st_size
+    return size
@@ -15,6 +15,96 @@ from aiida.common.datastructures import wf_states, wf_exit_call, wf_default_call
 logger = aiidalogger.getChild('workflowmanager')
 
 
+# The states of the calculations (one row per calculation, with its process
+# state, finish status and calculation states) and of the sub-workflows (one
+# row per sub-workflow) of all the RUNNING steps. The tables are the same for
+# both backends.
+_RUNNING_STEPS_STATES_QUERY = """
+    SELECT sc.dbworkflowstep_id, n.id, n.attributes->>%(process_state_key)s,
+        array_remove(array_agg(cs.state), NULL), NULL::varchar
+    FROM db_dbworkflowstep AS s
+    JOIN db_dbworkflowstep_calculations AS sc ON sc.dbworkflowstep_id = s.id
+    JOIN db_dbnode AS n ON n.id = sc.dbnode_id
+    LEFT JOIN db_dbcalcstate AS cs ON cs.dbnode_id = n.id
+    WHERE s.state = %(running)s
+    GROUP BY sc.dbworkflowstep_id, n.id
+    UNION ALL
+    SELECT ss.dbworkflowstep_id, NULL::integer, NULL::text, NULL::varchar[], w.state
+    FROM db_dbworkflowstep AS s
+    JOIN db_dbworkflowstep_sub_workflows AS ss ON ss.dbworkflowstep_id = s.id
+    JOIN db_dbworkflow AS w ON w.id = ss.dbworkflow_id
+    WHERE s.state = %(running)s
+"""
+
+
+class StepStates(object):
+    """
+    The counts of the calculations and sub-workflows of a workflow step, by
+    state
+    """
+
+    def __init__(self):
+        self.calcs_num = 0
+        self.calcs_terminated = 0
+        self.calcs_new = []
+        self.sub_wf_num = 0
+        self.sub_wf_terminated = 0
+
+    @property
+    def is_ready(self):
+        """
+        True if all the calculations and sub-workflows of the step have
+        finished (successfully or not)
+        """
+        return (self.calcs_num == self.calcs_terminated and
+                self.sub_wf_num == self.sub_wf_terminated)
+
+
+def get_running_steps_states():
+    """
+    Get the states of the calculations and sub-workflows of all the RUNNING
+    workflow steps, with a single query.
+
+    A calculation is terminated if it has finished (i.e., it is either
+    finished_ok or failed), and new if its most recent calculation state is
+    NEW or if it has none, as for JobCalculation._is_new(). A sub-workflow is
+    terminated if it has finished (FINISHED or SLEEP) or failed (ERROR).
+
+    :return: a dictionary with the StepStates of each step, by step id. The
+        steps with no calculations and no sub-workflows are not included.
+    """
+    from aiida.backends.utils import get_raw_cursor
+    from aiida.common.datastructures import calc_states, sort_states
+    from aiida.orm.calculation import Calculation
+    from plumpy import ProcessState
+
+    terminated_sub_wf_states = (wf_states.FINISHED, wf_states.SLEEP, wf_states.ERROR)
+
+    with get_raw_cursor(commit=False) as cursor:
+        cursor.execute(_RUNNING_STEPS_STATES_QUERY, {
+            'process_state_key': Calculation.PROCESS_STATE_KEY,
+            'running': wf_states.RUNNING})
+        rows = cursor.fetchall()
+
+    states = {}
+    for step_id, calc_pk, process_state, calc_state_list, sub_wf_state in rows:
+        step_states = states.setdefault(step_id, StepStates())
+        if calc_pk is not None:
+            step_states.calcs_num += 1
+            if process_state == ProcessState.FINISHED.value:
+                step_states.calcs_terminated += 1
+            # As get_state(), a calculation with no state entries has the state None
+            calc_state = sort_states(calc_state_list)[0] if calc_state_list else None
+            if calc_state in (calc_states.NEW, None):
+                step_states.calcs_new.append(calc_pk)
+        else:
+            step_states.sub_wf_num += 1
+            if sub_wf_state in terminated_sub_wf_states:
+                step_states.sub_wf_terminated += 1
+
+    return states
+
+
 def execute_steps():
     """
     This method loops on the RUNNING workflows and handled the execution of the
@@ -33,53 +123,64 @@ def execute_steps():
     to be launched, and in case reloads the workflow and execute the specific 
     those steps. In case or error the step is flagged in ERROR state and the 
     stack is reported in the workflow report.
-    """
 
+    The states of the calculations and sub-workflows of all the steps are
+    fetched at once (see ``get_running_steps_states``), and the workflows are
+    loaded only for the steps that advance or submit calculations.
+    """
+    import time
     from aiida.orm import JobCalculation
     from aiida.orm.implementation import get_all_running_steps
- 
+
     logger.debug("Querying the worflow DB")
-    
+
+    start_time = time.time()
     running_steps = get_all_running_steps()
+    steps_states = get_running_steps_states()
+    query_time = time.time() - start_time
+
+    num_advanced = 0
+    num_submitted = 0
 
     for s in running_steps:
         if s.parent.state == wf_states.FINISHED:
             s.set_state(wf_states.FINISHED)
             continue
 
-        w = s.parent.get_aiida_class()
-
-        logger.info("[{0}] Found active step: {1}".format(w.pk, s.name))
+        logger.debug("[{0}] Found active step: {1}".format(s.parent.id, s.name))
 
-        s_calcs_new = [c.pk for c in s.get_calculations() if c._is_new()]
-        s_calcs_finished = [c.pk for c in s.get_calculations() if c.is_finished_ok]
-        s_calcs_failed = [c.pk for c in s.get_calculations() if c.is_failed]
-        s_calcs_num = len(s.get_calculations())
+        step_states = steps_states.get(s.id, None) or StepStates()
 
-        s_sub_wf_finished = [sw.pk for sw in s.get_sub_workflows() if sw.has_finished_ok()]
-        s_sub_wf_failed = [sw.pk for sw in s.get_sub_workflows() if sw.has_failed()]
-        s_sub_wf_num = len(s.get_sub_workflows())
+        if step_states.is_ready:
 
-        if (s_calcs_num == (len(s_calcs_finished) + len(s_calcs_failed)) and
-            s_sub_wf_num == (len(s_sub_wf_finished) + len(s_sub_wf_failed))):
+            w = s.parent.get_aiida_class()
 
             logger.info("[{0}] Step: {1} ready to move".format(w.pk, s.name))
 
             s.set_state(wf_states.FINISHED)
-            
+
             advance_workflow(w, s)
+            num_advanced += 1
 
-        elif len(s_calcs_new) > 0:
+        elif step_states.calcs_new:
 
-            for pk in s_calcs_new:
+            w = s.parent.get_aiida_class()
+
+            for pk in step_states.calcs_new:
 
                 obj_calc = JobCalculation.get_subclass_from_pk(pk=pk)
                 try:
                     obj_calc.submit()
+                    num_submitted += 1
                     logger.info("[{0}] Step: {1} launched calculation {2}".format(w.pk, s.name, pk))
                 except:
                     logger.error("[{0}] Step: {1} cannot launch calculation {2}".format(w.pk, s.name, pk))
 
+    logger.info("Stepped {} running workflow steps in {:.3f}s (queries: {:.3f}s): "
+                "{} advanced, {} calculations submitted".format(
+                    len(running_steps), time.time() - start_time, query_time,
+                    num_advanced, num_submitted))
+
 
 def advance_workflow(w, step):
     """
@@ -7,6 +7,9 @@
 # For further information on the license, see the LICENSE.txt file        #
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
+import os
+from collections import OrderedDict
+
 from aiida.orm import Data
 
 
@@ -17,21 +20,42 @@ class ArrayData(Data):
     way using numpy.save() (therefore, this class requires numpy to be
     installed).
 
-    Each array is stored within the Node folder as a different .npy file.
+    Each array is stored within the Node folder as a different .npy file or,
+    if requested with ``set_array(name, array, chunked=True)``, as a .npc file:
+    a chunked container where the array is split along its first axis in
+    chunks compressed independently (see :py:mod:`aiida.orm.data.array.chunked`),
+    that is smaller on disk and from which a part of the array can be read by
+    decompressing only the chunks that contain it.
 
     :note: Before storing, no caching is done: if you perform a
       :py:meth:`.get_array` call, the array will be re-read from disk.
       If instead the ArrayData node has already been stored,
       the array is cached in memory after the first read, and the cached array
-      is used thereafter.
+      is used thereafter. The cache of each node is limited to a total size
+      (the ``arraydata.cache_size`` property, in MB), beyond which the least
+      recently used arrays are dropped.
       If too much RAM memory is used, you can clear the
       cache with the :py:meth:`.clear_internal_cache` method.
+
+    :note: With ``lazy=True``, :py:meth:`.get_array` instead returns a
+      read-only memory-mapped view of the file of a stored node, so that
+      only the parts of the array that are accessed are read from disk.
     """
     array_prefix = "array|"
 
+    # File extensions of the arrays stored in numpy format and in the chunked container
+    _npy_extension = '.npy'
+    _chunked_extension = '.npc'
+
+    # Maximum total size in bytes of the arrays cached by each node, read from
+    # the arraydata.cache_size property the first time that it is needed
+    _cache_max_size = None
+
     def __init__(self, *args, **kwargs):
         super(ArrayData, self).__init__(*args, **kwargs)
-        self._cached_arrays = {}
+        self._cached_arrays = OrderedDict()
+        self._cached_size = 0
+        self._mmapped_arrays = {}
 
     def delete_array(self, name):
         """
@@ -39,13 +63,7 @@ class ArrayData(Data):
 
         :param name: The name of the array to delete from the node.
         """
-        import numpy
-
-        fname = '{}.npy'.format(name)
-        if fname not in self.get_folder_list():
-            raise KeyError(
-                "Array with name '{}' not found in node pk= {}".format(
-                    name, self.pk))
+        fname = self._get_array_filename(name)
 
         # remove both file and attribute
         self.remove_path(fname)
@@ -85,7 +103,8 @@ class ArrayData(Data):
         Return a list of all arrays stored in the node, listing the files (and
         not relying on the properties).
         """
-        return [i[:-4] for i in self.get_folder_list() if i.endswith('.npy')]
+        return [os.path.splitext(i)[0] for i in self.get_folder_list()
+                if i.endswith((self._npy_extension, self._chunked_extension))]
 
     def _arraynames_from_properties(self):
         """
@@ -104,41 +123,173 @@ class ArrayData(Data):
         """
         return tuple(self.get_attr("{}{}".format(self.array_prefix, name)))
 
-    def iterarrays(self):
+    def iterarrays(self, lazy=True):
         """
         Iterator that returns tuples (name, array) for each array stored in the
         node.
+
+        :param lazy: if True (default), the arrays of a stored node are
+            read-only memory-mapped views that are not cached, see
+            :py:meth:`.get_array`
         """
         for name in self.get_arraynames():
-            yield (name, self.get_array(name))
+            yield (name, self.get_array(name, lazy=lazy))
 
-    def get_array(self, name):
+    def get_array(self, name, index=None, lazy=False):
         """
         Return an array stored in the node
 
         :param name: The name of the array to return.
+        :param index: if given, return only this part of the array; it can be
+            anything that numpy accepts as an index, e.g. an integer, a slice
+            or a tuple of them.
+        :param lazy: if True and the node is stored, do not read the whole
+            array in memory: the array is memory-mapped read-only, and only
+            the part given by index is read (and copied) from disk. Without
+            an index, the read-only memory-mapped array is returned. Before
+            storing, only the part given by index is read, if any.
+        """
+        if not self.is_stored:
+            # Before storing, always re-read from disk, since the file can
+            # still be replaced
+            if lazy and index is not None:
+                return self._read_array_part(name, index)
+            array = self._get_array_from_file(name)
+        elif lazy:
+            if self._is_chunked(name):
+                # Only the chunks containing the requested part are read
+                array = self._read_chunked_array(name, index)
+                if index is None:
+                    array.setflags(write=False)
+                return array
+            array = self._get_mmapped_array(name)
+            if index is not None:
+                return _copy_part(array[index])
+        else:
+            array = self._get_cached_array(name)
+
+        if index is not None:
+            return array[index]
+        return array
+
+    def _get_array_from_file(self, name, mmap_mode=None):
+        """
+        Read an array from the file in the node folder
+
+        :param name: The name of the array.
+        :param mmap_mode: the mmap_mode of numpy.load
         """
         import numpy
 
-        # raw function used only internally
-        def get_array_from_file(self, name):
-            fname = '{}.npy'.format(name)
-            if fname not in self.get_folder_list():
-                raise KeyError(
-                    "Array with name '{}' not found in node pk= {}".format(
-                        name, self.pk))
+        fname = self._get_array_filename(name)
+        if fname.endswith(self._chunked_extension):
+            return self._read_chunked_array(name)
 
-            array = numpy.load(self.get_abs_path(fname))
-            return array
+        return numpy.load(self.get_abs_path(fname), mmap_mode=mmap_mode)
 
-        # Return with proper caching, but only after storing. Before, instead,
-        # always re-read from disk
-        if not self.is_stored:
-            return get_array_from_file(self, name)
-        else:
-            if name not in self._cached_arrays:
-                self._cached_arrays[name] = get_array_from_file(self, name)
-            return self._cached_arrays[name]
+    def _read_array_part(self, name, index):
+        """
+        Read from disk only the part of an array given by index, without
+        caching anything
+
+        :return: a new array
+        """
+        if self._is_chunked(name):
+            return self._read_chunked_array(name, index)
+        try:
+            array = self._get_array_from_file(name, mmap_mode='r')
+        except ValueError:
+            # Arrays of python objects cannot be memory-mapped
+            array = self._get_array_from_file(name)
+        return _copy_part(array[index])
+
+    def _get_array_filename(self, name):
+        """
+        :return: the name of the file of the array in the node folder
+        :raise KeyError: if there is no array with this name
+        """
+        folder_list = self.get_folder_list()
+        for extension in (self._npy_extension, self._chunked_extension):
+            fname = '{}{}'.format(name, extension)
+            if fname in folder_list:
+                return fname
+
+        raise KeyError(
+            "Array with name '{}' not found in node pk= {}".format(
+                name, self.pk))
+
+    def _is_chunked(self, name):
+        """
+        :return: True if the array is stored in the chunked container format
+        """
+        return self._get_array_filename(name).endswith(self._chunked_extension)
+
+    def _read_chunked_array(self, name, index=None):
+        """
+        Read an array, or the part of it given by index, from its chunked container
+        """
+        from aiida.orm.data.array.chunked import ChunkedArrayReader
+
+        with self._get_folder_pathsubfolder.open(
+                self._get_array_filename(name), 'rb') as handle:
+            return ChunkedArrayReader(handle).read(index)
+
+    def _get_mmapped_array(self, name):
+        """
+        Return the read-only memory-mapped array of a stored node, or the
+        array read in memory if it cannot be memory-mapped (e.g. because it
+        contains python objects)
+        """
+        if name not in self._mmapped_arrays:
+            try:
+                array = self._get_array_from_file(name, mmap_mode='r')
+            except ValueError:
+                array = self._get_array_from_file(name)
+                array.setflags(write=False)
+            self._mmapped_arrays[name] = array
+        return self._mmapped_arrays[name]
+
+    def _get_cached_array(self, name):
+        """
+        Return an array of a stored node from the cache, reading it from disk
+        if needed; the least recently used arrays are dropped from the cache
+        when it grows beyond the maximum size
+        """
+        try:
+            array = self._cached_arrays.pop(name)
+        except KeyError:
+            array = self._get_array_from_file(name)
+            self._cached_size += array.nbytes
+        # (Re)insert as the most recently used
+        self._cached_arrays[name] = array
+
+        max_size = self.get_cache_max_size()
+        while self._cached_size > max_size and self._cached_arrays:
+            _, evicted = self._cached_arrays.popitem(last=False)
+            self._cached_size -= evicted.nbytes
+        return array
+
+    @classmethod
+    def get_cache_max_size(cls):
+        """
+        :return: the maximum total size in bytes of the arrays cached by each
+            stored node
+        """
+        if cls._cache_max_size is None:
+            from aiida.common.setup import get_property
+            ArrayData._cache_max_size = get_property('arraydata.cache_size') * 1024 * 1024
+        return cls._cache_max_size
+
+    @classmethod
+    def set_cache_max_size(cls, max_size):
+        """
+        Set the maximum total size of the arrays cached by each stored node,
+        overriding the arraydata.cache_size property for this class and its
+        subclasses
+
+        :param max_size: the size in bytes
+        """
+        cls._cache_max_size = max_size
 
     def clear_internal_cache(self):
         """
@@ -148,49 +299,139 @@ class ArrayData(Data):
         This function is useful if you want to keep the node in memory, but you
         do not want to waste memory to cache the arrays in RAM.
         """
-        self._cached_arrays = {}
+        self._cached_arrays = OrderedDict()
+        self._cached_size = 0
+        self._mmapped_arrays = {}
 
-    def set_array(self, name, array):
+    def set_array(self, name, array, chunked=False):
         """
         Store a new numpy array inside the node. Possibly overwrite the array
         if it already existed.
 
-        Internally, it stores a name.npy file in numpy format.
+        Internally, it stores a name.npy file in numpy format or, if chunked
+        is True, a name.npc chunked container. The file is written directly
+        in the folder of the node.
 
         :param name: The name of the array.
         :param array: The numpy array to store.
+        :param chunked: if True, store the array in a chunked container, where
+            each chunk is compressed; arrays of python objects are always
+            stored in numpy format.
         """
-        import re
-        import tempfile
-
         import numpy
 
         if not (isinstance(array, numpy.ndarray)):
             raise TypeError("ArrayData can only store numpy arrays. Convert "
                             "the object to an array first")
 
+        chunked = chunked and not array.dtype.hasobject
+        extension = self._chunked_extension if chunked else self._npy_extension
+        self._prepare_array_file(name, extension)
+
+        with self._get_folder_pathsubfolder.open(
+                '{}{}'.format(name, extension), 'wb') as handle:
+            if chunked:
+                from aiida.orm.data.array.chunked import save_chunked
+                save_chunked(handle, array)
+            else:
+                numpy.save(handle, array)
+
+        # Mainly for convenience, for querying purposes (both stores the fact
+        # that there is an array with that name, and its shape)
+        self._set_attr("{}{}".format(self.array_prefix, name),
+                       list(array.shape))
+
+    def open_array_appender(self, name, dtype, row_shape=()):
+        """
+        Create an array by appending blocks of rows to it, without holding the
+        whole array in memory: the rows are written directly to the .npy file
+        in the node folder. The array is complete once the appender is closed,
+        e.g.::
+
+            with node.open_array_appender('energies', float) as appender:
+                for block in blocks:
+                    appender.append(block)
+
+        :param name: The name of the array; an existing array with this name
+            is replaced.
+        :param dtype: the dtype of the array; arrays of python objects are
+            not supported.
+        :param row_shape: the shape of each row, i.e. of the array without
+            its first axis.
+        :return: an :py:class:`ArrayAppender`
+        """
+        self._prepare_array_file(name, self._npy_extension)
+        return ArrayAppender(self, name, dtype, row_shape)
+
+    def _prepare_array_file(self, name, extension):
+        """
+        Check that an array with this name can be written in a file with this
+        extension, and remove the file of a previous array with the same
+        name stored in the other format
+        """
+        import re
+
+        from aiida.common.exceptions import ModificationNotAllowed
+
         # Check if the name is valid
         if not (name) or re.sub('[0-9a-zA-Z_]', '', name):
             raise ValueError("The name assigned to the array ({}) is not valid,"
                              "it can only contain digits, letters or underscores")
 
-        fname = "{}.npy".format(name)
+        if self.is_stored:
+            raise ModificationNotAllowed(
+                "Cannot set an array after storing the node")
 
-        with tempfile.NamedTemporaryFile() as f:
-            # Store in a temporary file, and then add to the node
-            numpy.save(f, array)
-            f.flush()  # Important to flush here, otherwise the next copy command
-            # will just copy an empty file
-            self.add_path(f.name, fname)
+        folder_list = self.get_folder_list()
+        for old_extension in (self._npy_extension, self._chunked_extension):
+            fname = '{}{}'.format(name, old_extension)
+            if old_extension != extension and fname in folder_list:
+                self.remove_path(fname)
 
-        # Mainly for convenience, for querying purposes (both stores the fact
-        # that there is an array with that name, and its shape)
-        self._set_attr("{}{}".format(self.array_prefix, name),
-                       list(array.shape))
+    def _get_objects_to_hash(self):
+        """
+        Return a list of objects which should be included in the hash.
+
+        The chunked containers are hashed from their decompressed content,
+        one chunk at a time, since the compressed bytes depend on the zlib
+        version.
+        """
+        from aiida.common.folders import Folder
+        from aiida.common.hashing import make_hash
+
+        objects = super(ArrayData, self)._get_objects_to_hash()
+        chunked = [name for name in self.get_arraynames() if self._is_chunked(name)]
+        if not chunked:
+            return objects
+
+        ignored = [self._get_array_filename(name) for name in chunked]
+        objects = [
+            make_hash(obj, ignored_folder_content=ignored) if isinstance(obj, Folder) else obj
+            for obj in objects
+        ]
+        objects.append({name: self._get_chunked_array_hash(name) for name in chunked})
+        return objects
+
+    def _get_chunked_array_hash(self, name):
+        """
+        :return: the hash of the dtype, the shape and the content of an array
+            stored in a chunked container, reading one chunk at a time
+        """
+        import hashlib
+
+        from aiida.orm.data.array.chunked import ChunkedArrayReader
+
+        with self._get_folder_pathsubfolder.open(
+                self._get_array_filename(name), 'rb') as handle:
+            reader = ChunkedArrayReader(handle)
+            hasher = hashlib.sha224('ac{}{}'.format(reader.dtype.descr, reader.shape))
+            for chunk in reader.iterchunks():
+                hasher.update(chunk.tobytes())
+        return hasher.hexdigest()
 
     def _validate(self):
         """
-        Check if the list of .npy files stored inside the node and the
+        Check if the list of .npy and .npc files stored inside the node and the
         list of properties match. Just a name check, no check on the size
         since this would require to reload all arrays and this may take time
         and memory.
@@ -206,3 +447,93 @@ class ArrayData(Data):
                 " node (pk= {}): {} vs. {}".format(self.pk,
                                                    files, properties))
         super(ArrayData, self)._validate()
+
+
+def _copy_part(part):
+    """
+    :return: a copy in memory of a part of a (memory-mapped) array, or the
+        part itself if it is a scalar
+    """
+    import numpy
+
+    if isinstance(part, numpy.ndarray):
+        return numpy.array(part)
+    return part
+
+
+class ArrayAppender(object):
+    """
+    Write an array to a .npy file of an :py:class:`ArrayData` node by blocks
+    of rows, see :py:meth:`ArrayData.open_array_appender`.
+
+    A header with room for the largest possible shape is written first, and
+    is rewritten with the actual shape when the appender is closed.
+    """
+
+    def __init__(self, node, name, dtype, row_shape=()):
+        import numpy
+        from numpy.lib.format import dtype_to_descr, magic
+
+        self.dtype = numpy.dtype(dtype)
+        if self.dtype.hasobject:
+            raise ValueError("Arrays of python objects cannot be appended to")
+        self.row_shape = tuple(row_shape)
+        self.num_rows = 0
+
+        self._node = node
+        self._name = name
+        self._descr = dtype_to_descr(self.dtype)
+        self._magic = magic(1, 0)
+        # Enough room for any number of rows, aligned as numpy does
+        self._header_size = len(self._get_header(2 ** 63)) + 1
+        self._header_size += -(len(self._magic) + 2 + self._header_size) % 16
+
+        self._handle = node._get_folder_pathsubfolder.open(
+            '{}{}'.format(name, node._npy_extension), 'wb')
+        self._write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _get_header(self, num_rows):
+        return "{{'descr': {!r}, 'fortran_order': False, 'shape': {!r}, }}".format(
+            self._descr, (int(num_rows),) + self.row_shape)
+
+    def _write_header(self):
+        import struct
+
+        header = self._get_header(self.num_rows)
+        header = header + ' ' * (self._header_size - len(header) - 1) + '\n'
+        self._handle.seek(0)
+        self._handle.write(self._magic + struct.pack('<H', self._header_size) + header)
+
+    def append(self, rows):
+        """
+        Append rows at the end of the array
+
+        :param rows: an array (or anything that numpy can convert to an array
+            of the dtype of the appender) of shape ``(m,) + row_shape``
+        """
+        import numpy
+
+        rows = numpy.ascontiguousarray(rows, dtype=self.dtype)
+        if rows.shape[1:] != self.row_shape:
+            raise ValueError("The rows appended to the array {} must have shape (m,) + {}, "
+                             "got {}".format(self._name, self.row_shape, rows.shape))
+        self._handle.write(rows.tobytes())
+        self.num_rows += rows.shape[0]
+
+    def close(self):
+        """
+        Write the final shape of the array, and record it in the attributes
+        of the node
+        """
+        if self._handle.closed:
+            return
+        self._write_header()
+        self._handle.close()
+        self._node._set_attr("{}{}".format(self._node.array_prefix, self._name),
+                             [self.num_rows] + list(self.row_shape))
@@ -396,8 +396,10 @@ class BandsData(KpointsData):
         :param also_occupations: if True, returns also the occupations array.
         Default = False
         """
+        # The arrays are copied from the read-only memory-mapped files, so
+        # that they are not kept in the cache of the node
         try:
-            bands = numpy.array(self.get_array('bands'))
+            bands = numpy.array(self.get_array('bands', lazy=True))
         except KeyError:
             raise AttributeError("No stored bands has been found")
 
@@ -405,7 +407,7 @@ class BandsData(KpointsData):
 
         if also_occupations:
             try:
-                occupations = numpy.array(self.get_array('occupations'))
+                occupations = numpy.array(self.get_array('occupations', lazy=True))
             except KeyError:
                 raise AttributeError('No occupations were set')
             to_return.append(occupations)
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+A chunked and compressed container for a single numpy array, stored in one file.
+
+The array is split along its first axis in chunks of consecutive rows, and each
+chunk is compressed with zlib independently, so that a subset of the rows can
+be read by decompressing only the chunks that contain them. The file layout is::
+
+    MAGIC | chunk 0 | chunk 1 | ... | index (JSON) | offset of the index (8 bytes)
+
+where the index holds the dtype, the shape, the number of rows per chunk and
+the offset and size of each compressed chunk. As the index is written last,
+the chunks can be written to the file one at a time.
+"""
+import json
+import struct
+import zlib
+
+import numpy
+from numpy.lib.format import dtype_to_descr
+from numpy.lib.utils import safe_eval
+
+__all__ = ['save_chunked', 'ChunkedArrayReader', 'is_chunked']
+
+MAGIC = '\x93AIIDACHUNKS\x01'
+FOOTER_FORMAT = '<Q'
+FOOTER_SIZE = struct.calcsize(FOOTER_FORMAT)
+
+# Target size in bytes of the uncompressed chunks
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_COMPRESSION_LEVEL = 6
+
+
+def is_chunked(handle):
+    """
+    :param handle: a file opened in binary mode, positioned at its beginning
+    :return: True if the file is a chunked array container; the position of
+        the file is restored
+    """
+    start = handle.tell()
+    try:
+        return handle.read(len(MAGIC)) == MAGIC
+    finally:
+        handle.seek(start)
+
+
+def save_chunked(handle, array, chunk_size=DEFAULT_CHUNK_SIZE, compression_level=DEFAULT_COMPRESSION_LEVEL):
+    """
+    Write an array to a file in the chunked container format, one chunk at a time
+
+    :param handle: a file opened for writing in binary mode
+    :param array: the numpy array to write; arrays of python objects are not supported
+    :param chunk_size: the target size in bytes of the uncompressed chunks; a
+        chunk contains at least one row
+    :param compression_level: the zlib compression level, from 1 (fastest) to 9 (smallest)
+    """
+    if array.dtype.hasobject:
+        raise ValueError('arrays of python objects cannot be stored in a chunked container')
+
+    if array.ndim == 0:
+        rows = [array]
+        chunk_rows = 1
+    else:
+        row_size = array[0:1].nbytes if array.shape[0] else 0
+        chunk_rows = max(1, chunk_size // row_size) if row_size else max(1, array.shape[0])
+        rows = (array[start:start + chunk_rows] for start in range(0, array.shape[0], chunk_rows))
+
+    handle.write(MAGIC)
+    offset = len(MAGIC)
+    chunks = []
+    for block in rows:
+        data = zlib.compress(numpy.ascontiguousarray(block).tobytes(), compression_level)
+        handle.write(data)
+        chunks.append([offset, len(data)])
+        offset += len(data)
+
+    index = {
+        # The repr of the descr, as in the header of the .npy files
+        'descr': repr(dtype_to_descr(array.dtype)),
+        'shape': list(array.shape),
+        'chunk_rows': chunk_rows,
+        'compression': 'zlib',
+        'chunks': chunks,
+    }
+    handle.write(json.dumps(index))
+    handle.write(struct.pack(FOOTER_FORMAT, offset))
+
+
+class ChunkedArrayReader(object):
+    """
+    Random access, by chunk, to an array stored in the chunked container format
+    """
+
+    def __init__(self, handle):
+        """
+        :param handle: the container file, opened for reading in binary mode
+        """
+        if not is_chunked(handle):
+            raise ValueError('the file is not a chunked array container')
+
+        self._handle = handle
+        handle.seek(-FOOTER_SIZE, 2)
+        index_end = handle.tell()
+        index_offset, = struct.unpack(FOOTER_FORMAT, handle.read(FOOTER_SIZE))
+        handle.seek(index_offset)
+        index = json.loads(handle.read(index_end - index_offset))
+
+        self.dtype = numpy.dtype(safe_eval(index['descr']))
+        self.shape = tuple(index['shape'])
+        self.chunk_rows = index['chunk_rows']
+        self._chunks = index['chunks']
+
+    @property
+    def num_chunks(self):
+        return len(self._chunks)
+
+    def iterchunks(self):
+        """
+        Iterator over the chunks of the array, decompressed one at a time
+        """
+        for chunk in range(self.num_chunks):
+            yield self.read_chunk(chunk)
+
+    def read_chunk(self, chunk):
+        """
+        :param chunk: the index of the chunk
+        :return: the rows of the array in the chunk, as a new array
+        """
+        offset, size = self._chunks[chunk]
+        self._handle.seek(offset)
+        data = zlib.decompress(self._handle.read(size))
+        array = numpy.frombuffer(data, dtype=self.dtype).copy()
+        if not self.shape:
+            return array.reshape(self.shape)
+        num_rows = min(self.chunk_rows, self.shape[0] - chunk * self.chunk_rows)
+        return array.reshape((num_rows,) + self.shape[1:])
+
+    def read(self, index=None):
+        """
+        Read the array, or a part of it
+
+        :param index: if given, return only this part of the array. If the
+            index on the first axis is an integer or a slice, only the chunks
+            containing the selected rows are read; for any other index the
+            whole array is read first.
+        :return: a new array
+        """
+        first, rest = _split_index(index)
+        if not self.shape or first is None:
+            array = self._read_all()
+            return array if index is None else array[index]
+
+        num_rows = self.shape[0]
+        chunk_rows = self.chunk_rows
+        if not isinstance(first, slice):
+            row = first + num_rows if first < 0 else first
+            if not 0 <= row < num_rows:
+                raise IndexError('index {} is out of bounds for axis 0 with size {}'.format(first, num_rows))
+            return self.read_chunk(row // chunk_rows)[row % chunk_rows][rest]
+
+        # The selected rows are computed from the bounds of the slice, without
+        # listing them
+        start, stop, step = first.indices(num_rows)
+        count = len(xrange(start, stop, step))
+        if count == 0:
+            return numpy.empty((0,) + self.shape[1:], dtype=self.dtype)[(slice(None),) + rest]
+        last = start + (count - 1) * step
+
+        if abs(step) >= chunk_rows:
+            # Each selected row is in a different chunk
+            block = numpy.concatenate([
+                self.read_chunk(row // chunk_rows)[row % chunk_rows:row % chunk_rows + 1]
+                for row in xrange(start, stop, step)])
+            return block[(slice(None),) + rest]
+
+        # Otherwise all the chunks from the one of the first selected row to
+        # the one of the last selected row contain selected rows
+        first_chunk = min(start, last) // chunk_rows
+        last_chunk = max(start, last) // chunk_rows
+        block = numpy.concatenate([self.read_chunk(chunk) for chunk in xrange(first_chunk, last_chunk + 1)])
+        offset = first_chunk * chunk_rows
+        local_stop = last - offset + (1 if step > 0 else -1)
+        rows = slice(start - offset, local_stop if local_stop >= 0 else None, step)
+        # A copy, not to keep the unselected rows of the block in memory
+        return block[(rows,) + rest].copy()
+
+    def _read_all(self):
+        if not self.shape:
+            return self.read_chunk(0)
+        if not self._chunks:
+            return numpy.empty(self.shape, dtype=self.dtype)
+        return numpy.concatenate(list(self.iterchunks())).reshape(self.shape)
+
+
+def _split_index(index):
+    """
+    :return: the index on the first axis, if it is an integer or a slice (None
+        otherwise), and the tuple of the indices on the other axes
+    """
+    if isinstance(index, tuple):
+        if index and _is_basic_index(index[0]) and not any(item is Ellipsis or item is None for item in index):
+            return index[0], index[1:]
+        return None, ()
+    if _is_basic_index(index):
+        return index, ()
+    return None, ()
+
+
+def _is_basic_index(index):
+    return isinstance(index, slice) or (isinstance(index, (int, long, numpy.integer)) and not isinstance(index, bool))
+
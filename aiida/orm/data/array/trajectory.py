@@ -33,7 +33,14 @@ class TrajectoryData(ArrayData):
     """
     Stores a trajectory (a sequence of crystal structures with timestamps, and
     possibly with velocities).
+
+    Long trajectories can be written by blocks of steps with
+    :py:meth:`.open_writer`, and read one step at a time with
+    :py:meth:`.get_step_data` and :py:meth:`.iter_step_data`, that only read
+    the steps they need from disk.
     """
+    # Number of steps read at a time by iter_step_data
+    _step_block_size = 1000
 
     def _internal_validate(self, stepids, cells, symbols, positions, times, velocities):
         """
@@ -177,6 +184,25 @@ class TrajectoryData(ArrayData):
         positions = numpy.array([[list(s.position) for s in x.sites] for x in structurelist])
         self.set_trajectory(stepids, cells, symbols, positions)
 
+    def open_writer(self, symbols):
+        """
+        Write the trajectory by blocks of steps, without holding it all in
+        memory: the steps are appended directly to the files in the node
+        folder, e.g.::
+
+            with trajectory.open_writer(symbols) as writer:
+                for stepids, cells, positions in blocks:
+                    writer.append(stepids, cells, positions)
+
+        The trajectory is complete, and can be stored, once the writer is
+        closed. Any trajectory previously set is replaced.
+
+        :param symbols: string array with dimension ``n``, see
+            :py:meth:`.set_trajectory`
+        :return: a :py:class:`TrajectoryWriter`
+        """
+        return TrajectoryWriter(self, symbols)
+
     def _validate(self):
         """
         Verify that the required arrays are present and that their type and
@@ -228,35 +254,41 @@ class TrajectoryData(ArrayData):
             DeprecationWarning)
         return self.get_stepids()
 
-    def get_stepids(self):
+    def get_stepids(self, index=None):
         """
         Return the array of steps, if it has already been set.
 
         .. versionadded:: 0.7
            Renamed from get_steps
 
+        :param index: if given, only this part of the array is read from disk
+            and returned (e.g. the index of a step, or a slice of steps)
         :raises KeyError: if the trajectory has not been set yet.
         """
-        return self.get_array('steps')
+        return self.get_array('steps', index=index, lazy=index is not None)
 
-    def get_times(self):
+    def get_times(self, index=None):
         """
         Return the array of times (in ps), if it has already been set.
 
+        :param index: if given, only this part of the array is read from disk
+            and returned (e.g. the index of a step, or a slice of steps)
         :raises KeyError: if the trajectory has not been set yet.
         """
         try:
-            return self.get_array('times')
+            return self.get_array('times', index=index, lazy=index is not None)
         except (AttributeError, KeyError):
             return None
 
-    def get_cells(self):
+    def get_cells(self, index=None):
         """
         Return the array of cells, if it has already been set.
 
+        :param index: if given, only this part of the array is read from disk
+            and returned (e.g. the index of a step, or a slice of steps)
         :raises KeyError: if the trajectory has not been set yet.
         """
-        return self.get_array('cells')
+        return self.get_array('cells', index=index, lazy=index is not None)
 
     def get_symbols(self):
         """
@@ -266,15 +298,21 @@ class TrajectoryData(ArrayData):
         """
         return self.get_array('symbols')
 
-    def get_positions(self):
+    def get_positions(self, index=None):
         """
         Return the array of positions, if it has already been set.
 
+        For a stored node, the array is memory-mapped read-only rather than
+        read in memory, so that only the steps that are accessed are read
+        from disk.
+
+        :param index: if given, return only this part of the array (e.g. the
+            index of a step, or a slice of steps)
         :raises KeyError: if the trajectory has not been set yet.
         """
-        return self.get_array('positions')
+        return self.get_array('positions', index=index, lazy=True)
 
-    def get_velocities(self):
+    def get_velocities(self, index=None):
         """
         Return the array of velocities, if it has already been set.
 
@@ -282,9 +320,12 @@ class TrajectoryData(ArrayData):
           functions, will not raise an exception if the velocities are not
           set, but rather return ``None`` (both if no trajectory was not set yet,
           and if it the trajectory was set but no velocities were specified).
+
+        :param index: if given, only this part of the array is read from disk
+            and returned (e.g. the index of a step, or a slice of steps)
         """
         try:
-            return self.get_array('velocities')
+            return self.get_array('velocities', index=index, lazy=index is not None)
         except (AttributeError, KeyError):
             return None
 
@@ -339,6 +380,8 @@ class TrajectoryData(ArrayData):
           positions is a :math:`n \times 3` array, and velocities is either
           ``None`` or a :math:`n \times 3` array
 
+        Only the given step is read from disk.
+
         :param index: The index of the step that you want to retrieve, from
            0 to ``self.numsteps - 1``.
         :raises IndexError: if you require an index beyond the limits.
@@ -348,15 +391,47 @@ class TrajectoryData(ArrayData):
             raise IndexError("You have only {} steps, but you are looking beyond"
                              " (index={})".format(self.numsteps, index))
 
-        vel = self.get_velocities()
-        if vel is not None:
-            vel = vel[index, :, :]
-        time = self.get_times()
-        if time is not None:
-            time = time[index]
-        return (self.get_stepids()[index], time, self.get_cells()[index, :, :],
-                self.get_symbols(), self.get_positions()[index, :, :], vel)
+        return (self.get_stepids(index), self.get_times(index), self.get_cells(index),
+                self.get_symbols(), self.get_positions(index), self.get_velocities(index))
+
+    def iter_step_data(self, start=0, stop=None, step=1):
+        """
+        Iterator over the steps of the trajectory, yielding for each step the
+        same tuple as :py:meth:`.get_step_data`. The arrays are read from disk
+        by blocks of steps, so that the whole trajectory is never in memory.
+
+        :param start: the index of the first step
+        :param stop: the index at which to stop (excluded); by default, the
+            end of the trajectory
+        :param step: iterate over one step every ``step``; it can be negative
+            to iterate backwards, as in a slice
+        """
+        indices = range(*slice(start, stop, step).indices(self.numsteps))
+        symbols = self.get_symbols()
 
+        for first in range(0, len(indices), self._step_block_size):
+            block = indices[first:first + self._step_block_size]
+            # Read the block in ascending order, and reverse it if needed
+            index = slice(min(block), max(block) + 1, abs(step))
+            order = slice(None, None, -1 if step < 0 else 1)
+
+            stepids = self.get_stepids(index)[order]
+            cells = self.get_cells(index)[order]
+            positions = self.get_positions(index)[order]
+            times = self.get_times(index)
+            if times is not None:
+                times = times[order]
+            velocities = self.get_velocities(index)
+            if velocities is not None:
+                velocities = velocities[order]
+
+            for i in range(len(block)):
+                yield (stepids[i],
+                       None if times is None else times[i],
+                       cells[i],
+                       symbols,
+                       positions[i],
+                       None if velocities is None else velocities[i])
 
     def step_to_structure(self, index, custom_kinds=None):
         """
@@ -392,10 +467,17 @@ class TrajectoryData(ArrayData):
           meaning that the strings in the ``symbols`` array must be valid
           chemical symbols.
         """
-        from aiida.orm.data.structure import StructureData, Kind, Site
-
         # ignore step, time, and velocities
         _, _, cell, symbols, positions, _ = self.get_step_data(index)
+        return self._get_structure_from_step(cell, symbols, positions, custom_kinds)
+
+    @staticmethod
+    def _get_structure_from_step(cell, symbols, positions, custom_kinds=None):
+        """
+        Return a StructureData with the cell, symbols and positions of a
+        step, see :py:meth:`.get_step_structure`
+        """
+        from aiida.orm.data.structure import StructureData, Kind, Site
 
         if custom_kinds is not None:
             kind_names = []
@@ -434,40 +516,33 @@ class TrajectoryData(ArrayData):
         from aiida.common.constants import elements
         _atomic_numbers = {data['symbol']: num for num, data in elements.iteritems()}
 
-        indices = range(self.numsteps)
-        if index is not None:
+        # The steps are read one block at a time
+        if index is None:
+            indices = range(self.numsteps)
+            steps = self.iter_step_data()
+        else:
             indices = [index]
-        return_string = "ANIMSTEPS {}\nCRYSTAL\n".format(len(indices))
+            steps = [self.get_step_data(index)]
+        lines = ["ANIMSTEPS {}\nCRYSTAL\n".format(len(indices))]
         # Do the checks once and for all here:
         structure = self.get_step_structure(index=0)
         if structure.is_alloy() or structure.has_vacancies():
             raise NotImplementedError("XSF for alloys or systems with "
                                       "vacancies not implemented.")
-        cells = self.get_cells()
-        positions = self.get_positions()
         symbols = self.get_symbols()
         atomic_numbers_list = [_atomic_numbers[s] for s in symbols]
         nat = len(symbols)
 
-        for idx in indices:
-            return_string += "PRIMVEC {}\n".format(idx+1)
-            #~ structure = self.get_step_structure(index=idx)
-            #~ sites = structure.sites
-            #~ if structure.is_alloy() or structure.has_vacancies():
-                #~ raise NotImplementedError("XSF for alloys or systems with "
-                                          #~ "vacancies not implemented.")
-            for cell_vector in cells[idx]:
-                return_string += " ".join(["{:18.5f}".format(i) for i in cell_vector])
-                return_string += "\n"
-            return_string += "PRIMCOORD {}\n".format(idx+1)
-            return_string += "{} 1\n" .format(nat)
-            for atn, pos in zip(atomic_numbers_list, positions[idx]):
-                try:
-                    return_string += "{} {:18.10f} {:18.10f} {:18.10f}\n".format(atn, pos[0], pos[1], pos[2] )
-                except:
-                    print atn, pos
-                    raise
-        return return_string.encode('utf-8'), {}
+        for idx, (_, _, cell, _, positions, _) in zip(indices, steps):
+            lines.append("PRIMVEC {}\n".format(idx+1))
+            for cell_vector in cell:
+                lines.append(" ".join(["{:18.5f}".format(i) for i in cell_vector]))
+                lines.append("\n")
+            lines.append("PRIMCOORD {}\n".format(idx+1))
+            lines.append("{} 1\n" .format(nat))
+            for atn, pos in zip(atomic_numbers_list, positions):
+                lines.append("{} {:18.10f} {:18.10f} {:18.10f}\n".format(atn, pos[0], pos[1], pos[2]))
+        return "".join(lines).encode('utf-8'), {}
 
     def _prepare_cif(self, trajectory_index=None, main_file_name=""):
         """
@@ -478,17 +553,20 @@ class TrajectoryData(ArrayData):
             import ase_loops, cif_from_ase, pycifrw_from_cif
         from aiida.common.utils import HiddenPrints
 
-        cif = ""
-        indices = range(self.numsteps)
-        if trajectory_index is not None:
-            indices = [trajectory_index]
-        for idx in indices:
-            structure = self.get_step_structure(idx)
+        # The steps are read one block at a time
+        if trajectory_index is None:
+            steps = self.iter_step_data()
+        else:
+            steps = [self.get_step_data(trajectory_index)]
+
+        cifs = []
+        for _, _, cell, symbols, positions, _ in steps:
+            structure = self._get_structure_from_step(cell, symbols, positions)
             ciffile = pycifrw_from_cif(cif_from_ase(structure.get_ase()),
                                        ase_loops)
             with HiddenPrints():
-                cif = cif + ciffile.WriteOut()
-        return cif.encode('utf-8'), {}
+                cifs.append(ciffile.WriteOut())
+        return "".join(cifs).encode('utf-8'), {}
 
     def _prepare_tcod(self, main_file_name="", **kwargs):
         """
@@ -744,7 +822,8 @@ class TrajectoryData(ArrayData):
             maxindex = len(times)
         else:
             maxindex = np.argmin(times < maxtime)
-        positions = self.get_positions()[minindex:maxindex:stepsize]
+        # With an index, a copy is returned that can be modified in place
+        positions = self.get_positions(slice(minindex, maxindex, stepsize))
 
 
         try:
@@ -833,6 +912,87 @@ class TrajectoryData(ArrayData):
         mlab.show()
 
 
+class TrajectoryWriter(object):
+    """
+    Write a :py:class:`TrajectoryData` by blocks of steps, see
+    :py:meth:`TrajectoryData.open_writer`.
+
+    The times and the velocities are stored if they are passed with the first
+    block, in which case they must be passed with every block.
+    """
+
+    def __init__(self, trajectory, symbols):
+        import numpy
+
+        symbols = numpy.array(symbols)
+        if any([not isinstance(i, basestring) for i in symbols]) or symbols.ndim != 1:
+            raise TypeError("TrajectoryData.symbols must be a 1d array of strings")
+
+        self._trajectory = trajectory
+        self.numsites = symbols.size
+        self.numsteps = 0
+
+        # Delete the arrays of a previous trajectory that may not be rewritten
+        for name in ('times', 'velocities'):
+            try:
+                trajectory.delete_array(name)
+            except KeyError:
+                pass
+
+        trajectory.set_array('symbols', symbols)
+        self._appenders = {
+            'steps': trajectory.open_array_appender('steps', int),
+            'cells': trajectory.open_array_appender('cells', float, (3, 3)),
+            'positions': trajectory.open_array_appender('positions', float, (self.numsites, 3)),
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def append(self, stepids, cells, positions, times=None, velocities=None):
+        """
+        Append a block of steps to the trajectory. The arrays have the same
+        meaning and shapes as in :py:meth:`TrajectoryData.set_trajectory`,
+        where ``s`` is the number of steps in the block.
+        """
+        import numpy
+
+        arrays = {'steps': stepids, 'cells': cells, 'positions': positions}
+        for name, array in (('times', times), ('velocities', velocities)):
+            if self.numsteps == 0 and array is not None and name not in self._appenders:
+                row_shape = () if name == 'times' else (self.numsites, 3)
+                self._appenders[name] = self._trajectory.open_array_appender(name, float, row_shape)
+            if (array is not None) != (name in self._appenders):
+                raise ValueError("TrajectoryData.{} must be passed with every block, "
+                                 "or with none".format(name))
+            if array is not None:
+                arrays[name] = array
+
+        numsteps = numpy.shape(stepids)[0] if numpy.ndim(stepids) else None
+        # Check all the arrays before writing any of them
+        for name, array in arrays.iteritems():
+            if numpy.ndim(array) == 0 or numpy.shape(array)[0] != numsteps:
+                raise ValueError("All the arrays of a block of steps must have "
+                                 "the same length")
+            if numpy.shape(array)[1:] != self._appenders[name].row_shape:
+                raise ValueError("The TrajectoryData.{} of a block of s steps must have "
+                                 "shape (s,) + {}".format(name, self._appenders[name].row_shape))
+
+        for name, array in arrays.iteritems():
+            self._appenders[name].append(array)
+        self.numsteps += numsteps
+
+    def close(self):
+        """
+        Complete the trajectory, writing the shapes of its arrays
+        """
+        for appender in self._appenders.itervalues():
+            appender.close()
+
+
 def plot_positions_XYZ(
             times, positions, indices_to_show, color_list, label,
             positions_unit='A', times_unit='ps', dont_block=False,
@@ -41,8 +41,7 @@ class Code(AbstractCode):
           otherwise a list of integers with the code PKs.
         """
         valid_codes = list(cls.query(
-            dbattributes__key="input_plugin",
-            dbattributes__tval=plugin))
+            attributes__contains={"input_plugin": plugin}))
 
         if labels:
             return [c.label for c in valid_codes]
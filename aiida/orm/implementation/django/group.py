@@ -240,8 +240,7 @@ class Group(AbstractGroup):
               user=None, node_attributes=None, past_days=None,
               name_filters=None, **kwargs):
 
-        from aiida.backends.djsite.db.models import (DbGroup, DbNode,
-                                                     DbAttribute)
+        from aiida.backends.djsite.db.models import DbGroup, DbNode
 
         # Analyze args and kwargs to create the query
         queryobject = Q()
@@ -296,24 +295,12 @@ class Group(AbstractGroup):
                     vlist = [vlist]
 
                 for v in vlist:
-                    # This will be a dictionary of the type
-                    # {'datatype': 'txt', 'tval': 'xxx') for instance, if
-                    # the passed data is a string
-                    base_query_dict = DbAttribute.get_query_dict(v)
-                    # prepend to the key the right django string to SQL-join
-                    # on the right table
-                    query_dict = {'dbnodes__dbattributes__{}'.format(k2): v2
-                                  for k2, v2 in base_query_dict.iteritems()}
-
-                    # I narrow down the list of groups.
-                    # I had to do it in this way, with multiple DB hits and
-                    # not a single, complicated query because in SQLite
-                    # there is a maximum of 64 tables in a join.
-                    # Since typically one requires a small number of filters,
-                    # this should be ok.
+                    # I narrow down the list of groups, with one query per
+                    # filter. The containment on the JSONB column of the
+                    # attributes can use its GIN index.
                     groups_pk = groups_pk.intersection(DbGroup.objects.filter(
-                        pk__in=groups_pk, dbnodes__dbattributes__key=k,
-                        **query_dict).values_list('pk', flat=True))
+                        pk__in=groups_pk, dbnodes__attributes__contains={k: v}
+                    ).values_list('pk', flat=True))
 
         retlist = []
         # Return sorted by pk
@@ -38,6 +38,28 @@ class DjangoLog(Log):
 
         return entry
 
+    def create_entries(self, entries):
+        """
+        Create many log entries with a single bulk insert, skipping those
+        where objpk or objname are not set
+        """
+        models = [
+            DbLog(
+                time=entry['time'],
+                loggername=entry['loggername'],
+                levelname=entry['levelname'],
+                objname=entry['objname'],
+                objpk=entry['objpk'],
+                message=entry.get('message', ""),
+                metadata=json.dumps(entry.get('metadata', None))
+            )
+            for entry in entries
+            if entry.get('objpk', None) is not None and entry.get('objname', None) is not None
+        ]
+        DbLog.objects.bulk_create(models)
+
+        return len(models)
+
     def find(self, filter_by=None, order_by=None, limit=None):
         """
         Find all entries in the Log collection that confirm to the filter and
@@ -20,10 +20,10 @@ from aiida.common.exceptions import (InternalError, ModificationNotAllowed,
 from aiida.common.folders import RepositoryFolder
 from aiida.common.links import LinkType
 from aiida.common.utils import get_new_uuid, type_check
-from aiida.orm.implementation.general.node import AbstractNode, _NO_DEFAULT, _HASH_EXTRA_KEY
+from aiida.orm.implementation.general.node import AbstractNode, _NO_DEFAULT, _HASH_EXTRA_KEY, _STORE_MANY_BATCH_SIZE
 from aiida.orm.implementation.django.computer import Computer
 from aiida.orm.mixins import Sealable
-from aiida.orm.implementation.general.utils import get_db_columns
+from aiida.orm.implementation.general.utils import get_db_columns, get_attr
 
 from . import user as users
 
@@ -192,7 +192,9 @@ class Node(AbstractNode):
         self._dbnode.label = field_value
         if self.is_stored:
             with transaction.atomic():
-                self._dbnode.save()
+                # Do not save the attributes and extras, that could overwrite
+                # the changes of other processes
+                self._dbnode.save(update_fields=['label', 'mtime'])
                 self._increment_version_number_db()
 
     def _get_db_description_field(self):
@@ -202,7 +204,9 @@ class Node(AbstractNode):
         self._dbnode.description = field_value
         if self.is_stored:
             with transaction.atomic():
-                self._dbnode.save()
+                # Do not save the attributes and extras, that could overwrite
+                # the changes of other processes
+                self._dbnode.save(update_fields=['description', 'mtime'])
                 self._increment_version_number_db()
 
     def _replace_dblink_from(self, src, label, link_type):
@@ -331,70 +335,74 @@ class Node(AbstractNode):
         :param str key: key name
         :param value: its value
         """
-        from aiida.backends.djsite.db.models import DbAttribute
-
-        DbAttribute.set_value_for_node(self._dbnode, key, value)
+        self._dbnode.set_attr(key, value)
         self._increment_version_number_db()
 
     def _del_db_attr(self, key):
-        from aiida.backends.djsite.db.models import DbAttribute
-        if not DbAttribute.has_key(self._dbnode, key):
+        try:
+            self._dbnode.del_attr(key)
+        except AttributeError:
             raise AttributeError("DbAttribute {} does not exist".format(
                 key))
-        DbAttribute.del_value_for_node(self._dbnode, key)
         self._increment_version_number_db()
 
     def _get_db_attr(self, key):
-        from aiida.backends.djsite.db.models import DbAttribute
-        return DbAttribute.get_value_for_node(
-            dbnode=self._dbnode, key=key)
+        try:
+            return get_attr(self._attributes(), key)
+        except (KeyError, IndexError):
+            raise AttributeError("Attribute '{}' does not exist".format(key))
 
     def _set_db_extra(self, key, value, exclusive=False):
-        from aiida.backends.djsite.db.models import DbExtra
-
-        DbExtra.set_value_for_node(self._dbnode, key, value,
-                                   stop_if_existing=exclusive)
+        self._dbnode.set_extra(key, value, exclusive=exclusive)
         self._increment_version_number_db()
 
     def _reset_db_extras(self, new_extras):
-        raise NotImplementedError("Reset of extras has not been implemented"
-                                  "for Django backend.")
+        self._dbnode.reset_extras(new_extras)
+        self._increment_version_number_db()
 
     def _get_db_extra(self, key, *args):
-        from aiida.backends.djsite.db.models import DbExtra
-        return DbExtra.get_value_for_node(dbnode=self._dbnode,
-                                          key=key)
+        try:
+            return get_attr(self._extras(), key)
+        except (KeyError, IndexError):
+            raise AttributeError("DbExtra {} does not exist".format(
+                key))
 
     def _del_db_extra(self, key):
-        from aiida.backends.djsite.db.models import DbExtra
-        if not DbExtra.has_key(self._dbnode, key):
+        try:
+            self._dbnode.del_extra(key)
+        except AttributeError:
             raise AttributeError("DbExtra {} does not exist".format(
                 key))
-        return DbExtra.del_value_for_node(self._dbnode, key)
         self._increment_version_number_db()
 
     def _db_iterextras(self):
-        from aiida.backends.djsite.db.models import DbExtra
-        extraslist = DbExtra.list_all_node_elements(self._dbnode)
-        for e in extraslist:
-            yield (e.key, e.getvalue())
+        return self._extras().iteritems()
 
     def _db_iterattrs(self):
-        from aiida.backends.djsite.db.models import DbAttribute
-
-        all_attrs = DbAttribute.get_all_values_for_node(self._dbnode)
-        for attr in all_attrs:
-            yield (attr, all_attrs[attr])
+        return self._attributes().iteritems()
 
     def _db_attrs(self):
-        # Note: I "duplicate" the code from iterattrs and reimplement it
-        # here, rather than
-        # calling iterattrs from here, because iterattrs is slow on each call
-        # since it has to call .getvalue(). To improve!
-        from aiida.backends.djsite.db.models import DbAttribute
-        attrlist = DbAttribute.list_all_node_elements(self._dbnode)
-        for attr in attrlist:
-            yield attr.key
+        return self._attributes().iterkeys()
+
+    def _attributes(self):
+        self._ensure_model_uptodate(['attributes'])
+        return self._dbnode.attributes
+
+    def _extras(self):
+        self._ensure_model_uptodate(['extras'])
+        return self._dbnode.extras
+
+    def _ensure_model_uptodate(self, fields):
+        """
+        Reload the given fields of the stored node from the database, since
+        they could have been changed by another process
+        """
+        from aiida.backends.djsite.db.models import DbNode
+
+        if self.is_stored:
+            values = DbNode.objects.filter(pk=self._dbnode.pk).values(*fields)[0]
+            for field, value in values.iteritems():
+                setattr(self._dbnode, field, value)
 
     def add_comment(self, content, user=None):
         from aiida.backends.djsite.db.models import DbComment
@@ -484,9 +492,12 @@ class Node(AbstractNode):
 
     def _increment_version_number_db(self):
         from aiida.backends.djsite.db.models import DbNode
-        # I increment the node number using a filter
-        self._dbnode.nodeversion = F('nodeversion') + 1
-        self._dbnode.save()
+        from aiida.utils import timezone
+        # I increment the node number using a filter, without saving the
+        # other fields, that could overwrite the changes of other processes.
+        # The mtime must be set explicitly, as update() skips auto_now
+        DbNode.objects.filter(pk=self._dbnode.pk).update(
+            nodeversion=F('nodeversion') + 1, mtime=timezone.now())
 
         # This reload internally the node of self._dbnode
         # Note: I have to reload the object (to have the right values in memory,
@@ -636,7 +647,6 @@ class Node(AbstractNode):
         from django.db import transaction
         from aiida.common.utils import EmptyContextManager
         from aiida.common.exceptions import ValidationError
-        from aiida.backends.djsite.db.models import DbAttribute
         import aiida.orm.autogroup
 
         if with_transaction:
@@ -658,13 +668,10 @@ class Node(AbstractNode):
         # problems, especially with SQLite
         try:
             with context_man:
-                # Save the row
+                # Save the row, with its attributes 'manually' without
+                # incrementing the version for each add.
+                self._dbnode.attributes = self._attrs_cache
                 self._dbnode.save()
-                # Save its attributes 'manually' without incrementing
-                # the version for each add.
-                DbAttribute.reset_values_for_node(self._dbnode,
-                                                  attributes=self._attrs_cache,
-                                                  with_transaction=False)
                 # This should not be used anymore: I delete it to
                 # possibly free memory
                 del self._attrs_cache
@@ -685,8 +692,93 @@ class Node(AbstractNode):
                 self._repository_folder.abspath, move=True, overwrite=True)
             raise
 
-        from aiida.backends.djsite.db.models import DbExtra
         # I store the hash without cleaning and without incrementing the nodeversion number
-        DbExtra.set_value_for_node(self._dbnode, _HASH_EXTRA_KEY, self.get_hash())
+        self._dbnode.set_extra(_HASH_EXTRA_KEY, self.get_hash())
 
         return self
+
+    @classmethod
+    def _db_store_many(cls, nodes, other_nodes, with_transaction=True):
+        """
+        Store many new nodes in the DB with bulk inserts, also saving their
+        repository directories and attributes, and then their cached input links.
+
+        :param nodes: the nodes to store in bulk, sorted such that the sources
+            of cached links come first
+        :param other_nodes: the nodes to be stored individually with their
+            store() method after the bulk inserts, sorted likewise
+        :parameter with_transaction: if False, no transaction is used. This
+          is meant to be used ONLY if the outer calling function has already
+          a transaction open!
+        """
+        from django.db import transaction
+        from aiida.common.utils import EmptyContextManager
+        from aiida.backends.djsite.db.models import DbNode
+
+        if with_transaction:
+            context_man = transaction.atomic()
+        else:
+            context_man = EmptyContextManager()
+
+        # The hash does not depend on where the files are, so I compute it
+        # while they are still in the sandbox
+        hashes = [node.get_hash() for node in nodes]
+
+        # NOTE: as in _db_store, I first store the files, then only if this
+        # is successful, I store the DB entries.
+        cls._move_to_repository_many(nodes)
+
+        dbnodes = [node._dbnode for node in nodes]
+        for node, hash_ in zip(nodes, hashes):
+            node._dbnode.attributes = node._attrs_cache
+            node._dbnode.extras = {_HASH_EXTRA_KEY: hash_}
+        unstored_state = cls._get_unstored_state_many(nodes + other_nodes)
+        try:
+            with context_man:
+                DbNode.objects.bulk_create(dbnodes, batch_size=_STORE_MANY_BATCH_SIZE)
+
+                # bulk_create does not set the PKs, get them back in bulk from the UUIDs
+                uuids = [unicode(dbnode.uuid) for dbnode in dbnodes]
+                pks = {}
+                for start in range(0, len(uuids), _STORE_MANY_BATCH_SIZE):
+                    pks.update((unicode(uuid), pk) for uuid, pk in DbNode.objects.filter(
+                        uuid__in=uuids[start:start + _STORE_MANY_BATCH_SIZE]).values_list('uuid', 'pk'))
+                for dbnode, uuid in zip(dbnodes, uuids):
+                    dbnode.pk = pks[uuid]
+                    dbnode._state.adding = False
+                    dbnode._state.db = DbNode.objects.db
+
+                for node in nodes:
+                    node._to_be_stored = False
+
+                # All the sources of the links of the remaining nodes are now stored
+                for node in other_nodes:
+                    node.store(with_transaction=False, use_cache=False)
+
+                # The nodes are new, so their links cannot generate a loop
+                # with existing nodes, nor clash with existing labels
+                links = []
+                for node in nodes:
+                    for label, (src, link_type) in node._inputlinks_cache.iteritems():
+                        links.append(DbLink(input_id=src.pk, output_id=node.pk,
+                                            label=label, type=link_type.value))
+                DbLink.objects.bulk_create(links, batch_size=_STORE_MANY_BATCH_SIZE)
+
+        # This is one of the few cases where it is ok to do a 'global'
+        # except, also because I am re-raising the exception
+        except:
+            # The other nodes stored so far are rolled back as well
+            for node in nodes + other_nodes:
+                node._dbnode.pk = None
+                node._dbnode._state.adding = True
+            # I put back the files in the sandbox folders since the
+            # transaction did not succeed
+            cls._restore_unstored_state_many(unstored_state)
+            raise
+
+        for node in nodes:
+            node._inputlinks_cache.clear()
+            # These should not be used anymore: I delete them to
+            # possibly free memory
+            del node._attrs_cache
+            node._temp_folder = None
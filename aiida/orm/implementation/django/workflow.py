@@ -586,7 +586,7 @@ def kill_all():
 
 def get_all_running_steps():
     from aiida.backends.djsite.db.models import DbWorkflowStep
-    return DbWorkflowStep.objects.filter(state=wf_states.RUNNING)
+    return DbWorkflowStep.objects.filter(state=wf_states.RUNNING).select_related('parent')
 
 
 def get_workflow_info(w, tab_size=2, short=False, pre_string="",
@@ -8,9 +8,9 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 import abc
-import copy
 import datetime
 import enum
+import itertools
 
 from aiida.common.datastructures import calc_states
 from aiida.common.exceptions import ModificationNotAllowed, MissingPluginError
@@ -943,7 +943,8 @@ class AbstractJobCalculation(AbstractCalculation):
             group_pk=None, all_users=False, pks=tuple(),
             relative_ctime=True, with_scheduler_state=False,
             order_by=None, limit=None, filters=None,
-            projections=('pk', 'state', 'ctime', 'sched', 'computer', 'type'), raw=False
+            projections=('pk', 'state', 'ctime', 'sched', 'computer', 'type'), raw=False,
+            after=None, batch_size=100
     ):
         """
         Print a description of the AiiDA calculations.
@@ -972,12 +973,19 @@ class AbstractJobCalculation(AbstractCalculation):
                            Default = False
         :param raw: Only print the query result, without any headers, footers
             or other additional information
+        :param after: if specified, the PK of a calculation: only the
+            calculations that come after it, in the order given by order_by,
+            are shown. Use the PK of the last calculation of a page to show
+            the next one (keyset pagination, see
+            :py:func:`aiida.orm.querybuilder.get_keyset_filters`)
+        :param batch_size: the number of rows fetched from the database and
+            printed at a time. The widths of the columns are those of the
+            rows of the first batch.
 
         :return: a string with description of calculations.
         """
 
-        from aiida.orm.querybuilder import QueryBuilder
-        from tabulate import tabulate
+        from aiida.orm.querybuilder import QueryBuilder, get_keyset_filters
         from aiida.orm.backend import construct_backend
 
         projection_label_dict = {
@@ -1056,6 +1064,27 @@ class AbstractJobCalculation(AbstractCalculation):
             else:
                 group_filters = None
 
+        # The rows are ordered by ctime, and by id for the calculations created
+        # at the same time, so that the order is the same when paginating
+        if order_by == 'ctime':
+            order_columns = ['ctime', 'id']
+        elif order_by is not None or after is not None:
+            order_columns = ['id']
+        else:
+            order_columns = []
+
+        if after is not None:
+            key = QueryBuilder().append(
+                cls, filters={'id': after}, project=order_columns).first()
+            if key is None:
+                print("No calculation with PK {} found".format(after))
+                return
+            keyset_filters = get_keyset_filters(order_columns, key)
+            if calculation_filters:
+                calculation_filters = {'and': [calculation_filters, keyset_filters]}
+            else:
+                calculation_filters = keyset_filters
+
         calc_list_header = [projection_label_dict[p] for p in projections]
 
         qb = QueryBuilder()
@@ -1084,51 +1113,95 @@ class AbstractJobCalculation(AbstractCalculation):
                 for k, v in [cls.projection_map[p]]:
                     projections_dict[k].append(v)
 
+        # The id of the last row, to show the next page
+        if 'id' not in projections_dict['calculation']:
+            projections_dict['calculation'].append('id')
+
         for k, v in projections_dict.iteritems():
             qb.add_projection(k, v)
 
         # ORDER
-        if order_by is not None:
-            qb.order_by({'calculation': [order_by]})
+        if order_columns:
+            qb.order_by({'calculation': order_columns})
 
         # LIMIT
         if limit is not None:
             qb.limit(limit)
 
-        results_generator = qb.iterdict()
+        # Only columns and attributes are projected: read the rows without
+        # building the ORM instances
+        results_generator = qb.iterdict(batch_size=batch_size, raw=True)
 
+        # The labels of the types of the calculations, by type string
+        type_labels = {}
+        widths = None
+        last_pk = None
         counter = 0
         while True:
             calc_list_data = []
-            try:
-                for i in range(100):
-                    res = results_generator.next()
-
-                    row = cls._get_calculation_info_row(
-                        res, projections, now if relative_ctime else None)
+            for res in itertools.islice(results_generator, batch_size):
+                calc_list_data.append(cls._get_calculation_info_row(
+                    res, projections, now if relative_ctime else None, type_labels))
+                last_pk = res['calculation']['id']
+
+            # The rows are printed as they are read, with the widths of the
+            # columns of the first batch
+            if widths is None:
+                widths = cls._get_column_widths(calc_list_data, None if raw else calc_list_header)
+                if not raw:
+                    print(cls._format_calculation_info_row(calc_list_header, widths))
+                    print(cls._format_calculation_info_row(['-' * width for width in widths], widths))
+            for row in calc_list_data:
+                print(cls._format_calculation_info_row(row, widths))
+
+            counter += len(calc_list_data)
+            if len(calc_list_data) < batch_size:
+                break
 
-                    # Build the row of information
-                    calc_list_data.append(row)
+        if not raw:
+            print("\nTotal results: {}\n".format(counter))
+            if limit is not None and counter == limit:
+                print("To show the next {} calculations, pass the options: --limit {} --after {}\n".format(
+                    limit, limit, last_pk))
 
-                    counter += 1
+    @staticmethod
+    def _get_column_widths(rows, header=None):
+        """
+        Get the widths of the columns of a table.
 
-                if raw:
-                    print(tabulate(calc_list_data, tablefmt='plain'))
-                else:
-                    print(tabulate(calc_list_data, headers=calc_list_header))
+        :param rows: a list of rows, each a list of values
+        :param header: the list of the names of the columns, if they are printed
+        :return: a list with the width of each column
+        """
+        if header is not None:
+            rows = [header] + rows
+        if not rows:
+            return []
+        return [max(len(unicode(value if value is not None else '')) for value in column)
+                for column in zip(*rows)]
 
-            except StopIteration:
-                if raw:
-                    print(tabulate(calc_list_data, tablefmt='plain'))
-                else:
-                    print(tabulate(calc_list_data, headers=calc_list_header))
-                break
+    @staticmethod
+    def _format_calculation_info_row(row, widths):
+        """
+        Format a row of a table with fixed widths of the columns: the numbers
+        are aligned to the right, the other values to the left.
 
-        if not raw:
-            print("\nTotal results: {}\n".format(counter))
+        :param row: a list of values
+        :param widths: the list of the widths of the columns
+        :return: a string
+        """
+        cells = []
+        for value, width in zip(row, widths):
+            if value is None:
+                value = ''
+            if isinstance(value, (int, long, float)) and not isinstance(value, bool):
+                cells.append(unicode(value).rjust(width))
+            else:
+                cells.append(unicode(value).ljust(width))
+        return u'  '.join(cells).rstrip()
 
     @classmethod
-    def _get_calculation_info_row(cls, res, projections, times_since=None):
+    def _get_calculation_info_row(cls, res, projections, times_since=None, type_labels=None):
         """
         Get a row of information about a calculation.
 
@@ -1136,28 +1209,30 @@ class AbstractJobCalculation(AbstractCalculation):
         :param times_since: Times are relative to this timepoint, if None then
             absolute times will be used.
         :param projections: The projections used in the calculation query
+        :param type_labels: a dictionary of the labels of the types of the
+            calculations, by type string, filled as the types are met: pass
+            the same dictionary for all the rows of a query
         :type projections: list
         :type times_since: :class:`!datetime.datetime`
         :return: A list of string with information about the calculation.
         """
-        d = copy.deepcopy(res)
+        # Only the values of the calculation are replaced below
+        d = dict(res)
+        d['calculation'] = dict(res['calculation'])
+
+        if type_labels is None:
+            type_labels = {}
 
         try:
-            prefix = 'calculation.job.'
             calculation_type = d['calculation']['type']
-            calculation_class = get_plugin_type_from_type_string(calculation_type)
-            module, class_name = calculation_class.rsplit('.', 1)
-
-            # For the base class 'calculation.job.JobCalculation' the module at this point equals 'calculation.job'
-            # For this case we should simply set the type to the base module calculation.job. Otherwise we need
-            # to strip the prefix to get the proper sub module
-            if module == prefix.rstrip('.'):
-                d['calculation']['type'] = module[len(prefix):]
-            else:
-                assert module.startswith(prefix), "module '{}' does not start with '{}'".format(module, prefix)
-                d['calculation']['type'] = module[len(prefix):]
         except KeyError:
             pass
+        else:
+            try:
+                d['calculation']['type'] = type_labels[calculation_type]
+            except KeyError:
+                type_label = cls._get_calculation_type_label(calculation_type)
+                type_labels[calculation_type] = d['calculation']['type'] = type_label
         for proj in ('ctime', 'mtime'):
             try:
                 time = d['calculation'][proj]
@@ -1207,6 +1282,28 @@ class AbstractJobCalculation(AbstractCalculation):
 
         return result
 
+    @staticmethod
+    def _get_calculation_type_label(calculation_type):
+        """
+        Get the label shown for the type of a calculation: the module of its
+        plugin, without the 'calculation.job.' prefix.
+
+        :param calculation_type: the type string of the calculation
+        :return: a string
+        """
+        prefix = 'calculation.job.'
+        calculation_class = get_plugin_type_from_type_string(calculation_type)
+        module, class_name = calculation_class.rsplit('.', 1)
+
+        # For the base class 'calculation.job.JobCalculation' the module at this point equals 'calculation.job'
+        # For this case we should simply set the type to the base module calculation.job. Otherwise we need
+        # to strip the prefix to get the proper sub module
+        if module == prefix.rstrip('.'):
+            return module[len(prefix):]
+        else:
+            assert module.startswith(prefix), "module '{}' does not start with '{}'".format(module, prefix)
+            return module[len(prefix):]
+
     @classmethod
     def _get_all_with_state(
             cls, state, computer=None, user=None,
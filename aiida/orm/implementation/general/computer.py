@@ -40,6 +40,11 @@ class AbstractComputer(object):
     """
     _logger = logging.getLogger(__name__)
 
+    # Default values for the batched polling of the scheduler, see the
+    # aiida.work.job_manager module
+    _DEFAULT_MINIMUM_JOB_POLL_INTERVAL = 10.
+    _DEFAULT_JOB_POLL_BATCH_SIZE = 200
+
     @classproperty
     def _conf_attributes(self):
         """
@@ -695,6 +700,80 @@ class AbstractComputer(object):
                 raise TypeError("def_cpus_per_machine must be an integer (or None)")
         self._set_property("default_mpiprocs_per_machine", def_cpus_per_machine)
 
+    def get_minimum_job_poll_interval(self):
+        """
+        Return the minimum interval in seconds between two consecutive queries
+        of the scheduler for the state of the jobs running on this computer.
+        """
+        return self._get_property("minimum_job_poll_interval",
+                                  self._DEFAULT_MINIMUM_JOB_POLL_INTERVAL)
+
+    def set_minimum_job_poll_interval(self, interval):
+        """
+        Set the minimum interval in seconds between two consecutive queries of
+        the scheduler for the state of the jobs running on this computer.
+        Accepts None to restore the default value.
+        """
+        if interval is None:
+            self._del_property("minimum_job_poll_interval", raise_exception=False)
+            return
+        if not isinstance(interval, (int, long, float)) or interval < 0:
+            raise ValueError("the minimum job poll interval must be a non-negative number (or None)")
+        self._set_property("minimum_job_poll_interval", interval)
+
+    def get_job_poll_batch_size(self):
+        """
+        Return the maximum number of job ids that are passed to the scheduler
+        in a single query when polling the state of the jobs on this computer.
+        """
+        return self._get_property("job_poll_batch_size",
+                                  self._DEFAULT_JOB_POLL_BATCH_SIZE)
+
+    def set_job_poll_batch_size(self, batch_size):
+        """
+        Set the maximum number of job ids that are passed to the scheduler in a
+        single query when polling the state of the jobs on this computer.
+        Accepts None to restore the default value.
+        """
+        if batch_size is None:
+            self._del_property("job_poll_batch_size", raise_exception=False)
+            return
+        if not isinstance(batch_size, (int, long)) or batch_size <= 0:
+            raise ValueError("the job poll batch size must be a positive integer (or None)")
+        self._set_property("job_poll_batch_size", batch_size)
+
+    def get_retrieve_with_tarball(self):
+        """
+        Return whether the files of the calculations run on this computer are
+        retrieved by packing them in a single tarball on the remote side.
+        """
+        return self._get_property("retrieve_with_tarball", False)
+
+    def set_retrieve_with_tarball(self, val):
+        """
+        Set whether the files of the calculations run on this computer are
+        retrieved by packing them in a single tarball on the remote side, that
+        is then transferred at once and unpacked locally. This requires GNU tar
+        on the computer, otherwise the files are retrieved one by one.
+        """
+        self._set_property("retrieve_with_tarball", bool(val))
+
+    def get_upload_with_tarball(self):
+        """
+        Return whether the input files of the calculations run on this computer
+        are uploaded by packing them in a single tarball that is unpacked remotely.
+        """
+        return self._get_property("upload_with_tarball", False)
+
+    def set_upload_with_tarball(self, val):
+        """
+        Set whether the input files of the calculations run on this computer are
+        uploaded by packing them in a single tarball, that is transferred at once
+        and unpacked on the remote side. This requires tar on the computer,
+        otherwise the files are uploaded one by one.
+        """
+        self._set_property("upload_with_tarball", bool(val))
+
     @abstractmethod
     def get_transport_params(self):
         pass
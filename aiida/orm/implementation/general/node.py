@@ -32,6 +32,8 @@ from aiida.plugins.loader import get_query_type_from_type_string, get_type_strin
 
 _NO_DEFAULT = tuple()
 _HASH_EXTRA_KEY = '_aiida_hash'
+# Number of rows written by each bulk insert of store_many
+_STORE_MANY_BATCH_SIZE = 1000
 
 
 def clean_value(value):
@@ -1667,6 +1669,192 @@ class AbstractNode(object):
         """
         pass
 
+    @classmethod
+    def store_many(cls, nodes, with_transaction=True):
+        """
+        Store many new nodes at once, together with their attributes and the
+        input links that are in their cache.
+
+        The nodes, their attributes and links are written with bulk inserts
+        in a single transaction and their repository folders are moved in one
+        pass, which is much faster than calling store() on each node.
+
+        :note: The source of each cached input link must be either already
+            stored or one of the nodes to store.
+
+        :note: Caching is not used: all nodes are stored as new nodes. Nodes
+            whose class overrides store() (e.g. to set some attributes or the
+            calculation state) are stored one by one with their own store(),
+            after the bulk inserts.
+
+        :param nodes: an iterable of nodes; those already stored are skipped
+        :parameter with_transaction: if False, no transaction is used. This
+          is meant to be used ONLY if the outer calling function has already
+          a transaction open!
+        :return: the list of nodes that were stored, with parents before children
+        :raise ModificationNotAllowed: if a cached input link has an unstored
+            source that is not among the nodes to store
+        :raise ValueError: if the cached links between the nodes form a loop
+        """
+        nodes = cls._sort_nodes_to_store(nodes)
+
+        bulk_nodes = []
+        other_nodes = []
+        for node in nodes:
+            if type(node).store.__func__ is AbstractNode.store.__func__:
+                bulk_nodes.append(node)
+            else:
+                other_nodes.append(node)
+
+        # As in store(), I check that the data is valid before doing anything
+        for node in bulk_nodes:
+            node._validate()
+
+        if nodes:
+            cls._db_store_many(bulk_nodes, other_nodes, with_transaction)
+
+        # Set up autogrouping used by verdi run (the other nodes did it in store())
+        from aiida.orm.autogroup import current_autogroup, Autogroup, VERDIAUTOGROUP_TYPE
+        from aiida.orm import Group
+
+        if current_autogroup is not None:
+            if not isinstance(current_autogroup, Autogroup):
+                raise ValidationError(
+                    "current_autogroup is not an AiiDA Autogroup")
+
+            to_group = [node for node in bulk_nodes if current_autogroup.is_to_be_grouped(node)]
+            group_name = current_autogroup.get_group_name()
+            if to_group and group_name is not None:
+                g = Group.get_or_create(
+                    name=group_name, type_string=VERDIAUTOGROUP_TYPE)[0]
+                g.add_nodes(to_group)
+
+        return nodes
+
+    @staticmethod
+    def _sort_nodes_to_store(nodes):
+        """
+        Sort the unstored nodes such that the sources of their cached input
+        links come before them.
+
+        :param nodes: an iterable of nodes
+        :return: a list with the unstored nodes, each appearing once
+        :raise ModificationNotAllowed: if a cached input link has an unstored
+            source that is not among the given nodes
+        :raise ValueError: if the cached links between the nodes form a loop
+        """
+        unstored = collections.OrderedDict()
+        for node in nodes:
+            if not node.is_stored:
+                unstored[id(node)] = node
+
+        num_parents = {}
+        children = collections.defaultdict(list)
+        for key, node in unstored.iteritems():
+            parents = set()
+            for label, (parent, _) in node._inputlinks_cache.iteritems():
+                if parent.is_stored:
+                    continue
+                if id(parent) not in unstored:
+                    raise ModificationNotAllowed(
+                        "Cannot store the input link '{}' of node (UUID={}) "
+                        "because its source is not stored and is not among "
+                        "the nodes to store".format(label, node.uuid))
+                parents.add(id(parent))
+            num_parents[key] = len(parents)
+            for parent_key in parents:
+                children[parent_key].append(key)
+
+        sorted_nodes = []
+        ready = collections.deque(key for key in unstored if not num_parents[key])
+        while ready:
+            key = ready.popleft()
+            sorted_nodes.append(unstored[key])
+            for child_key in children[key]:
+                num_parents[child_key] -= 1
+                if not num_parents[child_key]:
+                    ready.append(child_key)
+
+        if len(sorted_nodes) != len(unstored):
+            raise ValueError("The cached links between the nodes to store would generate a loop")
+
+        return sorted_nodes
+
+    @abstractclassmethod
+    def _db_store_many(cls, nodes, other_nodes, with_transaction=True):
+        """
+        Store many new nodes in the DB with bulk inserts, also saving their
+        repository directories and attributes, and then their cached input links.
+
+        :param nodes: the nodes to store in bulk, sorted such that the sources
+            of cached links come first
+        :param other_nodes: the nodes to be stored individually with their
+            store() method after the bulk inserts, sorted likewise
+        :parameter with_transaction: if False, no transaction is used. This
+          is meant to be used ONLY if the outer calling function has already
+          a transaction open!
+        """
+        pass
+
+    @staticmethod
+    def _move_to_repository_many(nodes):
+        """
+        Move the files of the unstored nodes from their sandbox folders to the
+        repository. If a move fails, the files already moved are put back.
+
+        :param nodes: a list of unstored nodes
+        """
+        moved = []
+        try:
+            for node in nodes:
+                node._repository_folder.replace_with_folder(
+                    node._get_temp_folder().abspath, move=True, overwrite=True)
+                moved.append(node)
+        except:
+            AbstractNode._move_to_sandbox_many(moved)
+            raise
+
+    @staticmethod
+    def _move_to_sandbox_many(nodes):
+        """
+        Put back the files of the nodes in their sandbox folders, when storing
+        them did not succeed.
+
+        :param nodes: a list of nodes whose files were moved to the repository
+        """
+        for node in nodes:
+            node._get_temp_folder().replace_with_folder(
+                node._repository_folder.abspath, move=True, overwrite=True)
+
+    @staticmethod
+    def _get_unstored_state_many(nodes):
+        """
+        Save the caches of the unstored nodes that storing them clears, to
+        restore them with _restore_unstored_state_many if it does not succeed.
+
+        :param nodes: a list of unstored nodes
+        :return: a list of tuples (node, attributes cache, input links cache)
+        """
+        return [(node, dict(node._attrs_cache), dict(node._inputlinks_cache)) for node in nodes]
+
+    @staticmethod
+    def _restore_unstored_state_many(unstored_state):
+        """
+        Make the nodes unstored again, when the transaction in which they were
+        stored did not succeed: restore their caches and put back their files
+        in their sandbox folders. The backend has to reset their DB entries.
+
+        :param unstored_state: the list returned by _get_unstored_state_many
+            for the nodes
+        """
+        for node, attrs_cache, inputlinks_cache in unstored_state:
+            node._to_be_stored = True
+            node._attrs_cache = attrs_cache
+            node._inputlinks_cache = inputlinks_cache
+            # A node whose store() failed already put back its files
+            if node._repository_folder.exists():
+                AbstractNode._move_to_sandbox_many([node])
+
     def __del__(self):
         """
         Called only upon real object destruction from memory
@@ -7,6 +7,28 @@
 # For further information on the license, see the LICENSE.txt file        #
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
+def get_attr(attrs, key):
+    """
+    Get the value of an attribute in a dictionary of nested attributes
+
+    :param attrs: the dictionary of the attributes
+    :param key: the key, where the keys of nested dictionaries and the indices
+        of nested lists are separated by dots
+    :raise KeyError: if a key does not exist
+    :raise IndexError: if an index is out of range
+    """
+    path = key.split('.')
+
+    d = attrs
+    for p in path:
+        if p.isdigit():
+            p = int(p)
+        # Let it raise the appropriate exception
+        d = d[p]
+
+    return d
+
+
 def get_db_columns(db_class):
     """
     This function returns a dictionary where the keys are the columns of
@@ -38,6 +38,33 @@ class SqlaLog(Log):
 
         return entry
 
+    def create_entries(self, entries):
+        """
+        Create many log entries with a single bulk insert, skipping those
+        where objpk or objname are not set.
+        The session of the current thread is used, since the entries can be
+        created from the thread of a logging handler.
+        """
+        mappings = [
+            {
+                'time': entry['time'],
+                'loggername': entry['loggername'],
+                'levelname': entry['levelname'],
+                'objname': entry['objname'],
+                'objpk': entry['objpk'],
+                'message': entry.get('message', ""),
+                '_metadata': entry.get('metadata', None) or {},
+            }
+            for entry in entries
+            if entry.get('objpk', None) is not None and entry.get('objname', None) is not None
+        ]
+        if mappings:
+            thread_session = get_scoped_session()
+            thread_session.bulk_insert_mappings(DbLog, mappings)
+            thread_session.commit()
+
+        return len(mappings)
+
     def find(self, filter_by=None, order_by=None, limit=None):
         """
         Find all entries in the Log collection that confirm to the filter and
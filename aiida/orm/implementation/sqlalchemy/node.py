@@ -23,7 +23,7 @@ from aiida.common.exceptions import (InternalError, ModificationNotAllowed,
                                      NotExistent, UniquenessError)
 from aiida.common.links import LinkType
 from aiida.common.utils import type_check
-from aiida.orm.implementation.general.node import AbstractNode, _NO_DEFAULT, _HASH_EXTRA_KEY
+from aiida.orm.implementation.general.node import AbstractNode, _NO_DEFAULT, _HASH_EXTRA_KEY, _STORE_MANY_BATCH_SIZE
 from aiida.orm.implementation.sqlalchemy.computer import Computer
 from aiida.orm.implementation.sqlalchemy.utils import django_filter, \
     get_attr
@@ -743,6 +743,154 @@ class Node(AbstractNode):
         self._dbnode.set_extra(_HASH_EXTRA_KEY, self.get_hash())
         return self
 
+    @classmethod
+    def _db_store_many(cls, nodes, other_nodes, with_transaction=True):
+        """
+        Store many new nodes in the DB with bulk inserts, also saving their
+        repository directories and attributes, and then their cached input links.
+
+        :note: store() of the other nodes commits the session when it sets
+            the hash extra, as it always does in this backend. If an error
+            occurs afterwards, the nodes committed so far stay stored, without
+            the cached input links of the nodes stored in bulk.
+
+        :param nodes: the nodes to store in bulk, sorted such that the sources
+            of cached links come first
+        :param other_nodes: the nodes to be stored individually with their
+            store() method after the bulk inserts, sorted likewise
+        :parameter with_transaction: if False, no transaction is used. This
+          is meant to be used ONLY if the outer calling function has already
+          a transaction open!
+        """
+        from sqlalchemy.orm.session import make_transient, make_transient_to_detached
+        from aiida.backends.sqlalchemy import get_scoped_session
+        from aiida.utils import timezone
+        session = get_scoped_session()
+
+        # The hash does not depend on where the files are, so I compute it
+        # while they are still in the sandbox
+        hashes = [node.get_hash() for node in nodes]
+
+        # NOTE: as in _db_store, I first store the files, then only if this
+        # is successful, I store the DB entries.
+        cls._move_to_repository_many(nodes)
+
+        dbnodes = [node._dbnode for node in nodes]
+        table = DbNode.__table__
+        now = timezone.now()
+        unstored_state = cls._get_unstored_state_many(nodes + other_nodes)
+        # The DbNodes can be expired by the commits when the transaction fails
+        uuids = [node.uuid for node in nodes + other_nodes]
+        try:
+            rows = []
+            for node, dbnode, hash_ in zip(nodes, dbnodes, hashes):
+                # The DbNode is not in the session yet: the columns that are
+                # not set have no value until I give them one
+                if dbnode in session:
+                    session.expunge(dbnode)
+                dbnode.ctime = dbnode.ctime or now
+                dbnode.mtime = dbnode.mtime or now
+                dbnode.nodeversion = dbnode.nodeversion or 1
+                dbnode.public = bool(dbnode.public)
+                dbnode.label = dbnode.label or ""
+                dbnode.description = dbnode.description or ""
+                dbnode.attributes = node._attrs_cache
+                dbnode.extras = {_HASH_EXTRA_KEY: hash_}
+                rows.append({
+                    'uuid': unicode(dbnode.uuid),
+                    'type': dbnode.type,
+                    'process_type': dbnode.process_type,
+                    'label': dbnode.label,
+                    'description': dbnode.description,
+                    'ctime': dbnode.ctime,
+                    'mtime': dbnode.mtime,
+                    'nodeversion': dbnode.nodeversion,
+                    'public': dbnode.public,
+                    'attributes': dbnode.attributes,
+                    'extras': dbnode.extras,
+                    'dbcomputer_id': dbnode.dbcomputer.id if dbnode.dbcomputer is not None else dbnode.dbcomputer_id,
+                    'user_id': dbnode.user.id if dbnode.user is not None else dbnode.user_id,
+                })
+
+            # A multi-row INSERT returns all the PKs at once
+            pks = {}
+            for start in range(0, len(rows), _STORE_MANY_BATCH_SIZE):
+                result = session.execute(
+                    table.insert().values(rows[start:start + _STORE_MANY_BATCH_SIZE]).returning(
+                        table.c.id, table.c.uuid))
+                pks.update((unicode(uuid), pk) for pk, uuid in result)
+
+            for node, dbnode, row in zip(nodes, dbnodes, rows):
+                dbnode.id = pks[row['uuid']]
+                dbnode.dbcomputer_id = row['dbcomputer_id']
+                dbnode.user_id = row['user_id']
+                # Attach the DbNode to the session as if it had been loaded
+                make_transient_to_detached(dbnode)
+                session.add(dbnode)
+                node._to_be_stored = False
+
+            # All the sources of the links of the remaining nodes are now stored
+            for node in other_nodes:
+                node.store(with_transaction=False, use_cache=False)
+
+            # The nodes are new, so their links cannot generate a loop
+            # with existing nodes, nor clash with existing labels
+            links = []
+            for node in nodes:
+                for label, (src, link_type) in node._inputlinks_cache.iteritems():
+                    links.append({'input_id': src.pk, 'output_id': node.pk,
+                                  'label': label, 'type': link_type.value})
+            for start in range(0, len(links), _STORE_MANY_BATCH_SIZE):
+                session.execute(DbLink.__table__.insert().values(
+                    links[start:start + _STORE_MANY_BATCH_SIZE]))
+
+            if with_transaction:
+                session.commit()
+
+        # This is one of the few cases where it is ok to do a 'global'
+        # except, also because I am re-raising the exception
+        except:
+            # The nodes committed by the store() of the other nodes stay stored
+            committed = cls._get_committed_uuids(uuids) if other_nodes and with_transaction else set()
+            unstored_state = [entry for entry, uuid in zip(unstored_state, uuids) if uuid not in committed]
+            for node, _, _ in unstored_state:
+                dbnode = node._dbnode
+                if dbnode in session:
+                    session.expunge(dbnode)
+                    make_transient(dbnode)
+                dbnode.id = None
+            if with_transaction:
+                session.rollback()
+            # I put back the files in the sandbox folders since the
+            # transaction did not succeed
+            cls._restore_unstored_state_many(unstored_state)
+            raise
+
+        for node in nodes:
+            node._inputlinks_cache.clear()
+            # These should not be used anymore: I delete them to
+            # possibly free memory
+            del node._attrs_cache
+            node._temp_folder = None
+
+    @staticmethod
+    def _get_committed_uuids(uuids):
+        """
+        :param uuids: a list of UUIDs of nodes
+        :return: the set of the UUIDs of the nodes that are committed to the DB,
+            checked outside of the current transaction
+        """
+        from sqlalchemy import select
+        import aiida.backends.sqlalchemy
+
+        table = DbNode.__table__
+        committed = set()
+        with aiida.backends.sqlalchemy.engine.connect() as connection:
+            for start in range(0, len(uuids), _STORE_MANY_BATCH_SIZE):
+                committed.update(unicode(uuid) for uuid, in connection.execute(
+                    select([table.c.uuid]).where(table.c.uuid.in_(uuids[start:start + _STORE_MANY_BATCH_SIZE]))))
+        return committed
+
     @property
     def uuid(self):
         return unicode(self._dbnode.uuid)
@@ -13,6 +13,7 @@ from sqlalchemy.types import Integer, Boolean
 import sqlalchemy.exc
 
 from aiida.common import exceptions
+from aiida.orm.implementation.general.utils import get_attr
 
 __all__ = ['django_filter', 'get_attr']
 
@@ -89,19 +90,6 @@ def iter_dict(attrs):
         yield "", attrs
 
 
-def get_attr(attrs, key):
-    path = key.split('.')
-
-    d = attrs
-    for p in path:
-        if p.isdigit():
-            p = int(p)
-        # Let it raise the appropriate exception
-        d = d[p]
-
-    return d
-
-
 def _create_op_func(op):
     def f(attr, val):
         return getattr(attr, op)(val)
@@ -746,8 +746,10 @@ def kill_all():
 
 def get_all_running_steps():
     from aiida.common.datastructures import wf_states
+    from sqlalchemy.orm import joinedload
     from aiida.backends.sqlalchemy.models.workflow import DbWorkflowStep
-    return DbWorkflowStep.query.filter_by(state=wf_states.RUNNING).all()
+    return DbWorkflowStep.query.filter_by(state=wf_states.RUNNING).options(
+        joinedload(DbWorkflowStep.parent)).all()
 
 
 def get_workflow_info(w, tab_size=2, short=False, pre_string="",
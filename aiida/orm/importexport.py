@@ -8,6 +8,7 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 import HTMLParser
+import re
 import sys
 
 from aiida.common import exceptions
@@ -21,6 +22,11 @@ from aiida.orm.user import User
 IMPORTGROUP_TYPE = 'aiida.import'
 COMP_DUPL_SUFFIX = ' (Imported #{})'
 
+# The export queries the entries in chunks of this number of ids, and
+# iterates over the results in batches of EXPORT_BATCH_SIZE rows
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_BATCH_SIZE = 1000
+
 # Giving names to the various entities. Attributes and links are not AiiDA
 # entities but we will refer to them as entities in the file (to simplify
 # references to them).
@@ -306,11 +312,25 @@ def deserialize_field(k, v, fields_info, import_unique_ids_mappings,
 
 
 def import_data(in_path, ignore_unknown_nodes=False,
-                silent=False):
+                silent=False, streaming=False):
+    """
+    Import an exported AiiDA environment to the AiiDA database.
+
+    :param in_path: the path to a file or folder that can be imported in AiiDA
+    :param ignore_unknown_nodes: if True, skip the links and group elements
+        that refer to unknown nodes instead of raising a ValueError
+    :param silent: if True, do not print the progress of the import
+    :param streaming: if True, use import_data_streaming, meant for big
+        export files; note that the returned dictionary then holds the number
+        of new and existing entries, instead of their pks
+    """
     from aiida.backends.settings import BACKEND
     from aiida.backends.profile import BACKEND_DJANGO, BACKEND_SQLA
 
-    if BACKEND == BACKEND_SQLA:
+    if streaming:
+        return import_data_streaming(in_path, ignore_unknown_nodes=ignore_unknown_nodes,
+                                     silent=silent)
+    elif BACKEND == BACKEND_SQLA:
         return import_data_sqla(in_path, ignore_unknown_nodes=ignore_unknown_nodes,
                                 silent=silent)
     elif BACKEND == BACKEND_DJANGO:
@@ -589,6 +609,24 @@ def import_data_dj(in_path, ignore_unknown_nodes=False,
 
                         imported_comp_names.add(import_data['name'])
 
+                    # For DbNodes, the attributes are stored in the same row
+                    if model_name == NODE_ENTITY_NAME:
+                        # Get attributes from import file
+                        try:
+                            attributes = data['node_attributes'][
+                                str(import_entry_id)]
+                            attributes_conversion = data[
+                                'node_attributes_conversion'][
+                                str(import_entry_id)]
+                        except KeyError:
+                            raise ValueError("Unable to find attribute info "
+                                             "for DbNode with UUID = {}".format(
+                                unique_id))
+
+                        # Here I have to deserialize the attributes
+                        import_data['attributes'] = deserialize_attributes(
+                            attributes, attributes_conversion)
+
                     objects_to_create.append(Model(**import_data))
                     import_entry_ids[unique_id] = import_entry_id
 
@@ -651,32 +689,6 @@ def import_data_dj(in_path, ignore_unknown_nodes=False,
                                                        import_entry_id,
                                                        new_pk)
 
-                # For DbNodes, we also have to store Attributes!
-                if model_name == NODE_ENTITY_NAME:
-                    if not silent:
-                        print "STORING NEW NODE ATTRIBUTES..."
-                    for unique_id, new_pk in just_saved.iteritems():
-                        import_entry_id = import_entry_ids[unique_id]
-                        # Get attributes from import file
-                        try:
-                            attributes = data['node_attributes'][
-                                str(import_entry_id)]
-                            attributes_conversion = data[
-                                'node_attributes_conversion'][
-                                str(import_entry_id)]
-                        except KeyError:
-                            raise ValueError("Unable to find attribute info "
-                                             "for DbNode with UUID = {}".format(
-                                unique_id))
-
-                        # Here I have to deserialize the attributes
-                        deserialized_attributes = deserialize_attributes(
-                            attributes, attributes_conversion)
-                        models.DbAttribute.reset_values_for_node(
-                            dbnode=new_pk,
-                            attributes=deserialized_attributes,
-                            with_transaction=False)
-
             if not silent:
                 print "STORING NODE LINKS..."
             ## TODO: check that we are not creating input links of an already
@@ -1418,6 +1430,742 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
     return ret_dict
 
 
+# The streaming import loads the entries in the temporary tables with COPY
+# commands of this number of rows
+IMPORT_BATCH_SIZE = 10000
+
+# The temporary tables in which the streaming import loads the content of the
+# export file, dropped at the end of the transaction. The uuid columns have the
+# type of the uuid column of db_dbnode, that depends on the backend.
+_IMPORT_TEMPORARY_TABLES = (
+    "CREATE TEMPORARY TABLE import_attribute (export_pk integer PRIMARY KEY, "
+    "attributes jsonb) ON COMMIT DROP",
+    "CREATE TEMPORARY TABLE import_node (export_pk integer, uuid {uuid_type}, "
+    "type varchar(255), label varchar(255), description text, "
+    "ctime timestamp with time zone, mtime timestamp with time zone, "
+    "nodeversion integer, public boolean, user_id integer, "
+    "dbcomputer_id integer) ON COMMIT DROP",
+    "CREATE TEMPORARY TABLE import_link (input {uuid_type}, "
+    "output {uuid_type}, label varchar(255), type varchar(255)) ON COMMIT DROP",
+    "CREATE TEMPORARY TABLE import_group_node (group_uuid text, "
+    "node_uuid {uuid_type}) ON COMMIT DROP",
+    "CREATE TEMPORARY TABLE import_new_node (id integer, uuid {uuid_type}) "
+    "ON COMMIT DROP",
+)
+
+_NODE_COPY_COLUMNS = ('export_pk', 'uuid', 'type', 'label', 'description',
+                      'ctime', 'mtime', 'nodeversion', 'public', 'user_id',
+                      'dbcomputer_id')
+
+
+def import_data_streaming(in_path, ignore_unknown_nodes=False, silent=False):
+    """
+    Import an exported AiiDA environment to the AiiDA database, without
+    loading the whole export file in memory.
+
+    The members of data.json are read one at a time and loaded with the
+    PostgreSQL COPY command in temporary tables, that are then joined with the
+    tables of the database to find the nodes that already exist and to insert
+    the new nodes, links and group elements with a few INSERT ... SELECT
+    statements. Users, computers and groups, that are few, are stored with the
+    ORM of the backend. The repository folders of the new nodes are written
+    directly from the tar or zip file, without extracting it first.
+    Everything is done in a single transaction.
+
+    :param in_path: the path to a (possibly compressed) tar file, a zip file
+        or a folder with an exported AiiDA environment
+    :param ignore_unknown_nodes: if True, the links and group elements that
+        refer to nodes that are neither in the file nor in the database are
+        skipped, otherwise a ValueError is raised
+    :param silent: if True, do not print the progress of the import
+    :return: a dictionary with, for each imported entity, the number of 'new'
+        and of 'existing' entries (only 'new' for the links). Differently from
+        import_data_dj and import_data_sqla, the pks are not returned, as
+        there could be millions of them.
+    """
+    import json
+    import uuid as uuid_module
+
+    from aiida.backends.utils import get_raw_cursor
+    from aiida.common.datastructures import calc_states
+    from aiida.common.folders import SandboxFolder
+    from aiida.common.links import LinkType
+    from aiida.common.utils import get_configured_user_email, get_new_uuid
+    from aiida.utils import timezone
+
+    # This is the export version expected by this function
+    expected_export_version = '0.3'
+
+    ret_dict = {}
+    progress = _ImportProgress(silent)
+
+    with SandboxFolder() as sandbox:
+        archive = _ImportArchive(in_path, sandbox)
+
+        with open(archive.metadata_path) as f:
+            metadata = json.load(f)
+
+        if metadata['export_version'] != expected_export_version:
+            raise ValueError("File export version is {}, but I can import only "
+                             "version {}".format(metadata['export_version'],
+                                                 expected_export_version))
+
+        all_known_models = (USER_ENTITY_NAME, COMPUTER_ENTITY_NAME, NODE_ENTITY_NAME,
+                            GROUP_ENTITY_NAME, LINK_ENTITY_NAME, ATTRIBUTE_ENTITY_NAME)
+        for import_field_name in metadata['all_fields_info']:
+            if import_field_name not in all_known_models:
+                raise NotImplementedError("Apparently, you are importing a "
+                                          "file with a model '{}', but this does not appear in "
+                                          "all_known_models!".format(import_field_name))
+
+        with open(archive.data_path, 'rb') as handle, get_raw_cursor(commit=True) as cursor:
+            reader = JsonMembersReader(handle)
+
+            ##########################################
+            # USERS, COMPUTERS AND GROUPS (WITH ORM) #
+            ##########################################
+            import_unique_ids_mappings = {}
+            foreign_ids_reverse_mappings = {}
+            for entity_name in (USER_ENTITY_NAME, COMPUTER_ENTITY_NAME, GROUP_ENTITY_NAME):
+                entries = {int(keys[0]): value for keys, value in
+                           reader.iter_members(('export_data', entity_name))}
+                unique_identifier = metadata['unique_identifiers'][entity_name]
+                import_unique_ids_mappings[entity_name] = {
+                    k: v[unique_identifier] for k, v in entries.iteritems()}
+                foreign_ids_reverse_mappings[entity_name] = {}
+                new, existing = _import_entities_orm(
+                    entity_name, entries, metadata,
+                    import_unique_ids_mappings=import_unique_ids_mappings,
+                    foreign_ids_reverse_mappings=foreign_ids_reverse_mappings)
+                ret_dict[entity_name] = {'new': new, 'existing': existing}
+                progress.report(entity_name, len(entries))
+
+            ############################################
+            # LOAD THE EXPORT FILE IN TEMPORARY TABLES #
+            ############################################
+            cursor.execute("SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+                           "WHERE attrelid = 'db_dbnode'::regclass AND attname = 'uuid'")
+            uuid_type = cursor.fetchone()[0]
+            for statement in _IMPORT_TEMPORARY_TABLES:
+                cursor.execute(statement.format(uuid_type=uuid_type))
+
+            # Only the few conversions that are not trivial (i.e. of the
+            # attributes with dates) are kept in memory
+            conversions = {}
+            for (pk,), conversion in reader.iter_members(('node_attributes_conversion',)):
+                if _has_conversion(conversion):
+                    conversions[pk] = conversion
+
+            with _CopyBuffer(cursor, 'import_attribute', ('export_pk', 'attributes')) as buf:
+                for (pk,), attributes in reader.iter_members(('node_attributes',)):
+                    if pk in conversions:
+                        attributes = deserialize_attributes(attributes, conversions[pk])
+                    buf.add((int(pk), json.dumps(attributes, default=_json_default)))
+            progress.report(ATTRIBUTE_ENTITY_NAME, buf.count)
+            del conversions
+
+            node_fields_info = metadata['all_fields_info'].get(NODE_ENTITY_NAME, {})
+            with _CopyBuffer(cursor, 'import_node', _NODE_COPY_COLUMNS) as buf:
+                for (pk,), entry_data in reader.iter_members(('export_data', NODE_ENTITY_NAME)):
+                    import_data = dict(deserialize_field(
+                        k, v, fields_info=node_fields_info,
+                        import_unique_ids_mappings=import_unique_ids_mappings,
+                        foreign_ids_reverse_mappings=foreign_ids_reverse_mappings)
+                                       for k, v in entry_data.iteritems())
+                    import_data['export_pk'] = int(pk)
+                    buf.add([import_data.get(column) for column in _NODE_COPY_COLUMNS])
+            progress.report(NODE_ENTITY_NAME, buf.count)
+
+            with _CopyBuffer(cursor, 'import_link', ('input', 'output', 'label', 'type')) as buf:
+                for _, link in reader.iter_members(('links_uuid',)):
+                    buf.add((link['input'], link['output'], link['label'],
+                             LinkType(link['type']).value))
+            progress.report(LINK_ENTITY_NAME, buf.count)
+
+            with _CopyBuffer(cursor, 'import_group_node', ('group_uuid', 'node_uuid')) as buf:
+                for (group_uuid, _), node_uuid in reader.iter_members(('groups_uuid',), depth=2):
+                    buf.add((group_uuid, node_uuid))
+            progress.report('Group elements', buf.count)
+
+            cursor.execute("CREATE INDEX ON import_node (uuid)")
+            for table in ('import_attribute', 'import_node', 'import_link', 'import_group_node'):
+                # The temporary tables are not analyzed automatically
+                cursor.execute("ANALYZE {}".format(table))
+
+            ######################
+            # PRELIMINARY CHECKS #
+            ######################
+            cursor.execute("""
+                SELECT u.uuid FROM (
+                    SELECT input AS uuid FROM import_link
+                    UNION SELECT output FROM import_link
+                    UNION SELECT node_uuid FROM import_group_node) AS u
+                WHERE NOT EXISTS (SELECT 1 FROM import_node i WHERE i.uuid = u.uuid)
+                AND NOT EXISTS (SELECT 1 FROM db_dbnode n WHERE n.uuid = u.uuid)""")
+            unknown_nodes = [str(row[0]) for row in cursor.fetchall()]
+            if unknown_nodes and not ignore_unknown_nodes:
+                raise ValueError(
+                    "The import file refers to {} nodes with unknown UUID, therefore "
+                    "it cannot be imported. Either first import the unknown nodes, "
+                    "or export also the parents when exporting. The unknown UUIDs "
+                    "are:\n".format(len(unknown_nodes)) +
+                    "\n".join('* {}'.format(uuid) for uuid in unknown_nodes))
+
+            cursor.execute("""
+                SELECT i.uuid FROM import_node i
+                WHERE NOT EXISTS (SELECT 1 FROM import_attribute a WHERE a.export_pk = i.export_pk)
+                AND NOT EXISTS (SELECT 1 FROM db_dbnode n WHERE n.uuid = i.uuid)
+                LIMIT 1""")
+            row = cursor.fetchone()
+            if row is not None:
+                raise ValueError("Unable to find attribute info "
+                                 "for DbNode with UUID = {}".format(row[0]))
+
+            #########
+            # NODES #
+            #########
+            cursor.execute("""
+                SELECT count(*) FROM import_node i
+                WHERE EXISTS (SELECT 1 FROM db_dbnode n WHERE n.uuid = i.uuid)""")
+            existing_nodes = cursor.fetchone()[0]
+
+            cursor.execute("""
+                WITH inserted AS (
+                    INSERT INTO db_dbnode (uuid, type, label, description, ctime, mtime,
+                        nodeversion, public, attributes, extras, user_id, dbcomputer_id)
+                    SELECT i.uuid, i.type, coalesce(i.label, ''), coalesce(i.description, ''),
+                        i.ctime, i.mtime, coalesce(i.nodeversion, 1), coalesce(i.public, false),
+                        a.attributes, '{}', i.user_id, i.dbcomputer_id
+                    FROM import_node i JOIN import_attribute a ON a.export_pk = i.export_pk
+                    WHERE NOT EXISTS (SELECT 1 FROM db_dbnode n WHERE n.uuid = i.uuid)
+                    RETURNING id, uuid)
+                INSERT INTO import_new_node (id, uuid) SELECT id, uuid FROM inserted""")
+            new_nodes = cursor.rowcount
+
+            # I set for all nodes, even if I should set it only for calculations
+            cursor.execute("INSERT INTO db_dbcalcstate (dbnode_id, state, time) "
+                           "SELECT id, %s, now() FROM import_new_node", (calc_states.IMPORTED,))
+            ret_dict[NODE_ENTITY_NAME] = {'new': new_nodes, 'existing': existing_nodes}
+            progress.report('New nodes', new_nodes)
+
+            #########
+            # LINKS #
+            #########
+            cursor.execute("""
+                CREATE TEMPORARY TABLE import_link_pk ON COMMIT DROP AS
+                SELECT DISTINCT i.id AS input_id, o.id AS output_id, l.label, l.type
+                FROM import_link l
+                JOIN db_dbnode i ON i.uuid = l.input
+                JOIN db_dbnode o ON o.uuid = l.output""")
+
+            cursor.execute("""
+                SELECT l.input_id, l.output_id, d.label, l.label
+                FROM import_link_pk l JOIN db_dblink d
+                ON d.input_id = l.input_id AND d.output_id = l.output_id
+                WHERE d.label <> l.label LIMIT 1""")
+            row = cursor.fetchone()
+            if row is not None:
+                raise ValueError("Trying to rename an existing link "
+                                 "name, stopping (in={}, out={}, "
+                                 "old_label={}, new_label={})".format(*row))
+
+            cursor.execute("""
+                SELECT l.output_id, l.label, l.input_id
+                FROM import_link_pk l JOIN db_dblink d
+                ON d.output_id = l.output_id AND d.label = l.label
+                WHERE d.input_id <> l.input_id
+                AND NOT EXISTS (SELECT 1 FROM db_dblink e
+                                WHERE e.input_id = l.input_id AND e.output_id = l.output_id)
+                LIMIT 1""")
+            row = cursor.fetchone()
+            if row is not None:
+                raise ValueError("There exists already an input link "
+                                 "to node {} with label {} but it "
+                                 "does not come the expected input {}".format(*row))
+
+            cursor.execute("""
+                INSERT INTO db_dblink (input_id, output_id, label, type)
+                SELECT l.input_id, l.output_id, l.label, l.type FROM import_link_pk l
+                WHERE NOT EXISTS (SELECT 1 FROM db_dblink d
+                                  WHERE d.input_id = l.input_id AND d.output_id = l.output_id)""")
+            ret_dict[LINK_ENTITY_NAME] = {'new': cursor.rowcount}
+            progress.report('New links', cursor.rowcount)
+
+            ##################
+            # GROUP ELEMENTS #
+            ##################
+            cursor.execute("""
+                INSERT INTO db_dbgroup_dbnodes (dbgroup_id, dbnode_id)
+                SELECT DISTINCT g.id, n.id FROM import_group_node i
+                JOIN db_dbgroup g ON g.uuid::text = i.group_uuid
+                JOIN db_dbnode n ON n.uuid = i.node_uuid
+                WHERE NOT EXISTS (SELECT 1 FROM db_dbgroup_dbnodes m
+                                  WHERE m.dbgroup_id = g.id AND m.dbnode_id = n.id)""")
+            progress.report('New group elements', cursor.rowcount)
+
+            ######################################################
+            # Put everything in a specific group
+            if new_nodes + existing_nodes:
+                # Get an unique name for the import group, based on the
+                # current (local) time
+                basename = timezone.localtime(timezone.now()).strftime("%Y%m%d-%H%M%S")
+                group_name = basename
+                counter = 0
+                while True:
+                    cursor.execute("SELECT 1 FROM db_dbgroup WHERE name = %s AND type = %s",
+                                   (group_name, IMPORTGROUP_TYPE))
+                    if cursor.fetchone() is None:
+                        break
+                    counter += 1
+                    group_name = "{}_{}".format(basename, counter)
+
+                cursor.execute("""
+                    INSERT INTO db_dbgroup (uuid, name, type, time, description, user_id)
+                    SELECT %s, %s, %s, now(), '', id FROM db_dbuser WHERE email = %s
+                    RETURNING id""", (get_new_uuid(), group_name, IMPORTGROUP_TYPE,
+                                      get_configured_user_email()))
+                group_id = cursor.fetchone()[0]
+                cursor.execute("""
+                    INSERT INTO db_dbgroup_dbnodes (dbgroup_id, dbnode_id)
+                    SELECT DISTINCT %s, n.id FROM import_node i
+                    JOIN db_dbnode n ON n.uuid = i.uuid""", (group_id,))
+
+                if not silent:
+                    print "IMPORTED NODES GROUPED IN IMPORT GROUP NAMED '{}'".format(group_name)
+            else:
+                if not silent:
+                    print "NO DBNODES TO IMPORT, SO NO GROUP CREATED"
+
+            #################################
+            # REPOSITORY FILES OF THE NODES #
+            #################################
+            # Only the new nodes get their files, read with a server-side cursor
+            new_uuids = {}
+            with cursor.connection.cursor('import_new_node_uuids') as uuid_cursor:
+                uuid_cursor.itersize = IMPORT_BATCH_SIZE
+                uuid_cursor.execute("SELECT uuid FROM import_new_node")
+                for row in uuid_cursor:
+                    new_uuids[uuid_module.UUID(str(row[0])).bytes] = False
+
+            archive.write_node_folders(new_uuids)
+            for key, found in new_uuids.iteritems():
+                if not found:
+                    raise ValueError("Unable to find the repository "
+                                     "folder for node with UUID={} "
+                                     "in the exported file".format(uuid_module.UUID(bytes=key)))
+            progress.report('Node folders', len(new_uuids))
+
+            # The tables are dropped anyway at the end of the transaction, but
+            # this could be nested in an outer one
+            cursor.execute("DROP TABLE import_attribute, import_node, import_link, "
+                           "import_group_node, import_new_node, import_link_pk")
+
+    if not silent:
+        print "DONE."
+
+    return ret_dict
+
+
+def _import_entities_orm(entity_name, entries, metadata, import_unique_ids_mappings,
+                         foreign_ids_reverse_mappings):
+    """
+    Store with the ORM of the current backend the entries of one of the
+    entities of the export file that are not in the database yet. Used by the
+    streaming import for the users, computers and groups, that are few.
+
+    :param entity_name: the name of the entity
+    :param entries: a dictionary with the fields of the entries of the export
+        file, by their pk in the export file
+    :param metadata: the metadata of the export file
+    :param import_unique_ids_mappings: as in deserialize_field
+    :param foreign_ids_reverse_mappings: as in deserialize_field; it is
+        updated with the pks of the new and existing entries
+    :return: the number of new and of existing entries
+    """
+    import json
+
+    from aiida.backends.settings import BACKEND
+    from aiida.backends.profile import BACKEND_DJANGO, BACKEND_SQLA
+
+    fields_info = metadata['all_fields_info'].get(entity_name, {})
+    unique_identifier = metadata['unique_identifiers'][entity_name]
+    import_unique_ids = [v[unique_identifier] for v in entries.itervalues()]
+
+    if BACKEND == BACKEND_DJANGO:
+        Model = get_object_from_string(entity_names_to_signatures[entity_name])
+        existing = dict(Model.objects.filter(
+            **{'{}__in'.format(unique_identifier): import_unique_ids}).values_list(
+            unique_identifier, 'pk'))
+
+        def name_exists(name):
+            return Model.objects.filter(name=name).exists()
+
+        def store(import_data):
+            entry = Model(**import_data)
+            entry.save()
+            return entry.pk
+
+    elif BACKEND == BACKEND_SQLA:
+        import aiida.backends.sqlalchemy
+
+        session = aiida.backends.sqlalchemy.get_scoped_session()
+        Model = get_object_from_string(entity_names_to_sqla_schema[entity_name])
+        column = getattr(Model, unique_identifier)
+        existing = {}
+        if import_unique_ids:
+            existing = {unicode(k): pk for k, pk in session.query(column, Model.id).filter(
+                column.in_(import_unique_ids))}
+
+        def name_exists(name):
+            return session.query(Model).filter(Model.name == name).count() > 0
+
+        def store(import_data):
+            for file_fkey, model_fkey in file_fields_to_model_fields.get(entity_name, {}).iteritems():
+                if file_fkey in import_data and model_fkey not in import_data:
+                    import_data[model_fkey] = import_data.pop(file_fkey)
+            entry = Model(**import_data)
+            session.add(entry)
+            session.flush()
+            return entry.id
+
+    else:
+        raise Exception("Unknown settings.BACKEND: {}".format(BACKEND))
+
+    new = 0
+    dupl_counter = 0
+    imported_comp_names = set()
+    for entry_data in entries.itervalues():
+        unique_id = entry_data[unique_identifier]
+        if unique_id in existing:
+            foreign_ids_reverse_mappings[entity_name][unique_id] = existing[unique_id]
+            continue
+
+        import_data = dict(deserialize_field(
+            k, v, fields_info=fields_info,
+            import_unique_ids_mappings=import_unique_ids_mappings,
+            foreign_ids_reverse_mappings=foreign_ids_reverse_mappings)
+                           for k, v in entry_data.iteritems())
+
+        if entity_name == COMPUTER_ENTITY_NAME:
+            # Rename the new computer if there is already a computer with
+            # the same name in the database
+            orig_name = import_data['name']
+            while name_exists(import_data['name']) or import_data['name'] in imported_comp_names:
+                import_data['name'] = orig_name + COMP_DUPL_SUFFIX.format(dupl_counter)
+                dupl_counter += 1
+            imported_comp_names.add(import_data['name'])
+
+            # The Django backend stores the metadata and the transport
+            # parameters as strings of the serialized JSON objects, the
+            # SQLA backend as JSON objects
+            for key in ('metadata', 'transport_params'):
+                if BACKEND == BACKEND_DJANGO and isinstance(import_data[key], dict):
+                    import_data[key] = json.dumps(import_data[key])
+                elif BACKEND == BACKEND_SQLA and isinstance(import_data[key], basestring):
+                    import_data[key] = json.loads(import_data[key])
+
+        foreign_ids_reverse_mappings[entity_name][unique_id] = store(import_data)
+        new += 1
+
+    return new, len(entries) - new
+
+
+def _has_conversion(conversion_data):
+    """
+    :return: True if the conversion data of the attributes of a node converts
+        at least one value, i.e. if deserialize_attributes has something to do
+    """
+    if isinstance(conversion_data, dict):
+        return any(_has_conversion(v) for v in conversion_data.itervalues())
+    elif isinstance(conversion_data, (list, tuple)):
+        return any(_has_conversion(v) for v in conversion_data)
+    return conversion_data is not None
+
+
+def _json_default(value):
+    """
+    Serialize the datetimes of the deserialized attributes in isoformat, as
+    stored by both backends
+    """
+    import datetime
+
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    raise TypeError("{!r} is not JSON serializable".format(value))
+
+
+def _copy_value(value):
+    """
+    :return: the representation of a value in the text format of the
+        PostgreSQL COPY command
+    """
+    import datetime
+
+    if value is None:
+        return '\\N'
+    elif isinstance(value, bool):
+        return 't' if value else 'f'
+    elif isinstance(value, float):
+        return repr(value)
+    elif isinstance(value, (int, long)):
+        return str(value)
+    elif isinstance(value, datetime.datetime):
+        value = value.isoformat()
+    elif isinstance(value, unicode):
+        value = value.encode('utf-8')
+    else:
+        value = str(value)
+    return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+class _CopyBuffer(object):
+    """
+    Load rows in a table with the PostgreSQL COPY command, in batches.
+    The last batch is sent when leaving the with block.
+    """
+
+    def __init__(self, cursor, table, columns, batch_size=None):
+        """
+        :param cursor: a DB-API cursor of psycopg2
+        :param table: the name of the table
+        :param columns: the names of the columns, in the order of the values of the rows
+        :param batch_size: the number of rows sent with each COPY command,
+            IMPORT_BATCH_SIZE by default
+        """
+        self._cursor = cursor
+        self._statement = "COPY {} ({}) FROM STDIN".format(table, ', '.join(columns))
+        self._batch_size = batch_size or IMPORT_BATCH_SIZE
+        self._rows = []
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+
+    def add(self, row):
+        """
+        :param row: the values of a row
+        """
+        self._rows.append('\t'.join(_copy_value(value) for value in row))
+        if len(self._rows) >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        from cStringIO import StringIO
+
+        if self._rows:
+            self._cursor.copy_expert(self._statement, StringIO('\n'.join(self._rows) + '\n'))
+            self.count += len(self._rows)
+            self._rows = []
+
+
+class _ImportProgress(object):
+    """
+    Print the number of entries processed by each stage of the streaming
+    import, with the time taken and the throughput
+    """
+
+    def __init__(self, silent):
+        import time
+
+        self._silent = silent
+        self._start = time.time()
+
+    def report(self, stage, count):
+        import time
+
+        now = time.time()
+        if not self._silent:
+            elapsed = now - self._start
+            print "{}: {} entries in {:.2f} s ({:.0f} entries/s)".format(
+                stage, count, elapsed, count / elapsed if elapsed else 0.)
+        self._start = now
+
+
+class _ImportArchive(object):
+    """
+    The content of an export file for the streaming import: only data.json
+    and metadata.json are extracted, the files of the nodes are written
+    directly from the archive to the repository.
+    """
+    nodes_export_subfolder = 'nodes'
+    json_files = ('data.json', 'metadata.json')
+
+    def __init__(self, in_path, sandbox):
+        """
+        :param in_path: the path to a (possibly compressed) tar file, a zip
+            file or a folder
+        :param sandbox: a SandboxFolder where data.json and metadata.json are extracted
+        """
+        import os
+        import tarfile
+        import zipfile
+
+        self._in_path = in_path
+        if os.path.isdir(in_path):
+            self._format = 'folder'
+            json_folder = in_path
+        else:
+            if tarfile.is_tarfile(in_path):
+                self._format = 'tar'
+            elif zipfile.is_zipfile(in_path):
+                self._format = 'zip'
+            else:
+                raise ValueError("Unable to detect the input file format, it "
+                                 "is neither a (possibly compressed) tar file, "
+                                 "nor a zip file.")
+            self._extract_json_files(sandbox)
+            json_folder = sandbox.abspath
+
+        self.data_path = os.path.join(json_folder, 'data.json')
+        self.metadata_path = os.path.join(json_folder, 'metadata.json')
+        for path in (self.data_path, self.metadata_path):
+            if not os.path.isfile(path):
+                raise ValueError("Unable to find the file {} in the import "
+                                 "file or folder".format(os.path.basename(path)))
+
+    def _extract_json_files(self, sandbox):
+        import shutil
+        import tarfile
+        import zipfile
+
+        if self._format == 'tar':
+            try:
+                # The export writes the JSON files before the node files, so
+                # that only the beginning of the stream has to be read
+                with tarfile.open(self._in_path, 'r|*') as tar:
+                    found = set()
+                    for member in tar:
+                        tar.members = []
+                        if member.name in self.json_files and member.isfile():
+                            with open(sandbox.get_abs_path(member.name), 'wb') as handle:
+                                shutil.copyfileobj(tar.extractfile(member), handle)
+                            found.add(member.name)
+                            if len(found) == len(self.json_files):
+                                break
+            except tarfile.ReadError:
+                raise ValueError("The input file format for import is not valid (1)")
+        else:
+            try:
+                with zipfile.ZipFile(self._in_path, 'r') as zip_file:
+                    names = set(zip_file.namelist())
+                    for name in self.json_files:
+                        if name in names:
+                            zip_file.extract(path=sandbox.abspath, member=name)
+            except zipfile.BadZipfile:
+                raise ValueError("The input file format for import is not valid (not"
+                                 " a zip file)")
+
+    def write_node_folders(self, new_uuids):
+        """
+        Write the repository folders of the new nodes, replacing any existing
+        folder, from a single sequential read of the archive.
+
+        :param new_uuids: a dictionary with the UUIDs of the new nodes (as
+            bytes) as keys; the values are set to True for the nodes whose
+            folder was found in the archive
+        """
+        import os
+        import tarfile
+        import uuid as uuid_module
+        import zipfile
+        from aiida.common import objectstore
+        from aiida.common.folders import RepositoryFolder
+
+        if self._format == 'folder':
+            for key in new_uuids:
+                uuid = str(uuid_module.UUID(bytes=key))
+                src = os.path.join(os.path.abspath(self._in_path), self.nodes_export_subfolder,
+                                   export_shard_uuid(uuid))
+                if os.path.isdir(src):
+                    RepositoryFolder(section=Node._section_name, uuid=uuid).replace_with_folder(
+                        src, move=False, overwrite=True)
+                    new_uuids[key] = True
+
+        elif self._format == 'tar':
+            with tarfile.open(self._in_path, 'r|*') as tar:
+                for member in tar:
+                    tar.members = []
+                    if member.isdev():
+                        # safety: skip if character device, block device or FIFO
+                        print >> sys.stderr, ("WARNING, device found inside the "
+                                              "import file: {}".format(member.name))
+                        continue
+                    if member.issym() or member.islnk():
+                        # safety: in export, I set dereference=True therefore
+                        # there should be no symbolic or hard links.
+                        print >> sys.stderr, ("WARNING, link found inside the "
+                                              "import file: {}".format(member.name))
+                        continue
+                    dest = self._get_destination(member.name, new_uuids)
+                    if dest is not None:
+                        self._write_member(dest, member.isdir(), lambda: tar.extractfile(member))
+
+        else:
+            with zipfile.ZipFile(self._in_path, 'r') as zip_file:
+                for info in zip_file.infolist():
+                    dest = self._get_destination(info.filename, new_uuids)
+                    if dest is not None:
+                        self._write_member(dest, info.filename.endswith('/'),
+                                           lambda: zip_file.open(info))
+
+        # The folders replaced with replace_with_folder are already in the object store
+        if self._format != 'folder' and objectstore.is_enabled():
+            for key, found in new_uuids.iteritems():
+                if found:
+                    objectstore.deduplicate_folder(RepositoryFolder(
+                        section=Node._section_name, uuid=str(uuid_module.UUID(bytes=key))))
+
+    def _get_destination(self, name, new_uuids):
+        """
+        :return: the path in the repository of a member of the archive, if it
+            is in the folder of a new node (whose folder is erased first if
+            this is its first member), None otherwise
+        """
+        import os
+        import uuid as uuid_module
+        from aiida.common.folders import RepositoryFolder
+
+        parts = [part for part in name.split('/') if part not in ('', '.')]
+        if len(parts) < 4 or parts[0] != self.nodes_export_subfolder:
+            return None
+        if '..' in parts:
+            raise ValueError("Invalid path in the import file: {}".format(name))
+        try:
+            # The folders are sharded as in export_shard_uuid
+            key = uuid_module.UUID(''.join(parts[1:4])).bytes
+        except ValueError:
+            return None
+        if key not in new_uuids:
+            return None
+
+        folder = RepositoryFolder(section=Node._section_name, uuid=str(uuid_module.UUID(bytes=key)))
+        if not new_uuids[key]:
+            folder.erase(create_empty_folder=True)
+            new_uuids[key] = True
+        return os.path.join(folder.abspath, *parts[4:])
+
+    @staticmethod
+    def _write_member(dest, is_dir, open_member):
+        import os
+        import shutil
+        from aiida.common.folders import Folder
+
+        folder = Folder(os.path.dirname(dest))
+        if is_dir:
+            if not os.path.isdir(dest):
+                os.makedirs(dest, mode=folder.mode_dir)
+            return
+        if not folder.exists():
+            folder.create()
+        with open(dest, 'wb') as handle:
+            shutil.copyfileobj(open_member(), handle)
+        os.chmod(dest, folder.mode_file)
+
+
 class HTMLGetLinksParser(HTMLParser.HTMLParser):
     def __init__(self, filter_extension=None):
         """
@@ -1673,7 +2421,7 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
     from aiida.common.links import LinkType
     from aiida.common.folders import RepositoryFolder
     from aiida.orm.querybuilder import QueryBuilder
-    from aiida.backends.utils import QueryFactory
+    from aiida.backends.general.graph_traversal import traverse_graph
     if not silent:
         print("STARTING EXPORT...")
 
@@ -1712,8 +2460,7 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
                 qb.append(Node, ancestor_of='low_node', project=['id'])
                 additional_ids = [_ for _, in qb.all()]
             else:
-                q = QueryFactory()()
-                additional_ids = [_ for _, in q.get_all_parents(given_node_entry_ids, return_values=['id'])]
+                additional_ids = traverse_graph(given_node_entry_ids, backward=(LinkType.CREATE, LinkType.INPUT))
 
             given_node_entry_ids = given_node_entry_ids.union(additional_ids)
 
@@ -1721,15 +2468,17 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
         if given_node_entry_ids:
             # Add all (direct) outputs of a calculation object that was already
             # selected
-            qb = QueryBuilder()
-            # Only looking at calculations and subclasses that are in my entries:
-            qb.append(Calculation, tag='high_node',
-                      filters={'id': {'in': given_node_entry_ids}})
-            # Only looking at the output that was created by a calculation.
-            # From the OPM we know it has to be Data, linked by CREATE.
-            qb.append(Data, output_of='high_node', project=['id'],
-                      edge_filters={'type': {'==': LinkType.CREATE.value}})  # and the outputs
-            additional_ids = [_ for [_] in qb.all()]
+            additional_ids = set()
+            for chunk in grouper(EXPORT_CHUNK_SIZE, sorted(given_node_entry_ids)):
+                qb = QueryBuilder()
+                # Only looking at calculations and subclasses that are in my entries:
+                qb.append(Calculation, tag='high_node',
+                          filters={'id': {'in': list(chunk)}})
+                # Only looking at the output that was created by a calculation.
+                # From the OPM we know it has to be Data, linked by CREATE.
+                qb.append(Data, output_of='high_node', project=['id'],
+                          edge_filters={'type': {'==': LinkType.CREATE.value}})  # and the outputs
+                additional_ids.update(_ for [_] in qb.iterall(batch_size=EXPORT_BATCH_SIZE))
             given_node_entry_ids = given_node_entry_ids.union(additional_ids)
 
     # Here we get all the columns that we plan to project per entity that we
@@ -1765,22 +2514,18 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
         elif given_entity == COMPUTER_ENTITY_NAME:
             entry_ids_to_add = given_computer_entry_ids
 
-        qb = QueryBuilder()
-        qb.append(entity_names_to_entities[given_entity],
-                  filters={"id": {"in": entry_ids_to_add}},
-                  project=project_cols,
-                  tag=given_entity, outerjoin=True)
-        entries_to_add[given_entity] = qb
+        entries_to_add[given_entity] = (entry_ids_to_add, project_cols)
 
     # TODO (Spyros) To see better! Especially for functional licenses
     # Check the licenses of exported data.
     if allowed_licenses is not None or forbidden_licenses is not None:
-        qb = QueryBuilder()
-        qb.append(Node, project=["id", "attributes.source.license"],
-                  filters={"id": {"in": given_node_entry_ids}})
-        # Skip those nodes where the license is not set (this is the standard behavior with Django)
-        node_licenses = list((a, b) for [a, b] in qb.all() if b is not None)
-        check_licences(node_licenses, allowed_licenses, forbidden_licenses)
+        for chunk in grouper(EXPORT_CHUNK_SIZE, sorted(given_node_entry_ids)):
+            qb = QueryBuilder()
+            qb.append(Node, project=["id", "attributes.source.license"],
+                      filters={"id": {"in": list(chunk)}})
+            # Skip those nodes where the license is not set (this is the standard behavior with Django)
+            node_licenses = list((a, b) for [a, b] in qb.iterall(batch_size=EXPORT_BATCH_SIZE) if b is not None)
+            check_licences(node_licenses, allowed_licenses, forbidden_licenses)
 
     ############################################################
     ##### Start automatic recursive export data generation #####
@@ -1788,40 +2533,47 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
     if not silent:
         print "STORING DATABASE ENTRIES..."
 
+    # The entries are queried in chunks of ids and written to temporary files
+    # as they are read, one per entity, since all the entries of an entity
+    # have to be contiguous in data.json. In this way, the exported data is
+    # never in memory at once.
     export_data = dict()
     entity_separator = '_'
-    for entity_name, partial_query in entries_to_add.iteritems():
+    for entity_name, (entry_ids_to_add, project_cols) in entries_to_add.iteritems():
 
         foreign_fields = {k: v for k, v in
                           all_fields_info[entity_name].iteritems()
                           # all_fields_info[model_name].iteritems()
                           if 'requires' in v}
 
-        for k, v in foreign_fields.iteritems():
-            ref_model_name = v['requires']
-            fill_in_query(partial_query, entity_name, ref_model_name,
-                          [entity_name], entity_separator)
-
-        for temp_d in partial_query.iterdict():
-            for k in temp_d.keys():
-                # Get current entity
-                current_entity = k.split(entity_separator)[-1]
-
-                # This is a empty result of an outer join.
-                # It should not be taken into account.
-                if temp_d[k]["id"] is None:
-                    continue
+        for chunk in grouper(EXPORT_CHUNK_SIZE, sorted(entry_ids_to_add)):
+            partial_query = QueryBuilder()
+            partial_query.append(entity_names_to_entities[entity_name],
+                                 filters={"id": {"in": list(chunk)}},
+                                 project=project_cols,
+                                 tag=entity_name, outerjoin=True)
+            for k, v in foreign_fields.iteritems():
+                ref_model_name = v['requires']
+                fill_in_query(partial_query, entity_name, ref_model_name,
+                              [entity_name], entity_separator)
+
+            for temp_d in partial_query.iterdict(batch_size=EXPORT_BATCH_SIZE):
+                for k in temp_d.keys():
+                    # Get current entity
+                    current_entity = k.split(entity_separator)[-1]
+
+                    # This is a empty result of an outer join.
+                    # It should not be taken into account.
+                    if temp_d[k]["id"] is None:
+                        continue
 
-                temp_d2 = {
-                    temp_d[k]["id"]:
-                        serialize_dict(temp_d[k],
-                                       remove_fields=['id'],
-                                       rename_fields=
-                                       model_fields_to_file_fields[current_entity])}
-                try:
-                    export_data[current_entity].update(temp_d2)
-                except KeyError:
-                    export_data[current_entity] = temp_d2
+                    try:
+                        entity_file = export_data[current_entity]
+                    except KeyError:
+                        entity_file = export_data[current_entity] = JsonMembersFile()
+                    entity_file.add(temp_d[k]["id"], serialize_dict(
+                        temp_d[k], remove_fields=['id'],
+                        rename_fields=model_fields_to_file_fields[current_entity]))
 
     ######################################
     # Manually manage links and attributes
@@ -1829,7 +2581,7 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
     # I use .get because there may be no nodes to export
     all_nodes_pk = list()
     if export_data.has_key(NODE_ENTITY_NAME):
-        all_nodes_pk.extend(export_data.get(NODE_ENTITY_NAME).keys())
+        all_nodes_pk = sorted(export_data.get(NODE_ENTITY_NAME).keys)
 
     if sum(len(model_data) for model_data in export_data.values()) == 0:
         if not silent:
@@ -1844,62 +2596,20 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
     ## ATTRIBUTES
     if not silent:
         print "STORING NODE ATTRIBUTES..."
-    node_attributes = {}
-    node_attributes_conversion = {}
+    node_attributes = JsonMembersFile()
+    node_attributes_conversion = JsonMembersFile()
 
     # A second QueryBuilder query to get the attributes. See if this can be
     # optimized
-    if len(all_nodes_pk) > 0:
+    for chunk in grouper(EXPORT_CHUNK_SIZE, all_nodes_pk):
         all_nodes_query = QueryBuilder()
-        all_nodes_query.append(Node, filters={"id": {"in": all_nodes_pk}},
+        all_nodes_query.append(Node, filters={"id": {"in": list(chunk)}},
                                project=["*"])
-        for res in all_nodes_query.iterall():
+        for res in all_nodes_query.iterall(batch_size=EXPORT_BATCH_SIZE):
             n = res[0]
-            (node_attributes[str(n.pk)],
-             node_attributes_conversion[str(n.pk)]) = serialize_dict(
-                n.get_attrs(), track_conversion=True)
-
-    if not silent:
-        print "STORING NODE LINKS..."
-    ## All 'parent' links (in this way, I can automatically export a node
-    ## that will get automatically attached to a parent node in the end DB,
-    ## if the parent node is already present in the DB)
-    links_uuid = list()
-    # Export links only if there are nodes to be extracted
-    if len(all_nodes_pk) > 0:
-        links_qb = QueryBuilder()
-        links_qb.append(Node, project=['uuid'], tag='input')
-        links_qb.append(Node,
-                        project=['uuid'], tag='output',
-                        filters={'id': {'in': all_nodes_pk}},
-                        edge_filters={'type': {'in': (LinkType.CREATE.value, LinkType.INPUT.value)}},
-                        edge_project=['label', 'type'], output_of='input')
-
-        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-            links_uuid.append({
-                'input': str(input_uuid),
-                'output': str(output_uuid),
-                'label': str(link_label),
-                'type': str(link_type)
-            })
-
-    if not silent:
-        print "STORING GROUP ELEMENTS..."
-    groups_uuid = dict()
-    # If a group is in the exported date, we export the group/node correlation
-    if GROUP_ENTITY_NAME in export_data:
-        for curr_group in export_data[GROUP_ENTITY_NAME]:
-            group_uuid_qb = QueryBuilder()
-            group_uuid_qb.append(entity_names_to_entities[GROUP_ENTITY_NAME],
-                                 filters={'id': {'==': curr_group}},
-                                 project=['uuid'], tag='group')
-            group_uuid_qb.append(entity_names_to_entities[NODE_ENTITY_NAME],
-                                 project=['uuid'], member_of='group')
-            for res in group_uuid_qb.iterall():
-                if groups_uuid.has_key(str(res[0])):
-                    groups_uuid[str(res[0])].append(str(res[1]))
-                else:
-                    groups_uuid[str(res[0])] = [str(res[1])]
+            attributes, conversion = serialize_dict(n.get_attrs(), track_conversion=True)
+            node_attributes.add(n.pk, attributes)
+            node_attributes_conversion.add(n.pk, conversion)
 
     ######################################
     # Now I store
@@ -1908,22 +2618,73 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
     nodesubfolder = folder.get_subfolder('nodes', create=True,
                                          reset_limit=True)
 
-    # Add the proper signatures to the exported data
-    for entity_name in export_data.keys():
-        export_data[entity_name] = (
-            export_data.pop(entity_name))
-
     if not silent:
         print "STORING DATA..."
 
     with folder.open('data.json', 'w') as f:
-        json.dump({
-            'node_attributes': node_attributes,
-            'node_attributes_conversion': node_attributes_conversion,
-            'export_data': export_data,
-            'links_uuid': links_uuid,
-            'groups_uuid': groups_uuid,
-        }, f)
+        f.write('{"node_attributes": ')
+        node_attributes.write_object(f)
+        f.write(', "node_attributes_conversion": ')
+        node_attributes_conversion.write_object(f)
+        f.write(', "export_data": {')
+        for index, (entity_name, entity_file) in enumerate(export_data.iteritems()):
+            f.write('{}{}: '.format(', ' if index else '', json.dumps(entity_name)))
+            entity_file.write_object(f)
+        f.write('}')
+
+        if not silent:
+            print "STORING NODE LINKS..."
+        ## All 'parent' links (in this way, I can automatically export a node
+        ## that will get automatically attached to a parent node in the end DB,
+        ## if the parent node is already present in the DB)
+        f.write(', "links_uuid": [')
+        num_links = 0
+        # Export links only if there are nodes to be extracted
+        for chunk in grouper(EXPORT_CHUNK_SIZE, all_nodes_pk):
+            links_qb = QueryBuilder()
+            links_qb.append(Node, project=['uuid'], tag='input')
+            links_qb.append(Node,
+                            project=['uuid'], tag='output',
+                            filters={'id': {'in': list(chunk)}},
+                            edge_filters={'type': {'in': (LinkType.CREATE.value, LinkType.INPUT.value)}},
+                            edge_project=['label', 'type'], output_of='input')
+
+            for input_uuid, output_uuid, link_label, link_type in links_qb.iterall(batch_size=EXPORT_BATCH_SIZE):
+                f.write('{}{}'.format(', ' if num_links else '', json.dumps({
+                    'input': str(input_uuid),
+                    'output': str(output_uuid),
+                    'label': str(link_label),
+                    'type': str(link_type)
+                })))
+                num_links += 1
+        f.write(']')
+
+        if not silent:
+            print "STORING GROUP ELEMENTS..."
+        f.write(', "groups_uuid": {')
+        num_groups = 0
+        # If a group is in the exported date, we export the group/node correlation
+        if GROUP_ENTITY_NAME in export_data:
+            for curr_group in sorted(export_data[GROUP_ENTITY_NAME].keys):
+                group_uuid_qb = QueryBuilder()
+                group_uuid_qb.append(entity_names_to_entities[GROUP_ENTITY_NAME],
+                                     filters={'id': {'==': curr_group}},
+                                     project=['uuid'], tag='group')
+                group_uuid_qb.append(entity_names_to_entities[NODE_ENTITY_NAME],
+                                     project=['uuid'], member_of='group')
+                num_members = 0
+                for res in group_uuid_qb.iterall(batch_size=EXPORT_BATCH_SIZE):
+                    if not num_members:
+                        f.write('{}{}: ['.format(', ' if num_groups else '', json.dumps(str(res[0]))))
+                        num_groups += 1
+                    f.write('{}{}'.format(', ' if num_members else '', json.dumps(str(res[1]))))
+                    num_members += 1
+                if num_members:
+                    f.write(']')
+        f.write('}}')
+
+    for json_file in [node_attributes, node_attributes_conversion] + export_data.values():
+        json_file.close()
 
     # Add proper signature to unique identifiers & all_fields_info
     # Ignore if a key doesn't exist in any of the two dictionaries
@@ -1942,13 +2703,13 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
         print "STORING FILES..."
 
     # If there are no nodes, there are no files to store
-    if len(all_nodes_pk) > 0:
+    for chunk in grouper(EXPORT_CHUNK_SIZE, all_nodes_pk):
         # Large speed increase by not getting the node itself and looping in memory
         # in python, but just getting the uuid
         uuid_query = QueryBuilder()
-        uuid_query.append(Node, filters={"id": {"in": all_nodes_pk}},
+        uuid_query.append(Node, filters={"id": {"in": list(chunk)}},
                           project=["uuid"])
-        for res in uuid_query.all():
+        for res in uuid_query.iterall(batch_size=EXPORT_BATCH_SIZE):
             uuid = str(res[0])
             sharded_uuid = export_shard_uuid(uuid)
 
@@ -1958,12 +2719,234 @@ def export_tree(what, folder, also_parents=True, also_calc_outputs=True,
                 sharded_uuid, create=False,
                 reset_limit=True)
             # In this way, I copy the content of the folder, and not the folder
-            # itself
+            # itself. The archive folders write the files directly in the archive.
             thisnodefolder.insert_path(src=RepositoryFolder(
                 section=Node._section_name, uuid=uuid).abspath,
                                        dest_name='.')
 
 
+class JsonMembersFile(object):
+    """
+    A temporary file collecting the members of a JSON object one at a time,
+    to write big JSON objects without keeping them in memory.
+    The members added with an existing key are ignored.
+    """
+
+    def __init__(self):
+        import tempfile
+
+        self._file = tempfile.TemporaryFile()
+        self.keys = set()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, key, value):
+        """
+        Add a member to the object.
+
+        :param key: the key, converted to a string as json.dump would do
+        :param value: a JSON serializable value
+        """
+        import json
+
+        if key in self.keys:
+            return
+        self._file.write('{}{}: {}'.format(', ' if self.keys else '', json.dumps(str(key)), json.dumps(value)))
+        self.keys.add(key)
+
+    def write_object(self, handle):
+        """
+        Write the JSON object with the members added so far to a file.
+        """
+        import shutil
+
+        handle.write('{')
+        self._file.seek(0)
+        shutil.copyfileobj(self._file, handle)
+        handle.write('}')
+
+    def close(self):
+        self._file.close()
+
+
+class JsonMembersReader(object):
+    """
+    Incremental reader of the members of the big JSON objects and arrays of a
+    file, such as the data.json of the export files, that does not load the
+    whole file in memory.
+    """
+    # Size in bytes of the blocks read from the file
+    _chunk_size = 1024 * 1024
+
+    _whitespace = re.compile(r'[ \t\n\r]*')
+    _structure = re.compile(r'["\[\]{}]')
+    _string = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+
+    def __init__(self, handle):
+        """
+        :param handle: the JSON file, opened for reading
+        """
+        import json
+
+        self._handle = handle
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+
+    def iter_members(self, path, depth=1):
+        """
+        Iterate over the members of an object or array of the file, reading
+        the file from the beginning.
+
+        :param path: the tuple of the keys of the nested objects leading to
+            the object or array, e.g. ('export_data', 'Node')
+        :param depth: the number of nested containers whose members are
+            iterated; with depth=2, the members of the members are returned
+        :return: an iterator over (keys, value) tuples, where keys is the
+            tuple of the keys (for objects) or positions (for arrays) of the
+            value at each depth. Nothing is returned if the path is not in the file.
+        """
+        self._handle.seek(0)
+        self._buffer = ''
+        self._pos = 0
+        if not self._enter_path(path):
+            return
+        for member in self._iter_members(depth):
+            yield member
+
+    def _enter_path(self, path):
+        for key in path:
+            if self._peek() != '{':
+                return False
+            for member_key in self._iter_entries():
+                if member_key == key:
+                    break
+                self._skip_value()
+            else:
+                return False
+        return True
+
+    def _iter_members(self, depth):
+        for key in self._iter_entries():
+            if depth > 1:
+                for keys, value in self._iter_members(depth - 1):
+                    yield (key,) + keys, value
+            else:
+                yield (key,), self._read_value()
+
+    def _iter_entries(self):
+        """
+        Iterate over the keys of the object, or the positions in the array,
+        at the current position. After each step the position is at the
+        value, that has to be read or skipped before the next step.
+        """
+        opening = self._peek()
+        if opening not in '{[':
+            raise ValueError("Expected an object or an array in the JSON file")
+        closing = '}' if opening == '{' else ']'
+        self._pos += 1
+        if self._peek() == closing:
+            self._pos += 1
+            return
+
+        position = 0
+        while True:
+            if opening == '{':
+                key = self._read_value()
+                self._expect(':')
+            else:
+                key = position
+            yield key
+            position += 1
+
+            char = self._peek()
+            self._pos += 1
+            if char == closing:
+                return
+            if char != ',':
+                raise ValueError("Expected ',' or '{}' in the JSON file, found '{}'".format(closing, char))
+
+    def _fill(self):
+        """
+        Append the next block of the file to the buffer, dropping the part
+        already read.
+
+        :return: False at the end of the file
+        """
+        data = self._handle.read(self._chunk_size)
+        if not data:
+            return False
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """
+        Skip the whitespace and return the next character, without reading it
+        """
+        while True:
+            self._pos = self._whitespace.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of the JSON file")
+
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise ValueError("Expected '{}' in the JSON file, found '{}'".format(char, found))
+        self._pos += 1
+
+    def _read_value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                # The value may continue in the next block
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer may also continue
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _skip_value(self):
+        """
+        Skip the value at the current position without decoding it
+        """
+        if self._peek() not in '{[':
+            self._read_value()
+            return
+
+        depth = 0
+        while True:
+            match = self._structure.search(self._buffer, self._pos)
+            if match is None:
+                self._pos = len(self._buffer)
+                if not self._fill():
+                    raise ValueError("Unexpected end of the JSON file")
+                continue
+            char = match.group()
+            if char == '"':
+                string = self._string.match(self._buffer, match.start())
+                if string is None:
+                    # The string continues in the next block
+                    self._pos = match.start()
+                    if not self._fill():
+                        raise ValueError("Unexpected end of the JSON file")
+                    continue
+                self._pos = string.end()
+                continue
+            self._pos = match.end()
+            depth += 1 if char in '{[' else -1
+            if depth == 0:
+                return
+
+
 def check_licences(node_licenses, allowed_licenses, forbidden_licenses):
     from aiida.common.exceptions import LicensingException
     from inspect import isfunction
@@ -2028,24 +3011,75 @@ def get_all_parents_dj(node_pks):
 
 
 class MyWritingZipFile(object):
+    """
+    A file to be written in a zip file, buffered in a temporary file on disk
+    rather than in memory, and added to the zip file when closed.
+    """
+
     def __init__(self, zipfile, fname):
         self._zipfile = zipfile
         self._fname = fname
         self._buffer = None
 
     def open(self):
-        import StringIO
+        import tempfile
+
+        if self._buffer is not None:
+            raise IOError("Cannot open again!")
+        self._buffer = tempfile.NamedTemporaryFile(delete=False)
+
+    def write(self, data):
+        self._buffer.write(data)
+
+    def close(self):
+        import os
+
+        self._buffer.close()
+        try:
+            self._zipfile.write(self._buffer.name, self._fname)
+        finally:
+            os.remove(self._buffer.name)
+        self._buffer = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+class MyWritingTarFile(object):
+    """
+    A file to be written in a tar file, buffered in a temporary file on disk
+    and added to the tar file when closed.
+    """
+
+    def __init__(self, tarfile, fname):
+        self._tarfile = tarfile
+        self._fname = fname
+        self._buffer = None
+
+    def open(self):
+        import tempfile
 
         if self._buffer is not None:
             raise IOError("Cannot open again!")
-        self._buffer = StringIO.StringIO()
+        self._buffer = tempfile.TemporaryFile()
 
     def write(self, data):
         self._buffer.write(data)
 
     def close(self):
+        import tarfile
+        import time
+
+        info = tarfile.TarInfo(name=self._fname)
+        info.size = self._buffer.tell()
+        info.mtime = time.time()
         self._buffer.seek(0)
-        self._zipfile.writestr(self._fname, self._buffer.read())
+        self._tarfile.addfile(info, self._buffer)
+        self._buffer.close()
         self._buffer = None
 
     def __enter__(self):
@@ -2167,6 +3201,129 @@ class ZipFolder(object):
             self._zipfile.write(src, base_filename)
 
 
+class TarFolder(object):
+    """
+    A folder inside a tar file being written, with the same interface as
+    ZipFolder, so that export_tree can write the files directly in the tar
+    file without creating the export tree on disk first.
+    """
+
+    def __init__(self, tarfolder_or_fname, mode=None, subfolder='.'):
+        """
+        :param tarfolder_or_fname: either another TarFolder instance,
+          of which you want to get a subfolder, or a filename to create.
+        :param mode: the file mode; see the tarfile.open docs for valid
+          strings (e.g. 'w:gz'). Note: can be specified only if
+          tarfolder_or_fname is a string (the filename to generate)
+        :param subfolder: the subfolder that specified the "current working
+          directory" in the tar file. If tarfolder_or_fname is a TarFolder,
+          subfolder is a relative path from tarfolder_or_fname.subfolder
+        """
+        import tarfile
+        import os
+
+        if isinstance(tarfolder_or_fname, basestring):
+            the_mode = mode
+            if the_mode is None:
+                the_mode = "r"
+            # PAX_FORMAT: virtually no limitations, better support for unicode
+            #   characters
+            # dereference=True: at the moment, we should not have any symlink or
+            #   hardlink in the AiiDA repository; therefore, do not store symlinks
+            #   or hardlinks, but store the actual destinations.
+            #   This also simplifies the checks on import.
+            self._tarfile = tarfile.open(tarfolder_or_fname, the_mode,
+                                         format=tarfile.PAX_FORMAT,
+                                         dereference=True)
+            self._pwd = subfolder
+        else:
+            if mode is not None:
+                raise ValueError("Cannot specify 'mode' when passing a TarFolder")
+            self._tarfile = tarfolder_or_fname._tarfile
+            self._pwd = os.path.join(tarfolder_or_fname.pwd, subfolder)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def close(self):
+        self._tarfile.close()
+
+    @property
+    def pwd(self):
+        return self._pwd
+
+    def open(self, fname, mode='r'):
+        if mode == 'w':
+            return MyWritingTarFile(
+                tarfile=self._tarfile, fname=self._get_internal_path(fname))
+        else:
+            return self._tarfile.extractfile(self._get_internal_path(fname))
+
+    def _get_internal_path(self, filename):
+        import os
+        return os.path.normpath(os.path.join(self.pwd, filename))
+
+    def get_subfolder(self, subfolder, create=False, reset_limit=False):
+        # reset_limit: ignored
+        # create: ignored, folders are added together with their content
+        subfolder = TarFolder(self, subfolder=subfolder)
+        return subfolder
+
+    def insert_path(self, src, dest_name=None, overwrite=True):
+        """
+        Add a file or a folder (recursively) to the tar file, reading it
+        directly from src.
+
+        :param overwrite: ignored, tar files cannot be checked efficiently
+          for existing members while being written
+        """
+        import os
+
+        if dest_name is None:
+            base_filename = unicode(os.path.basename(src))
+        else:
+            base_filename = unicode(dest_name)
+
+        base_filename = self._get_internal_path(base_filename)
+
+        if not isinstance(src, unicode):
+            src = unicode(src)
+
+        if not os.path.isabs(src):
+            raise ValueError("src must be an absolute path in insert_file")
+
+        self._tarfile.add(src, arcname=base_filename)
+
+
+class _OutputFile(object):
+    """
+    A context manager giving the path of a temporary file, in the same folder
+    as the output file, that is renamed to the output file only if the block
+    succeeds and is removed otherwise, so that a failed export does not leave
+    a partial output file (or overwrite an existing one)
+    """
+
+    def __init__(self, outfile):
+        import os
+
+        self.outfile = outfile
+        self.path = '{}.{}.tmp'.format(outfile, os.getpid())
+
+    def __enter__(self):
+        return self.path
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        import os
+
+        if exc_type is None:
+            os.rename(self.path, self.outfile)
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+
+
 def export_zip(what, outfile='testzip', overwrite=False,
                silent=False, use_compression=True, **kwargs):
     import os
@@ -2177,8 +3334,9 @@ def export_zip(what, outfile='testzip', overwrite=False,
 
     import time
     t = time.time()
-    with ZipFolder(outfile, mode='w', use_compression=use_compression) as folder:
-        export_tree(what, folder=folder, silent=silent, **kwargs)
+    with _OutputFile(outfile) as path:
+        with ZipFolder(path, mode='w', use_compression=use_compression) as folder:
+            export_tree(what, folder=folder, silent=silent, **kwargs)
     if not silent:
         print "File written in {:10.3g} s.".format(time.time() - t)
 
@@ -2201,44 +3359,20 @@ def export(what, outfile='export_data.aiida.tar.gz', overwrite=False, silent=Fal
     :raise IOError: if overwrite==False and the filename already exists.
     """
     import os
-    import tarfile
     import time
 
-    from aiida.common.folders import SandboxFolder
-
     if not overwrite and os.path.exists(outfile):
         raise IOError("The output file '{}' already "
                       "exists".format(outfile))
 
-    folder = SandboxFolder()
-    t1 = time.time()
-    export_tree(what, folder=folder, silent=silent, **kwargs)
-
-    t2 = time.time()
-
-    if not silent:
-        print "COMPRESSING..."
-
-    # PAX_FORMAT: virtually no limitations, better support for unicode
-    #   characters
-    # dereference=True: at the moment, we should not have any symlink or
-    #   hardlink in the AiiDA repository; therefore, do not store symlinks
-    #   or hardlinks, but store the actual destinations.
-    #   This also simplifies the checks on import.
-    t3 = time.time()
-    with tarfile.open(outfile, "w:gz", format=tarfile.PAX_FORMAT,
-                      dereference=True) as tar:
-        tar.add(folder.abspath, arcname="")
-
-        #        import shutil
-        #        shutil.make_archive(outfile, 'zip', folder.abspath)#, base_dir='aiida')
-    t4 = time.time()
+    # The export tree is written directly in the compressed tar file
+    t = time.time()
+    with _OutputFile(outfile) as path:
+        with TarFolder(path, mode='w:gz') as folder:
+            export_tree(what, folder=folder, silent=silent, **kwargs)
 
     if not silent:
-        filecr_time = t2 - t1
-        filecomp_time = t4 - t3
-        print "Exported in {:6.2g}s, compressed in {:6.2g}s, total: {:6.2g}s.".format(filecr_time, filecomp_time,
-                                                                                      filecr_time + filecomp_time)
+        print "Exported and compressed in {:6.2g}s.".format(time.time() - t)
 
     if not silent:
         print "DONE."
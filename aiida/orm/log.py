@@ -50,6 +50,23 @@ class Log(object):
         """
         pass
 
+    def create_entries(self, entries):
+        """
+        Create many log entries at once. The concrete classes should override
+        it to store all the entries with a single bulk insert.
+
+        :param entries: the entries to create, as dictionaries with the keyword
+            arguments of :meth:`create_entry`
+        :type entries: list
+        :return: The number of entries stored
+        :rtype: int
+        """
+        num_stored = 0
+        for entry in entries:
+            if self.create_entry(**entry) is not None:
+                num_stored += 1
+        return num_stored
+
     def create_entry_from_record(self, record):
         """
         Helper function to create a log entry from a record created as by the
@@ -60,16 +77,43 @@ class Log(object):
         :return: An object implementing the log entry interface
         :rtype: :class:`aiida.orm.log.LogEntry`
         """
+        entry = self._get_entry_from_record(record)
+
+        # Do not store if objpk and objname are not set
+        if entry is None:
+            return None
+
+        return self.create_entry(**entry)
+
+    def create_entries_from_records(self, records):
+        """
+        Helper function to create the log entries of many records created by
+        the python logging library at once, skipping the records without
+        objpk and objname
+
+        :param records: The records created by the logging module
+        :type records: list
+        :return: The number of entries stored
+        :rtype: int
+        """
+        entries = [self._get_entry_from_record(record) for record in records]
+        return self.create_entries([entry for entry in entries if entry is not None])
+
+    @staticmethod
+    def _get_entry_from_record(record):
+        """
+        :return: the keyword arguments of :meth:`create_entry` for a record,
+            or None if its objpk or objname are not set
+        """
         from datetime import datetime
 
         objpk = record.__dict__.get('objpk', None)
         objname = record.__dict__.get('objname', None)
 
-        # Do not store if objpk and objname are not set
         if objpk is None or objname is None:
             return None
 
-        return self.create_entry(
+        return dict(
             time=timezone.make_aware(datetime.fromtimestamp(record.created)),
             loggername=record.name,
             levelname=record.levelname,
@@ -36,6 +36,7 @@ from sqlalchemy.dialects.postgresql import array
 from aiida.common.exceptions import InputValidationError, ConfigurationError
 # The way I get column as a an attribute to the orm class
 from aiida.backends.utils import _get_column
+from aiida.backends.general.transitive_closure import closure_table, is_closure_usable
 from aiida.common.links import LinkType
 
 
@@ -1206,9 +1207,37 @@ class QueryBuilder(object):
         )
         return aliased_edge
 
+    def _use_transitive_closure(self):
+        """
+        :returns: True if the ancestor and descendant joins can use the transitive closure table
+            instead of the recursive queries, i.e. if the table exists and is up to date.
+            The answer is computed once per query.
+        """
+        if self._transitive_closure_usable is None:
+            self._transitive_closure_usable = is_closure_usable()
+        return self._transitive_closure_usable
+
+    @staticmethod
+    def _get_shortest_paths(paths):
+        """
+        :param paths: the recursive query of the ancestor-descendant pairs, with one row per path
+        :returns: a subquery with one row per pair, with the depth of the shortest path between the two
+            nodes, i.e. the same rows as the transitive closure table
+        """
+        return select([
+            paths.c.ancestor_id,
+            paths.c.descendant_id,
+            sa_func.min(paths.c.depth).label('depth'),
+        ]).group_by(paths.c.ancestor_id, paths.c.descendant_id).alias()
+
     def _join_descendants_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False):
         """
-        joining descendants using the recursive functionality
+        joining descendants using the recursive functionality.
+        If the transitive closure table exists and is up to date (see
+        :py:mod:`aiida.backends.general.transitive_closure`), it is joined
+        instead, unless the path is needed. Both return every pair of nodes
+        once, with the depth of the shortest path between them. If the path is
+        needed, a row is returned for every path instead, with its depth.
         :TODO: Move the filters to be done inside the recursive query (for example on depth)
         :TODO: Pass an option to also show the path, if this is wanted.
         """
@@ -1219,6 +1248,18 @@ class QueryBuilder(object):
             'descendant_of_beta'
         )
 
+        if not expand_path and self._use_transitive_closure():
+            closure = closure_table.alias()
+            self._query = self._query.join(
+                closure,
+                closure.c.ancestor_id == joined_entity.id
+            ).join(
+                entity_to_join,
+                closure.c.descendant_id == entity_to_join.id,
+                isouter=isouterjoin
+            )
+            return closure.c
+
         link1 = aliased(self._impl.Link)
         link2 = aliased(self._impl.Link)
         node1 = aliased(self._impl.Node)
@@ -1261,6 +1302,9 @@ class QueryBuilder(object):
             ).where(link2.type.in_((LinkType.CREATE.value, LinkType.INPUT.value)))
         ))  # .alias()
 
+        if not expand_path:
+            descendants_recursive = self._get_shortest_paths(descendants_recursive)
+
         self._query = self._query.join(
             descendants_recursive,
             descendants_recursive.c.ancestor_id == joined_entity.id
@@ -1273,7 +1317,12 @@ class QueryBuilder(object):
 
     def _join_ancestors_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False):
         """
-        joining ancestors using the recursive functionality
+        joining ancestors using the recursive functionality.
+        If the transitive closure table exists and is up to date (see
+        :py:mod:`aiida.backends.general.transitive_closure`), it is joined
+        instead, unless the path is needed. Both return every pair of nodes
+        once, with the depth of the shortest path between them. If the path is
+        needed, a row is returned for every path instead, with its depth.
         :TODO: Move the filters to be done inside the recursive query (for example on depth)
         :TODO: Pass an option to also show the path, if this is wanted.
 
@@ -1284,6 +1333,18 @@ class QueryBuilder(object):
             'descendant_of_beta'
         )
 
+        if not expand_path and self._use_transitive_closure():
+            closure = closure_table.alias()
+            self._query = self._query.join(
+                closure,
+                closure.c.descendant_id == joined_entity.id
+            ).join(
+                entity_to_join,
+                closure.c.ancestor_id == entity_to_join.id,
+                isouter=isouterjoin
+            )
+            return closure.c
+
         link1 = aliased(self._impl.Link)
         link2 = aliased(self._impl.Link)
         node1 = aliased(self._impl.Node)
@@ -1325,6 +1386,9 @@ class QueryBuilder(object):
             # I can't follow RETURN or CALL links
         ))
 
+        if not expand_path:
+            ancestors_recursive = self._get_shortest_paths(ancestors_recursive)
+
         self._query = self._query.join(
             ancestors_recursive,
             ancestors_recursive.c.descendant_id == joined_entity.id
@@ -1671,6 +1735,9 @@ class QueryBuilder(object):
         # right session
         firstalias = self._tag_to_alias_map[self._path[0]['tag']]
         self._query = self._impl.get_session().query(firstalias)
+        # Whether the transitive closure table can be used, checked when the first
+        # ancestor or descendant join is built
+        self._transitive_closure_usable = None
 
         ######################### JOINS ################################
         # ~ print self._query
@@ -2029,9 +2096,11 @@ class QueryBuilder(object):
         query = self.get_query()
         return self._impl.count(query)
 
-    def iterall(self, batch_size=100):
+    def iterall(self, batch_size=100, raw=False):
         """
         Same as :meth:`.all`, but returns a generator.
+        The rows are fetched from the database in batches through a server-side
+        cursor, so that the memory use does not grow with the number of rows.
         Be aware that this is only safe if no commit will take place during this
         transaction. You might also want to read the SQLAlchemy documentation on
         http://docs.sqlalchemy.org/en/latest/orm/query.html#sqlalchemy.orm.query.Query.yield_per
@@ -2040,19 +2109,28 @@ class QueryBuilder(object):
         :param int batch_size:
             The size of the batches to ask the backend to batch results in subcollections.
             You can optimize the speed of the query by tuning this parameter.
+            If None, all the rows are fetched at once.
+        :param bool raw:
+            If True, the rows are read without building the ORM instances and the
+            projected values are returned as they come from the database.
+            This is faster when iterating over many rows of columns or attributes,
+            but the ORM instances (*\**) cannot be projected.
 
         :returns: a generator of lists
         """
 
         query = self.get_query()
+        self._check_raw_projections(raw)
 
-        for item in self._impl.iterall(query, batch_size, self._attrkeys_as_in_sql_result):
+        for item in self._impl.iterall(query, batch_size, self._attrkeys_as_in_sql_result, raw=raw):
             yield item
         return
 
-    def iterdict(self, batch_size=100):
+    def iterdict(self, batch_size=100, raw=False):
         """
         Same as :meth:`.dict`, but returns a generator.
+        The rows are fetched from the database in batches through a server-side
+        cursor, so that the memory use does not grow with the number of rows.
         Be aware that this is only safe if no commit will take place during this
         transaction. You might also want to read the SQLAlchemy documentation on
         http://docs.sqlalchemy.org/en/latest/orm/query.html#sqlalchemy.orm.query.Query.yield_per
@@ -2061,14 +2139,29 @@ class QueryBuilder(object):
         :param int batch_size:
             The size of the batches to ask the backend to batch results in subcollections.
             You can optimize the speed of the query by tuning this parameter.
+            If None, all the rows are fetched at once.
+        :param bool raw:
+            If True, the rows are read without building the ORM instances, as for
+            :meth:`.iterall`.
 
         :returns: a generator of dictionaries
         """
 
         query = self.get_query()
-        for item in self._impl.iterdict(query, batch_size, self.tag_to_projected_entity_dict):
+        self._check_raw_projections(raw)
+
+        for item in self._impl.iterdict(query, batch_size, self.tag_to_projected_entity_dict, raw=raw):
             yield item
 
+    def _check_raw_projections(self, raw):
+        """
+        :raise InputValidationError: if the rows should be returned raw but an ORM instance is projected
+        """
+        if raw and any('*' in projected for projected in self.tag_to_projected_entity_dict.values()):
+            raise InputValidationError(
+                "The ORM instances (*) cannot be projected if the rows are returned raw, "
+                "project their columns or attributes instead")
+
     def all(self, batch_size=None):
         """
         Executes the full query with the order of the rows as returned by the backend.
@@ -2195,3 +2288,43 @@ class QueryBuilder(object):
         cls = kwargs.pop('cls', Node)
         self.append(cls=cls, ancestor_of=join_to, autotag=True, **kwargs)
         return self
+
+
+def get_keyset_filters(columns, values, descending=False):
+    """
+    Build the filters selecting the rows that come after a given row, when the
+    rows are ordered by the given columns (keyset, or seek, pagination).
+    Unlike an offset, the database does not have to go through the rows of
+    the previous pages, and no row is skipped or repeated if rows are added
+    in between.
+
+    Usage::
+
+        # The next 100 calculations, after the calculation with the given
+        # ctime and id
+        qb = QueryBuilder()
+        qb.append(Calculation, filters=get_keyset_filters(['ctime', 'id'], [ctime, pk]))
+        qb.order_by({Calculation: ['ctime', 'id']})
+        qb.limit(100)
+
+    :param columns: the list of the columns by which the rows are ordered, the
+        last one being unique (e.g. ['ctime', 'id'])
+    :param values: the values of the columns for the last row of the previous
+        page
+    :param descending: True if the rows are ordered by decreasing values
+    :returns: a filter specification, for the entity of the columns
+    """
+    if len(columns) != len(values):
+        raise InputValidationError("There must be a value for each column of the key")
+    operator = '<' if descending else '>'
+
+    # (c1 > v1) or (c1 == v1 and c2 > v2) or ...
+    alternatives = []
+    for index, column in enumerate(columns):
+        alternative = {previous: {'==': value} for previous, value in zip(columns[:index], values)}
+        alternative[column] = {operator: values[index]}
+        alternatives.append(alternative)
+
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return {'or': alternatives}
@@ -1,15 +1,23 @@
 # -*- coding: utf-8 -*-
+import hashlib
+import importlib
+import json
+import os
+import sys
 import traceback
-try:
-    from reentry import manager as epm
-except ImportError:
-    import pkg_resources as epm
+from collections import namedtuple
 
 from aiida.common.exceptions import MissingEntryPointError, MultipleEntryPointError, LoadingEntryPointError
 
 
 ENTRY_POINT_STRING_SEPARATOR = ':'
 
+# The folder, in the AiiDA configuration folder, of the files of the entry point index
+ENTRY_POINT_INDEX_FOLDER = 'entry_points'
+
+# The folder where reentry saves the entry points it scanned (by default)
+REENTRY_DATA_FOLDER = '~/.config/reentry/data'
+
 
 entry_point_group_to_module_path_map = {
     'aiida.calculations': 'aiida.orm.calculation.job',
@@ -26,6 +34,159 @@ entry_point_group_to_module_path_map = {
 }
 
 
+# The entry points of each group, as lists of [name, module_name, attrs], and the
+# list of all the groups (None until needed). The index is saved to a file, so
+# that new processes (each verdi command, each daemon worker) neither import
+# reentry or pkg_resources nor scan the installed distributions.
+_index = None
+
+# The groups (None for the list of groups) scanned in this process: an entry
+# point missing from a group of the saved index is only missing if the group
+# was scanned again
+_scanned_groups = set()
+
+# Incremented whenever the index changes, to invalidate what was derived from it
+_index_version = 0
+
+
+class IndexedEntryPoint(namedtuple('IndexedEntryPoint', ['group', 'name', 'module_name', 'attrs'])):
+    """
+    An entry point of the index, with the attributes and the load method of
+    the pkg_resources.EntryPoint
+    """
+
+    def load(self):
+        """
+        :return: the object registered at the entry point
+        :raises ImportError: if the object cannot be imported
+        """
+        loaded = importlib.import_module(self.module_name)
+        try:
+            for attr in self.attrs:
+                loaded = getattr(loaded, attr)
+        except AttributeError as exception:
+            raise ImportError("{} ({})".format(self, exception))
+        return loaded
+
+    def __str__(self):
+        return '{} = {}:{}'.format(self.name, self.module_name, '.'.join(self.attrs))
+
+
+def _get_entry_point_manager():
+    # Imported only when the index has to be built: both scan all the
+    # installed distributions when imported
+    try:
+        from reentry import manager as epm
+    except ImportError:
+        import pkg_resources as epm
+    return epm
+
+
+def _get_environment_paths():
+    """
+    The folders of sys.path where the distributions are installed: the first
+    one is the folder of the script or the current directory (the empty
+    string), that changes with every command and every file written to it
+    """
+    return [path for path in sys.path[1:] if path]
+
+
+def _get_index_path():
+    from aiida.common.setup import AIIDA_CONFIG_FOLDER
+
+    # A file for each python environment sharing the configuration folder
+    environment = hashlib.sha1(json.dumps([sys.executable, _get_environment_paths()])).hexdigest()
+    return os.path.join(os.path.expanduser(AIIDA_CONFIG_FOLDER), ENTRY_POINT_INDEX_FOLDER,
+                        '{}.json'.format(environment[:16]))
+
+
+def _get_index_signature():
+    """
+    The modification times of the folders of sys.path (but the one of the
+    script), that change when distributions are installed or removed, and of
+    the files of reentry, that change when the entry points are scanned by
+    reentry
+    """
+    reentry_folder = os.path.expanduser(REENTRY_DATA_FOLDER)
+    try:
+        reentry_paths = [os.path.join(reentry_folder, filename)
+                         for filename in sorted(os.listdir(reentry_folder))]
+    except OSError:
+        reentry_paths = []
+
+    signature = []
+    for path in _get_environment_paths() + reentry_paths:
+        try:
+            signature.append([path, os.stat(path).st_mtime])
+        except OSError:
+            pass
+    return signature
+
+
+def _get_index():
+    global _index
+    if _index is None:
+        try:
+            with open(_get_index_path()) as handle:
+                index = json.load(handle)
+            if index['signature'] != _get_index_signature():
+                raise ValueError('outdated index')
+            _index = {'groups': index['groups'], 'all_groups': index['all_groups']}
+        except (IOError, ValueError, KeyError, TypeError):
+            _index = {'groups': {}, 'all_groups': None}
+    return _index
+
+
+def _save_index():
+    index_path = _get_index_path()
+    tmp_path = '{}.{}.tmp'.format(index_path, os.getpid())
+    try:
+        if not os.path.isdir(os.path.dirname(index_path)):
+            os.makedirs(os.path.dirname(index_path))
+        with open(tmp_path, 'w') as handle:
+            json.dump(dict(_get_index(), signature=_get_index_signature()), handle)
+        os.rename(tmp_path, index_path)
+    except (IOError, OSError):
+        # The index is only an optimization
+        pass
+
+
+def _scan_group(group):
+    """
+    Update the index with the entry points currently registered in a group
+    """
+    global _index_version
+    entry_points = [[ep.name, ep.module_name, list(ep.attrs)]
+                    for ep in _get_entry_point_manager().iter_entry_points(group=group)]
+    _get_index()['groups'][group] = entry_points
+    _scanned_groups.add(group)
+    _index_version += 1
+    _save_index()
+
+
+def get_entry_point_index_version():
+    """
+    :return: a number that changes whenever the entry points are scanned again,
+        so that the objects loaded from them can be cached until then
+    """
+    return _index_version
+
+
+def reset_entry_point_index():
+    """
+    Forget the saved entry point index, e.g. after installing a plugin, so
+    that the entry points are scanned again
+    """
+    global _index, _index_version
+    _index = {'groups': {}, 'all_groups': None}
+    _scanned_groups.clear()
+    _index_version += 1
+    try:
+        os.remove(_get_index_path())
+    except OSError:
+        pass
+
+
 def load_entry_point(group, name):
     """
     Load the class registered under the entry point for a given name and group
@@ -39,8 +200,12 @@ def load_entry_point(group, name):
 
     try:
         loaded_entry_point = entry_point.load()
-    except ImportError as exception:
-        raise LoadingEntryPointError("Failed to load entry point '{}':\n{}".format(name, traceback.format_exc()))
+    except ImportError:
+        # The saved index may be outdated
+        if group in _scanned_groups:
+            raise LoadingEntryPointError("Failed to load entry point '{}':\n{}".format(name, traceback.format_exc()))
+        _scan_group(group)
+        return load_entry_point(group, name)
 
     return loaded_entry_point
 
@@ -80,7 +245,10 @@ def get_entry_points(group):
     :param group: the entry point group
     :return: a list of entry points
     """
-    return [ep for ep in epm.iter_entry_points(group=group)]
+    groups = _get_index()['groups']
+    if group not in groups:
+        _scan_group(group)
+    return [IndexedEntryPoint(group, *entry) for entry in groups[group]]
 
 
 def get_entry_point(group, name):
@@ -95,6 +263,11 @@ def get_entry_point(group, name):
     """
     entry_points = [ep for ep in get_entry_points(group) if ep.name == name]
 
+    # The saved index may be outdated
+    if not entry_points and group not in _scanned_groups:
+        _scan_group(group)
+        entry_points = [ep for ep in get_entry_points(group) if ep.name == name]
+
     if not entry_points:
         raise MissingEntryPointError("Entry point '{}' not found in group '{}'".format(name, group))
 
@@ -104,6 +277,20 @@ def get_entry_point(group, name):
     return entry_points[0]
 
 
+def get_entry_point_groups():
+    """
+    :return: the list of the groups of all the registered entry points
+    """
+    global _index_version
+    index = _get_index()
+    if index['all_groups'] is None:
+        index['all_groups'] = sorted(_get_entry_point_manager().get_entry_map().keys())
+        _scanned_groups.add(None)
+        _index_version += 1
+        _save_index()
+    return index['all_groups']
+
+
 def get_entry_point_from_class(class_module, class_name):
     """
     Given the module and name of a class, attempt to obtain the corresponding entry point if it exists
@@ -119,8 +306,8 @@ def get_entry_point_from_class(class_module, class_name):
         class_path = class_name[len(prefix):]
         class_module, class_name = class_path.rsplit('.', 1)
 
-    for group in epm.get_entry_map().keys():
-        for entry_point in epm.iter_entry_points(group):
+    for group in get_entry_point_groups():
+        for entry_point in get_entry_points(group):
 
             if entry_point.module_name != class_module:
                 continue
@@ -3,16 +3,25 @@ from collections import namedtuple, OrderedDict
 from aiida.common.exceptions import DbContentError, MissingPluginError
 from aiida.common.exceptions import MissingEntryPointError, MultipleEntryPointError, LoadingEntryPointError
 from aiida.plugins.entry_point import load_entry_point, get_entry_point_from_class, entry_point_group_to_module_path_map
+from aiida.plugins.entry_point import get_entry_point_index_version
 
 
 EntryPoint = namedtuple('EntryPoint', ['group', 'base_class'])
 
+# The classes loaded by load_plugin, by (plugin_type, safe), valid as long as
+# the entry point index does not change
+_plugin_classes = {}
+_plugin_classes_version = None
+
 
 def load_plugin(plugin_type, safe=False):
     """
     Load a plugin class from its plugin type, which is essentially its ORM type string
     minus the trailing period
 
+    The classes are cached for the whole process, until the entry points are
+    scanned again.
+
     :param plugin_type: the plugin type string
     :param safe: when set to True, will always attempt to return the base class closest to the plugin_type if
         the actual entry point is not recognized
@@ -20,6 +29,28 @@ def load_plugin(plugin_type, safe=False):
     :raises MissingPluginError: plugin_type could not be resolved to registered entry point
     :raises LoadingPluginFailed: the entry point matching the plugin_type could not be loaded
     """
+    global _plugin_classes_version
+
+    if _plugin_classes_version != get_entry_point_index_version():
+        _plugin_classes.clear()
+        _plugin_classes_version = get_entry_point_index_version()
+
+    try:
+        return _plugin_classes[plugin_type, safe]
+    except KeyError:
+        pass
+
+    plugin = _load_plugin(plugin_type, safe)
+    # Loading the plugin may have scanned the entry points again
+    if _plugin_classes_version == get_entry_point_index_version():
+        _plugin_classes[plugin_type, safe] = plugin
+    return plugin
+
+
+def _load_plugin(plugin_type, safe=False):
+    """
+    Load a plugin class from its plugin type, as load_plugin, with no caching
+    """
     from aiida.orm.code import Code
     from aiida.orm.calculation import Calculation
     from aiida.orm.calculation.job import JobCalculation
@@ -92,8 +92,15 @@ class AiidaApi(Api):
         from aiida.restapi.resources import Calculation, Computer, User, Code, Data, \
             Group, Node, StructureData, KpointsData, BandsData, UpfData, CifData, ServerInfo
 
+        from aiida.restapi.common.cache import get_cache
+
         self.app = app
 
+        # A single cache shared by all the resources (that are instantiated
+        # at each request)
+        if 'cache' not in kwargs:
+            kwargs['cache'] = get_cache(kwargs.get('cache_config', None))
+
         super(AiidaApi, self).__init__(app=app, prefix=kwargs['PREFIX'], catch_all_404s=True)
 
 
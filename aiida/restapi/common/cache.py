@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Cache of the values computed by the translators of the REST API (the total
+count and the results of a query, the statistics, the io tree), so that the
+same requests do not query the database again for some seconds.
+
+The backend is chosen by the cache_config dictionary of config.py:
+
+    CACHE_TYPE: 'null' (no caching), 'simple' (in-process LRU cache) or
+        'filesystem' (one file per value in CACHE_DIR, shared between the
+        processes serving the api)
+    CACHE_THRESHOLD: the maximum number of values in the cache
+    CACHE_DIR: the directory of the 'filesystem' cache
+
+and the time (in seconds) for which the values are valid by the
+CACHING_TIMEOUTS dictionary, for each resource.
+"""
+import cPickle as pickle
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from aiida.common.exceptions import ConfigurationError
+
+
+def make_cache_key(*parts):
+    """
+    Build the key of a value from the parameters it depends on (the label of
+    the translator, the kind of value, the query_help, ...): equal dictionaries
+    give the same key, whatever the order of their keys
+
+    :return: a string
+    """
+    from aiida.backends import settings
+
+    serialized = json.dumps([settings.AIIDADB_PROFILE] + list(parts),
+                            sort_keys=True, default=repr)
+    return hashlib.sha1(serialized).hexdigest()
+
+
+class BaseCache(object):
+    """
+    Interface of the caches
+    """
+
+    def get(self, key):
+        """
+        :return: the value stored with key, or None if there is none or it
+            has expired
+        """
+        raise NotImplementedError
+
+    def set(self, key, value, timeout):
+        """
+        Store a value
+
+        :param timeout: the number of seconds for which the value is valid
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """
+        Remove all the values
+        """
+        raise NotImplementedError
+
+
+class NullCache(BaseCache):
+    """
+    A cache that does not store anything
+    """
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, timeout):
+        pass
+
+    def clear(self):
+        pass
+
+
+class SimpleCache(BaseCache):
+    """
+    An in-process cache, that drops the least recently used values when it
+    is full. The values are not copied: they must not be modified.
+    """
+
+    def __init__(self, threshold=500):
+        self._threshold = threshold
+        self._values = OrderedDict()
+        # The api can be run with a thread per request
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                expires, value = self._values.pop(key)
+            except KeyError:
+                return None
+            if expires < time.time():
+                return None
+            # Move it to the end, as the most recently used
+            self._values[key] = (expires, value)
+            return value
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._values.pop(key, None)
+            while len(self._values) >= self._threshold:
+                self._values.popitem(last=False)
+            self._values[key] = (time.time() + timeout, value)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class FileSystemCache(BaseCache):
+    """
+    A cache storing each value in a file of a directory, so that it is
+    shared between the processes serving the api. When there are more than
+    threshold files, the expired ones are removed, then the oldest ones.
+    """
+
+    _suffix = '.cache'
+
+    def __init__(self, cache_dir, threshold=500):
+        self._cache_dir = os.path.expanduser(cache_dir)
+        self._threshold = threshold
+        try:
+            os.makedirs(self._cache_dir)
+        except OSError:
+            if not os.path.isdir(self._cache_dir):
+                raise
+
+    def _get_path(self, key):
+        return os.path.join(self._cache_dir, key + self._suffix)
+
+    def _list_files(self):
+        return [os.path.join(self._cache_dir, filename)
+                for filename in os.listdir(self._cache_dir)
+                if filename.endswith(self._suffix)]
+
+    def _prune(self):
+        paths = self._list_files()
+        if len(paths) < self._threshold:
+            return
+
+        now = time.time()
+        remaining = []
+        for path in paths:
+            try:
+                with open(path, 'rb') as handle:
+                    expires = pickle.load(handle)
+                if expires < now:
+                    os.remove(path)
+                else:
+                    remaining.append((os.path.getmtime(path), path))
+            except (IOError, OSError, EOFError, pickle.UnpicklingError):
+                pass
+
+        # Remove the oldest values, to make room for the new one
+        remaining.sort()
+        for _, path in remaining[:len(remaining) - self._threshold + 1]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get(self, key):
+        try:
+            with open(self._get_path(key), 'rb') as handle:
+                if pickle.load(handle) < time.time():
+                    return None
+                return pickle.load(handle)
+        except (IOError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def set(self, key, value, timeout):
+        self._prune()
+        # Write to a temporary file first, so that the other processes never
+        # read a partial value
+        handle, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self._cache_dir)
+        try:
+            with os.fdopen(handle, 'wb') as handle:
+                pickle.dump(time.time() + timeout, handle, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(value, handle, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_path, self._get_path(key))
+        except (IOError, OSError, pickle.PicklingError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for path in self._list_files():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def get_cache(cache_config=None):
+    """
+    Instantiate the cache described by cache_config (see the docstring of the
+    module)
+
+    :param cache_config: a dictionary, or None for no caching
+    :return: an instance of BaseCache
+    """
+    if not cache_config:
+        return NullCache()
+
+    cache_type = cache_config.get('CACHE_TYPE', 'null')
+    threshold = cache_config.get('CACHE_THRESHOLD', 500)
+
+    if cache_type == 'null':
+        return NullCache()
+    elif cache_type == 'simple':
+        return SimpleCache(threshold=threshold)
+    elif cache_type == 'filesystem':
+        try:
+            cache_dir = cache_config['CACHE_DIR']
+        except KeyError:
+            raise ConfigurationError("CACHE_DIR must be set for the "
+                                     "'filesystem' cache")
+        return FileSystemCache(cache_dir, threshold=threshold)
+    else:
+        raise ConfigurationError("Unknown CACHE_TYPE '{}', valid types are "
+                                 "'null', 'simple' and 'filesystem'".format(cache_type))
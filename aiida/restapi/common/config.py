@@ -44,19 +44,30 @@ DATETIME_FORMAT: allowed values are 'asinput' and 'default'.
 SERIALIZER_CONFIG = {'datetime_format': 'default'}
 
 """
-Caching configuration
+Caching configuration (see aiida/restapi/common/cache.py)
 
-memcached: backend caching system
+CACHE_TYPE: 'null' (no caching), 'simple' (in-process LRU cache) or
+'filesystem' (shared between processes, requires CACHE_DIR)
+CACHE_THRESHOLD: maximum number of cached values
+
+CACHING_TIMEOUTS: for how long (in seconds) the counts and the results of
+each resource are reused. A resource missing or set to 0 is not cached.
 """
-cache_config={'CACHE_TYPE': 'memcached'}
+cache_config = {'CACHE_TYPE': 'simple', 'CACHE_THRESHOLD': 1000}
 CACHING_TIMEOUTS = { #Caching TIMEOUTS (in seconds)
     'nodes': 10,
     'users': 10,
     'calculations': 10,
     'computers': 10,
-    'datas': 10,
+    'data': 10,
     'groups': 10,
     'codes': 10,
+    'structures': 10,
+    'kpoints': 10,
+    'bands': 10,
+    'upfs': 10,
+    'cifs': 10,
+    'statistics': 60,
 }
 
 """
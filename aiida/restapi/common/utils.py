@@ -233,7 +233,7 @@ class Utils(object):
                 return (resource_type, page, id, query_type)
 
     def validate_request(self, limit=None, offset=None, perpage=None, page=None,
-                         query_type=None, is_querystring_defined=False):
+                         query_type=None, is_querystring_defined=False, after=None):
         """
         Performs various checks on the consistency of the request.
         Add here all the checks that you want to do, except validity of the page
@@ -256,7 +256,11 @@ class Utils(object):
             raise RestValidationError("perpage key requires that a page is "
                                       "requested (i.e. the path must contain "
                                       "/page/)")
-        # 4. No querystring if query type = schema'
+        # 4. after (keyset pagination) incompatible with offset and pages
+        if after is not None and (offset is not None or page is not None):
+            raise RestValidationError("after key is incompatible with offset "
+                                      "and with requesting a specific page")
+        # 5. No querystring if query type = schema'
         if query_type in ('schema') and is_querystring_defined:
             raise RestInputValidationError("schema requests do not allow "
                                            "specifying a query string")
@@ -444,6 +448,37 @@ class Utils(object):
 
         return response
 
+    def make_conditional(self, response, last_modified=None):
+        """
+        Add the validators of the content of a response (the ETag header,
+        a hash of the content, and the Last-Modified header, if given), and
+        turn it into a "304 Not Modified" response with no content if the
+        request shows that the client already has this content
+        (If-None-Match or If-Modified-Since headers).
+
+        :param response: a Flask response object
+        :param last_modified: the modification time of the content
+            (datetime), e.g. the mtime of a node
+        :return: the Flask response object
+        """
+        from flask import request
+        import pytz
+
+        response.add_etag()
+
+        if last_modified is not None:
+            # HTTP dates are in UTC, with a precision of a second
+            if last_modified.tzinfo is not None:
+                last_modified = last_modified.astimezone(pytz.utc).replace(tzinfo=None)
+            response.last_modified = last_modified.replace(microsecond=0)
+
+        # to expose the ETag in cross-domain requests
+        expose_header = response.headers.get('Access-Control-Expose-Headers')
+        response.headers['Access-Control-Expose-Headers'] = ','.join(
+            ([expose_header] if expose_header else []) + ['ETag'])
+
+        return response.make_conditional(request)
+
     def build_datetime_filter(self, dt):
         """
         This function constructs a filter for a datetime object to be in a
@@ -500,6 +535,7 @@ class Utils(object):
         limit = None
         offset = None
         perpage = None
+        after = None
         alist = None
         nalist = None
         elist = None
@@ -541,6 +577,10 @@ class Utils(object):
             raise RestInputValidationError(
                 "You cannot specify perpage more than "
                 "once")
+        if 'after' in field_counts.keys() and field_counts['after'] > 1:
+            raise RestInputValidationError(
+                "You cannot specify after more than "
+                "once")
         if 'orderby' in field_counts.keys() and field_counts['orderby'] > 1:
             raise RestInputValidationError(
                 "You cannot specify orderby more than "
@@ -600,6 +640,13 @@ class Utils(object):
                     raise RestInputValidationError(
                         "only assignment operator '=' "
                         "is permitted after 'perpage'")
+            elif field[0] == 'after':
+                if field[1] == '=':
+                    after = field[2]
+                else:
+                    raise RestInputValidationError(
+                        "only assignment operator '=' "
+                        "is permitted after 'after'")
 
             elif field[0] == 'alist':
                 if field[1] == '=':
@@ -707,7 +754,7 @@ class Utils(object):
         #     limit = self.LIMIT_DEFAULT
 
         return (limit, offset, perpage, orderby, filters, alist, nalist, elist,
-                nelist, downloadformat, visformat, filename, rtype)
+                nelist, downloadformat, visformat, filename, rtype, after)
 
     def parse_query_string(self, query_string):
         """
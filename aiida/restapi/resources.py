@@ -81,8 +81,6 @@ class ServerInfo(Resource):
         return self.utils.build_response(status=200, headers=headers, data=data)
 
 
-## TODO add the caching support. I cache total count, results, and possibly
-# set_query
 class BaseResource(Resource):
     """
     Each derived class will instantiate a different type of translator.
@@ -118,7 +116,7 @@ class BaseResource(Resource):
         ## Parse request
         (resource_type, page, id, query_type) = self.utils.parse_path(path, parse_pk_uuid=self.parse_pk_uuid)
         (limit, offset, perpage, orderby, filters, _alist, _nalist, _elist, _nelist, _downloadformat, _visformat,
-         _filename, _rtype) = self.utils.parse_query_string(query_string)
+         _filename, _rtype, after) = self.utils.parse_query_string(query_string)
 
         ## Validate request
         self.utils.validate_request(
@@ -127,7 +125,8 @@ class BaseResource(Resource):
             perpage=perpage,
             page=page,
             query_type=query_type,
-            is_querystring_defined=(bool(query_string)))
+            is_querystring_defined=(bool(query_string)),
+            after=after)
 
         ## Treat the schema case which does not imply access to the DataBase
         if query_type == 'schema':
@@ -139,7 +138,7 @@ class BaseResource(Resource):
 
         else:
             ## Set the query, and initialize qb object
-            self.trans.set_query(filters=filters, orders=orderby, id=id)
+            self.trans.set_query(filters=filters, orders=orderby, id=id, after=after)
 
             ## Count results
             total_count = self.trans.get_total_count()
@@ -166,7 +165,8 @@ class BaseResource(Resource):
             query_string=request.query_string,
             resource_type=resource_type,
             data=results)
-        return self.utils.build_response(status=200, headers=headers, data=data)
+        response = self.utils.build_response(status=200, headers=headers, data=data)
+        return self.utils.make_conditional(response)
 
 
 class Node(Resource):
@@ -211,7 +211,7 @@ class Node(Resource):
         (resource_type, page, id, query_type) = self.utils.parse_path(path, parse_pk_uuid=self.parse_pk_uuid)
 
         (limit, offset, perpage, orderby, filters, alist, nalist, elist, nelist, downloadformat, visformat, filename,
-         rtype) = self.utils.parse_query_string(query_string)
+         rtype, after) = self.utils.parse_query_string(query_string)
 
         ## Validate request
         self.utils.validate_request(
@@ -220,7 +220,11 @@ class Node(Resource):
             perpage=perpage,
             page=page,
             query_type=query_type,
-            is_querystring_defined=(bool(query_string)))
+            is_querystring_defined=(bool(query_string)),
+            after=after)
+
+        # Modification time of the requested node, if any
+        last_modified = None
 
         ## Treat the schema case which does not imply access to the DataBase
         if query_type == 'schema':
@@ -234,7 +238,7 @@ class Node(Resource):
         ## Treat the statistics
         elif query_type == "statistics":
             (limit, offset, perpage, orderby, filters, alist, nalist, elist, nelist, downloadformat, visformat,
-             filename, rtype) = self.utils.parse_query_string(query_string)
+             filename, rtype, after) = self.utils.parse_query_string(query_string)
             headers = self.utils.build_headers(url=request.url, total_count=0)
             if filters:
                 usr = filters["user"]["=="]
@@ -260,11 +264,14 @@ class Node(Resource):
                 downloadformat=downloadformat,
                 visformat=visformat,
                 filename=filename,
-                rtype=rtype)
+                rtype=rtype,
+                after=after)
 
             ## Count results
             total_count = self.trans.get_total_count()
 
+            last_modified = self.trans.get_last_modified()
+
             ## Pagination (if required)
             if page is not None:
                 (limit, offset, rel_pages) = self.utils.paginate(page, perpage, total_count)
@@ -324,7 +331,8 @@ class Node(Resource):
             resource_type=resource_type,
             data=results)
 
-        return self.utils.build_response(status=200, headers=headers, data=data)
+        response = self.utils.build_response(status=200, headers=headers, data=data)
+        return self.utils.make_conditional(response, last_modified=last_modified)
 
 
 class Computer(BaseResource):
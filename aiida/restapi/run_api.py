@@ -178,7 +178,9 @@ def run_api(App, Api, *args, **kwargs):
     api_kwargs = dict(PREFIX=confs.PREFIX,
                       PERPAGE_DEFAULT=confs.PERPAGE_DEFAULT,
                       LIMIT_DEFAULT=confs.LIMIT_DEFAULT,
-                      custom_schema=confs.custom_schema)
+                      custom_schema=confs.custom_schema,
+                      cache_config=getattr(confs, 'cache_config', None),
+                      CACHING_TIMEOUTS=getattr(confs, 'CACHING_TIMEOUTS', {}))
     api = Api(app, **api_kwargs)
 
     # Check if the app has to be hooked-up or just returned
@@ -13,6 +13,7 @@ from aiida.common.exceptions import InputValidationError, InvalidOperation, \
     ConfigurationError
 from aiida.common.utils import get_object_from_string, issingular
 from aiida.orm.querybuilder import QueryBuilder
+from aiida.restapi.common.cache import make_cache_key
 from aiida.restapi.common.exceptions import RestValidationError, \
     RestInputValidationError
 from aiida.restapi.common.utils import pk_dbsynonym
@@ -98,6 +99,15 @@ class BaseTranslator(object):
         else:
             self.custom_schema = None
 
+        # Cache of the counts and results (see aiida.restapi.common.cache),
+        # and the timeouts of the resources
+        self.cache = kwargs.get('cache', None)
+        self.caching_timeouts = kwargs.get('CACHING_TIMEOUTS', {})
+
+        # limit and offset of the query, part of the key of the cached results
+        self._limit = None
+        self._offset = None
+
     def __repr__(self):
         """
         This function is required for the caching system to be able to compare
@@ -213,29 +223,44 @@ class BaseTranslator(object):
         self.qb.__init__(**self._query_help)
         self._is_qb_initialized = True
 
+    def get_cached(self, name, compute, key, timeout_label=None):
+        """
+        Return the value computed by compute(), taking it from the cache if
+        the same value was computed less than the timeout of the resource
+        ago.
+
+        :param name: the kind of value, e.g. 'count'
+        :param compute: a function with no arguments computing the value
+        :param key: what the value depends on (e.g. the query_help), anything
+            that can be serialized to json
+        :param timeout_label: the key of CACHING_TIMEOUTS giving the timeout
+            (default: the label of the translator)
+        :return: the value
+        """
+        timeout = self.caching_timeouts.get(timeout_label or self.__label__)
+        if self.cache is None or not timeout:
+            return compute()
+
+        cache_key = make_cache_key(self.__label__, name, key)
+        value = self.cache.get(cache_key)
+        if value is None:
+            value = compute()
+            self.cache.set(cache_key, value, timeout)
+        return value
+
     def count(self):
         """
         Count the number of rows returned by the query and set total_count
         """
         if self._is_qb_initialized:
-            self._total_count = self.qb.count()
+            # The count does not depend on projections and orderings
+            key = dict(path=self._query_help['path'],
+                       filters=self._query_help['filters'])
+            self._total_count = self.get_cached('count', self.qb.count, key)
         else:
             raise InvalidOperation("query builder object has not been "
                                    "initialized.")
 
-            # def caching_method(self):
-            #     """
-            #     class method for caching. It is a wrapper of the
-            # flask_cache memoize
-            #     method. To be used as a decorator
-            #     :return: the flask_cache memoize method with the timeout kwarg
-            #     corrispondent to the class
-            #     """
-            #     return cache.memoize()
-            #
-
-            #    @cache.memoize(timeout=CACHING_TIMEOUTS[self.__label__])
-
     def get_total_count(self):
         """
         Returns the number of rows of the query.
@@ -355,7 +380,7 @@ class BaseTranslator(object):
         for tag, columns in orders.iteritems():
             self._query_help['order_by'][tag] = def_order(columns)
 
-    def set_query(self, filters=None, orders=None, projections=None, id=None):
+    def set_query(self, filters=None, orders=None, projections=None, id=None, after=None):
         """
         Adds filters, default projections, order specs to the query_help,
         and initializes the qb object
@@ -365,6 +390,8 @@ class BaseTranslator(object):
         :param orders: dictionary with the projections
         :param id: id of a specific node
         :type id: int
+        :param after: if not None, the pk of a result: only the results
+            that come after it are returned (see set_keyset)
         """
 
         tagged_filters = {}
@@ -404,9 +431,61 @@ class BaseTranslator(object):
             tagged_orders = {self._result_type: orders}
             self.set_order(tagged_orders)
 
+        ## Add the keyset pagination
+        if after is not None:
+            self.set_keyset(after)
+
         ## Initialize the query_object
         self.init_qb()
 
+    def set_keyset(self, after):
+        """
+        Filter the results that come after a given one, in the order of the
+        results (keyset pagination): to get the next page of results, pass
+        the pk of the last result of a page. Unlike with offset, the
+        database does not go through the results of the previous pages.
+
+        The results must be ordered by id or by ctime (in either direction),
+        or not ordered, in which case they are ordered by id. The results with
+        the same ctime are ordered by id.
+
+        :param after: the pk of a result
+        """
+        from aiida.orm.querybuilder import get_keyset_filters
+
+        try:
+            after = int(after)
+        except (TypeError, ValueError):
+            raise RestInputValidationError("after must be the pk of a result")
+
+        tag = self._result_type
+        order = self._query_help['order_by'].get(tag) or {pk_dbsynonym: 'asc'}
+        if len(order) != 1 or order.keys()[0] not in (pk_dbsynonym, 'ctime'):
+            raise RestInputValidationError("after requires ordering the results "
+                                           "by id or by ctime")
+        column, direction = order.items()[0]
+        if column == 'ctime':
+            columns = ['ctime', pk_dbsynonym]
+        else:
+            columns = [pk_dbsynonym]
+        self._query_help['order_by'][tag] = [{column: direction} for column in columns]
+
+        # The values of the ordering columns for the given result
+        qb_type = [vertex['type'] for vertex in self._query_help['path']
+                   if vertex['label'] == tag][0]
+        qb = QueryBuilder()
+        qb.append(type=qb_type, filters={pk_dbsynonym: after}, project=columns)
+        key = qb.first()
+        if key is None:
+            raise RestInputValidationError("no result with pk {} was found, "
+                                           "cannot get the results after it".format(after))
+
+        keyset_filters = get_keyset_filters(columns, key, descending=(direction == 'desc'))
+        filters = self._query_help['filters'].get(tag)
+        if filters:
+            keyset_filters = {'and': [filters, keyset_filters]}
+        self._query_help['filters'][tag] = keyset_filters
+
     def get_query_help(self):
         """
         :return: return QB json dictionary
@@ -444,6 +523,9 @@ class BaseTranslator(object):
                 raise InputValidationError("Offset value must be an "
                                            "integer")
 
+        self._limit = limit
+        self._offset = offset
+
         if self._is_qb_initialized:
             if limit is not None:
                 self.qb.limit(limit)
@@ -501,7 +583,10 @@ class BaseTranslator(object):
             self.count()
 
         ## Retrieve data
-        data = self.get_formatted_result(self._result_type)
+        key = dict(query_help=self._query_help, limit=self._limit,
+                   offset=self._offset)
+        data = self.get_cached(
+            'results', lambda: self.get_formatted_result(self._result_type), key)
         return data
 
     def _check_id_validity(self, id):
@@ -44,6 +44,9 @@ class NodeTranslator(BaseTranslator):
     _filename = None
     _rtype = None
 
+    # The content types whose results are cached (the others return files)
+    _cached_content_types = ('attributes', 'extras', 'visualization')
+
 
     def __init__(self, Class=None, **kwargs):
         """
@@ -135,7 +138,7 @@ class NodeTranslator(BaseTranslator):
     def set_query(self, filters=None, orders=None, projections=None,
                   query_type=None, id=None, alist=None, nalist=None,
                   elist=None, nelist=None, downloadformat=None, visformat=None,
-                  filename=None, rtype=None):
+                  filename=None, rtype=None, after=None):
         """
         Adds filters, default projections, order specs to the query_help,
         and initializes the qb object
@@ -146,6 +149,8 @@ class NodeTranslator(BaseTranslator):
             if query_type=='attributes'/'extras'
         :param query_type: (string) specify the result or the content ("attr")
         :param id: (integer) id of a specific node
+        :param after: the pk of a node: only the results that come after it
+            are returned (see set_keyset)
         """
 
         ## Check the compatibility of query_type and id
@@ -175,7 +180,8 @@ class NodeTranslator(BaseTranslator):
         super(NodeTranslator, self).set_query(filters=filters,
                                               orders=orders,
                                               projections=projections,
-                                              id=id)
+                                              id=id,
+                                              after=after)
 
     def _get_content(self):
         """
@@ -470,19 +476,59 @@ class NodeTranslator(BaseTranslator):
         :return: either a list of nodes or the details of single node
             from the database
         """
-        if self._content_type is not None:
-            return self._get_content()
-        else:
+        if self._content_type is None:
             return super(NodeTranslator, self).get_results()
+        elif self._content_type in self._cached_content_types:
+            key = dict(query_help=self._query_help,
+                       content_type=self._content_type,
+                       alist=self._alist, nalist=self._nalist,
+                       elist=self._elist, nelist=self._nelist,
+                       visformat=self._visformat)
+            return self.get_cached('content', self._get_content, key)
+        else:
+            return self._get_content()
+
+    def get_last_modified(self):
+        """
+        Return the modification time of the node requested by its id, to be
+        sent in the Last-Modified header of the response
+
+        :return: a datetime, or None if no single node is requested
+        """
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.orm.node import Node
+
+        if not self._is_id_query or self._id_filter is None \
+                or self._result_type != self.__label__:
+            return None
+
+        qb = QueryBuilder()
+        qb.append(Node, filters=self._id_filter, project=['mtime'])
+        result = qb.first()
+        if result is None:
+            return None
+        return result[0]
 
     def get_statistics(self, user_email=None):
         "Return statistics for a given node"
         from aiida.backends.utils import QueryFactory
-        qmanager = QueryFactory()()
-        return qmanager.get_creation_statistics(user_email=user_email)
 
+        def compute():
+            qmanager = QueryFactory()()
+            return qmanager.get_creation_statistics(user_email=user_email)
+
+        return self.get_cached('statistics', compute, user_email,
+                               timeout_label='statistics')
 
     def get_io_tree(self, uuid_pattern):
+        """
+        Return the node identified by uuid_pattern with its inputs and outputs,
+        in the format of the graph visualization of the web front end
+        """
+        return self.get_cached('io_tree', lambda: self._get_io_tree(uuid_pattern),
+                               uuid_pattern)
+
+    def _get_io_tree(self, uuid_pattern):
         from aiida.orm.querybuilder import QueryBuilder
         from aiida.orm.node import Node
 
@@ -324,7 +324,24 @@ stderr:
         """
         raise NotImplementedError
 
-    def getJobs(self, jobs=None, user=None, as_dict=False):
+    def _iter_joblist_output(self, retval, stdout, stderr, job_ids=None):
+        """
+        Parse the joblist output incrementally, yielding the JobInfo object
+        of each job.
+
+        The plugins should override it to skip the jobs that are not in
+        job_ids before parsing their fields and building their JobInfo, and
+        implement _parse_joblist_output on top of it. By default, all the
+        jobs are parsed by _parse_joblist_output and filtered afterwards.
+
+        :param job_ids: None to yield all the jobs, or a set of job ids to
+            yield only those jobs
+        """
+        for job in self._parse_joblist_output(retval, stdout, stderr):
+            if job_ids is None or job.job_id in job_ids:
+                yield job
+
+    def getJobs(self, jobs=None, user=None, as_dict=False, filter_jobs=None):
         """
         Get the list of jobs and return it.
 
@@ -335,6 +352,10 @@ stderr:
         :param list as_dict: if False (default), a list of JobInfo objects is
              returned. If True, a dictionary is returned, having as key the
              job_id and as value the JobInfo object.
+        :param list filter_jobs: if not None, a list of job ids: only these
+             jobs are returned, the other jobs in the output of the scheduler
+             are skipped before being parsed. Use it to get only some of the
+             jobs when querying all the jobs of a user.
 
         Note: typically, only either jobs or user can be specified. See also
         comments in _get_joblist_command.
@@ -342,14 +363,17 @@ stderr:
         with self.transport:
             retval, stdout, stderr = self.transport.exec_command_wait(self._get_joblist_command(jobs=jobs, user=user))
 
-        joblist = self._parse_joblist_output(retval, stdout, stderr)
+        if filter_jobs is not None:
+            filter_jobs = set(filter_jobs)
+
+        joblist = self._iter_joblist_output(retval, stdout, stderr, job_ids=filter_jobs)
         if as_dict:
             jobdict = {j.job_id: j for j in joblist}
             if None in jobdict:
                 raise SchedulerError("Found at least one job without jobid")
             return jobdict
         else:
-            return joblist
+            return list(joblist)
 
     @property
     def transport(self):
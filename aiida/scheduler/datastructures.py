@@ -477,6 +477,31 @@ class JobInfo(DefaultFieldsAttributeDict):
                        'queue_name', 'wallclock_time_seconds', 'requested_wallclock_time_seconds', 'cpu_time',
                        'submission_time', 'dispatch_time', 'finish_time')
 
+    def __getattr__(self, attr):
+        """
+        Read a field as an attribute, returning None for the undefined default
+        fields.
+
+        Overridden, with __setattr__, to access the dictionary directly: the
+        scheduler plugins set many fields of each job they parse.
+        """
+        try:
+            return dict.__getitem__(self, attr)
+        except KeyError:
+            if attr in self._default_fields:
+                return None
+            raise AttributeError("'{}' object has no attribute '{}'".format(self.__class__.__name__, attr))
+
+    def __setattr__(self, attr, value):
+        """
+        Set a field as an attribute (the attributes starting with an
+        underscore are not fields).
+        """
+        if attr.startswith('_'):
+            object.__setattr__(self, attr, value)
+        else:
+            dict.__setitem__(self, attr, value)
+
     # If some fields require special serializers, specify them here.
     # You then need to define also the respective _serialize_FIELDTYPE and
     # _deserialize_FIELDTYPE methods
@@ -278,12 +278,13 @@ class DirectScheduler(aiida.scheduler.Scheduler):
 
         return job_list
 
-    def getJobs(self, jobs=None, user=None, as_dict=False):
+    def getJobs(self, jobs=None, user=None, as_dict=False, filter_jobs=None):
         """
         Overrides original method from DirectScheduler in order to list
         missing processes as DONE.
         """
-        job_stats = super(DirectScheduler, self).getJobs(jobs=jobs, user=user, as_dict=as_dict)
+        job_stats = super(DirectScheduler, self).getJobs(jobs=jobs, user=user, as_dict=as_dict,
+                                                         filter_jobs=filter_jobs)
 
         found_jobs = []
         # Get the list of known jobs
@@ -293,6 +294,8 @@ class DirectScheduler(aiida.scheduler.Scheduler):
             found_jobs = [j.job_id for j in job_stats]
         # Now check if there are any the user requested but were not found
         not_found_jobs = list(set(jobs) - set(found_jobs)) if jobs else []
+        if filter_jobs is not None:
+            not_found_jobs = [job_id for job_id in not_found_jobs if job_id in filter_jobs]
 
         for job_id in not_found_jobs:
             job = JobInfo()
@@ -499,6 +499,16 @@ fi
             in the qstat output; missing jobs (for whatever reason) simply
             will not appear here.
         """
+        return list(self._iter_joblist_output(retval, stdout, stderr))
+
+    def _iter_joblist_output(self, retval, stdout, stderr, job_ids=None):
+        """
+        Parse the queue output string line by line, yielding the JobInfo
+        object of each job (see _parse_joblist_output).
+
+        :param job_ids: None to yield all the jobs, or a set of job ids: the
+            lines of the other jobs are skipped before their fields are parsed
+        """
         num_fields = len(self._joblist_fields)
 
         if retval != 0:
@@ -508,23 +518,26 @@ fi
                                  "retval={}\n"
                                  "stdout={}\nstderr={}".format(retval, stdout, stderr))
 
-        # will contain raw data parsed from output: only lines with the
-        # separator, and already split in fields
+        # Only the lines with the separator are parsed, one at a time, and
+        # split in fields.
         # I put num_fields, because in this way
         # if the symbol _field_separator appears in the title (that is
         # the last field), I don't split the title.
         # This assumes that _field_separator never
         # appears in any previous field.
-        jobdata_raw = [l.split(_field_separator, num_fields) for l in stdout.splitlines() if _field_separator in l]
+        for line in stdout.splitlines():
+            if _field_separator not in line:
+                continue
+            job = line.split(_field_separator, num_fields)
 
-        # Create dictionary and parse specific fields
-        job_list = []
-        for job in jobdata_raw:
+            # Skip the jobs that were not requested before parsing the line
+            if job_ids is not None and job[0] not in job_ids:
+                continue
 
             # Each job should have all fields.
             if len(job) != num_fields:
                 # I skip this calculation
-                # (I don't append anything to job_list before continuing)
+                # (I don't yield anything before continuing)
                 self.logger.error("Wrong line length in squeue output! '{}'" "".format(job))
                 continue
 
@@ -632,10 +645,8 @@ fi
                                       "expected number of nodes ({})!".format(
                                           len(this_job.allocated_machines), this_job.num_machines))
 
-            # I append to the list of jobs to return
-            job_list.append(this_job)
-
-        return job_list
+            # I yield the job to the caller
+            yield this_job
 
     def _parse_submit_output(self, retval, stdout, stderr):
         """
@@ -342,6 +342,16 @@ class PbsBaseClass(object):
             in the qstat output; missing jobs (for whatever reason) simply
             will not appear here.
         """
+        return list(self._iter_joblist_output(retval, stdout, stderr))
+
+    def _iter_joblist_output(self, retval, stdout, stderr, job_ids=None):
+        """
+        Parse the queue output string job by job, yielding the JobInfo
+        object of each job (see _parse_joblist_output).
+
+        :param job_ids: None to yield all the jobs, or a set of job ids: the
+            lines of the other jobs are skipped without being parsed
+        """
         # I don't raise because if I pass a list of jobs, I get a non-zero status
         # if one of the job is not in the list anymore
 
@@ -365,53 +375,8 @@ class PbsBaseClass(object):
             if retval != 0:
                 raise SchedulerError("Error during qstat parsing (_parse_joblist_output function)")
 
-        jobdata_raw = []  # will contain raw data parsed from qstat output
-        # Get raw data and split in lines
-        for line_num, l in enumerate(stdout.split('\n'), start=1):
-            # Each new job stanza starts with the string 'Job Id:': I
-            # create a new item in the jobdata_raw list
-            if l.startswith('Job Id:'):
-                jobdata_raw.append({'id': l.split(':', 1)[1].strip(), 'lines': [], 'warning_lines_idx': []})
-                # warning_lines_idx: lines that do not start either with
-                # tab or space
-            else:
-                if l.strip():
-                    # This is a non-empty line, therefore it is an attribute
-                    # of the last job found
-                    if not jobdata_raw:
-                        # The list is still empty! (This means that I found a
-                        # non-empty line, before finding the first 'Job Id:'
-                        # string: it is an error. However this may happen
-                        # only before the first job.
-                        raise SchedulerParsingError("I did not find the header for the first job")
-                        #self.logger.warning("I found some text before the "
-                        #"first job: {}".format(l))
-                    else:
-                        if l.startswith(' '):
-                            # If it starts with a space, it is a new field
-                            jobdata_raw[-1]['lines'].append(l)
-                        elif l.startswith('\t'):
-                            # If a line starts with a TAB,
-                            # I append to the previous string
-                            # stripping the TAB
-                            if not jobdata_raw[-1]['lines']:
-                                raise SchedulerParsingError("Line {} is the first line of the job, but it "
-                                                            "starts with a TAB! ({})".format(line_num, l))
-                            jobdata_raw[-1]['lines'][-1] += l[1:]
-                        else:
-                            #raise SchedulerParsingError(
-                            #    "Wrong starting character at line {}! ({})"
-                            #    "".format(line_num, l))
-                            ## For some reasons, the output of 'comment' and
-                            ## 'Variable_List', for instance, can have
-                            ## newlines if they are included... # I do a
-                            ## workaround
-                            jobdata_raw[-1]['lines'][-1] += "\n{}".format(l)
-                            jobdata_raw[-1]['warning_lines_idx'].append(len(jobdata_raw[-1]['lines']) - 1)
-
         # Create dictionary and parse specific fields
-        job_list = []
-        for job in jobdata_raw:
+        for job in self._iter_job_stanzas(stdout, job_ids=job_ids):
             this_job = JobInfo()
             this_job.job_id = job['id']
 
@@ -619,10 +584,70 @@ class PbsBaseClass(object):
             # Everything goes here anyway for debugging purposes
             this_job.raw_data = raw_data
 
-            # I append to the list of jobs to return
-            job_list.append(this_job)
+            # I yield the job to the caller
+            yield this_job
+
+    def _iter_job_stanzas(self, stdout, job_ids=None):
+        """
+        Split the output of qstat -f in the stanzas of the jobs, yielding
+        each of them as a dictionary with the job 'id', its 'lines' (the lines
+        continued with a TAB being joined) and the 'warning_lines_idx' (the
+        indices of the lines that did not start with a space or a TAB).
+
+        :param job_ids: None to yield all the jobs, or a set of job ids: the
+            lines of the other jobs are skipped without being parsed
+        """
+        job = None
+        skipping = False
+        # Split in lines
+        for line_num, l in enumerate(stdout.split('\n'), start=1):
+            # Each new job stanza starts with the string 'Job Id:': I
+            # yield the previous one and start a new one
+            if l.startswith('Job Id:'):
+                if job is not None:
+                    yield job
+                job_id = l.split(':', 1)[1].strip()
+                skipping = job_ids is not None and job_id not in job_ids
+                if skipping:
+                    job = None
+                else:
+                    job = {'id': job_id, 'lines': [], 'warning_lines_idx': []}
+                    # warning_lines_idx: lines that do not start either with
+                    # tab or space
+            elif skipping:
+                continue
+            else:
+                if l.strip():
+                    # This is a non-empty line, therefore it is an attribute
+                    # of the last job found
+                    if job is None:
+                        # No job was found yet! (This means that I found a
+                        # non-empty line, before finding the first 'Job Id:'
+                        # string: it is an error. However this may happen
+                        # only before the first job.
+                        raise SchedulerParsingError("I did not find the header for the first job")
+                    else:
+                        if l.startswith(' '):
+                            # If it starts with a space, it is a new field
+                            job['lines'].append(l)
+                        elif l.startswith('\t'):
+                            # If a line starts with a TAB,
+                            # I append to the previous string
+                            # stripping the TAB
+                            if not job['lines']:
+                                raise SchedulerParsingError("Line {} is the first line of the job, but it "
+                                                            "starts with a TAB! ({})".format(line_num, l))
+                            job['lines'][-1] += l[1:]
+                        else:
+                            ## For some reasons, the output of 'comment' and
+                            ## 'Variable_List', for instance, can have
+                            ## newlines if they are included... # I do a
+                            ## workaround
+                            job['lines'][-1] += "\n{}".format(l)
+                            job['warning_lines_idx'].append(len(job['lines']) - 1)
 
-        return job_list
+        if job is not None:
+            yield job
 
     def _convert_time(self, string):
         """
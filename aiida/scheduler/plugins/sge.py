@@ -293,6 +293,22 @@ class SgeScheduler(aiida.scheduler.Scheduler):
         return submit_command
 
     def _parse_joblist_output(self, retval, stdout, stderr):
+        """
+        Parse the queue output string (the XML output of qstat), as returned
+        by executing the command returned by _get_joblist_command command.
+
+        Return a list of JobInfo objects, one of each job.
+        """
+        return list(self._iter_joblist_output(retval, stdout, stderr))
+
+    def _iter_joblist_output(self, retval, stdout, stderr, job_ids=None):
+        """
+        Parse the queue output string job by job, yielding the JobInfo
+        object of each job (see _parse_joblist_output).
+
+        :param job_ids: None to yield all the jobs, or a set of job ids: the
+            fields of the other jobs are not parsed
+        """
         import xml.dom.minidom
 
         if retval != 0:
@@ -346,17 +362,13 @@ class SgeScheduler(aiida.scheduler.Scheduler):
         jobs = [i for i in first_child.getElementsByTagName('job_list')]
         #jobs = [i for i in jobinfo.getElementsByTagName('job_list')]
         #print [i[0].childNodes[0].data for i in job_numbers if i]
-        joblist = []
         for job in jobs:
             this_job = JobInfo()
 
-            #In case the user needs more information the xml-data for
-            #each job is stored:
-            this_job.raw_data = job.toxml()
-
             try:
-                job_element = job.getElementsByTagName('JB_job_number').pop(0)
-                element_child = job_element.childNodes.pop(0)
+                # The job number is left in the xml-data stored below
+                job_element = job.getElementsByTagName('JB_job_number')[0]
+                element_child = job_element.childNodes[0]
                 this_job.job_id = str(element_child.data).strip()
                 if not this_job.job_id:
                     raise SchedulerError
@@ -371,6 +383,15 @@ class SgeScheduler(aiida.scheduler.Scheduler):
                                   ,stdout))
                 raise IndexError("Error in sge._parse_joblist_output:" "no job id is given")
 
+            # Skip the jobs that were not requested before parsing the other
+            # fields
+            if job_ids is not None and this_job.job_id not in job_ids:
+                continue
+
+            #In case the user needs more information the xml-data for
+            #each job is stored:
+            this_job.raw_data = job.toxml()
+
             try:
                 job_element = job.getElementsByTagName('state').pop(0)
                 element_child = job_element.childNodes.pop(0)
@@ -440,9 +461,7 @@ class SgeScheduler(aiida.scheduler.Scheduler):
                 except IndexError:
                     self.logger.warning("No 'slots' field for job " "id {}".format(this_job.job_id))
 
-            joblist.append(this_job)
-        #self.logger.debug("joblist final: {}".format(joblist))
-        return joblist
+            yield this_job
 
     def _parse_submit_output(self, retval, stdout, stderr):
         """
@@ -450,6 +450,16 @@ class SlurmScheduler(aiida.scheduler.Scheduler):
             in the qstat output; missing jobs (for whatever reason) simply
             will not appear here.
         """
+        return list(self._iter_joblist_output(retval, stdout, stderr))
+
+    def _iter_joblist_output(self, retval, stdout, stderr, job_ids=None):
+        """
+        Parse the queue output string line by line, yielding the JobInfo
+        object of each job (see _parse_joblist_output).
+
+        :param job_ids: None to yield all the jobs, or a set of job ids: the
+            lines of the other jobs are skipped before their fields are parsed
+        """
         num_fields = len(self.fields)
 
         # I don't raise because if I pass a list of jobs,
@@ -468,18 +478,22 @@ class SlurmScheduler(aiida.scheduler.Scheduler):
             if retval != 0:
                 raise SchedulerError("Error during squeue parsing (_parse_joblist_output function)")
 
-        # will contain raw data parsed from output: only lines with the
-        # separator, and already split in fields
+        # Only the lines with the separator are parsed, one at a time, and
+        # split in fields.
         # I put num_fields, because in this way
         # if the symbol _field_separator appears in the title (that is
         # the last field), I don't split the title.
         # This assumes that _field_separator never
         # appears in any previous field.
-        jobdata_raw = [l.split(_field_separator, num_fields) for l in stdout.splitlines() if _field_separator in l]
+        job_id_index = [field[1] for field in self.fields].index('job_id')
+        for line in stdout.splitlines():
+            if _field_separator not in line:
+                continue
+            job = line.split(_field_separator, num_fields)
 
-        # Create dictionary and parse specific fields
-        job_list = []
-        for job in jobdata_raw:
+            # Skip the jobs that were not requested before parsing the line
+            if job_ids is not None and (len(job) <= job_id_index or job[job_id_index] not in job_ids):
+                continue
 
             thisjob_dict = {k[1]: v for k, v in zip(self.fields, job)}
 
@@ -491,7 +505,7 @@ class SlurmScheduler(aiida.scheduler.Scheduler):
                 job_state_raw = thisjob_dict['state_raw']
             except KeyError:
                 # I skip this calculation if I couldn't find this basic info
-                # (I don't append anything to job_list before continuing)
+                # (I don't yield anything before continuing)
                 self.logger.error("Wrong line length in squeue output! '{}'" "".format(job))
                 continue
 
@@ -532,9 +546,9 @@ class SlurmScheduler(aiida.scheduler.Scheduler):
                 # Also print a warning
                 self.logger.warning("Wrong line length in squeue output!"
                                     "Skipping optional fields. Line: '{}'"
-                                    "".format(jobdata_raw))
-                # I append this job before continuing
-                job_list.append(this_job)
+                                    "".format(job))
+                # I yield this job before continuing
+                yield this_job
                 continue
 
             # TODO: store executing_host?
@@ -604,10 +618,8 @@ class SlurmScheduler(aiida.scheduler.Scheduler):
                                       "expected number of nodes ({})!".format(
                                           len(this_job.allocated_machines), this_job.num_machines))
 
-            # I append to the list of jobs to return
-            job_list.append(this_job)
-
-        return job_list
+            # I yield the job to the caller
+            yield this_job
 
     def _convert_time(self, string):
         """
@@ -113,6 +113,21 @@ class TestParserBjobs(unittest.TestCase):
         # Important to enable again logs!
         logging.disable(logging.NOTSET)
 
+    def test_parse_joblist_output_filter_jobs(self):
+        """
+        Test that only the requested jobs are parsed from the bjobs output
+        """
+        s = LsfScheduler()
+
+        job_ids = set(['764254593', '764245175', '123456'])
+        job_list = list(s._iter_joblist_output(0, bjobs_stdout_to_test, '', job_ids=job_ids))
+        self.assertEquals([j.job_id for j in job_list], ['764254593', '764245175'])
+
+        # The jobs are parsed as without the filter
+        all_jobs = {j.job_id: j for j in s._parse_joblist_output(0, bjobs_stdout_to_test, '')}
+        for j in job_list:
+            self.assertEquals(j, all_jobs[j.job_id])
+
 
 class TestSubmitScript(unittest.TestCase):
 
@@ -867,6 +867,21 @@ class TestParserQstat(unittest.TestCase):
                 self.assertTrue(j.num_cpus == num_cpus)
                 # TODO : parse the env_vars
 
+    def test_parse_joblist_output_filter_jobs(self):
+        """
+        Test that only the requested jobs are parsed from the qstat -f output
+        """
+        s = PbsproScheduler()
+
+        job_ids = set(['69301.mycluster', '74164.mycluster', '12345.mycluster'])
+        job_list = list(s._iter_joblist_output(0, text_qstat_f_to_test, '', job_ids=job_ids))
+        self.assertEquals([j.job_id for j in job_list], ['69301.mycluster', '74164.mycluster'])
+
+        # The jobs are parsed as without the filter
+        all_jobs = {j.job_id: j for j in s._parse_joblist_output(0, text_qstat_f_to_test, '')}
+        for j in job_list:
+            self.assertEquals(j, all_jobs[j.job_id])
+
 
 # TODO: WHEN WE USE THE CORRECT ERROR MANAGEMENT, REIMPLEMENT THIS TEST
 #        def test_parse_with_error_retval(self):
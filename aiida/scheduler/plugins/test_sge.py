@@ -293,6 +293,14 @@ class TestCommand(unittest.TestCase):
             job_list_raise = sge._parse_joblist_output(retval, stdout, stderr)
         logging.disable(logging.NOTSET)
 
+    def test_parse_joblist_output_filter_jobs(self):
+        sge = SgeScheduler()
+
+        job_ids = set(['1212299', '123456'])
+        job_list = list(sge._iter_joblist_output(0, text_qstat_ext_urg_xml_test, '', job_ids=job_ids))
+        self.assertEquals([j.job_id for j in job_list], ['1212299'])
+        self.assertEquals(job_list[0].raw_data, test_raw_data)
+
     def test_submit_script(self):
         """
         """
@@ -95,6 +95,21 @@ class TestParserSqueue(unittest.TestCase):
         #                self.assertTrue( j.num_machines==num_machines )
         #                self.assertTrue( j.num_mpiprocs==num_mpiprocs )
 
+    def test_parse_joblist_output_filter_jobs(self):
+        """
+        Test that only the requested jobs are parsed from the squeue output
+        """
+        s = SlurmScheduler()
+
+        job_ids = set(['863100', '863553', '123456'])
+        job_list = list(s._iter_joblist_output(0, text_squeue_to_test, '', job_ids=job_ids))
+        self.assertEquals([j.job_id for j in job_list], ['863100', '863553'])
+
+        # The jobs are parsed as without the filter
+        all_jobs = {j.job_id: j for j in s._parse_joblist_output(0, text_squeue_to_test, '')}
+        for j in job_list:
+            self.assertEquals(j, all_jobs[j.job_id])
+
 
 class TestTimes(unittest.TestCase):
 
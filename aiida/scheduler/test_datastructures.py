@@ -71,3 +71,32 @@ class TestNodeNumberJobResource(unittest.TestCase):
 
         with self.assertRaises(ValueError):
             _ = NodeNumberJobResource(num_mpiprocs_per_machine=8, tot_num_mpiprocs=15)
+
+
+class TestJobInfo(unittest.TestCase):
+
+    def test_fields_as_attributes(self):
+        """
+        Test the access to the fields of a JobInfo as attributes
+        """
+        from aiida.scheduler.datastructures import JobInfo, job_states
+
+        job_info = JobInfo()
+        job_info.job_id = '12345'
+        job_info.job_state = job_states.RUNNING
+        job_info.raw_data = ['12345', 'R']
+
+        self.assertEquals(job_info['job_id'], '12345')
+        self.assertEquals(job_info.job_state, job_states.RUNNING)
+        self.assertEquals(job_info.raw_data, ['12345', 'R'])
+        self.assertEquals(job_info.extrakeys(), ['raw_data'])
+
+        # Undefined default fields are None, other attributes do not exist
+        self.assertIsNone(job_info.title)
+        with self.assertRaises(AttributeError):
+            _ = job_info.not_a_field
+
+        # The fields are serialized
+        loaded = JobInfo()
+        loaded.load_from_serialized(job_info.serialize())
+        self.assertEquals(loaded, job_info)
@@ -7,7 +7,7 @@
 # For further information on the license, see the LICENSE.txt file        #
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
-from stat import S_ISDIR, S_ISREG
+from stat import S_ISDIR, S_ISLNK, S_ISREG
 import StringIO
 
 import aiida.transport.transport
@@ -88,6 +88,12 @@ class SshTransport(aiida.transport.Transport):
     # This should be incremented to 30, probably.
     _DEFAULT_SAFE_OPEN_INTERVAL = 5.
 
+    # Number of remote files that are opened and read at the same time over the SFTP channel by get_many
+    _GET_PIPELINE_WINDOW = 16
+
+    # Size of the chunks in which files are written locally by get_many
+    _GET_CHUNK_SIZE = 32768
+
     @classmethod
     def _convert_username_fromstring(cls, string):
         """
@@ -461,7 +467,8 @@ class SshTransport(aiida.transport.Transport):
         if self._is_open:
             raise InvalidOperation("Cannot open the transport twice")
         # Open a SSHClient
-        connection_arguments = self._connect_args
+        # Copy the arguments, as they are modified below and the transport may be opened again after being closed
+        connection_arguments = dict(self._connect_args)
         proxystring = connection_arguments.pop('proxy_command', None)
         if proxystring is not None:
             proxy = _DetachedProxyCommand(proxystring)
@@ -500,6 +507,22 @@ class SshTransport(aiida.transport.Transport):
         self._client.close()
         self._is_open = False
 
+    def is_alive(self):
+        """
+        Check that both the SSH connection and the SFTP channel are still active.
+
+        :return: True if the transport is open and the connection is usable, False otherwise
+        """
+        if not self._is_open:
+            return False
+
+        ssh_transport = self._client.get_transport()
+        if ssh_transport is None or not ssh_transport.is_active():
+            return False
+
+        channel = self._sftp.get_channel()
+        return channel is not None and not channel.closed
+
     @property
     def sshclient(self):
         if not self._is_open:
@@ -1046,6 +1069,112 @@ class SshTransport(aiida.transport.Transport):
             else:
                 self.getfile(os.path.join(remotepath, item), os.path.join(dest, item))
 
+    def get_many(self, remote_local_pairs, ignore_nonexisting=False):
+        """
+        Retrieve several files or folders from remote to local, with the same
+        semantics as calling :meth:`get` on each pair in turn.
+
+        The remote folders are listed once (one request per directory) to build
+        the full list of files with their sizes, after which the files are
+        transferred in windows of ``_GET_PIPELINE_WINDOW``: all the files of a
+        window are opened and their reads are queued on the SFTP channel at once,
+        so that the transfers overlap instead of costing several round trips each.
+
+        :param remote_local_pairs: a list of tuples (remotepath, localpath), where each
+            localpath must be an absolute path
+        :param ignore_nonexisting: if True, remote paths that do not exist are skipped
+        :raise ValueError: if a local path is invalid
+        :raise IOError: if a remote path is not found and ignore_nonexisting is False
+        """
+        to_copy = []
+
+        for remotepath, localpath in remote_local_pairs:
+            if not os.path.isabs(localpath):
+                raise ValueError("The localpath must be an absolute path")
+
+            if self.has_magic(remotepath):
+                # Patterns are rare in retrieve lists: let get deal with their special semantics
+                self.get(remotepath, localpath, ignore_nonexisting=ignore_nonexisting)
+                continue
+
+            try:
+                attributes = self.sftp.stat(remotepath)
+            except IOError:
+                if ignore_nonexisting:
+                    continue
+                raise IOError("The remote path {} does not exist".format(remotepath))
+
+            if os.path.isdir(localpath):
+                localpath = os.path.join(localpath, os.path.split(remotepath)[1])
+
+            if S_ISDIR(attributes.st_mode):
+                if os.path.isfile(localpath):
+                    raise OSError("Cannot copy a directory into a file")
+                to_copy.extend(self._list_tree_files(remotepath, localpath))
+            else:
+                to_copy.append((remotepath, localpath, attributes.st_size))
+
+        for start in range(0, len(to_copy), self._GET_PIPELINE_WINDOW):
+            self._get_files_pipelined(to_copy[start:start + self._GET_PIPELINE_WINDOW])
+
+    def _list_tree_files(self, remotepath, localpath):
+        """
+        Walk a remote folder, creating the corresponding local folders.
+
+        :return: a list of tuples (remote file path, local file path, size)
+        """
+        files = []
+
+        if not os.path.isdir(localpath):
+            os.makedirs(localpath)
+
+        for attributes in self.sftp.listdir_attr(remotepath):
+            remote_item = os.path.join(remotepath, attributes.filename)
+            local_item = os.path.join(localpath, attributes.filename)
+
+            # The attributes of the listing are those of the links themselves: dereference them
+            if S_ISLNK(attributes.st_mode):
+                attributes = self.sftp.stat(remote_item)
+
+            if S_ISDIR(attributes.st_mode):
+                files.extend(self._list_tree_files(remote_item, local_item))
+            else:
+                files.append((remote_item, local_item, attributes.st_size))
+
+        return files
+
+    def _get_files_pipelined(self, files):
+        """
+        Transfer a list of remote files whose sizes are known, prefetching all of them at once.
+
+        :param files: a list of tuples (remote file path, local file path, size)
+        """
+        handles = []
+        try:
+            for remotepath, localpath, size in files:
+                handle = self.sftp.open(remotepath, 'rb')
+                handles.append((handle, localpath))
+                handle.prefetch(size)
+
+            for handle, localpath in handles:
+                try:
+                    with open(localpath, 'wb') as localfile:
+                        while True:
+                            data = handle.read(self._GET_CHUNK_SIZE)
+                            if not data:
+                                break
+                            localfile.write(data)
+                except IOError:
+                    # Do not leave partially written files around
+                    try:
+                        os.remove(localpath)
+                    except OSError:
+                        pass
+                    raise
+        finally:
+            for handle, _ in handles:
+                handle.close()
+
     def get_attribute(self, path):
         """
         Returns the object Fileattribute, specified in aiida.transport
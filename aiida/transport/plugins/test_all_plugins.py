@@ -1092,6 +1092,60 @@ class TestPutGetTree(unittest.TestCase):
             t.chdir('..')
             t.rmtree(directory)
 
+    @run_for_all_plugins
+    def test_get_many(self, custom_transport):
+        """
+        test of the retrieval of several files and folders at once
+        """
+        import os
+        import random
+        import string, shutil
+
+        local_dir = os.path.join('/', 'tmp')
+        remote_dir = local_dir
+        directory = 'tmp_try'
+
+        with custom_transport as t:
+            t.chdir(remote_dir)
+
+            while os.path.exists(os.path.join(local_dir, directory)):
+                # I append a random letter/number until it is unique
+                directory += random.choice(string.ascii_uppercase + string.digits)
+
+            t.mkdir(directory)
+            t.chdir(directory)
+
+            local_base_dir = os.path.join(local_dir, directory, 'local')
+            local_destination = os.path.join(local_dir, directory, 'destination')
+            os.mkdir(local_base_dir)
+            os.mkdir(os.path.join(local_base_dir, 'sub'))
+            os.mkdir(local_destination)
+
+            text = 'Viva Verdi\n'
+            for filename in ['a.txt', 'b.tmp', os.path.join('sub', 'c.txt')]:
+                with open(os.path.join(local_base_dir, filename), 'w') as f:
+                    f.write(text)
+
+            t.get_many([
+                (os.path.join('local', 'a.txt'), os.path.join(local_destination, 'a.txt')),
+                ('local', os.path.join(local_destination, 'tree')),
+                (os.path.join('local', 'non_existing'), os.path.join(local_destination, 'non_existing')),
+            ], ignore_nonexisting=True)
+
+            self.assertEquals(set(['a.txt', 'tree']), set(os.listdir(local_destination)))
+            self.assertEquals(set(['a.txt', 'b.tmp', 'sub']), set(os.listdir(os.path.join(local_destination, 'tree'))))
+            with open(os.path.join(local_destination, 'tree', 'sub', 'c.txt')) as f:
+                self.assertEquals(f.read(), text)
+
+            with self.assertRaises(IOError):
+                t.get_many([(os.path.join('local', 'non_existing'), os.path.join(local_destination, 'x'))])
+
+            shutil.rmtree(local_destination)
+
+            # exit
+            t.chdir('..')
+            t.rmtree(directory)
+
     @run_for_all_plugins
     def test_put_get_abs_path(self, custom_transport):
         """
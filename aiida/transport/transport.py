@@ -36,6 +36,7 @@ class Transport(object):
         self._logger = aiida.common.aiidalogger.getChild('transport').getChild(self.__class__.__name__)
 
         self._logger_extra = None
+        self._is_open = False
         self._enters = 0
 
     def __enter__(self):
@@ -82,6 +83,23 @@ class Transport(object):
         """
         raise NotImplementedError
 
+    @property
+    def is_open(self):
+        """
+        :return: True if the transport channel is open, False otherwise
+        """
+        return self._is_open
+
+    def is_alive(self):
+        """
+        Check whether the open transport channel is still usable, e.g. that the
+        connection was not dropped by the remote end.  Plugins that connect to a
+        remote machine should override this with an actual check.
+
+        :return: True if the transport is open and usable, False otherwise
+        """
+        return self.is_open
+
     def __repr__(self):
         return '<{}: {}>'.format(self.__class__.__name__, str(self))
 
@@ -361,6 +379,21 @@ class Transport(object):
         """
         raise NotImplementedError
 
+    def get_many(self, remote_local_pairs, ignore_nonexisting=False):
+        """
+        Retrieve several files or folders from remote to local, with the same
+        semantics as calling :meth:`get` on each pair in turn.
+
+        This default implementation does exactly that; plugins that can
+        pipeline the transfers over their connection should override it.
+
+        :param remote_local_pairs: a list of tuples (remotepath, localpath), where each
+            localpath must be an absolute path
+        :param ignore_nonexisting: if True, remote paths that do not exist are skipped
+        """
+        for remotepath, localpath in remote_local_pairs:
+            self.get(remotepath, localpath, ignore_nonexisting=ignore_nonexisting)
+
     def getcwd(self):
         """
         Get working directory
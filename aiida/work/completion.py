@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+import logging
+import time
+
+import plumpy
+from plumpy import ProcessState
+
+__all__ = ['CompletionManager']
+
+_LOGGER = logging.getLogger(__name__)
+
+# The process states after which a calculation will not change anymore
+TERMINAL_STATES = (ProcessState.FINISHED, ProcessState.KILLED, ProcessState.EXCEPTED)
+
+# With a communicator, the terminations are broadcast and the database only needs
+# to be polled, at most this often, for the nodes terminated without a broadcast
+DEFAULT_FALLBACK_POLL_INTERVAL = 5.
+
+
+class CompletionManager(object):
+    """
+    Call back when the calculations and legacy workflows being waited on terminate.
+
+    Processes that run with a communicator broadcast their state changes, so a single
+    broadcast subscriber is used to be notified when any of the awaited calculations
+    reaches a terminal state.  The nodes that terminate without a broadcast (e.g. run
+    without a communicator, or legacy workflows) are found by polling the database
+    with one query for all the awaited calculations and one for all the awaited
+    workflows, rather than reloading every node separately.
+    """
+
+    def __init__(self, loop, poll_interval=0., communicator=None, fallback_poll_interval=None):
+        """
+        :param loop: the event loop on which the callbacks are called
+        :param poll_interval: the interval in seconds between two polls of the database
+        :param communicator: the communicator on which the state changes are broadcast,
+            or None to rely on polling only
+        :param fallback_poll_interval: the interval in seconds between two polls of the
+            database when a communicator is used (at least poll_interval)
+        """
+        self._loop = loop
+        self._communicator = communicator
+        self._calculations = {}  # Mapping of pk -> list of callbacks
+        self._workflows = {}  # Mapping of pk -> list of callbacks
+        self._poll_handle = None
+        self._poll_time = None
+
+        if communicator is None:
+            self._poll_interval = poll_interval
+        else:
+            if fallback_poll_interval is None:
+                fallback_poll_interval = DEFAULT_FALLBACK_POLL_INTERVAL
+            self._poll_interval = max(poll_interval, fallback_poll_interval)
+            self._communicator.add_broadcast_subscriber(self._broadcast_received)
+
+    def close(self):
+        """
+        Stop listening for broadcasts and polling; the pending callbacks will not be called
+        """
+        if self._communicator is not None:
+            self._communicator.remove_broadcast_subscriber(self._broadcast_received)
+            self._communicator = None
+        if self._poll_handle is not None:
+            self._loop.remove_timeout(self._poll_handle)
+            self._poll_handle = None
+        self._calculations = {}
+        self._workflows = {}
+
+    def call_on_calculation_finish(self, pk, callback):
+        """
+        Call the callback with the pk of the calculation once it has terminated
+
+        :param pk: the pk of the calculation
+        :param callback: the callable to call with the pk
+        """
+        self._calculations.setdefault(pk, []).append(callback)
+        # Check right away, in case it had already terminated
+        self._request_poll(0.)
+
+    def call_on_legacy_workflow_finish(self, pk, callback):
+        """
+        Call the callback with the pk of the legacy workflow once it has finished or failed
+
+        :param pk: the pk of the workflow
+        :param callback: the callable to call with the pk
+        """
+        self._workflows.setdefault(pk, []).append(callback)
+        self._request_poll(0.)
+
+    def get_calculation_future(self, pk):
+        """
+        :param pk: the pk of the calculation
+        :return: a future that resolves to the calculation node once it has terminated
+        """
+        from aiida.orm import load_node
+
+        future = plumpy.Future()
+
+        def set_result(pk):
+            if not future.done():
+                future.set_result(load_node(pk=pk))
+
+        self.call_on_calculation_finish(pk, set_result)
+        return future
+
+    def _broadcast_received(self, body, sender, subject, correlation_id):
+        if sender not in self._calculations or not subject.startswith('state_changed.'):
+            return
+
+        if subject.split('.')[-1] in [state.value for state in TERMINAL_STATES]:
+            self._loop.add_callback(self._calculation_terminated, sender)
+
+    def _calculation_terminated(self, pk):
+        for callback in self._calculations.pop(pk, []):
+            self._loop.add_callback(callback, pk)
+
+    def _workflow_finished(self, pk):
+        for callback in self._workflows.pop(pk, []):
+            self._loop.add_callback(callback, pk)
+
+    def _request_poll(self, delay):
+        """
+        Schedule a poll of the database in delay seconds, unless one is scheduled earlier already
+        """
+        poll_time = time.time() + delay
+        if self._poll_handle is not None:
+            if self._poll_time <= poll_time:
+                return
+            self._loop.remove_timeout(self._poll_handle)
+
+        self._poll_time = poll_time
+        self._poll_handle = self._loop.call_later(delay, self._poll)
+
+    def _poll(self):
+        self._poll_handle = None
+
+        try:
+            if self._calculations:
+                for pk in self._get_terminated_calculations(self._calculations.keys()):
+                    self._calculation_terminated(pk)
+            if self._workflows:
+                for pk in self._get_finished_workflows(self._workflows.keys()):
+                    self._workflow_finished(pk)
+        except Exception as exception:
+            _LOGGER.warning('Polling the database for the awaited nodes failed: {}'.format(exception))
+
+        if self._calculations or self._workflows:
+            self._request_poll(self._poll_interval)
+
+    @staticmethod
+    def _get_terminated_calculations(pks):
+        """
+        :param pks: the pks of the calculations
+        :return: the pks of those that have terminated, found with a single query
+        """
+        from aiida.orm.calculation import Calculation
+        from aiida.orm.querybuilder import QueryBuilder
+
+        qb = QueryBuilder()
+        qb.append(Calculation, project=['id'], filters={
+            'id': {'in': list(pks)},
+            'attributes.{}'.format(Calculation.PROCESS_STATE_KEY): {'in': [state.value for state in TERMINAL_STATES]}
+        })
+        return [pk for pk, in qb.iterall()]
+
+    @staticmethod
+    def _get_finished_workflows(pks):
+        """
+        :param pks: the pks of the legacy workflows
+        :return: the pks of those that have finished or failed, found with a single query
+        """
+        from aiida.backends import settings
+        from aiida.backends.profile import BACKEND_DJANGO, BACKEND_SQLA
+        from aiida.common.datastructures import wf_states
+
+        states = [wf_states.FINISHED, wf_states.SLEEP, wf_states.ERROR]
+        if settings.BACKEND == BACKEND_DJANGO:
+            from aiida.backends.djsite.db.models import DbWorkflow
+            return list(DbWorkflow.objects.filter(pk__in=list(pks), state__in=states).values_list('pk', flat=True))
+        elif settings.BACKEND == BACKEND_SQLA:
+            from aiida.backends.sqlalchemy import get_scoped_session
+            from aiida.backends.sqlalchemy.models.workflow import DbWorkflow
+            session = get_scoped_session()
+            query = session.query(DbWorkflow.id).filter(DbWorkflow.id.in_(list(pks)), DbWorkflow.state.in_(states))
+            return [pk for pk, in query]
+        else:
+            raise Exception("unknown backend {}".format(settings.BACKEND))
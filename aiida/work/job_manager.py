@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+import logging
+import sys
+import time
+
+import plumpy
+
+__all__ = ['JobManager']
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class JobsList(object):
+    """
+    Poll the scheduler of a single authinfo for the state of all the jobs that
+    are currently being waited on.
+
+    Rather than querying the scheduler once per job, all the job ids that were
+    requested since the last poll are gathered and passed to the scheduler in
+    as few calls to ``getJobs`` as possible (one, if the scheduler can query by
+    user, otherwise one per batch of job ids). Each requester then receives the
+    ``JobInfo`` of its own job through a future.  Polls are never closer in time
+    than the minimum job poll interval of the computer.
+    """
+
+    def __init__(self, authinfo, transport_queue, last_updated=None):
+        """
+        :param authinfo: The authinfo whose jobs are polled
+        :param transport_queue: The transport queue used to get an open transport
+        :param last_updated: The time of the last poll, as returned by :func:`time.time`
+        """
+        self._authinfo = authinfo
+        self._transport_queue = transport_queue
+        self._loop = transport_queue.loop
+        self._last_updated = last_updated
+        self._job_update_requests = {}  # Mapping of job id -> list of futures
+        self._update_handle = None
+        self._polling = False
+
+        computer = authinfo.computer
+        self._minimum_update_interval = computer.get_minimum_job_poll_interval()
+        self._batch_size = computer.get_job_poll_batch_size()
+
+    @property
+    def last_updated(self):
+        """
+        :return: the time of the last poll of the scheduler, or None if it was never polled
+        """
+        return self._last_updated
+
+    def get_minimum_update_interval(self):
+        """
+        :return: the minimum interval in seconds between two polls of the scheduler
+        """
+        return self._minimum_update_interval
+
+    def get_batch_size(self):
+        """
+        :return: the maximum number of job ids passed to a single scheduler query
+        """
+        return self._batch_size
+
+    def request_job_info_update(self, job_id):
+        """
+        Request an update of the state of a job.  The returned future will get
+        the corresponding ``JobInfo`` as its result, or None if the scheduler
+        does not know about the job (anymore).
+
+        :param job_id: the id of the job as returned by the scheduler
+        :return: a future that resolves to the JobInfo of the job
+        """
+        future = plumpy.Future()
+        self._job_update_requests.setdefault(job_id, []).append(future)
+        self._ensure_updating()
+        return future
+
+    def _ensure_updating(self):
+        """
+        Make sure that a poll of the scheduler is scheduled if there are outstanding requests
+        """
+        if self._update_handle is not None or self._polling or not self._job_update_requests:
+            return
+
+        self._update_handle = self._loop.call_later(self._get_next_update_delay(), self._request_transport)
+
+    def _get_next_update_delay(self):
+        """
+        :return: the number of seconds to wait before the next poll respecting the minimum interval
+        """
+        if self._last_updated is None:
+            return 0.
+
+        elapsed = time.time() - self._last_updated
+        return max(self._minimum_update_interval - elapsed, 0.)
+
+    def _request_transport(self):
+        self._update_handle = None
+        self._polling = True
+        self._transport_queue.call_me_with_transport(self._authinfo, self._update_job_info)
+
+    def _update_job_info(self, authinfo, transport):
+        """
+        Poll the scheduler for all the jobs that were requested so far and
+        pass on the results.  This is called by the transport queue with an
+        open transport.
+        """
+        # Take a snapshot of the requests: anything requested from now on will be served by the next poll
+        requests = self._job_update_requests
+        self._job_update_requests = {}
+
+        try:
+            job_ids = [job_id for job_id, futures in requests.items() if any(not f.done() for f in futures)]
+            if job_ids:
+                job_infos = self._get_jobs_from_scheduler(transport, job_ids)
+                self._last_updated = time.time()
+            else:
+                job_infos = {}
+        except Exception:
+            exc_info = sys.exc_info()
+            _LOGGER.warning('Polling the scheduler for {} failed: {}'.format(authinfo, exc_info[1]))
+            for futures in requests.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exc_info(exc_info)
+        else:
+            for job_id, futures in requests.items():
+                for future in futures:
+                    if not future.done():
+                        future.set_result(job_infos.get(job_id, None))
+        finally:
+            self._polling = False
+            self._ensure_updating()
+
+    def _get_jobs_from_scheduler(self, transport, job_ids):
+        """
+        Query the scheduler for the given job ids
+
+        :param transport: an open transport for the authinfo
+        :param job_ids: the list of job ids to query
+        :return: a dictionary of job id -> JobInfo for the jobs known to the scheduler
+        """
+        scheduler = self._authinfo.computer.get_scheduler()
+        scheduler.set_transport(transport)
+
+        if scheduler.get_feature('can_query_by_user'):
+            _LOGGER.debug('Polling the scheduler for all jobs of the user ({} requested)'.format(len(job_ids)))
+            # Only the requested jobs are parsed from the output
+            return scheduler.getJobs(user='$USER', as_dict=True, filter_jobs=job_ids)
+
+        job_infos = {}
+        for start in range(0, len(job_ids), self._batch_size):
+            batch = job_ids[start:start + self._batch_size]
+            _LOGGER.debug('Polling the scheduler for a batch of {} jobs'.format(len(batch)))
+            job_infos.update(scheduler.getJobs(jobs=batch, as_dict=True))
+
+        return job_infos
+
+
+class JobManager(object):
+    """
+    A manager of the scheduler job state polling, keeping one :class:`JobsList`
+    per authinfo so that all the jobs of a computer are polled together.
+    """
+
+    def __init__(self, transport_queue):
+        """
+        :param transport_queue: The transport queue used to get open transports
+        """
+        self._transport_queue = transport_queue
+        self._job_lists = {}
+
+    def get_jobs_list(self, authinfo):
+        """
+        Get or create the jobs list for the given authinfo
+
+        :param authinfo: the authinfo
+        :return: the :class:`JobsList` of the authinfo
+        """
+        if authinfo.id not in self._job_lists:
+            self._job_lists[authinfo.id] = JobsList(authinfo, self._transport_queue)
+
+        return self._job_lists[authinfo.id]
+
+    def request_job_info_update(self, authinfo, job_id):
+        """
+        Request an update of the state of a job on the computer of the given authinfo
+
+        :param authinfo: the authinfo of the job
+        :param job_id: the id of the job as returned by the scheduler
+        :return: a future that resolves to the JobInfo of the job, or None if not found
+        """
+        return self.get_jobs_list(authinfo).request_job_info_update(job_id)
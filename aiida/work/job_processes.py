@@ -72,44 +72,66 @@ class SubmitJob(TransportTask):
             raise TransportTaskException(calc_states.SUBMISSIONFAILED)
 
 
-class UpdateSchedulerState(TransportTask):
-    """ A task to update the scheduler state of a job calculation """
+class UpdateSchedulerState(plumpy.Future):
+    """
+    A task to update the scheduler state of a job calculation
 
-    def execute(self, transport):
-        self._calc.logger.info('Updating scheduler state calculation<{}>'.format(self._calc.pk))
+    The job info is obtained through the job manager which polls the scheduler for the
+    jobs of all the calculations of the same authinfo at once.  A transport is only
+    requested for this calculation alone when the job is done, to get the detailed job info.
+    """
+
+    def __init__(self, calc_node, transport_queue, job_manager):
+        super(UpdateSchedulerState, self).__init__()
+        self._calc = calc_node
+        self._authinfo = calc_node.get_computer().get_authinfo(calc_node.get_user())
+        self._transport_queue = transport_queue
 
         # We are the only ones to set the calc state to COMPUTED, so if it is set here
         # it was already completed in a previous task that got shutdown and reactioned
         if self._calc.get_state() == calc_states.COMPUTED:
-            return True
+            self.set_result(True)
+            return
 
-        scheduler = self._calc.get_computer().get_scheduler()
-        scheduler.set_transport(transport)
+        self._calc.logger.info('Updating scheduler state calculation<{}>'.format(self._calc.pk))
+        job_info_future = job_manager.request_job_info_update(self._authinfo, self._calc.get_job_id())
+        job_info_future.add_done_callback(self._job_info_updated)
+
+    def _job_info_updated(self, job_info_future):
+        if self.done():
+            # We got cancelled in the meantime
+            return
 
-        job_id = self._calc.get_job_id()
+        try:
+            info = job_info_future.result()
 
-        kwargs = {'jobs': [job_id], 'as_dict': True}
-        if scheduler.get_feature('can_query_by_user'):
-            kwargs['user'] = "$USER"
-        found_jobs = scheduler.getJobs(**kwargs)
+            if info is None:
+                # If the job is computed or not found assume it's done
+                job_done = True
+                self._calc._set_scheduler_state(job_states.DONE)
+            else:
+                execmanager.update_job_calc_from_job_info(self._calc, info)
+                job_done = info.job_state == job_states.DONE
+        except Exception:
+            self.set_exc_info(sys.exc_info())
+            return
 
-        info = found_jobs.get(job_id, None)
-        if info is None:
-            # If the job is computed or not found assume it's done
-            job_done = True
-            self._calc._set_scheduler_state(job_states.DONE)
+        if job_done:
+            # If the job is done, also get detailed job info, which requires a transport of our own
+            self._transport_queue.call_me_with_transport(self._authinfo, self._get_detailed_job_info)
         else:
-            # Has the state changed?
-            last_jobinfo = self._calc._get_last_jobinfo()
+            self.set_result(False)
 
-            execmanager.update_job_calc_from_job_info(self._calc, info)
+    def _get_detailed_job_info(self, authinfo, transport):
+        if self.done():
+            return
 
-            job_done = info.job_state == job_states.DONE
+        try:
+            scheduler = self._calc.get_computer().get_scheduler()
+            scheduler.set_transport(transport)
 
-        if job_done:
-            # If the job is done, also get detailed job info
             try:
-                detailed_job_info = scheduler.get_detailed_jobinfo(job_id)
+                detailed_job_info = scheduler.get_detailed_jobinfo(self._calc.get_job_id())
             except NotImplementedError:
                 detailed_job_info = (
                     u"AiiDA MESSAGE: This scheduler does not implement "
@@ -118,10 +140,11 @@ class UpdateSchedulerState(TransportTask):
                     u"a job after it has finished.")
 
             execmanager.update_job_calc_from_detailed_job_info(self._calc, detailed_job_info)
-
             self._calc._set_state(calc_states.COMPUTED)
-
-        return job_done
+        except Exception:
+            self.set_exc_info(sys.exc_info())
+        else:
+            self.set_result(True)
 
 
 class RetrieveJob(TransportTask):
@@ -232,7 +255,7 @@ class Waiting(plumpy.Waiting):
                 job_done = False
                 # Keep geting scheduler updates until done
                 while not job_done:
-                    self._task = UpdateSchedulerState(calc, transport_queue)
+                    self._task = UpdateSchedulerState(calc, transport_queue, self.process.runner.job_manager)
                     job_done = yield self._task
                     if self._kill_future:
                         yield self._do_kill()
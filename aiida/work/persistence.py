@@ -8,7 +8,14 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 
+import cPickle as pickle
+import functools
+import hashlib
 import logging
+import os
+import tempfile
+import zlib
+
 import plumpy
 import yaml
 
@@ -18,17 +25,193 @@ __all__ = ['ObjectLoader', 'get_object_loader']
 
 LOGGER = logging.getLogger(__name__)
 
+# The serializers of the checkpoints, as pairs of (dumps, loads) functions
+SERIALIZERS = {
+    'pickle': (functools.partial(pickle.dumps, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+    'yaml': (yaml.dump, yaml.load),
+}
+
+# The compressions of the serialized checkpoints, as pairs of (compress, decompress) functions
+COMPRESSIONS = {
+    'none': (lambda data: data, lambda data: data),
+    # A low compression level: the checkpoints are saved often and compress well anyway
+    'zlib': (lambda data: zlib.compress(data, 1), zlib.decompress),
+}
+
+try:
+    import lz4.frame
+except ImportError:
+    pass
+else:
+    COMPRESSIONS['lz4'] = (lz4.frame.compress, lz4.frame.decompress)
+
 
 class PersistenceError(Exception):
     pass
 
 
+class CheckpointStore(object):
+    """
+    The interface of the stores of the checkpoints of the AiiDAPersister, keeping
+    the last checkpoint of every process as an opaque string of bytes
+    """
+
+    def save(self, pid, encoding, checksum, data):
+        """
+        Save the checkpoint of a process, replacing the previous one
+
+        :param pid: the process id
+        :param encoding: how the checkpoint was serialized and compressed, e.g. 'pickle+zlib'
+        :param checksum: the checksum of the serialized checkpoint
+        :param data: the serialized and compressed checkpoint
+        """
+        raise NotImplementedError
+
+    def load(self, pid):
+        """
+        :param pid: the process id
+        :return: a tuple with the encoding and the data of the checkpoint of the process,
+            or None if it does not have one
+        """
+        raise NotImplementedError
+
+    def delete(self, pid):
+        """
+        Delete the checkpoint of a process, if it has one
+
+        :param pid: the process id
+        """
+        raise NotImplementedError
+
+    def get_pids(self):
+        """
+        :return: the list of the ids of the processes with a checkpoint
+        """
+        raise NotImplementedError
+
+
+class DbCheckpointStore(CheckpointStore):
+    """
+    Store the checkpoints in the DbCheckpoint table, one row per process
+    """
+
+    def save(self, pid, encoding, checksum, data):
+        from psycopg2 import Binary
+        from aiida.backends.utils import get_raw_cursor
+
+        params = {'pid': pid, 'encoding': encoding, 'checksum': checksum, 'data': Binary(data)}
+        with get_raw_cursor() as cursor:
+            cursor.execute(
+                'UPDATE db_dbcheckpoint SET mtime = now(), encoding = %(encoding)s, checksum = %(checksum)s, '
+                'data = %(data)s WHERE pid = %(pid)s', params)
+            if not cursor.rowcount:
+                cursor.execute(
+                    'INSERT INTO db_dbcheckpoint (pid, mtime, encoding, checksum, data) '
+                    'VALUES (%(pid)s, now(), %(encoding)s, %(checksum)s, %(data)s)', params)
+
+    def load(self, pid):
+        from aiida.backends.utils import get_raw_cursor
+
+        with get_raw_cursor(commit=False) as cursor:
+            cursor.execute('SELECT encoding, data FROM db_dbcheckpoint WHERE pid = %s', [pid])
+            row = cursor.fetchone()
+
+        if row is None:
+            return None
+        return row[0], str(row[1])
+
+    def delete(self, pid):
+        from aiida.backends.utils import get_raw_cursor
+
+        with get_raw_cursor() as cursor:
+            cursor.execute('DELETE FROM db_dbcheckpoint WHERE pid = %s', [pid])
+
+    def get_pids(self):
+        from aiida.backends.utils import get_raw_cursor
+
+        with get_raw_cursor(commit=False) as cursor:
+            cursor.execute('SELECT pid FROM db_dbcheckpoint ORDER BY pid')
+            return [pid for pid, in cursor.fetchall()]
+
+
+class FileCheckpointStore(CheckpointStore):
+    """
+    Store the checkpoints as files in a folder, one file per process
+    """
+
+    _SUFFIX = '.checkpoint'
+
+    def __init__(self, folder):
+        """
+        :param folder: the absolute path of the folder, created if it does not exist
+        """
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        self._folder = folder
+
+    def _get_path(self, pid):
+        return os.path.join(self._folder, '{}{}'.format(pid, self._SUFFIX))
+
+    def save(self, pid, encoding, checksum, data):
+        # Write to a temporary file first, such that a checkpoint is never left half written
+        descriptor, temp_path = tempfile.mkstemp(dir=self._folder)
+        with os.fdopen(descriptor, 'wb') as handle:
+            handle.write('{}\n{}\n'.format(encoding, checksum))
+            handle.write(data)
+        os.rename(temp_path, self._get_path(pid))
+
+    def load(self, pid):
+        try:
+            with open(self._get_path(pid), 'rb') as handle:
+                encoding = handle.readline().rstrip('\n')
+                handle.readline()
+                return encoding, handle.read()
+        except IOError:
+            return None
+
+    def delete(self, pid):
+        try:
+            os.remove(self._get_path(pid))
+        except OSError:
+            pass
+
+    def get_pids(self):
+        return sorted(int(filename[:-len(self._SUFFIX)]) for filename in os.listdir(self._folder)
+                      if filename.endswith(self._SUFFIX))
+
+
 class AiiDAPersister(plumpy.Persister):
     """
     This node is responsible to taking saved process instance states and
     persisting them to the database.
+
+    The checkpoints are serialized (with pickle by default), compressed (with zlib
+    by default) and saved in a :class:`CheckpointStore`, by default the DbCheckpoint
+    table. A checkpoint identical to the last one saved for the same process is not
+    saved again.
     """
 
+    def __init__(self, store=None, serializer='pickle', compression='zlib'):
+        """
+        :param store: the :class:`CheckpointStore`, by default a :class:`DbCheckpointStore`
+        :param serializer: the name of the serializer, one of the keys of SERIALIZERS
+        :param compression: the name of the compression, one of the keys of COMPRESSIONS
+        """
+        if serializer not in SERIALIZERS:
+            raise ValueError("unknown serializer '{}', valid ones are {}".format(serializer, SERIALIZERS.keys()))
+        if compression not in COMPRESSIONS:
+            raise ValueError("unknown compression '{}', valid ones are {}".format(compression, COMPRESSIONS.keys()))
+
+        self._store = store if store is not None else DbCheckpointStore()
+        self._serializer = serializer
+        self._compression = compression
+        self._encoding = '{}+{}'.format(serializer, compression)
+        self._checksums = {}  # Mapping of pid -> checksum of the last checkpoint saved
+
+    @property
+    def store(self):
+        return self._store
+
     def save_checkpoint(self, process, tag=None):
         LOGGER.info('Persisting process<{}>'.format(process.pid))
 
@@ -36,8 +219,13 @@ class AiiDAPersister(plumpy.Persister):
             raise NotImplementedError('Checkpoint tags not supported yet')
 
         bundle = plumpy.Bundle(process, plumpy.LoadSaveContext(loader=get_object_loader()))
-        calc = process.calc
-        calc._set_checkpoint(yaml.dump(bundle))
+        serialized = SERIALIZERS[self._serializer][0](bundle)
+        checksum = hashlib.sha1(serialized).hexdigest()
+
+        if self._checksums.get(process.pid, None) != checksum:
+            data = COMPRESSIONS[self._compression][0](serialized)
+            self._store.save(process.pid, self._encoding, checksum, data)
+            self._checksums[process.pid] = checksum
 
         return bundle
 
@@ -45,6 +233,27 @@ class AiiDAPersister(plumpy.Persister):
         if tag is not None:
             raise NotImplementedError('Checkpoint tags not supported yet')
 
+        saved = self._store.load(pid)
+        if saved is None:
+            return self._load_attribute_checkpoint(pid)
+
+        encoding, data = saved
+        try:
+            serializer, compression = encoding.split('+')
+            loads = SERIALIZERS[serializer][1]
+            decompress = COMPRESSIONS[compression][1]
+        except (ValueError, KeyError):
+            raise PersistenceError("Calculation<{}> has a checkpoint with the unsupported encoding '{}'".format(
+                pid, encoding))
+
+        return loads(decompress(data))
+
+    @staticmethod
+    def _load_attribute_checkpoint(pid):
+        """
+        Load a checkpoint saved as YAML in the attributes of the calculation node,
+        where they were saved before the checkpoint stores were introduced
+        """
         calculation = orm.load_node(pid)
         checkpoint = calculation.checkpoint
 
@@ -61,7 +270,7 @@ class AiiDAPersister(plumpy.Persister):
 
         :return: list of PersistedCheckpoint tuples
         """
-        pass
+        return [plumpy.PersistedCheckpoint(pid, None) for pid in self._store.get_pids()]
 
     def get_process_checkpoints(self, pid):
         """
@@ -72,9 +281,15 @@ class AiiDAPersister(plumpy.Persister):
         :param pid: the process pid
         :return: list of PersistedCheckpoint tuples
         """
-        pass
+        if self._store.load(pid) is None:
+            return []
+        return [plumpy.PersistedCheckpoint(pid, None)]
 
     def delete_checkpoint(self, pid, tag=None):
+        self._store.delete(pid)
+        self._checksums.pop(pid, None)
+
+        # Also delete a checkpoint saved in the attributes by a previous version
         calc = orm.load_node(pid)
         calc._del_checkpoint()
 
@@ -84,7 +299,7 @@ class AiiDAPersister(plumpy.Persister):
 
         :param pid: the process id of the :class:`aiida.work.processes.Process`
         """
-        pass
+        self.delete_checkpoint(pid)
 
 
 class ObjectLoader(plumpy.DefaultObjectLoader):
@@ -4,8 +4,8 @@ import logging
 import plumpy
 import tornado.ioloop
 
-from aiida.orm import load_node, load_workflow
-from . import futures
+from . import completion
+from . import job_manager
 from . import persistence
 from . import rmq
 from . import transports
@@ -66,7 +66,8 @@ class Runner(object):
         self._loop = loop if loop is not None else tornado.ioloop.IOLoop()
         self._poll_interval = poll_interval
         self._rmq_submit = rmq_submit
-        self._transport = transports.TransportQueue(self._loop)
+        self._transport = transports.TransportQueue(self._loop, pool=transports.create_transport_pool(self._loop))
+        self._job_manager = job_manager.JobManager(self._transport)
 
         if enable_persistence:
             self._persister = persister if persister is not None else persistence.AiiDAPersister()
@@ -78,6 +79,8 @@ class Runner(object):
             logger.warning('Disabling rmq submission, no RMQ config provided')
             self._rmq_submit = False
 
+        self._completion_manager = completion.CompletionManager(self._loop, poll_interval, self._communicator)
+
         # Save kwargs for creating child runners
         self._kwargs = {
             'rmq_config': rmq_config,
@@ -104,6 +107,10 @@ class Runner(object):
     def transport(self):
         return self._transport
 
+    @property
+    def job_manager(self):
+        return self._job_manager
+
     @property
     def persister(self):
         return self._persister
@@ -132,6 +139,8 @@ class Runner(object):
         assert not self._closed
 
         self.stop()
+        self._completion_manager.close()
+        self._transport.close()
         if self._rmq_connector is not None:
             self._rmq_connector.disconnect()
         self._closed = True
@@ -258,12 +267,24 @@ class Runner(object):
         return ResultAndPid(result, node.pk)
 
     def call_on_legacy_workflow_finish(self, pk, callback):
-        legacy_wf = load_workflow(pk=pk)
-        self._poll_legacy_wf(legacy_wf, callback)
+        """
+        Call the callback with the pk of the legacy workflow once it has finished or failed
+
+        :param pk: the pk of the workflow
+        :param callback: the callable to call with the pk
+        """
+        self._completion_manager.call_on_legacy_workflow_finish(pk, callback)
 
     def call_on_calculation_finish(self, pk, callback):
-        calc_node = load_node(pk=pk)
-        self._poll_calculation(calc_node, callback)
+        """
+        Call the callback with the pk of the calculation once it has terminated. The
+        termination is broadcast by the process if the runner has a communicator,
+        otherwise all the awaited calculations are polled together.
+
+        :param pk: the pk of the calculation
+        :param callback: the callable to call with the pk
+        """
+        self._completion_manager.call_on_calculation_finish(pk, callback)
 
     def get_calculation_future(self, pk):
         """
@@ -272,8 +293,7 @@ class Runner(object):
 
         :return: A future representing the completion of the calculation node
         """
-        return futures.CalculationFuture(
-            pk, self._loop, self._poll_interval, self._communicator)
+        return self._completion_manager.get_calculation_future(pk)
 
     @contextmanager
     def child_runner(self):
@@ -306,18 +326,6 @@ class Runner(object):
     def _create_child_runner(self):
         return Runner(**self._kwargs)
 
-    def _poll_legacy_wf(self, workflow, callback):
-        if workflow.has_finished_ok() or workflow.has_failed():
-            self._loop.add_callback(callback, workflow.pk)
-        else:
-            self._loop.call_later(self._poll_interval, self._poll_legacy_wf, workflow, callback)
-
-    def _poll_calculation(self, calc_node, callback):
-        if calc_node.is_terminated:
-            self._loop.add_callback(callback, calc_node.pk)
-        else:
-            self._loop.call_later(self._poll_interval, self._poll_calculation, calc_node, callback)
-
 
 class DaemonRunner(Runner):
     """
@@ -1,12 +1,125 @@
 from collections import namedtuple
 import logging
 import threading
+import time
 import traceback
 from aiida.utils import DEFAULT_TRANSPORT_INTERVAL
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def create_transport_pool(loop):
+    """
+    Create a transport pool according to the transport pooling properties of the configuration
+
+    :param loop: The io loop
+    :return: a :class:`TransportPool`, or None if pooling is disabled
+    """
+    from aiida.common.setup import get_property
+
+    if not get_property('transport.pool_connections'):
+        return None
+
+    return TransportPool(loop, idle_timeout=get_property('transport.pool_idle_timeout'))
+
+
+class TransportPool(object):
+    """
+    A pool of open transports, keyed on authinfo, that allows connections to be
+    reused across batches of transport tasks rather than being opened and closed
+    every time.
+
+    At most one transport is kept open for a given authinfo, as the
+    :class:`TransportQueue` passes it to all the callbacks of a batch, one after
+    the other. A transport that is not used for `idle_timeout` seconds is closed,
+    and an idle transport that is found to be dead is discarded.
+    """
+    IdleEntry = namedtuple('IdleEntry', ['transport', 'last_used'])
+
+    def __init__(self, loop, idle_timeout=300):
+        """
+        :param loop: The io loop
+        :param idle_timeout: The number of seconds after which an unused transport is closed
+        """
+        self._loop = loop
+        self._idle_timeout = idle_timeout
+        self._idle = {}  # Mapping of authinfo id -> IdleEntry
+
+    def has_idle(self, authinfo):
+        """
+        :return: True if there is an open transport for the authinfo ready to be used; an idle
+            transport that is not alive anymore is discarded
+        """
+        entry = self._idle.get(authinfo.id)
+        if entry is None:
+            return False
+        if entry.transport.is_alive():
+            return True
+
+        _LOGGER.info("Discarding dead pooled transport '{}'".format(entry.transport))
+        del self._idle[authinfo.id]
+        self._close(entry.transport)
+        return False
+
+    def acquire(self, authinfo, transport=None):
+        """
+        Get an open transport for the authinfo, reusing the idle one if it is still alive
+
+        :param authinfo: the authinfo
+        :param transport: an optional closed transport for the authinfo to be opened if none can be reused,
+            otherwise a new one is created
+        :return: an open transport
+        """
+        if self.has_idle(authinfo):
+            return self._idle.pop(authinfo.id).transport
+
+        if transport is None:
+            transport = authinfo.get_transport()
+        # Enter the transport, rather than opening it, such that nested 'with' statements of the users of the
+        # transport will not close it when they are done
+        transport.__enter__()
+        _LOGGER.debug("Opened pooled transport '{}'".format(transport))
+
+        return transport
+
+    def release(self, authinfo, transport):
+        """
+        Give back a transport obtained with :meth:`acquire`, making it available to be reused
+
+        :param authinfo: the authinfo the transport was acquired for
+        :param transport: the transport
+        """
+        replaced = self._idle.get(authinfo.id)
+        self._idle[authinfo.id] = self.IdleEntry(transport, time.time())
+        if replaced is not None and replaced.transport is not transport:
+            self._close(replaced.transport)
+        self._loop.call_later(self._idle_timeout, self._expire, authinfo.id, transport)
+
+    def close(self):
+        """
+        Close all the idle transports
+        """
+        for entry in self._idle.values():
+            self._close(entry.transport)
+        self._idle = {}
+
+    def _expire(self, authinfo_id, transport):
+        entry = self._idle.get(authinfo_id)
+        # It may have been reused and released since, in which case a later expiry is scheduled
+        if entry is not None and entry.transport is transport and \
+                time.time() - entry.last_used >= self._idle_timeout:
+            del self._idle[authinfo_id]
+            _LOGGER.debug("Closing idle pooled transport '{}'".format(transport))
+            self._close(transport)
+
+    @staticmethod
+    def _close(transport):
+        try:
+            transport.__exit__(None, None, None)
+        except Exception:
+            _LOGGER.warning("Failed to close pooled transport '{}':\n{}".format(transport, traceback.format_exc()))
+
+
 class TransportQueue(object):
     """
     A queue to get transport objects from authinfo.  This class allows clients
@@ -17,23 +130,43 @@ class TransportQueue(object):
     it will open the transport and give it to all the clients that asked for it
     up to that point.  This way opening of transports (a costly operation) can
     be minimised.
+
+    If a :class:`TransportPool` is given, the transports are taken from it and
+    kept open after the callbacks have been called, so that the next requests
+    for the same authinfo can be served straight away without a new connection.
     """
     AuthinfoEntry = namedtuple("AuthinfoEntry", ['authinfo', 'transport', 'callbacks', 'callback_handle'])
 
-    def __init__(self, loop=None, interval=DEFAULT_TRANSPORT_INTERVAL):
+    def __init__(self, loop=None, interval=DEFAULT_TRANSPORT_INTERVAL, pool=None):
         """
         :param loop: The io loop
         :param interval: The callback interval in seconds
+        :param pool: An optional transport pool
         """
         super(TransportQueue, self).__init__()
 
         self._loop = loop
         self._entries = {}
         self._interval = interval
+        self._pool = pool
         self._entries_lock = threading.Lock()
 
         self._callback_handle = None
 
+    @property
+    def loop(self):
+        """
+        :return: the event loop used by the queue
+        """
+        return self._loop
+
+    def close(self):
+        """
+        Close the transports that are kept open by the pool, if any
+        """
+        if self._pool is not None:
+            self._pool.close()
+
     def call_me_with_transport(self, authinfo, callback):
         _LOGGER.debug("Got request for transport with callback '{}'".format(callback))
 
@@ -44,17 +177,22 @@ class TransportQueue(object):
         if authinfo.id in self._entries:
             return self._entries[authinfo.id]
 
-        transport = authinfo.get_transport()
-
-        # Check if the transport is happy to be opened with any frequency
-        # I put <= 0 to avoid that if the user, by mistake, puts a negative
-        # number, we get errors. Negative errors will be considered as zero.
-        safe_open_interval = transport.get_safe_open_interval()
-        if safe_open_interval <= 0.:
+        if self._pool is not None and self._pool.has_idle(authinfo):
+            # An open transport that is still alive is waiting to be reused, no need to wait
+            transport = None
             callback_handle = self._loop.add_callback(self._do_callback, authinfo.id)
         else:
-            # Ok, we have to use a delay
-            callback_handle = self._loop.call_later(safe_open_interval, self._do_callback, authinfo.id)
+            transport = authinfo.get_transport()
+
+            # Check if the transport is happy to be opened with any frequency
+            # I put <= 0 to avoid that if the user, by mistake, puts a negative
+            # number, we get errors. Negative errors will be considered as zero.
+            safe_open_interval = transport.get_safe_open_interval()
+            if safe_open_interval <= 0.:
+                callback_handle = self._loop.add_callback(self._do_callback, authinfo.id)
+            else:
+                # Ok, we have to use a delay
+                callback_handle = self._loop.call_later(safe_open_interval, self._do_callback, authinfo.id)
 
         entry = self.AuthinfoEntry(authinfo, transport, [], callback_handle)
         self._entries[authinfo.id] = entry
@@ -62,15 +200,34 @@ class TransportQueue(object):
         return entry
 
     def _do_callback(self, authinfo_id):
-        entry = self._entries.pop(authinfo_id)
-        with entry.transport:
-            for fn in entry.callbacks:
-                _LOGGER.debug("Passing transport to {}...".format(fn))
-                try:
-                    fn(entry.authinfo, entry.transport)
-                except BaseException:
-                    _LOGGER.error(
-                        "Callback '{}' raised exception when passed transport:\n{}".format(
-                            fn, traceback.format_exc())
-                    )
-                _LOGGER.debug("...callback finished")
+        if self._pool is None:
+            entry = self._entries.pop(authinfo_id)
+            with entry.transport:
+                self._call_callbacks(entry, entry.transport)
+            return
+
+        with self._entries_lock:
+            entry = self._entries.pop(authinfo_id)
+            if entry.transport is None and not self._pool.has_idle(entry.authinfo):
+                # The idle transport died in the meantime: a new one is opened after the safe open interval
+                self._get_or_create_entry(entry.authinfo).callbacks.extend(entry.callbacks)
+                return
+
+        transport = self._pool.acquire(entry.authinfo, entry.transport)
+        try:
+            self._call_callbacks(entry, transport)
+        finally:
+            self._pool.release(entry.authinfo, transport)
+
+    @staticmethod
+    def _call_callbacks(entry, transport):
+        for fn in entry.callbacks:
+            _LOGGER.debug("Passing transport to {}...".format(fn))
+            try:
+                fn(entry.authinfo, transport)
+            except BaseException:
+                _LOGGER.error(
+                    "Callback '{}' raised exception when passed transport:\n{}".format(
+                        fn, traceback.format_exc())
+                )
+            _LOGGER.debug("...callback finished")
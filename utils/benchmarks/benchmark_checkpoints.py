@@ -0,0 +1,119 @@
+#!/usr/bin/env runaiida
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Benchmark of the save and load latency of the checkpoints of a WorkChain with a
+large context, comparing the YAML checkpoints in the node attributes, as saved
+by the previous AiiDAPersister, with the serializers and compressions of the
+checkpoint store.
+
+Run it with::
+
+    verdi run utils/benchmarks/benchmark_checkpoints.py [num_entries] [repetitions]
+"""
+import sys
+import time
+
+import yaml
+
+from aiida import work
+from aiida.work.persistence import AiiDAPersister, COMPRESSIONS, SERIALIZERS, get_object_loader
+from aiida.work.workchain import WorkChain
+
+
+class CheckpointWorkChain(WorkChain):
+
+    @classmethod
+    def define(cls, spec):
+        super(CheckpointWorkChain, cls).define(spec)
+        spec.outline(cls.step)
+
+    def step(self):
+        pass
+
+
+def create_workchain(num_entries):
+    runner = work.Runner(poll_interval=0., rmq_config=None, enable_persistence=False)
+    workchain = CheckpointWorkChain(runner=runner)
+    for index in range(num_entries):
+        workchain.ctx['entry_{}'.format(index)] = {
+            'energy': -1.2345e2 * index,
+            'label': 'calculation {}'.format(index),
+            'kpoints': [index, index + 1, index + 2],
+        }
+    return workchain
+
+
+def time_legacy(workchain, repetitions):
+    """
+    The checkpoints as saved by the previous AiiDAPersister
+
+    :return: the mean save and load times and the size of the checkpoint
+    """
+    import plumpy
+
+    save_time = 0.
+    load_time = 0.
+    for iteration in range(repetitions):
+        workchain.ctx['iteration'] = iteration
+
+        start = time.time()
+        bundle = plumpy.Bundle(workchain, plumpy.LoadSaveContext(loader=get_object_loader()))
+        workchain.calc._set_checkpoint(yaml.dump(bundle))
+        save_time += time.time() - start
+
+        start = time.time()
+        yaml.load(workchain.calc.checkpoint)
+        load_time += time.time() - start
+
+    size = len(workchain.calc.checkpoint)
+    workchain.calc._del_checkpoint()
+    return save_time / repetitions, load_time / repetitions, size
+
+
+def time_persister(workchain, repetitions, serializer, compression):
+    """
+    :return: the mean save and load times and the size of the checkpoint
+    """
+    persister = AiiDAPersister(serializer=serializer, compression=compression)
+
+    save_time = 0.
+    load_time = 0.
+    for iteration in range(repetitions):
+        # Change the context, otherwise the unchanged checkpoint is not saved
+        workchain.ctx['iteration'] = iteration
+
+        start = time.time()
+        persister.save_checkpoint(workchain)
+        save_time += time.time() - start
+
+        start = time.time()
+        persister.load_checkpoint(workchain.pid)
+        load_time += time.time() - start
+
+    size = len(persister.store.load(workchain.pid)[1])
+    persister.delete_checkpoint(workchain.pid)
+    return save_time / repetitions, load_time / repetitions, size
+
+
+def main(num_entries=10000, repetitions=5):
+    workchain = create_workchain(num_entries)
+    print 'WorkChain with {} context entries, mean of {} repetitions'.format(num_entries, repetitions)
+
+    line = '  {:<28} save: {:8.4f} s   load: {:8.4f} s   size: {:10d} bytes'
+    print line.format('yaml in attributes (legacy)', *time_legacy(workchain, repetitions))
+    for serializer in sorted(SERIALIZERS):
+        for compression in sorted(COMPRESSIONS):
+            timings = time_persister(workchain, repetitions, serializer, compression)
+            print line.format('{}+{}'.format(serializer, compression), *timings)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
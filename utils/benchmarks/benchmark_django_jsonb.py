@@ -0,0 +1,108 @@
+#!/usr/bin/env runaiida
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Benchmark of the storage of the attributes in the Django backend, comparing the
+JSONB column of DbNode with the previous scheme of one DbAttribute row per value
+(and per element of the lists and dictionaries), for writing, reading all the
+attributes of a node and filtering the nodes on the value of an attribute.
+
+Run it on a Django profile meant for testing, as it creates new nodes::
+
+    verdi run utils/benchmarks/benchmark_django_jsonb.py [num_nodes] [num_keys]
+"""
+import sys
+import time
+
+from django.db import transaction
+
+from aiida.backends import settings
+from aiida.backends.profile import BACKEND_DJANGO
+from aiida.orm.node import Node
+
+LABEL = 'benchmark_django_jsonb'
+
+# The nodes are split in this many groups by the value of the 'group' attribute
+NUM_GROUPS = 10
+
+
+def get_attributes(index, num_keys):
+    attributes = {'key_{}'.format(i): i * 0.5 for i in range(num_keys)}
+    attributes['group'] = index % NUM_GROUPS
+    attributes['nested'] = {'name': 'node_{}'.format(index), 'values': range(10)}
+    return attributes
+
+
+def time_function(label, legacy_function, function):
+    start = time.time()
+    legacy_result = legacy_function()
+    legacy_time = time.time() - start
+
+    start = time.time()
+    result = function()
+    new_time = time.time() - start
+
+    assert result == legacy_result, 'the results of {} differ'.format(label)
+    print '{:<35} DbAttribute: {:8.3f} s   JSONB: {:8.3f} s   speedup: {:6.2f}x'.format(
+        label, legacy_time, new_time, legacy_time / new_time if new_time else float('inf'))
+
+
+def main(num_nodes=1000, num_keys=100):
+    from aiida.backends.djsite.db.models import DbNode, DbAttribute
+
+    if settings.BACKEND != BACKEND_DJANGO:
+        print 'This benchmark compares two storage schemes of the Django backend, use a Django profile'
+        return
+
+    nodes = [Node() for _ in range(num_nodes)]
+    for node in nodes:
+        node.label = LABEL
+    Node.store_many(nodes)
+    pks = [node.pk for node in nodes]
+    attributes = [get_attributes(index, num_keys) for index in range(num_nodes)]
+    print '{} nodes with {} attributes each'.format(num_nodes, num_keys + 2)
+
+    def write_legacy():
+        with transaction.atomic():
+            for pk, attrs in zip(pks, attributes):
+                DbAttribute.reset_values_for_node(pk, attributes=attrs, with_transaction=False)
+
+    def write_jsonb():
+        with transaction.atomic():
+            for pk, attrs in zip(pks, attributes):
+                DbNode.objects.filter(pk=pk).update(attributes=attrs)
+
+    time_function('write', write_legacy, write_jsonb)
+
+    time_function(
+        'full read',
+        lambda: [DbAttribute.get_all_values_for_nodepk(pk) for pk in pks],
+        lambda: [DbNode.objects.get(pk=pk).attributes for pk in pks])
+
+    time_function(
+        'filter on an attribute',
+        lambda: sorted(DbNode.objects.filter(
+            pk__in=pks, dbattributes__key='group', dbattributes__ival=3).values_list('pk', flat=True)),
+        lambda: sorted(DbNode.objects.filter(
+            pk__in=pks, attributes__contains={'group': 3}).values_list('pk', flat=True)))
+
+    time_function(
+        'filter on a nested attribute',
+        lambda: sorted(DbNode.objects.filter(
+            pk__in=pks, dbattributes__key='nested.name', dbattributes__tval='node_7').values_list('pk', flat=True)),
+        lambda: sorted(DbNode.objects.filter(
+            pk__in=pks, attributes__contains={'nested': {'name': 'node_7'}}).values_list('pk', flat=True)))
+
+    # Remove the rows of the previous scheme, that are not used anymore
+    DbAttribute.objects.filter(dbnode_id__in=pks).delete()
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
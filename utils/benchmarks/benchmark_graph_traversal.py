@@ -0,0 +1,146 @@
+#!/usr/bin/env runaiida
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Benchmark of the breadth-first traversal of the provenance graph, comparing
+traverse_graph with the previous traversal of delete_nodes, which ran one
+QueryBuilder query per depth with the ids of the frontier in an IN filter.
+
+First create the synthetic provenance graph (once, by default about 1M nodes),
+then run the traversals::
+
+    verdi run utils/benchmarks/benchmark_graph_traversal.py create [num_nodes]
+    verdi run utils/benchmarks/benchmark_graph_traversal.py run [num_start_nodes]
+
+The graph is made of chains of CHAIN_LENGTH calculations, each creating the data
+node that is the input of the next one. Every calculation also has as input one
+of the shared parameters, common to CHAINS_PER_PARAMETERS chains.
+"""
+import sys
+import time
+
+from aiida.backends.general.graph_traversal import traverse_graph
+from aiida.common.links import LinkType
+from aiida.orm import DataFactory
+from aiida.orm.calculation import Calculation
+from aiida.orm.node import Node
+from aiida.orm.querybuilder import QueryBuilder
+
+# Labels of the first nodes of the chains and of the shared parameters
+LABEL = 'benchmark_graph_traversal'
+SHARED_LABEL = 'benchmark_graph_traversal_shared'
+
+CHAIN_LENGTH = 20
+CHAINS_PER_PARAMETERS = 100
+
+PROVENANCE_LINKS = (LinkType.CREATE, LinkType.INPUT)
+
+ParameterData = DataFactory('parameter')
+
+
+def create(num_nodes=1000000):
+    nodes_per_chain = 2 * CHAIN_LENGTH + 1
+    num_chains = num_nodes // nodes_per_chain
+    created = 0
+    for start in range(0, num_chains, CHAINS_PER_PARAMETERS):
+        shared = ParameterData(dict={'start': start}, label=SHARED_LABEL).store()
+        nodes = []
+        for _ in range(min(CHAINS_PER_PARAMETERS, num_chains - start)):
+            node = ParameterData(dict={}, label=LABEL)
+            nodes.append(node)
+            for _ in range(CHAIN_LENGTH):
+                calc = Calculation()
+                calc.add_link_from(node, label='input', link_type=LinkType.INPUT)
+                calc.add_link_from(shared, label='parameters', link_type=LinkType.INPUT)
+                node = ParameterData(dict={})
+                node.add_link_from(calc, label='output', link_type=LinkType.CREATE)
+                nodes.extend([calc, node])
+        Node.store_many(nodes)
+        created += len(nodes) + 1
+        print '{} nodes created'.format(created)
+
+
+def legacy_traverse(pks, link_types):
+    """
+    The previous traversal of delete_nodes, with one query per depth
+    """
+    edge_filters = {'type': {'in': [link_type.value for link_type in link_types]}}
+    operational_set = set(pks)
+    visited = set(pks)
+    while operational_set:
+        new_pks_set = set([i for i, in QueryBuilder().append(
+            Node, filters={'id': {'in': operational_set}}).append(
+            Node, project='id', edge_filters=edge_filters).iterall()])
+        operational_set = new_pks_set.difference(visited)
+        visited = visited.union(new_pks_set)
+    return visited
+
+
+def time_traversal(label, legacy_function, function):
+    start = time.time()
+    legacy_result = legacy_function()
+    legacy_time = time.time() - start
+
+    start = time.time()
+    result = function()
+    new_time = time.time() - start
+
+    assert set(result) == set(legacy_result), 'the traversals of {} differ'.format(label)
+    print '{:<45} {:>8} nodes   legacy: {:8.3f} s   traverse_graph: {:8.3f} s   speedup: {:5.2f}x'.format(
+        label, len(result), legacy_time, new_time, legacy_time / new_time if new_time else float('inf'))
+
+
+def run(num_start_nodes=100):
+    roots = [pk for pk, in QueryBuilder().append(
+        ParameterData, filters={'label': LABEL}, project='id', tag='root').order_by({'root': 'id'}).limit(
+        num_start_nodes).all()]
+    shared = [pk for pk, in QueryBuilder().append(
+        ParameterData, filters={'label': SHARED_LABEL}, project='id').limit(10).all()]
+    if not roots:
+        print "No nodes found, create them first with 'create'"
+        return
+
+    # The descendants, as when deleting nodes
+    time_traversal(
+        'descendants of {} chain roots'.format(len(roots)),
+        lambda: legacy_traverse(roots, PROVENANCE_LINKS),
+        lambda: traverse_graph(roots, forward=PROVENANCE_LINKS))
+    time_traversal(
+        'descendants of {} shared parameters'.format(len(shared)),
+        lambda: legacy_traverse(shared, PROVENANCE_LINKS),
+        lambda: traverse_graph(shared, forward=PROVENANCE_LINKS))
+
+    # The ancestors, as when exporting nodes
+    leaves = traverse_graph(roots, forward=PROVENANCE_LINKS)
+    time_traversal(
+        'ancestors of {} nodes'.format(len(leaves)),
+        lambda: get_all_ancestors(leaves),
+        lambda: traverse_graph(leaves, backward=PROVENANCE_LINKS))
+
+
+def get_all_ancestors(pks):
+    """
+    The ancestors as found by the QueryBuilder, as in the export
+    """
+    qb = QueryBuilder()
+    qb.append(Node, tag='low_node', filters={'id': {'in': list(pks)}})
+    qb.append(Node, ancestor_of='low_node', project=['id'])
+    return set(pks).union(pk for pk, in qb.iterall())
+
+
+def main(mode='run', *args):
+    if mode == 'create':
+        create(*[int(arg) for arg in args])
+    else:
+        run(*[int(arg) for arg in args])
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,120 @@
+#!/usr/bin/env runaiida
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Benchmark of the hashing of large ParameterData and ArrayData nodes, comparing
+the current make_hash with the original recursive implementation and checking
+that both produce the same hashes.
+
+Run it with::
+
+    verdi run utils/benchmarks/benchmark_hashing.py [num_keys] [array_size]
+"""
+import hashlib
+import sys
+import time
+
+import numpy as np
+
+from aiida.common import hashing
+from aiida.orm import DataFactory
+
+
+def legacy_make_hash(object_to_hash, **kwargs):
+    """
+    The original implementation of make_hash, building the intermediate strings and reading files at once
+    """
+    from collections import Mapping, Sequence, Set
+    from datetime import datetime
+    import numbers
+    from aiida.common.folders import Folder
+
+    def with_type(type_chr, string_to_hash):
+        return hashlib.sha224("{}{}".format(type_chr, string_to_hash)).hexdigest()
+
+    if isinstance(object_to_hash, basestring):
+        return with_type('s', object_to_hash)
+    if isinstance(object_to_hash, bool):
+        return with_type('b', str(object_to_hash))
+    if isinstance(object_to_hash, numbers.Integral):
+        return with_type('i', str(object_to_hash))
+    if isinstance(object_to_hash, numbers.Real):
+        return with_type('f', hashing.truncate_float64(object_to_hash).tobytes())
+    if object_to_hash is None:
+        return with_type('n', str(object_to_hash))
+    if isinstance(object_to_hash, datetime):
+        return with_type('d', str(object_to_hash))
+    if isinstance(object_to_hash, Mapping):
+        hashed_dictionary = {k: legacy_make_hash(v, **kwargs) for k, v in object_to_hash.items()}
+        return with_type('D', legacy_make_hash(sorted(hashed_dictionary.items()), **kwargs))
+    if isinstance(object_to_hash, Set):
+        return with_type('S', ",".join([legacy_make_hash(x, **kwargs) for x in sorted(object_to_hash)]))
+    if isinstance(object_to_hash, Sequence):
+        return with_type('L', ",".join([legacy_make_hash(x, **kwargs) for x in object_to_hash]))
+    if isinstance(object_to_hash, Folder):
+        def read_file(folder, name):
+            with folder.open(name) as handle:
+                return handle.read()
+
+        ignored_folder_content = kwargs.get('ignored_folder_content', [])
+        return with_type('pd', legacy_make_hash([
+            (name, object_to_hash.get_subfolder(name) if object_to_hash.isdir(name) else
+             with_type('pf', read_file(object_to_hash, name)))
+            for name in sorted(object_to_hash.get_content_list()) if name not in ignored_folder_content
+        ], **kwargs))
+    raise ValueError("Value of type {} cannot be hashed".format(type(object_to_hash)))
+
+
+def time_function(function, *args, **kwargs):
+    """
+    :return: a tuple of the best of three timings in seconds and the result
+    """
+    timings = []
+    for _ in range(3):
+        start = time.time()
+        result = function(*args, **kwargs)
+        timings.append(time.time() - start)
+    return min(timings), result
+
+
+def benchmark_node(label, node):
+    objects = node._get_objects_to_hash()
+
+    legacy_time, legacy_hash = time_function(legacy_make_hash, objects)
+    hashing.clear_hash_caches()
+    new_time, new_hash = time_function(hashing.make_hash, objects)
+
+    assert legacy_hash == new_hash, 'the hashes of {} differ: {} != {}'.format(label, legacy_hash, new_hash)
+
+    print '{:<40} legacy: {:8.3f} s   current: {:8.3f} s   speedup: {:5.2f}x'.format(
+        label, legacy_time, new_time, legacy_time / new_time if new_time else float('inf'))
+
+
+def main(num_keys=10000, array_size=1000000):
+    ParameterData = DataFactory('parameter')
+    ArrayData = DataFactory('array')
+
+    parameters = ParameterData(dict={
+        'key_{}'.format(i): {'value': i, 'list': [i, float(i), 'string_{}'.format(i)]} for i in range(num_keys)
+    })
+    benchmark_node('ParameterData ({} keys, unstored)'.format(num_keys), parameters)
+
+    arrays = ArrayData()
+    arrays.set_array('positions', np.random.rand(array_size, 3))
+    arrays.set_array('energies', np.random.rand(array_size))
+    benchmark_node('ArrayData ({} rows, unstored)'.format(array_size), arrays)
+
+    # The repository folder of a stored node is hashed only once
+    arrays.store()
+    benchmark_node('ArrayData ({} rows, stored)'.format(array_size), arrays)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,133 @@
+#!/usr/bin/env runaiida
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Benchmark of the loading of the plugin classes of the nodes, with and without
+the cache of load_plugin, and of the entry point index.
+
+First create the nodes (once), then run the benchmark::
+
+    verdi run utils/benchmarks/benchmark_plugin_loader.py create [num_nodes]
+    verdi run utils/benchmarks/benchmark_plugin_loader.py run [num_nodes]
+
+``run`` times:
+
+* resolving the plugin class of num_nodes type strings of mixed types, as
+  done for each row by DbNode.get_aiida_class
+* loading the nodes created with ``create`` with a QueryBuilder
+* listing the entry points of all the groups, scanning the installed
+  distributions or reading the saved index
+"""
+import sys
+import time
+
+from aiida.orm import DataFactory
+from aiida.orm.data.bool import Bool
+from aiida.orm.data.float import Float
+from aiida.orm.data.int import Int
+from aiida.orm.data.str import Str
+from aiida.orm.node import Node
+from aiida.orm.querybuilder import QueryBuilder
+from aiida.plugins import entry_point, loader
+
+# Label of the nodes created for the benchmark
+LABEL = 'benchmark_plugin_loader'
+
+ParameterData = DataFactory('parameter')
+KpointsData = DataFactory('array.kpoints')
+
+
+def create_nodes(num_nodes):
+    """
+    Store num_nodes nodes of mixed types
+    """
+    constructors = [
+        lambda index: ParameterData(dict={'index': index}),
+        lambda index: Int(index),
+        lambda index: Float(index * 0.5),
+        lambda index: Str('value {}'.format(index)),
+        lambda index: Bool(index % 2 == 0),
+        lambda index: KpointsData(),
+    ]
+    for index in range(num_nodes):
+        node = constructors[index % len(constructors)](index)
+        node.label = LABEL
+        node.store()
+
+
+def get_mixed_type_strings(num_nodes):
+    """
+    :return: the type strings of num_nodes nodes, of the types in the database
+    """
+    type_strings = [row[0] for row in QueryBuilder().append(Node, project=['type']).distinct().all()]
+    type_strings = type_strings or ['data.parameter.ParameterData.', 'data.int.Int.', 'code.Code.']
+    return [type_strings[index % len(type_strings)] for index in range(num_nodes)]
+
+
+def time_resolve(type_strings, load_plugin):
+    start = time.time()
+    for type_string in type_strings:
+        load_plugin(loader.get_plugin_type_from_type_string(type_string), safe=True)
+    return time.time() - start
+
+
+def time_load_nodes(num_nodes):
+    start = time.time()
+    query = QueryBuilder().append(Node, filters={'label': LABEL}, project=['*']).limit(num_nodes)
+    count = sum(1 for _ in query.iterall(batch_size=1000))
+    return count, time.time() - start
+
+
+def time_entry_points():
+    start = time.time()
+    for group in entry_point.get_entry_point_groups():
+        entry_point.get_entry_points(group)
+    return time.time() - start
+
+
+def main(mode='run', num_nodes=100000):
+    num_nodes = int(num_nodes)
+
+    if mode == 'create':
+        create_nodes(num_nodes)
+        print 'Created {} nodes'.format(num_nodes)
+        return
+
+    type_strings = get_mixed_type_strings(num_nodes)
+    print 'Resolving the plugin classes of {} nodes of {} types'.format(
+        num_nodes, len(set(type_strings)))
+    print '  uncached: {:8.3f} s'.format(time_resolve(type_strings, loader._load_plugin))
+    print '  cached:   {:8.3f} s'.format(time_resolve(type_strings, loader.load_plugin))
+
+    load_plugin = loader.load_plugin
+    try:
+        # The callers import load_plugin from the module at each call
+        loader.load_plugin = loader._load_plugin
+        count, uncached_time = time_load_nodes(num_nodes)
+    finally:
+        loader.load_plugin = load_plugin
+    count, cached_time = time_load_nodes(num_nodes)
+    print 'Loading {} nodes with a QueryBuilder'.format(count)
+    print '  uncached: {:8.3f} s'.format(uncached_time)
+    print '  cached:   {:8.3f} s'.format(cached_time)
+
+    entry_point.reset_entry_point_index()
+    scan_time = time_entry_points()
+    # As in a new process, that reads the saved index
+    entry_point._index = None
+    entry_point._scanned_groups.clear()
+    index_time = time_entry_points()
+    print 'Listing the entry points of all the groups'
+    print '  scanning:         {:8.3f} s'.format(scan_time)
+    print '  from saved index: {:8.3f} s'.format(index_time)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,97 @@
+#!/usr/bin/env runaiida
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Benchmark of the iteration over the results of a QueryBuilder, recording the
+rows per second and the peak memory (RSS) of the process.
+
+The peak RSS of a process can only grow, so run each mode in its own process.
+First create the nodes (once), then run one of the iteration modes::
+
+    verdi run utils/benchmarks/benchmark_querybuilder_iterall.py create [num_nodes]
+    verdi run utils/benchmarks/benchmark_querybuilder_iterall.py <mode> [batch_size]
+
+where mode is one of:
+
+* ``all``: all() of the id and an attribute, loading all rows at once
+* ``iterall``: iterall() of the id and an attribute
+* ``iterall_raw``: iterall(raw=True) of the id and an attribute
+* ``iterall_nodes``: iterall() of the nodes themselves
+"""
+import resource
+import sys
+import time
+
+from aiida.orm import DataFactory
+from aiida.orm.node import Node
+from aiida.orm.querybuilder import QueryBuilder
+
+# Label of the nodes created for the benchmark
+LABEL = 'benchmark_querybuilder_iterall'
+
+ParameterData = DataFactory('parameter')
+
+
+def get_peak_rss():
+    """
+    :return: the peak resident memory of the process in MB (ru_maxrss is in kB on Linux)
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.
+
+
+def create(num_nodes=1000000):
+    batch = 10000
+    for start in range(0, num_nodes, batch):
+        Node.store_many([
+            ParameterData(dict={'value': i, 'name': 'node_{}'.format(i)}, label=LABEL)
+            for i in range(start, min(start + batch, num_nodes))
+        ])
+        print '{} nodes created'.format(min(start + batch, num_nodes))
+
+
+def iterate(mode, batch_size=1000):
+    qb = QueryBuilder()
+    if mode == 'iterall_nodes':
+        qb.append(ParameterData, filters={'label': LABEL})
+    else:
+        qb.append(ParameterData, filters={'label': LABEL}, project=['id', 'attributes.value'])
+
+    initial_rss = get_peak_rss()
+    start = time.time()
+    if mode == 'all':
+        rows = qb.all()
+    elif mode == 'iterall':
+        rows = qb.iterall(batch_size=batch_size)
+    elif mode == 'iterall_raw':
+        rows = qb.iterall(batch_size=batch_size, raw=True)
+    elif mode == 'iterall_nodes':
+        rows = qb.iterall(batch_size=batch_size)
+    else:
+        raise ValueError('unknown mode {}'.format(mode))
+
+    num_rows = 0
+    for _ in rows:
+        num_rows += 1
+    elapsed = time.time() - start
+
+    print '{:<14} {} rows in {:8.3f} s: {:10.1f} rows/s   peak RSS: {:8.1f} MB (+{:.1f} MB)'.format(
+        mode, num_rows, elapsed, num_rows / elapsed if elapsed else float('inf'), get_peak_rss(),
+        get_peak_rss() - initial_rss)
+
+
+def main(mode='iterall', *args):
+    if mode == 'create':
+        create(*[int(arg) for arg in args])
+    else:
+        iterate(mode, *[int(arg) for arg in args])
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Benchmark of the parsing of the joblist output of the SLURM, PBS Pro, LSF and
+SGE schedulers, on synthetic outputs of num_lines lines built by repeating the
+jobs of the outputs used in the tests of the plugins::
+
+    python utils/benchmarks/benchmark_scheduler_parsing.py [num_lines] [num_requested]
+
+For each scheduler, the time to parse all the jobs is compared with the time
+to parse only num_requested of them, the other jobs being skipped by the
+parser (as when the jobs of AiiDA are polled among all the jobs of the user).
+"""
+import random
+import re
+import sys
+import time
+
+from aiida.scheduler.plugins.lsf import LsfScheduler
+from aiida.scheduler.plugins.pbspro import PbsproScheduler
+from aiida.scheduler.plugins.sge import SgeScheduler
+from aiida.scheduler.plugins.slurm import SlurmScheduler
+from aiida.scheduler.plugins.test_lsf import bjobs_stdout_to_test
+from aiida.scheduler.plugins.test_pbspro import text_qstat_f_to_test
+from aiida.scheduler.plugins.test_sge import text_qstat_ext_urg_xml_test
+from aiida.scheduler.plugins.test_slurm import text_squeue_to_test
+
+
+def make_tabular_output(text, separator, num_lines):
+    """
+    Repeat the lines of a squeue or bjobs output, where the job id is the
+    first field, with new job ids
+
+    :return: the output and the list of the job ids
+    """
+    lines = [line.split(separator, 1)[1] for line in text.splitlines() if separator in line]
+    job_ids = [str(1000000 + index) for index in range(num_lines)]
+    output = '\n'.join(
+        '{}{}{}'.format(job_id, separator, lines[index % len(lines)]) for index, job_id in enumerate(job_ids))
+    return output + '\n', job_ids
+
+
+def make_qstat_f_output(num_lines):
+    """
+    Repeat the job stanzas of a qstat -f output with new job ids, up to
+    num_lines lines
+
+    :return: the output and the list of the job ids
+    """
+    stanzas = [stanza.split('\n', 1)[1] for stanza in text_qstat_f_to_test.split('Job Id: ')[1:]]
+    pieces = []
+    job_ids = []
+    total_lines = 0
+    while total_lines < num_lines:
+        stanza = stanzas[len(job_ids) % len(stanzas)]
+        job_ids.append('{}.mycluster'.format(1000000 + len(job_ids)))
+        pieces.append('Job Id: {}\n{}'.format(job_ids[-1], stanza))
+        total_lines += stanza.count('\n') + 1
+    return ''.join(pieces), job_ids
+
+
+def make_qstat_xml_output(num_lines):
+    """
+    Repeat the pending job of the XML qstat output with new job ids, up to
+    num_lines lines
+
+    :return: the output and the list of the job ids
+    """
+    head, _, rest = text_qstat_ext_urg_xml_test.partition('  <job_info>\n')
+    job = re.search(r'    <job_list state="pending">.*?</job_list>\n', rest, re.DOTALL).group(0)
+    job_ids = [str(1000000 + index) for index in range(num_lines // (job.count('\n') or 1) + 1)]
+    jobs = ''.join(re.sub(r'<JB_job_number>\d+<', '<JB_job_number>{}<'.format(job_id), job) for job_id in job_ids)
+    return '{}  <job_info>\n{}  </job_info>\n</job_info>'.format(head, jobs), job_ids
+
+
+def time_parsing(scheduler, stdout, job_ids, num_requested):
+    """
+    :return: the number of jobs and the time to parse all of them, and to
+        parse num_requested of them
+    """
+    requested = set(random.Random(0).sample(job_ids, min(num_requested, len(job_ids))))
+
+    start = time.time()
+    num_jobs = len(scheduler._parse_joblist_output(0, stdout, ''))
+    all_time = time.time() - start
+
+    start = time.time()
+    num_requested = len(list(scheduler._iter_joblist_output(0, stdout, '', job_ids=requested)))
+    requested_time = time.time() - start
+
+    return num_jobs, all_time, num_requested, requested_time
+
+
+def main(num_lines=100000, num_requested=100):
+    num_lines = int(num_lines)
+    num_requested = int(num_requested)
+
+    outputs = [
+        ('SLURM', SlurmScheduler(), make_tabular_output(text_squeue_to_test, '^^^', num_lines)),
+        ('PBS Pro', PbsproScheduler(), make_qstat_f_output(num_lines)),
+        ('LSF', LsfScheduler(), make_tabular_output(bjobs_stdout_to_test, '|', num_lines)),
+        ('SGE', SgeScheduler(), make_qstat_xml_output(num_lines)),
+    ]
+
+    print 'Parsing the joblist output ({} lines)'.format(num_lines)
+    for name, scheduler, (stdout, job_ids) in outputs:
+        num_jobs, all_time, num_parsed, requested_time = time_parsing(scheduler, stdout, job_ids, num_requested)
+        print '  {}'.format(name)
+        print '    all {:6d} jobs: {:8.3f} s'.format(num_jobs, all_time)
+        print '    {:6d} jobs:     {:8.3f} s'.format(num_parsed, requested_time)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,74 @@
+#!/usr/bin/env runaiida
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Benchmark of the storage of many new ParameterData nodes, linked as inputs to a
+few calculations, comparing the bulk Node.store_many with one store() per node.
+
+Run it with::
+
+    verdi run utils/benchmarks/benchmark_store_many.py [num_nodes] [num_keys]
+"""
+import sys
+import time
+
+from aiida.common.links import LinkType
+from aiida.orm import DataFactory
+from aiida.orm.calculation import Calculation
+from aiida.orm.node import Node
+
+# Number of input nodes linked to each calculation
+INPUTS_PER_CALCULATION = 100
+
+
+def create_nodes(num_nodes, num_keys):
+    """
+    :return: a list of unstored ParameterData nodes followed by the calculations that have them as inputs
+    """
+    ParameterData = DataFactory('parameter')
+
+    parameters = [
+        ParameterData(dict={'key_{}'.format(j): i * j for j in range(num_keys)}) for i in range(num_nodes)
+    ]
+    calculations = []
+    for start in range(0, num_nodes, INPUTS_PER_CALCULATION):
+        calc = Calculation()
+        for i, node in enumerate(parameters[start:start + INPUTS_PER_CALCULATION]):
+            calc.add_link_from(node, label='input_{}'.format(i), link_type=LinkType.INPUT)
+        calculations.append(calc)
+
+    return parameters + calculations
+
+
+def store_one_by_one(nodes):
+    for node in nodes:
+        node.store()
+
+
+def main(num_nodes=2000, num_keys=10):
+    nodes = create_nodes(num_nodes, num_keys)
+    start = time.time()
+    store_one_by_one(nodes)
+    single_time = time.time() - start
+
+    nodes = create_nodes(num_nodes, num_keys)
+    start = time.time()
+    Node.store_many(nodes)
+    bulk_time = time.time() - start
+
+    print '{} nodes with {} attributes and {} links'.format(
+        len(nodes), num_keys, num_nodes)
+    print '  store():      {:8.3f} s ({:8.1f} nodes/s)'.format(single_time, len(nodes) / single_time)
+    print '  store_many(): {:8.3f} s ({:8.1f} nodes/s)   speedup: {:5.2f}x'.format(
+        bulk_time, len(nodes) / bulk_time, single_time / bulk_time)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
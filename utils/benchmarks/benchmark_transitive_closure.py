@@ -0,0 +1,122 @@
+#!/usr/bin/env runaiida
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Benchmark of the ancestor and descendant queries of the QueryBuilder, comparing
+the recursive queries with the transitive closure table, and of the overhead of
+the closure table on the storage of new links.
+
+The closure table is dropped and rebuilt, so run it on a test profile::
+
+    verdi run utils/benchmarks/benchmark_transitive_closure.py [num_chains] [chain_length]
+
+Every chain is a sequence of chain_length calculations, each creating the data
+node that is the input of the next one.
+"""
+import sys
+import time
+
+from aiida.backends.general.transitive_closure import build_closure, drop_closure, get_closure_status
+from aiida.common.links import LinkType
+from aiida.orm import DataFactory
+from aiida.orm.calculation import Calculation
+from aiida.orm.node import Node
+from aiida.orm.querybuilder import QueryBuilder
+
+# Label of the first node of every chain
+LABEL = 'benchmark_transitive_closure'
+
+ParameterData = DataFactory('parameter')
+
+
+def create_chains(num_chains, chain_length):
+    """
+    Store num_chains chains of chain_length calculations
+
+    :return: the time spent to store them
+    """
+    start = time.time()
+    for _ in range(num_chains):
+        node = ParameterData(dict={}, label=LABEL)
+        nodes = [node]
+        for _ in range(chain_length):
+            calc = Calculation()
+            calc.add_link_from(node, label='input', link_type=LinkType.INPUT)
+            node = ParameterData(dict={})
+            node.add_link_from(calc, label='output', link_type=LinkType.CREATE)
+            nodes.extend([calc, node])
+        Node.store_many(nodes)
+    return time.time() - start
+
+
+def time_queries():
+    """
+    :return: a dictionary with the best of three timings of some ancestor and descendant queries
+    """
+    def descendants():
+        qb = QueryBuilder()
+        qb.append(ParameterData, filters={'label': LABEL}, tag='root')
+        qb.append(Node, descendant_of='root', project='id')
+        return qb.count()
+
+    def deep_descendants():
+        qb = QueryBuilder()
+        qb.append(ParameterData, filters={'label': LABEL}, tag='root')
+        qb.append(Node, descendant_of='root', edge_filters={'depth': {'>': 5}}, project='id')
+        return qb.count()
+
+    def ancestors_of_calculations():
+        qb = QueryBuilder()
+        qb.append(Calculation, tag='calc')
+        qb.append(ParameterData, ancestor_of='calc', filters={'label': LABEL}, project='id')
+        return qb.count()
+
+    timings = {}
+    for function in (descendants, deep_descendants, ancestors_of_calculations):
+        best = None
+        for _ in range(3):
+            start = time.time()
+            count = function()
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[function.__name__] = (best, count)
+    return timings
+
+
+def main(num_chains=200, chain_length=20):
+    if get_closure_status() is not None:
+        print 'Dropping the existing transitive closure table, rebuild it afterwards if needed'
+    drop_closure()
+
+    store_time = create_chains(num_chains, chain_length)
+    recursive_timings = time_queries()
+
+    start = time.time()
+    num_rows = build_closure()
+    build_time = time.time() - start
+    closure_timings = time_queries()
+
+    store_time_with_closure = create_chains(num_chains, chain_length)
+
+    num_nodes = num_chains * (2 * chain_length + 1)
+    print '{} chains of {} calculations ({} nodes per run)'.format(num_chains, chain_length, num_nodes)
+    print '  closure built in {:.3f} s ({} pairs)'.format(build_time, num_rows)
+    print '  storing the nodes: {:8.3f} s without closure, {:8.3f} s with closure'.format(
+        store_time, store_time_with_closure)
+    for name in sorted(recursive_timings):
+        recursive_time, recursive_count = recursive_timings[name]
+        closure_time, closure_count = closure_timings[name]
+        print '  {:<28} recursive: {:8.3f} s ({} rows)   closure: {:8.3f} s ({} rows)   speedup: {:5.2f}x'.format(
+            name, recursive_time, recursive_count, closure_time, closure_count,
+            recursive_time / closure_time if closure_time else float('inf'))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
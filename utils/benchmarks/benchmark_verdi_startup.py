@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Benchmark of the startup time of verdi, for the commands that do not need the
+database (the help and the completion). Each command is run num_runs times in
+a new interpreter::
+
+    python utils/benchmarks/benchmark_verdi_startup.py [num_runs] [max_seconds]
+
+For each command, the median time of the runs and the number of imported
+modules are printed, with the heavy modules that should not be imported.
+The script exits with a non-zero status if a heavy module is imported, or if
+the median time of a command is above max_seconds: it can be used to check
+for regressions of the startup time.
+"""
+import sys
+
+from aiida.cmdline.utils.importtime import get_import_timings
+
+COMMANDS = [
+    ['help'],
+    ['completion', '1', 'verdi'],
+    ['completion', '2', 'verdi', 'calculation'],
+    ['devel', 'listproperties'],
+]
+
+# Modules that only the commands accessing the database need
+HEAVY_MODULES = ['django', 'sqlalchemy', 'numpy', 'aiida.orm', 'aiida.backends.djsite.db.models']
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.
+
+
+def main(num_runs=5, max_seconds=None):
+    num_runs = int(num_runs)
+    max_seconds = float(max_seconds) if max_seconds is not None else None
+
+    failed = False
+    for command in COMMANDS:
+        results = [get_import_timings(command) for _ in range(num_runs)]
+        wall_time = median([result['wall_time'] for result in results])
+        names = set(timing.name for timing in results[-1]['imports'])
+        heavy = sorted(name for name in names if name in HEAVY_MODULES)
+
+        print "verdi {}".format(' '.join(command))
+        print '  median time: {:8.3f} s'.format(wall_time)
+        print '  imports:     {:8d}'.format(len(names))
+        if results[-1]['error'] is not None:
+            print '  error:       {}'.format(results[-1]['error'])
+        if heavy:
+            print '  heavy modules imported: {}'.format(', '.join(heavy))
+            failed = True
+        if max_seconds is not None and wall_time > max_seconds:
+            print '  slower than {} s'.format(max_seconds)
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])